@@ -232,6 +232,8 @@ def generate_personalized_animations(
 
     results = []
 
+    pending = []
+
     for section in chapter["sections"]:
         section_num = section["section"]
         section_title = section["title"]
@@ -247,47 +249,57 @@ def generate_personalized_animations(
 
             output_name = f"{section_num.replace('.', '_')}_{name}_{interest}"
 
+            if not preview_only:
+                # Rendered together below so LLM calls overlap rendering
+                pending.append((output_name, topic, requirements))
+                continue
+
             logger.info(f"\nGenerating: {output_name}")
             logger.info(f"Topic: {topic}")
 
             try:
-                if preview_only:
-                    # Just generate code, don't render
-                    result = engine.preview_code(
-                        topic=topic,
-                        requirements=requirements,
-                        audience_level="high school"
-                    )
-
-                    # Save the code
-                    code_path = interest_output / f"{output_name}.py"
-                    with open(code_path, 'w') as f:
-                        f.write(f"# {topic} - {profile.display_name} Edition\n")
-                        f.write(f"# Section {section_num}\n\n")
-                        f.write(result.code)
-
-                    logger.info(f"  Code saved: {code_path}")
-                    results.append((output_name, True, "Code generated"))
-                else:
-                    # Full generation and rendering
-                    result = engine.generate(
-                        topic=topic,
-                        requirements=requirements,
-                        audience_level="high school",
-                        output_filename=output_name
-                    )
-
-                    if result.success:
-                        logger.info(f"  SUCCESS: {result.video_path}")
-                        results.append((output_name, True, str(result.video_path)))
-                    else:
-                        logger.error(f"  FAILED: {result.error_message}")
-                        results.append((output_name, False, result.error_message))
+                # Just generate code, don't render
+                result = engine.preview_code(
+                    topic=topic,
+                    requirements=requirements,
+                    audience_level="high school"
+                )
+
+                # Save the code
+                code_path = interest_output / f"{output_name}.py"
+                with open(code_path, 'w') as f:
+                    f.write(f"# {topic} - {profile.display_name} Edition\n")
+                    f.write(f"# Section {section_num}\n\n")
+                    f.write(result.code)
+
+                logger.info(f"  Code saved: {code_path}")
+                results.append((output_name, True, "Code generated"))
 
             except Exception as e:
                 logger.exception(f"  ERROR: {e}")
                 results.append((output_name, False, str(e)))
 
+    if pending:
+        # Full generation and rendering, pipelined across the chapter
+        specs = [
+            {
+                "topic": topic,
+                "requirements": requirements,
+                "audience_level": "high school",
+                "output_filename": output_name,
+            }
+            for output_name, topic, requirements in pending
+        ]
+        for index, result in engine.generate_many(specs):
+            output_name = pending[index][0]
+            logger.info(f"\nFinished: {output_name}")
+            if result.success:
+                logger.info(f"  SUCCESS: {result.video_path}")
+                results.append((output_name, True, str(result.video_path)))
+            else:
+                logger.error(f"  FAILED: {result.error_message}")
+                results.append((output_name, False, result.error_message))
+
     # Summary
     logger.info(f"\n{'='*60}")
     logger.info(f"GENERATION COMPLETE - {profile.display_name}")
@@ -297,20 +297,21 @@ def animate_step(
     results = []
     errors = []
 
+    jobs = []
     for i, spec in enumerate(animation_specs, 1):
         section = spec["section"]
         example_num = spec.get("example_num", i)
-        topic = spec["topic"]
-        requirements = spec["requirements"]
         suffix = f"_{interest}" if interest else ""
         output_name = f"section_{section.replace('.', '_')}_example_{example_num}{suffix}"
+        jobs.append((spec, section, example_num, output_name))
 
-        logger.info(f"\nAnimation {i}/{len(animation_specs)}: {topic[:50]}...")
-
-        try:
-            if preview_only:
+    if preview_only:
+        for i, (spec, section, example_num, output_name) in enumerate(jobs, 1):
+            topic = spec["topic"]
+            logger.info(f"\nAnimation {i}/{len(jobs)}: {topic[:50]}...")
+            try:
                 result = engine.preview_code(
-                    topic=topic, requirements=requirements, audience_level="high school"
+                    topic=topic, requirements=spec["requirements"], audience_level="high school"
                 )
                 code_path = code_dir / f"{output_name}.py"
                 code_path.write_text(
@@ -322,25 +323,39 @@ def animate_step(
                 generated += 1
                 successful += 1
                 results.append({"name": output_name, "success": True, "path": str(code_path), "type": "code"})
-            else:
-                result = engine.generate(
-                    topic=topic, requirements=requirements,
-                    audience_level="high school", output_filename=output_name,
-                )
+            except Exception as e:
+                logger.exception(f"  ERROR: {e}")
                 generated += 1
-                if result.success:
-                    logger.info(f"  SUCCESS: {result.video_path}")
-                    successful += 1
-                    results.append({"name": output_name, "success": True, "path": str(result.video_path), "type": "video"})
-                else:
-                    logger.error(f"  FAILED: {result.error_message}")
-                    results.append({"name": output_name, "success": False, "error": result.error_message, "type": "video"})
-                    errors.append(f"Animation failed: {output_name}")
-        except Exception as e:
-            logger.exception(f"  ERROR: {e}")
-            generated += 1
-            results.append({"name": output_name, "success": False, "error": str(e), "type": "unknown"})
-            errors.append(f"Exception: {output_name}: {str(e)}")
+                results.append({"name": output_name, "success": False, "error": str(e), "type": "unknown"})
+                errors.append(f"Exception: {output_name}: {str(e)}")
+        return generated, successful, results, errors
+
+    # Generate and render concurrently; results arrive in completion order
+    generate_specs = [
+        {
+            "topic": spec["topic"],
+            "requirements": spec["requirements"],
+            "audience_level": "high school",
+            "output_filename": output_name,
+        }
+        for spec, _, _, output_name in jobs
+    ]
+    video_results = {}
+    for done, (index, result) in enumerate(engine.generate_many(generate_specs), 1):
+        output_name = jobs[index][3]
+        generated += 1
+        logger.info(f"\nAnimation {done}/{len(jobs)}: {output_name}")
+        if result.success:
+            logger.info(f"  SUCCESS: {result.video_path}")
+            successful += 1
+            video_results[index] = {"name": output_name, "success": True, "path": str(result.video_path), "type": "video"}
+        else:
+            logger.error(f"  FAILED: {result.error_message}")
+            video_results[index] = {"name": output_name, "success": False, "error": result.error_message, "type": "video"}
+            errors.append(f"Animation failed: {output_name}")
+
+    # Report in textbook order regardless of completion order
+    results = [video_results[index] for index in sorted(video_results)]
 
     return generated, successful, results, errors
 
@@ -6,6 +6,7 @@ Provides REST API endpoints for storing and retrieving generated math animations
 
 from .models import VideoMetadata, VideoCreate, VideoResponse, VideoListResponse
 from .storage import VideoStorage
+from .async_storage import AsyncVideoStorage
 from .server import create_app
 
 __all__ = [
@@ -14,5 +15,6 @@ __all__ = [
     "VideoResponse",
     "VideoListResponse",
     "VideoStorage",
+    "AsyncVideoStorage",
     "create_app",
 ]
@@ -0,0 +1,102 @@
+"""
+Async facade over VideoStorage for the FastAPI routes.
+
+SQLite calls block, so running them directly in ``async def`` handlers
+stalls every other request, SSE stream and generation on the event loop.
+AsyncVideoStorage runs each call on a small dedicated thread pool instead;
+the pool size bounds how many requests touch the database at once, and
+each pool thread keeps its own VideoStorage connection.
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+from .models import VideoCreate, VideoMetadata, VideoSearchParams
+from .storage import BULK_CHUNK_SIZE, VideoPage, VideoStorage
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_STORAGE_WORKERS = 8
+
+
+class AsyncVideoStorage:
+    """Awaitable VideoStorage methods, executed on a bounded thread pool."""
+
+    def __init__(self, storage: VideoStorage, max_workers: int = DEFAULT_STORAGE_WORKERS):
+        """
+        Initialize the async storage.
+
+        Args:
+            storage: The synchronous storage to wrap
+            max_workers: Threads running storage calls; at most this many
+                queries run at once, the rest wait without blocking the loop
+        """
+        self.storage = storage
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="video-storage")
+
+    async def _run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    async def save(self, video: VideoCreate) -> VideoMetadata:
+        return await self._run(self.storage.save, video)
+
+    async def save_many(
+        self,
+        videos: Iterable[VideoCreate],
+        chunk_size: Optional[int] = BULK_CHUNK_SIZE,
+    ) -> List[VideoMetadata]:
+        # Materialize so the iterable is not consumed on the pool thread
+        return await self._run(self.storage.save_many, list(videos), chunk_size=chunk_size)
+
+    async def get_by_id(self, video_id: str, include_code: bool = True) -> Optional[VideoMetadata]:
+        return await self._run(self.storage.get_by_id, video_id, include_code=include_code)
+
+    async def get_code(self, video_id: str) -> Optional[str]:
+        return await self._run(self.storage.get_code, video_id)
+
+    async def list_videos_page(self, params: Optional[VideoSearchParams] = None) -> VideoPage:
+        return await self._run(self.storage.list_videos_page, params)
+
+    async def list_videos(
+        self, params: Optional[VideoSearchParams] = None
+    ) -> Tuple[List[VideoMetadata], Optional[int]]:
+        return await self._run(self.storage.list_videos, params)
+
+    async def best_videos_for_concepts(
+        self,
+        concept_ids: Sequence[str],
+        interest: Optional[str] = None,
+        success_only: bool = True,
+    ) -> Dict[str, VideoMetadata]:
+        return await self._run(
+            self.storage.best_videos_for_concepts,
+            list(concept_ids),
+            interest=interest,
+            success_only=success_only,
+        )
+
+    async def update(self, video_id: str, **updates) -> Optional[VideoMetadata]:
+        return await self._run(self.storage.update, video_id, **updates)
+
+    async def delete(self, video_id: str) -> bool:
+        return await self._run(self.storage.delete, video_id)
+
+    async def get_stats(self) -> dict:
+        return await self._run(self.storage.get_stats)
+
+    async def rebuild_search_index(self) -> None:
+        await self._run(self.storage.rebuild_search_index)
+
+    def close(self) -> None:
+        """Wait for running calls, stop the pool and close all connections."""
+        self._executor.shutdown(wait=True)
+        self.storage.close()
@@ -80,6 +80,21 @@ def stats(db_path: Path):
         for style, count in stats['by_style'].items():
             click.echo(f"  {style}: {count}")
 
+    if stats['by_grade']:
+        click.echo("\nBy Grade:")
+        for grade, count in stats['by_grade'].items():
+            click.echo(f"  {grade}: {count}")
+
+    if stats['by_model']:
+        click.echo("\nBy Model:")
+        for model, usage in stats['by_model'].items():
+            avg_render = usage['avg_render_time_ms']
+            click.echo(
+                f"  {model}: {usage['videos']} videos, "
+                f"{usage['input_tokens']} in / {usage['output_tokens']} out tokens"
+                + (f", avg render {avg_render / 1000:.1f}s" if avg_render is not None else "")
+            )
+
     click.echo()
 
 
@@ -149,5 +164,32 @@ def list_videos(db_path: Path, topic: str, interest: str, limit: int):
     click.echo()
 
 
+@main.command("gc-blobs")
+@click.option(
+    "--db-path",
+    type=click.Path(path_type=Path),
+    default=Path("./data/videos.db"),
+    help="Path to SQLite database",
+)
+@click.option(
+    "--blob-dir",
+    type=click.Path(path_type=Path),
+    default=None,
+    help="Blob store directory (default: MATH_ENGINE_BLOB_STORE_DIR)",
+)
+@click.option("--grace-hours", default=1.0, type=float, help="Keep blobs used this recently")
+def gc_blobs(db_path: Path, blob_dir: Path, grace_hours: float):
+    """Delete stored videos no output or database record refers to."""
+    from ..config import Config
+    from ..renderer.blob_store import BlobStore
+    from .storage import VideoStorage
+
+    store = BlobStore(blob_dir or Config.from_env().blob_store_dir)
+    referenced = VideoStorage(db_path).referenced_content_hashes()
+    removed = store.gc(referenced=referenced, grace_seconds=grace_hours * 3600)
+
+    click.echo(f"Removed {removed} unreferenced blobs from {store.root}")
+
+
 if __name__ == "__main__":
     main()
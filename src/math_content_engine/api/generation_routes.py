@@ -6,7 +6,6 @@ POST /api/v1/generate   — generate a video for a concept/theme/grade
 
 from __future__ import annotations
 
-import asyncio
 import logging
 import os
 from typing import List, Optional
@@ -70,6 +69,7 @@ async def generate_content(request: GenerateRequest) -> GenerateResponse:
     """
     from math_content_engine.config import Config
     from math_content_engine.engine import MathContentEngine
+    from math_content_engine.llm import get_llm_client
     from math_content_engine.api.storage import VideoStorage
     from math_content_engine.personalization.theme_mapper import theme_to_interest
 
@@ -115,12 +115,12 @@ async def generate_content(request: GenerateRequest) -> GenerateResponse:
             interest=interest if interest != "neutral" else None,
             storage=storage,
             tutor_writer=tutor_writer,
+            llm_client=get_llm_client(config),
         )
 
-        # Run the synchronous generate() in a thread so we don't block the
-        # event loop (Manim rendering is CPU-bound).
-        result = await asyncio.to_thread(
-            engine.generate,
+        # LLM calls are awaited on the event loop; rendering (CPU-bound)
+        # runs in a worker thread inside agenerate().
+        result = await engine.agenerate(
             topic=request.topic,
             requirements=request.requirements,
             audience_level=request.audience_level,
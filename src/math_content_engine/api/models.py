@@ -68,6 +68,7 @@ class VideoMetadata(BaseModel):
     # File metadata
     file_size_bytes: Optional[int] = None
     duration_seconds: Optional[float] = None
+    content_sha256: Optional[str] = None  # Blob store hash of the video file
 
     # Status
     success: bool = True
@@ -111,6 +112,7 @@ class VideoCreate(BaseModel):
 
     file_size_bytes: Optional[int] = None
     duration_seconds: Optional[float] = None
+    content_sha256: Optional[str] = None
 
     success: bool = True
     error_message: Optional[str] = None
@@ -138,6 +140,7 @@ class VideoResponse(BaseModel):
 
     file_size_bytes: Optional[int] = None
     duration_seconds: Optional[float] = None
+    content_sha256: Optional[str] = None
 
     success: bool
     created_at: datetime
@@ -148,14 +151,16 @@ class VideoResponse(BaseModel):
 class VideoListResponse(BaseModel):
     """Response model for listing videos."""
     videos: List[VideoResponse]
-    total: int
+    total: Optional[int] = None  # None when include_total is false
     page: int
     page_size: int
     has_more: bool
+    next_cursor: Optional[str] = None  # Pass as ``cursor`` to fetch the next page
 
 
 class VideoSearchParams(BaseModel):
     """Search/filter parameters for listing videos."""
+    concept_id: Optional[str] = None
     topic: Optional[str] = None
     scene_name: Optional[str] = None
     interest: Optional[str] = None
@@ -165,3 +170,10 @@ class VideoSearchParams(BaseModel):
     success_only: bool = True
     page: int = 1
     page_size: int = 20
+    # Keyset pagination: next_cursor of the previous page (overrides page)
+    cursor: Optional[str] = None
+    include_total: bool = True
+    # Full-text search over topic, scene name and requirements (and code
+    # with search_code); results are ranked by relevance
+    q: Optional[str] = None
+    search_code: bool = False
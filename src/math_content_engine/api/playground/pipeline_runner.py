@@ -19,7 +19,7 @@ from typing import Any, Dict, List, Optional
 
 from ...config import Config
 from ...knowledge_graph.concept_extractor import ConceptExtractor
-from ...llm import create_llm_client
+from ...llm import get_llm_client
 from ...llm.base import BaseLLMClient
 from ...personalization import TextbookParser, get_interest_profile
 from ...utils.code_extractor import extract_python_code
@@ -137,7 +137,7 @@ def run_personalization(
     user_prompt = user_prompt_override or preview.user_prompt
 
     start = time.time()
-    llm_client = create_llm_client(config)
+    llm_client = get_llm_client(config)
     response = llm_client.generate(
         prompt=user_prompt,
         system_prompt=system_prompt,
@@ -202,7 +202,7 @@ def run_concept_extraction(
     Returns a dict with ``concepts``, ``summary``, etc.
     """
     start = time.time()
-    llm_client = create_llm_client(config)
+    llm_client = get_llm_client(config)
     extractor = ConceptExtractor(llm_client=llm_client)
 
     if system_prompt_override or user_prompt_override:
@@ -290,7 +290,7 @@ def run_animation_generation(
     user_prompt = user_prompt_override or preview.user_prompt
 
     start = time.time()
-    llm_client = create_llm_client(config)
+    llm_client = get_llm_client(config)
     response = llm_client.generate(prompt=user_prompt, system_prompt=system_prompt)
     duration_ms = int((time.time() - start) * 1000)
 
@@ -380,6 +380,9 @@ def run_render(
     data service when available.
     """
     from ...renderer.manim_renderer import ManimRenderer
+    from ...renderer.blob_store import create_blob_store
+    from ...renderer.render_cache import create_render_cache
+    from ...renderer.worker_pool import create_worker_pool
     from ...constants import VideoQuality
 
     quality_map = {
@@ -403,6 +406,9 @@ def run_render(
             output_dir=output_dir,
             cache_dir=cache_dir,
             quality=video_quality,
+            render_cache=create_render_cache(config),
+            worker_pool=create_worker_pool(config),
+            blob_store=create_blob_store(config),
         )
         result = renderer.render(
             code=code,
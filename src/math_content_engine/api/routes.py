@@ -4,7 +4,7 @@ FastAPI routes for video retrieval API.
 
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Union
 
 from fastapi import APIRouter, HTTPException, Query, Depends
 from fastapi.responses import FileResponse
@@ -18,33 +18,58 @@ from .models import (
     AnimationStyle,
     VideoQuality,
 )
+from .async_storage import AsyncVideoStorage
 from .storage import VideoStorage
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/videos", tags=["videos"])
 
+# Most records accepted by one bulk create request
+MAX_BULK_VIDEOS = 1000
+
 # Storage instance (will be set by server.py)
-_storage: Optional[VideoStorage] = None
+_storage: Optional[AsyncVideoStorage] = None
 
 
-def get_storage() -> VideoStorage:
-    """Dependency to get storage instance."""
+def get_storage() -> AsyncVideoStorage:
+    """Dependency to get the async storage instance."""
     if _storage is None:
         raise HTTPException(status_code=500, detail="Storage not initialized")
     return _storage
 
 
-def set_storage(storage: VideoStorage) -> None:
-    """Set the storage instance."""
+def set_storage(storage: Union[VideoStorage, AsyncVideoStorage]) -> None:
+    """Set the storage instance; a VideoStorage is wrapped for async use."""
     global _storage
+    if isinstance(storage, VideoStorage):
+        storage = AsyncVideoStorage(storage)
     _storage = storage
 
 
+@router.get("/by-concepts", response_model=Dict[str, VideoResponse])
+async def get_videos_by_concepts(
+    concept_id: List[str] = Query(..., description="Concept IDs; repeat for several"),
+    interest: Optional[str] = Query(None, description="Preferred interest theme"),
+    storage: AsyncVideoStorage = Depends(get_storage)
+) -> Dict[str, VideoResponse]:
+    """
+    Get the best video for each of several concepts.
+
+    Resolves all videos of a lesson in one request. Videos matching
+    ``interest`` are preferred, then higher quality, then the newest.
+
+    Returns:
+        Video per concept ID; concepts without a video are omitted
+    """
+    best = await storage.best_videos_for_concepts(concept_id, interest=interest)
+    return {concept: _to_response(video) for concept, video in best.items()}
+
+
 @router.get("/{video_id}", response_model=VideoResponse)
 async def get_video_metadata(
     video_id: str,
-    storage: VideoStorage = Depends(get_storage)
+    storage: AsyncVideoStorage = Depends(get_storage)
 ) -> VideoResponse:
     """
     Get video metadata by ID.
@@ -55,36 +80,17 @@ async def get_video_metadata(
     Returns:
         Video metadata including path, topic, generation info
     """
-    video = storage.get_by_id(video_id)
+    video = await storage.get_by_id(video_id, include_code=False)
     if video is None:
         raise HTTPException(status_code=404, detail=f"Video not found: {video_id}")
 
-    return VideoResponse(
-        id=video.id,
-        topic=video.topic,
-        scene_name=video.scene_name,
-        video_path=video.video_path,
-        requirements=video.requirements,
-        audience_level=video.audience_level,
-        interest=video.interest,
-        style=video.style,
-        quality=video.quality,
-        llm_provider=video.llm_provider,
-        llm_model=video.llm_model,
-        generation_attempts=video.generation_attempts,
-        render_attempts=video.render_attempts,
-        render_time_ms=video.render_time_ms,
-        file_size_bytes=video.file_size_bytes,
-        duration_seconds=video.duration_seconds,
-        success=video.success,
-        created_at=video.created_at,
-    )
+    return _to_response(video)
 
 
 @router.get("/{video_id}/file")
 async def get_video_file(
     video_id: str,
-    storage: VideoStorage = Depends(get_storage)
+    storage: AsyncVideoStorage = Depends(get_storage)
 ) -> FileResponse:
     """
     Download the actual video file by ID.
@@ -95,7 +101,7 @@ async def get_video_file(
     Returns:
         The video file as a download
     """
-    video = storage.get_by_id(video_id)
+    video = await storage.get_by_id(video_id, include_code=False)
     if video is None:
         raise HTTPException(status_code=404, detail=f"Video not found: {video_id}")
 
@@ -120,7 +126,7 @@ async def get_video_file(
 @router.get("/{video_id}/code")
 async def get_video_code(
     video_id: str,
-    storage: VideoStorage = Depends(get_storage)
+    storage: AsyncVideoStorage = Depends(get_storage)
 ) -> dict:
     """
     Get the Manim code used to generate the video.
@@ -131,7 +137,7 @@ async def get_video_code(
     Returns:
         The Manim Python code as text
     """
-    video = storage.get_by_id(video_id)
+    video = await storage.get_by_id(video_id)
     if video is None:
         raise HTTPException(status_code=404, detail=f"Video not found: {video_id}")
 
@@ -144,6 +150,11 @@ async def get_video_code(
 
 @router.get("", response_model=VideoListResponse)
 async def list_videos(
+    q: Optional[str] = Query(
+        None, description="Full-text search over topic, scene name and requirements"
+    ),
+    search_code: bool = Query(False, description="Also search the generated code"),
+    concept_id: Optional[str] = Query(None, description="Filter by concept ID"),
     topic: Optional[str] = Query(None, description="Filter by topic (partial match)"),
     scene_name: Optional[str] = Query(None, description="Filter by scene name"),
     interest: Optional[str] = Query(None, description="Filter by interest"),
@@ -152,15 +163,27 @@ async def list_videos(
     success_only: bool = Query(True, description="Only show successful videos"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
-    storage: VideoStorage = Depends(get_storage)
+    cursor: Optional[str] = Query(
+        None, description="next_cursor of the previous page; replaces page"
+    ),
+    include_total: bool = Query(True, description="Include the total match count"),
+    storage: AsyncVideoStorage = Depends(get_storage)
 ) -> VideoListResponse:
     """
     List videos with optional filtering and pagination.
 
+    Deep pages should follow ``next_cursor`` rather than increasing
+    ``page``: cursor pages cost the same at any depth. Full-text results
+    (``q``) are ranked by relevance and paged by ``page``; combining ``q``
+    with ``cursor`` is rejected with 400.
+
     Returns:
         Paginated list of video metadata
     """
     params = VideoSearchParams(
+        q=q,
+        search_code=search_code,
+        concept_id=concept_id,
         topic=topic,
         scene_name=scene_name,
         interest=interest,
@@ -169,45 +192,29 @@ async def list_videos(
         success_only=success_only,
         page=page,
         page_size=page_size,
+        cursor=cursor,
+        include_total=include_total,
     )
 
-    videos, total = storage.list_videos(params)
+    try:
+        result = await storage.list_videos_page(params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return VideoListResponse(
-        videos=[
-            VideoResponse(
-                id=v.id,
-                topic=v.topic,
-                scene_name=v.scene_name,
-                video_path=v.video_path,
-                requirements=v.requirements,
-                audience_level=v.audience_level,
-                interest=v.interest,
-                style=v.style,
-                quality=v.quality,
-                llm_provider=v.llm_provider,
-                llm_model=v.llm_model,
-                generation_attempts=v.generation_attempts,
-                render_attempts=v.render_attempts,
-                render_time_ms=v.render_time_ms,
-                file_size_bytes=v.file_size_bytes,
-                duration_seconds=v.duration_seconds,
-                success=v.success,
-                created_at=v.created_at,
-            )
-            for v in videos
-        ],
-        total=total,
+        videos=[_to_response(v) for v in result.videos],
+        total=result.total,
         page=page,
         page_size=page_size,
-        has_more=(page * page_size) < total,
+        has_more=result.has_more,
+        next_cursor=result.next_cursor,
     )
 
 
 @router.post("", response_model=VideoResponse, status_code=201)
 async def create_video(
     video: VideoCreate,
-    storage: VideoStorage = Depends(get_storage)
+    storage: AsyncVideoStorage = Depends(get_storage)
 ) -> VideoResponse:
     """
     Create a new video record.
@@ -220,8 +227,39 @@ async def create_video(
     Returns:
         Created video metadata with assigned ID
     """
-    metadata = storage.save(video)
+    metadata = await storage.save(video)
+    return _to_response(metadata)
+
+
+@router.post("/bulk", response_model=List[VideoResponse], status_code=201)
+async def create_videos_bulk(
+    videos: List[VideoCreate],
+    storage: AsyncVideoStorage = Depends(get_storage)
+) -> List[VideoResponse]:
+    """
+    Create many video records at once.
+
+    Intended for backfills and batch runs. All records are written in one
+    transaction, so a failed request saves none of them and can be retried
+    as a whole.
+
+    Args:
+        videos: Video metadata to store, at most MAX_BULK_VIDEOS
+
+    Returns:
+        Created video metadata with assigned IDs, in request order
+    """
+    if len(videos) > MAX_BULK_VIDEOS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {MAX_BULK_VIDEOS} videos per bulk request, got {len(videos)}",
+        )
+    saved = await storage.save_many(videos, chunk_size=None)
+    return [_to_response(metadata) for metadata in saved]
+
 
+def _to_response(metadata: VideoMetadata) -> VideoResponse:
+    """Build the API response for a stored video."""
     return VideoResponse(
         id=metadata.id,
         topic=metadata.topic,
@@ -239,6 +277,7 @@ async def create_video(
         render_time_ms=metadata.render_time_ms,
         file_size_bytes=metadata.file_size_bytes,
         duration_seconds=metadata.duration_seconds,
+        content_sha256=metadata.content_sha256,
         success=metadata.success,
         created_at=metadata.created_at,
     )
@@ -247,7 +286,7 @@ async def create_video(
 @router.delete("/{video_id}", status_code=204)
 async def delete_video(
     video_id: str,
-    storage: VideoStorage = Depends(get_storage)
+    storage: AsyncVideoStorage = Depends(get_storage)
 ) -> None:
     """
     Delete a video record.
@@ -257,13 +296,13 @@ async def delete_video(
     Args:
         video_id: The unique video identifier
     """
-    if not storage.delete(video_id):
+    if not await storage.delete(video_id):
         raise HTTPException(status_code=404, detail=f"Video not found: {video_id}")
 
 
 @router.get("/stats/summary")
 async def get_stats(
-    storage: VideoStorage = Depends(get_storage)
+    storage: AsyncVideoStorage = Depends(get_storage)
 ) -> dict:
     """
     Get video storage statistics.
@@ -271,4 +310,4 @@ async def get_stats(
     Returns:
         Summary statistics about stored videos
     """
-    return storage.get_stats()
+    return await storage.get_stats()
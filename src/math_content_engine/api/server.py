@@ -4,6 +4,7 @@ FastAPI server setup for video retrieval API.
 
 import logging
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Optional
 
@@ -13,6 +14,9 @@ from fastapi.staticfiles import StaticFiles
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
 
+from ..llm.connections import aclose_async_clients
+from ..llm.factory import close_llm_clients
+from .async_storage import DEFAULT_STORAGE_WORKERS, AsyncVideoStorage
 from .routes import router, set_storage
 from .storage import VideoStorage
 
@@ -38,12 +42,25 @@ def create_app(
     if db_path is None:
         db_path = Path(os.getenv("MATH_ENGINE_DB_PATH", "./data/videos.db"))
 
-    # Initialize storage
-    storage = VideoStorage(db_path)
+    # Initialize storage; routes reach SQLite through a bounded thread
+    # pool so queries never block the event loop
+    storage = AsyncVideoStorage(
+        VideoStorage(db_path),
+        max_workers=int(os.getenv("MATH_ENGINE_DB_WORKERS", str(DEFAULT_STORAGE_WORKERS))),
+    )
     set_storage(storage)
 
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        # Release pooled LLM connections shared across requests
+        await aclose_async_clients()
+        close_llm_clients()
+        storage.close()
+
     # Create FastAPI app
     app = FastAPI(
+        lifespan=lifespan,
         title="Math Content Engine - Video API",
         description=(
             "REST API for retrieving math animation videos generated by the "
@@ -123,6 +140,8 @@ def create_app(
                 "get_video_file": "GET /api/v1/videos/{id}/file",
                 "get_video_code": "GET /api/v1/videos/{id}/code",
                 "create_video": "POST /api/v1/videos",
+                "create_videos_bulk": "POST /api/v1/videos/bulk",
+                "videos_by_concepts": "GET /api/v1/videos/by-concepts",
                 "delete_video": "DELETE /api/v1/videos/{id}",
                 "stats": "GET /api/v1/videos/stats/summary",
                 "generate": "POST /api/v1/generate",
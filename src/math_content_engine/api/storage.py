@@ -2,20 +2,219 @@
 SQLite storage for video metadata.
 """
 
+import base64
+import binascii
+import hashlib
 import json
 import logging
+import os
+import re
 import sqlite3
+import threading
+import zlib
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
 from .models import VideoMetadata, VideoCreate, VideoSearchParams
 
 logger = logging.getLogger(__name__)
 
+# Columns of the full-text index over videos and their bm25 weights. Code
+# is indexed separately in code_fts, one entry per distinct code blob.
+FTS_COLUMNS = ("topic", "scene_name", "requirements")
+FTS_WEIGHTS = (10.0, 5.0, 2.0)
+CODE_FTS_WEIGHT = 1.0
+
+# Columns read for list results; code stays in code_blobs until asked for
+LIST_COLUMNS = (
+    "id", "topic", "scene_name", "video_path",
+    "concept_ids", "grade",
+    "requirements", "audience_level", "interest", "style", "quality",
+    "llm_provider", "llm_model", "input_tokens", "output_tokens",
+    "generation_attempts", "render_attempts", "total_attempts",
+    "generation_time_ms", "render_time_ms",
+    "file_size_bytes", "duration_seconds", "content_sha256",
+    "success", "error_message",
+    "created_at", "updated_at",
+)
+_LIST_SELECT = ", ".join(f"videos.{c}" for c in LIST_COLUMNS)
+
+# Rank of the quality column for best_videos_for_concepts(), higher is better
+_QUALITY_RANK = (
+    "CASE videos.quality WHEN 'k' THEN 5 WHEN 'p' THEN 4 WHEN 'h' THEN 3 "
+    "WHEN 'm' THEN 2 ELSE 1 END"
+)
+
+# Dimensions of the video_stats rollup and the column each groups by;
+# "all" has a single row (value '') covering every video
+STATS_DIMENSIONS = {
+    "all": "''",
+    "interest": "interest",
+    "style": "style",
+    "grade": "grade",
+    "provider": "llm_provider",
+    "model": "llm_model",
+}
+# PRAGMA user_version from which videos keep no inline code
+_SCHEMA_INLINE_CODE_MIGRATED = 1
+
+# Filters whose row counts are cached: equality tests a written row can be
+# matched against in Python. LIKE filters and full-text search are counted
+# on every request instead of taking cache slots.
+_COUNTED_FILTERS = ("concept_id", "interest", "grade", "style", "quality", "success_only")
+# Video columns those filters test
+_COUNTED_COLUMNS = frozenset({"concept_ids", "interest", "grade", "style", "quality", "success"})
+# Video columns whose changes move counters between rollup rows
+_STATS_SOURCE_COLUMNS = (
+    "success", "interest", "style", "grade", "llm_provider", "llm_model",
+    "generation_time_ms", "render_time_ms", "input_tokens", "output_tokens",
+)
+_STATS_COUNTERS = (
+    "videos", "successful",
+    "generation_time_ms", "generation_timed", "render_time_ms", "render_timed",
+    "input_tokens", "output_tokens",
+)
+
+
+def _stats_upsert(dimension: str, row: str, sign: int) -> str:
+    """SQL adding (sign=1) or removing (sign=-1) a video row to its rollup rows.
+
+    ``row`` is NEW or OLD inside a trigger, or a table alias.
+    """
+    column = STATS_DIMENSIONS[dimension]
+    value = "''" if column == "''" else f"{row}.{column}"
+    counters = (
+        "1",
+        f"{row}.success = 1",
+        f"COALESCE({row}.generation_time_ms, 0)",
+        f"{row}.generation_time_ms IS NOT NULL",
+        f"COALESCE({row}.render_time_ms, 0)",
+        f"{row}.render_time_ms IS NOT NULL",
+        f"COALESCE({row}.input_tokens, 0)",
+        f"COALESCE({row}.output_tokens, 0)",
+    )
+    return f"""
+        INSERT INTO video_stats (dimension, value, {", ".join(_STATS_COUNTERS)})
+        SELECT '{dimension}', {value}, {", ".join(f"{sign} * ({c})" for c in counters)}
+        WHERE {value} IS NOT NULL
+        ON CONFLICT (dimension, value) DO UPDATE SET
+            {", ".join(f"{c} = {c} + excluded.{c}" for c in _STATS_COUNTERS)};
+    """
+
+
+# Videos written per transaction by save_many()
+BULK_CHUNK_SIZE = 500
+
+_INSERT_VIDEO = """
+    INSERT INTO videos (
+        id, topic, scene_name, video_path, code, code_id,
+        concept_ids, grade,
+        requirements, audience_level, interest, style, quality,
+        llm_provider, llm_model, input_tokens, output_tokens,
+        generation_attempts, render_attempts, total_attempts,
+        generation_time_ms, render_time_ms,
+        file_size_bytes, duration_seconds, content_sha256,
+        success, error_message,
+        created_at, updated_at
+    ) VALUES (
+        ?, ?, ?, ?, '', ?,
+        ?, ?,
+        ?, ?, ?, ?, ?,
+        ?, ?, ?, ?,
+        ?, ?, ?,
+        ?, ?,
+        ?, ?, ?,
+        ?, ?,
+        ?, ?
+    )
+"""
+
+_SEARCH_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def compress_code(code: str) -> bytes:
+    """Compress scene code for the code_blobs table."""
+    return zlib.compress(code.encode("utf-8"), 6)
+
+
+def decompress_code(data: bytes) -> str:
+    """Inverse of compress_code()."""
+    return zlib.decompress(data).decode("utf-8")
+
+
+def build_fts_query(text: str) -> Optional[str]:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term, so operators and punctuation
+    in the input cannot produce syntax errors; all words must match.
+
+    Returns:
+        The MATCH expression, or None if the text has no words
+    """
+    tokens = _SEARCH_TOKEN.findall(text)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+@dataclass
+class VideoPage:
+    """One page of list results."""
+    videos: List[VideoMetadata]
+    total: Optional[int]  # None when the total was not requested
+    has_more: bool
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(created_at: str, video_id: str) -> str:
+    """Encode the sort key of the last row of a page as an opaque cursor."""
+    raw = json.dumps([created_at, video_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Decode a cursor from encode_cursor().
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, video_id = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(created_at, str) or not isinstance(video_id, str):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return created_at, video_id
+
 
 class VideoStorage:
-    """SQLite-based storage for video metadata."""
+    """SQLite-based storage for video metadata.
+
+    Each thread keeps one open connection, so prepared statements are
+    reused across calls. The database runs in WAL mode: readers never
+    block on a writer, and writers wait up to BUSY_TIMEOUT_SECONDS for
+    each other instead of failing with "database is locked".
+    """
+
+    # Seconds a connection waits for another writer's lock
+    BUSY_TIMEOUT_SECONDS = 30.0
+
+    # Page cache per connection, in KiB
+    CACHE_SIZE_KB = 16 * 1024
+
+    # Bytes of the database file memory-mapped for reads
+    MMAP_SIZE_BYTES = 256 * 1024 * 1024
+
+    # Prepared statements kept per connection
+    CACHED_STATEMENTS = 256
+
+    # Filter combinations whose row counts are kept up to date
+    COUNT_CACHE_SIZE = 128
 
     def __init__(self, db_path: Optional[Path] = None):
         """
@@ -28,24 +227,67 @@ class VideoStorage:
             db_path = Path("./data/videos.db")
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        # Set by _init_db(); False when SQLite was built without FTS5
+        self.fts_enabled = False
         self._init_db()
 
     def _get_connection(self) -> sqlite3.Connection:
-        """Get a database connection."""
-        conn = sqlite3.connect(str(self.db_path))
+        """Get this thread's database connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        # A connection inherited across fork() must not be reused
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        # Only the owning thread uses the connection; check_same_thread is
+        # off so close() can release connections of other threads
+        conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=self.BUSY_TIMEOUT_SECONDS,
+            cached_statements=self.CACHED_STATEMENTS,
+            check_same_thread=False,
+        )
         conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = -{self.CACHE_SIZE_KB}")
+        conn.execute(f"PRAGMA mmap_size = {self.MMAP_SIZE_BYTES}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        with self._connections_lock:
+            self._connections.append(conn)
         return conn
 
+    def close(self) -> None:
+        """Close every connection opened by this storage.
+
+        Call once no other thread is using the storage, e.g. at shutdown.
+        """
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
     def _init_db(self) -> None:
         """Initialize database schema."""
         with self._get_connection() as conn:
+            # WAL is persistent in the database file, so set it once here
+            conn.execute("PRAGMA journal_mode = WAL")
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS videos (
                     id TEXT PRIMARY KEY,
                     topic TEXT NOT NULL,
                     scene_name TEXT NOT NULL,
                     video_path TEXT NOT NULL,
-                    code TEXT NOT NULL,
+                    -- Legacy inline code; new rows keep code in code_blobs
+                    code TEXT NOT NULL DEFAULT '',
+                    code_id INTEGER REFERENCES code_blobs(id),
 
                     concept_ids TEXT,
                     grade TEXT,
@@ -69,6 +311,7 @@ class VideoStorage:
 
                     file_size_bytes INTEGER,
                     duration_seconds REAL,
+                    content_sha256 TEXT,
 
                     success INTEGER DEFAULT 1,
                     error_message TEXT,
@@ -78,6 +321,16 @@ class VideoStorage:
                 )
             """)
 
+            # Scene code, zlib-compressed and deduplicated by content hash
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS code_blobs (
+                    id INTEGER PRIMARY KEY,
+                    sha256 TEXT NOT NULL UNIQUE,
+                    data BLOB NOT NULL,
+                    size_bytes INTEGER NOT NULL
+                )
+            """)
+
             # Migrate existing tables: add columns if they don't exist
             existing_cols = {
                 row[1]
@@ -89,6 +342,14 @@ class VideoStorage:
             if "grade" not in existing_cols:
                 conn.execute("ALTER TABLE videos ADD COLUMN grade TEXT")
                 logger.info("Migrated: added grade column to videos table")
+            if "content_sha256" not in existing_cols:
+                conn.execute("ALTER TABLE videos ADD COLUMN content_sha256 TEXT")
+                logger.info("Migrated: added content_sha256 column to videos table")
+            if "code_id" not in existing_cols:
+                conn.execute(
+                    "ALTER TABLE videos ADD COLUMN code_id INTEGER REFERENCES code_blobs(id)"
+                )
+                logger.info("Migrated: added code_id column to videos table")
 
             # Create indexes for common queries
             conn.execute("""
@@ -109,10 +370,264 @@ class VideoStorage:
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_videos_grade ON videos(grade)
             """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_videos_code_id ON videos(code_id)
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_videos_content_sha256 ON videos(content_sha256)
+            """)
+            # Keyset pagination order, with and without the default
+            # success filter
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_videos_created_id ON videos(created_at, id)
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_videos_success_created_id
+                ON videos(success, created_at, id)
+            """)
+
+            # Concept -> video index; concept_ids in videos stays the
+            # canonical list, this table makes concept lookups indexed
+            concepts_exist = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'video_concepts'"
+            ).fetchone()
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS video_concepts (
+                    concept_id TEXT NOT NULL,
+                    video_id TEXT NOT NULL REFERENCES videos(id) ON DELETE CASCADE,
+                    PRIMARY KEY (concept_id, video_id)
+                ) WITHOUT ROWID
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_video_concepts_video
+                ON video_concepts(video_id, concept_id)
+            """)
+            if not concepts_exist:
+                conn.execute("""
+                    INSERT OR IGNORE INTO video_concepts (concept_id, video_id)
+                    SELECT json_each.value, videos.id
+                    FROM videos, json_each(videos.concept_ids)
+                    WHERE json_valid(videos.concept_ids)
+                """)
+
+            self._init_stats(conn)
+
+            # Row counts per filter combination, kept current by writes
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS video_counts (
+                    filter_key TEXT PRIMARY KEY,
+                    count INTEGER NOT NULL
+                )
+            """)
+            # Bumped by every write that can change a count, so a count taken
+            # outside the write lock is only cached if nothing changed since
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS video_counts_version (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    version INTEGER NOT NULL
+                )
+            """)
+            conn.execute("INSERT OR IGNORE INTO video_counts_version VALUES (0, 0)")
+
+            self.fts_enabled = self._init_fts(conn)
+            self._migrate_inline_code(conn)
 
             conn.commit()
             logger.info(f"Database initialized at {self.db_path}")
 
+    def _init_fts(self, conn: sqlite3.Connection) -> bool:
+        """Create the full-text index over videos and the triggers syncing it.
+
+        The index is an external-content FTS5 table, so the text is not
+        stored twice. Returns False if FTS5 is unavailable; searches then
+        fall back to LIKE.
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'videos_fts'"
+        ).fetchone()
+        if exists and "code" in {
+            row[1] for row in conn.execute("PRAGMA table_info(videos_fts)").fetchall()
+        }:
+            # Earlier layout indexed code inline; code now has its own index
+            for trigger in ("videos_fts_insert", "videos_fts_delete", "videos_fts_update"):
+                conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            conn.execute("DROP TABLE videos_fts")
+            exists = None
+        columns = ", ".join(FTS_COLUMNS)
+        old_values = ", ".join(f"old.{c}" for c in FTS_COLUMNS)
+        new_values = ", ".join(f"new.{c}" for c in FTS_COLUMNS)
+        try:
+            conn.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS videos_fts USING fts5(
+                    {columns}, content='videos', content_rowid='rowid'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 unavailable, text search falls back to LIKE: {e}")
+            return False
+
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS videos_fts_insert AFTER INSERT ON videos BEGIN
+                INSERT INTO videos_fts(rowid, {columns}) VALUES (new.rowid, {new_values});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS videos_fts_delete AFTER DELETE ON videos BEGIN
+                INSERT INTO videos_fts(videos_fts, rowid, {columns})
+                VALUES ('delete', old.rowid, {old_values});
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS videos_fts_update
+            AFTER UPDATE OF {columns} ON videos BEGIN
+                INSERT INTO videos_fts(videos_fts, rowid, {columns})
+                VALUES ('delete', old.rowid, {old_values});
+                INSERT INTO videos_fts(rowid, {columns}) VALUES (new.rowid, {new_values});
+            END
+        """)
+        if not exists:
+            # Index rows written before the search index existed
+            conn.execute("INSERT INTO videos_fts(videos_fts) VALUES ('rebuild')")
+            logger.info("Migrated: built full-text index over videos")
+
+        # Contentless index of code_blobs (rowid = code_blobs.id); code is
+        # stored compressed, so it is indexed from Python on write
+        code_exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'code_fts'"
+        ).fetchone()
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS code_fts USING fts5(code, content='')")
+        if not code_exists:
+            for blob in conn.execute("SELECT id, data FROM code_blobs").fetchall():
+                conn.execute(
+                    "INSERT INTO code_fts(rowid, code) VALUES (?, ?)",
+                    (blob["id"], decompress_code(blob["data"])),
+                )
+        return True
+
+    def _init_stats(self, conn: sqlite3.Connection) -> None:
+        """Create the video_stats rollup and the triggers maintaining it.
+
+        Triggers cover every write path (save, save_many, update, delete),
+        so get_stats() reads a handful of rows instead of scanning videos.
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'video_stats'"
+        ).fetchone()
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS video_stats (
+                dimension TEXT NOT NULL,
+                value TEXT NOT NULL,
+                {", ".join(f"{c} INTEGER NOT NULL DEFAULT 0" for c in _STATS_COUNTERS)},
+                PRIMARY KEY (dimension, value)
+            ) WITHOUT ROWID
+        """)
+
+        def body(*rows_and_signs: Tuple[str, int]) -> str:
+            return "".join(
+                _stats_upsert(dimension, row, sign)
+                for row, sign in rows_and_signs
+                for dimension in STATS_DIMENSIONS
+            )
+
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS video_stats_insert AFTER INSERT ON videos BEGIN
+                {body(("NEW", 1))}
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS video_stats_delete AFTER DELETE ON videos BEGIN
+                {body(("OLD", -1))}
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS video_stats_update
+            AFTER UPDATE OF {", ".join(_STATS_SOURCE_COLUMNS)} ON videos BEGIN
+                {body(("OLD", -1), ("NEW", 1))}
+            END
+        """)
+
+        if not exists:
+            # Roll up rows written before the stats table existed
+            for dimension, column in STATS_DIMENSIONS.items():
+                value = "''" if column == "''" else f"videos.{column}"
+                conn.execute(f"""
+                    INSERT INTO video_stats (dimension, value, {", ".join(_STATS_COUNTERS)})
+                    SELECT '{dimension}', {value}, COUNT(*),
+                        SUM(success = 1),
+                        COALESCE(SUM(generation_time_ms), 0), COUNT(generation_time_ms),
+                        COALESCE(SUM(render_time_ms), 0), COUNT(render_time_ms),
+                        COALESCE(SUM(input_tokens), 0), COALESCE(SUM(output_tokens), 0)
+                    FROM videos WHERE {value} IS NOT NULL GROUP BY {value}
+                """)
+
+    def _migrate_inline_code(self, conn: sqlite3.Connection) -> None:
+        """Move code stored inline in videos rows into code_blobs.
+
+        Runs once per database; PRAGMA user_version records that it is
+        done, so later opens skip the table scan.
+        """
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_INLINE_CODE_MIGRATED:
+            return
+        rows = conn.execute("SELECT id, code FROM videos WHERE code != ''").fetchall()
+        for row in rows:
+            conn.execute(
+                "UPDATE videos SET code = '', code_id = ? WHERE id = ?",
+                (self._store_code(conn, row["code"]), row["id"]),
+            )
+        if rows:
+            logger.info(f"Migrated: moved code of {len(rows)} videos into code_blobs")
+        conn.execute(f"PRAGMA user_version = {_SCHEMA_INLINE_CODE_MIGRATED}")
+
+    def _store_code(self, conn: sqlite3.Connection, code: str) -> int:
+        """Return the code_blobs id of ``code``, storing it if it is new."""
+        digest = hashlib.sha256(code.encode("utf-8")).hexdigest()
+        row = conn.execute("SELECT id FROM code_blobs WHERE sha256 = ?", (digest,)).fetchone()
+        if row is not None:
+            return row["id"]
+        cursor = conn.execute(
+            "INSERT INTO code_blobs (sha256, data, size_bytes) VALUES (?, ?, ?)",
+            (digest, compress_code(code), len(code.encode("utf-8"))),
+        )
+        if self.fts_enabled:
+            conn.execute(
+                "INSERT INTO code_fts(rowid, code) VALUES (?, ?)", (cursor.lastrowid, code)
+            )
+        return cursor.lastrowid
+
+    def _release_code(self, conn: sqlite3.Connection, code_id: Optional[int]) -> None:
+        """Delete a code blob once no video references it."""
+        if code_id is None:
+            return
+        if conn.execute("SELECT 1 FROM videos WHERE code_id = ? LIMIT 1", (code_id,)).fetchone():
+            return
+        blob = conn.execute("SELECT data FROM code_blobs WHERE id = ?", (code_id,)).fetchone()
+        if blob is None:
+            return
+        if self.fts_enabled:
+            conn.execute(
+                "INSERT INTO code_fts(code_fts, rowid, code) VALUES ('delete', ?, ?)",
+                (code_id, decompress_code(blob["data"])),
+            )
+        conn.execute("DELETE FROM code_blobs WHERE id = ?", (code_id,))
+
+    def rebuild_search_index(self) -> None:
+        """Rebuild the full-text index from the videos table.
+
+        Needed only if rowids changed outside VideoStorage, e.g. after a
+        manual VACUUM.
+        """
+        if not self.fts_enabled:
+            return
+        with self._get_connection() as conn:
+            conn.execute("INSERT INTO videos_fts(videos_fts) VALUES ('rebuild')")
+            conn.execute("INSERT INTO code_fts(code_fts) VALUES ('delete-all')")
+            for blob in conn.execute("SELECT id, data FROM code_blobs").fetchall():
+                conn.execute(
+                    "INSERT INTO code_fts(rowid, code) VALUES (?, ?)",
+                    (blob["id"], decompress_code(blob["data"])),
+                )
+            conn.commit()
+
     def save(self, video: VideoCreate) -> VideoMetadata:
         """
         Save a new video record.
@@ -123,7 +638,80 @@ class VideoStorage:
         Returns:
             VideoMetadata with generated ID and timestamps
         """
-        metadata = VideoMetadata(
+        metadata = self._new_metadata(video)
+
+        with self._get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            code_id = self._store_code(conn, metadata.code)
+            conn.execute(_INSERT_VIDEO, self._insert_values(metadata, code_id))
+            self._index_concepts(conn, [metadata])
+            self._adjust_counts(conn, [self._count_fields(metadata)], 1)
+            conn.commit()
+
+        logger.info(f"Saved video metadata: id={metadata.id}, topic={metadata.topic}")
+        return metadata
+
+    def save_many(
+        self,
+        videos: Iterable[VideoCreate],
+        chunk_size: Optional[int] = BULK_CHUNK_SIZE,
+    ) -> List[VideoMetadata]:
+        """
+        Save many video records, one transaction per chunk.
+
+        Much faster than calling save() per video for backfills: each chunk
+        is written with a single executemany and committed once. A failure
+        rolls back only the chunk being written.
+
+        Args:
+            videos: Video data to save
+            chunk_size: Videos written per transaction; None writes all of
+                them in one transaction, so a failure saves none
+
+        Returns:
+            VideoMetadata of every saved video, in input order
+        """
+        saved: List[VideoMetadata] = []
+        chunk: List[VideoMetadata] = []
+
+        def flush() -> None:
+            with self._get_connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                code_ids: Dict[str, int] = {}
+                rows = []
+                for metadata in chunk:
+                    if metadata.code not in code_ids:
+                        code_ids[metadata.code] = self._store_code(conn, metadata.code)
+                    rows.append(self._insert_values(metadata, code_ids[metadata.code]))
+                conn.executemany(_INSERT_VIDEO, rows)
+                self._index_concepts(conn, chunk)
+                self._adjust_counts(conn, [self._count_fields(m) for m in chunk], 1)
+                conn.commit()
+            saved.extend(chunk)
+            chunk.clear()
+
+        for video in videos:
+            chunk.append(self._new_metadata(video))
+            if chunk_size is not None and len(chunk) >= chunk_size:
+                flush()
+        if chunk:
+            flush()
+
+        logger.info(f"Saved {len(saved)} video records in bulk")
+        return saved
+
+    @staticmethod
+    def _index_concepts(conn: sqlite3.Connection, videos: Sequence[VideoMetadata]) -> None:
+        """Add the video_concepts rows of newly inserted videos."""
+        conn.executemany(
+            "INSERT OR IGNORE INTO video_concepts (concept_id, video_id) VALUES (?, ?)",
+            [(concept_id, v.id) for v in videos for concept_id in v.concept_ids],
+        )
+
+    @staticmethod
+    def _new_metadata(video: VideoCreate) -> VideoMetadata:
+        """Build the stored record for a new video, with ID and timestamps."""
+        return VideoMetadata(
             topic=video.topic,
             scene_name=video.scene_name,
             video_path=video.video_path,
@@ -146,93 +734,97 @@ class VideoStorage:
             render_time_ms=video.render_time_ms,
             file_size_bytes=video.file_size_bytes,
             duration_seconds=video.duration_seconds,
+            content_sha256=video.content_sha256,
             success=video.success,
             error_message=video.error_message,
         )
 
-        with self._get_connection() as conn:
-            conn.execute("""
-                INSERT INTO videos (
-                    id, topic, scene_name, video_path, code,
-                    concept_ids, grade,
-                    requirements, audience_level, interest, style, quality,
-                    llm_provider, llm_model, input_tokens, output_tokens,
-                    generation_attempts, render_attempts, total_attempts,
-                    generation_time_ms, render_time_ms,
-                    file_size_bytes, duration_seconds,
-                    success, error_message,
-                    created_at, updated_at
-                ) VALUES (
-                    ?, ?, ?, ?, ?,
-                    ?, ?,
-                    ?, ?, ?, ?, ?,
-                    ?, ?, ?, ?,
-                    ?, ?, ?,
-                    ?, ?,
-                    ?, ?,
-                    ?, ?,
-                    ?, ?
-                )
-            """, (
-                metadata.id,
-                metadata.topic,
-                metadata.scene_name,
-                metadata.video_path,
-                metadata.code,
-                json.dumps(metadata.concept_ids),
-                metadata.grade,
-                metadata.requirements,
-                metadata.audience_level,
-                metadata.interest,
-                metadata.style.value,
-                metadata.quality.value,
-                metadata.llm_provider,
-                metadata.llm_model,
-                metadata.input_tokens,
-                metadata.output_tokens,
-                metadata.generation_attempts,
-                metadata.render_attempts,
-                metadata.total_attempts,
-                metadata.generation_time_ms,
-                metadata.render_time_ms,
-                metadata.file_size_bytes,
-                metadata.duration_seconds,
-                1 if metadata.success else 0,
-                metadata.error_message,
-                metadata.created_at.isoformat(),
-                metadata.updated_at.isoformat(),
-            ))
-            conn.commit()
-
-        logger.info(f"Saved video metadata: id={metadata.id}, topic={metadata.topic}")
-        return metadata
+    @staticmethod
+    def _insert_values(metadata: VideoMetadata, code_id: int) -> tuple:
+        """Parameters of _INSERT_VIDEO for one video."""
+        return (
+            metadata.id,
+            metadata.topic,
+            metadata.scene_name,
+            metadata.video_path,
+            code_id,
+            json.dumps(metadata.concept_ids),
+            metadata.grade,
+            metadata.requirements,
+            metadata.audience_level,
+            metadata.interest,
+            metadata.style.value,
+            metadata.quality.value,
+            metadata.llm_provider,
+            metadata.llm_model,
+            metadata.input_tokens,
+            metadata.output_tokens,
+            metadata.generation_attempts,
+            metadata.render_attempts,
+            metadata.total_attempts,
+            metadata.generation_time_ms,
+            metadata.render_time_ms,
+            metadata.file_size_bytes,
+            metadata.duration_seconds,
+            metadata.content_sha256,
+            1 if metadata.success else 0,
+            metadata.error_message,
+            metadata.created_at.isoformat(),
+            metadata.updated_at.isoformat(),
+        )
 
-    def get_by_id(self, video_id: str) -> Optional[VideoMetadata]:
+    def get_by_id(self, video_id: str, include_code: bool = True) -> Optional[VideoMetadata]:
         """
         Get video metadata by ID.
 
         Args:
             video_id: The video ID
+            include_code: Load and decompress the scene code; when False,
+                ``code`` is returned empty
 
         Returns:
             VideoMetadata if found, None otherwise
         """
         with self._get_connection() as conn:
-            cursor = conn.execute(
-                "SELECT * FROM videos WHERE id = ?",
-                (video_id,)
-            )
-            row = cursor.fetchone()
+            if include_code:
+                query = f"""
+                    SELECT {_LIST_SELECT}, videos.code, code_blobs.data AS code_data
+                    FROM videos LEFT JOIN code_blobs ON code_blobs.id = videos.code_id
+                    WHERE videos.id = ?
+                """
+            else:
+                query = f"SELECT {_LIST_SELECT} FROM videos WHERE videos.id = ?"
+            row = conn.execute(query, (video_id,)).fetchone()
 
         if row is None:
             return None
 
         return self._row_to_metadata(row)
 
+    def get_code(self, video_id: str) -> Optional[str]:
+        """
+        Get only the scene code of a video.
+
+        Args:
+            video_id: The video ID
+
+        Returns:
+            The code, or None if the video does not exist
+        """
+        with self._get_connection() as conn:
+            row = conn.execute("""
+                SELECT videos.code, code_blobs.data AS code_data
+                FROM videos LEFT JOIN code_blobs ON code_blobs.id = videos.code_id
+                WHERE videos.id = ?
+            """, (video_id,)).fetchone()
+        if row is None:
+            return None
+        return self._row_code(row)
+
     def list_videos(
         self,
         params: Optional[VideoSearchParams] = None
-    ) -> Tuple[List[VideoMetadata], int]:
+    ) -> Tuple[List[VideoMetadata], Optional[int]]:
         """
         List videos with optional filtering and pagination.
 
@@ -240,15 +832,180 @@ class VideoStorage:
             params: Search/filter parameters
 
         Returns:
-            Tuple of (list of videos, total count)
+            Tuple of (list of videos, total count or None if not requested)
+        """
+        page = self.list_videos_page(params)
+        return page.videos, page.total
+
+    def list_videos_page(self, params: Optional[VideoSearchParams] = None) -> VideoPage:
+        """
+        List one page of videos, newest first.
+
+        With ``params.cursor`` the page starts after the cursor's row
+        (keyset pagination), which stays fast at any depth; otherwise
+        ``params.page`` is used. Totals come from a count cache kept
+        current by writes, so they are only computed on first use of a
+        filter combination.
+
+        With ``params.q`` results are ranked by full-text relevance
+        instead, paged by ``params.page``, and no cursor is returned or
+        accepted.
+
+        Args:
+            params: Search/filter parameters
+
+        Returns:
+            VideoPage with the videos, optional total and next cursor
+
+        Raises:
+            ValueError: If ``params.cursor`` is malformed or combined with
+                ``params.q``
         """
         if params is None:
             params = VideoSearchParams()
+        if params.cursor and params.q:
+            raise ValueError("cursor cannot be combined with q; page search results by page")
 
-        # Build WHERE clause
+        fts_query = build_fts_query(params.q) if params.q else None
+        if fts_query and self.fts_enabled:
+            return self._search_page(params, fts_query)
+
+        conditions, values = self._filter_conditions(params)
+        page_conditions = list(conditions)
+        page_values = list(values)
+        offset = 0
+        if params.cursor:
+            created_at, video_id = decode_cursor(params.cursor)
+            page_conditions.append("(created_at, id) < (?, ?)")
+            page_values += [created_at, video_id]
+        else:
+            offset = (params.page - 1) * params.page_size
+
+        where_clause = ""
+        if page_conditions:
+            where_clause = "WHERE " + " AND ".join(page_conditions)
+
+        with self._get_connection() as conn:
+            # Fetch one extra row to learn whether another page follows
+            query = f"""
+                SELECT {_LIST_SELECT} FROM videos
+                {where_clause}
+                ORDER BY created_at DESC, id DESC
+                LIMIT ? OFFSET ?
+            """
+            rows = conn.execute(
+                query, page_values + [params.page_size + 1, offset]
+            ).fetchall()
+
+            total = None
+            if params.include_total:
+                if params.q:
+                    total = self._count(conn, conditions, values)
+                else:
+                    total = self._cached_count(conn, params, conditions, values)
+
+        has_more = len(rows) > params.page_size
+        rows = rows[:params.page_size]
+        next_cursor = None
+        if has_more:
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+        return VideoPage(
+            videos=[self._row_to_metadata(row) for row in rows],
+            total=total,
+            has_more=has_more,
+            next_cursor=next_cursor,
+        )
+
+    def _search_page(self, params: VideoSearchParams, fts_query: str) -> VideoPage:
+        """List one page of full-text matches, best first."""
+        conditions, values = self._filter_conditions(params, include_q=False)
+        where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+        weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+        offset = (params.page - 1) * params.page_size
+
+        hits = f"""
+            SELECT rowid AS hit_rowid, bm25(videos_fts, {weights}) AS score
+            FROM videos_fts WHERE videos_fts MATCH ?
+        """
+        hit_values = [fts_query]
+        if params.search_code:
+            hits += f"""
+                UNION ALL
+                SELECT videos.rowid, bm25(code_fts) * {CODE_FTS_WEIGHT}
+                FROM code_fts JOIN videos ON videos.code_id = code_fts.rowid
+                WHERE code_fts MATCH ?
+            """
+            hit_values.append(fts_query)
+
+        with self._get_connection() as conn:
+            # bm25 scores are negative; summing ranks videos matching in
+            # both text and code above either alone
+            rows = conn.execute(f"""
+                WITH hits AS MATERIALIZED ({hits}),
+                ranked AS (
+                    SELECT hit_rowid, SUM(score) AS score FROM hits GROUP BY hit_rowid
+                )
+                SELECT {_LIST_SELECT} FROM videos
+                JOIN ranked ON videos.rowid = ranked.hit_rowid
+                {where_clause}
+                ORDER BY ranked.score, created_at DESC, id DESC
+                LIMIT ? OFFSET ?
+            """, hit_values + values + [params.page_size + 1, offset]).fetchall()
+
+            total = None
+            if params.include_total:
+                conditions, values = self._filter_conditions(params)
+                total = self._count(conn, conditions, values)
+
+        has_more = len(rows) > params.page_size
+        return VideoPage(
+            videos=[self._row_to_metadata(row) for row in rows[:params.page_size]],
+            total=total,
+            has_more=has_more,
+        )
+
+    @staticmethod
+    def _count(conn: sqlite3.Connection, conditions: List[str], values: list) -> int:
+        where_clause = "WHERE " + " AND ".join(conditions) if conditions else ""
+        return conn.execute(f"SELECT COUNT(*) FROM videos {where_clause}", values).fetchone()[0]
+
+    def _filter_conditions(
+        self,
+        params: VideoSearchParams,
+        include_q: bool = True,
+    ) -> Tuple[List[str], list]:
+        """Build the WHERE conditions and values for the filters of ``params``."""
         conditions = []
         values = []
 
+        if params.q and include_q:
+            fts_query = build_fts_query(params.q)
+            if fts_query and self.fts_enabled:
+                match = "rowid IN (SELECT rowid FROM videos_fts WHERE videos_fts MATCH ?)"
+                values.append(fts_query)
+                if params.search_code:
+                    match = (
+                        f"({match} OR code_id IN "
+                        "(SELECT rowid FROM code_fts WHERE code_fts MATCH ?))"
+                    )
+                    values.append(fts_query)
+                conditions.append(match)
+            elif fts_query:
+                # Without FTS5 only the text columns are searched; code is
+                # compressed and cannot be matched with LIKE
+                for token in _SEARCH_TOKEN.findall(params.q):
+                    conditions.append(
+                        "(" + " OR ".join(f"{c} LIKE ?" for c in FTS_COLUMNS) + ")"
+                    )
+                    values += [f"%{token}%"] * len(FTS_COLUMNS)
+
+        if params.concept_id:
+            conditions.append(
+                "id IN (SELECT video_id FROM video_concepts WHERE concept_id = ?)"
+            )
+            values.append(params.concept_id)
+
         if params.topic:
             conditions.append("topic LIKE ?")
             values.append(f"%{params.topic}%")
@@ -276,28 +1033,206 @@ class VideoStorage:
         if params.success_only:
             conditions.append("success = 1")
 
-        where_clause = ""
-        if conditions:
-            where_clause = "WHERE " + " AND ".join(conditions)
+        return conditions, values
 
-        with self._get_connection() as conn:
-            # Get total count
-            count_query = f"SELECT COUNT(*) FROM videos {where_clause}"
-            total = conn.execute(count_query, values).fetchone()[0]
+    @staticmethod
+    def _filter_key(params: VideoSearchParams) -> Optional[str]:
+        """Identify the filter combination of ``params``, ignoring paging.
 
-            # Get paginated results
-            offset = (params.page - 1) * params.page_size
-            query = f"""
-                SELECT * FROM videos
-                {where_clause}
-                ORDER BY created_at DESC
-                LIMIT ? OFFSET ?
-            """
-            cursor = conn.execute(query, values + [params.page_size, offset])
-            rows = cursor.fetchall()
+        Only combinations of equality filters are cached, so a write can be
+        matched against them without querying; None when ``params`` uses a
+        LIKE filter or full-text search. The key is the JSON of the filters.
+        """
+        if params.q or params.topic or params.scene_name:
+            return None
+        filters = params.model_dump(mode="json", include=set(_COUNTED_FILTERS))
+        return json.dumps(filters, sort_keys=True)
+
+    def _cached_count(
+        self,
+        conn: sqlite3.Connection,
+        params: VideoSearchParams,
+        conditions: List[str],
+        values: list,
+    ) -> int:
+        """Return the row count for a filter combination, counting on a miss."""
+        key = self._filter_key(params)
+        if key is None:
+            return self._count(conn, conditions, values)
+        row = conn.execute(
+            "SELECT count FROM video_counts WHERE filter_key = ?", (key,)
+        ).fetchone()
+        if row is not None:
+            return row["count"]
+
+        # Count in a read snapshot, without the write lock, and note the
+        # version the count belongs to
+        conn.execute("BEGIN")
+        try:
+            version = self._counts_version(conn)
+            total = self._count(conn, conditions, values)
+        finally:
+            conn.commit()
+        self._store_count(conn, key, total, version)
+        return total
+
+    @staticmethod
+    def _counts_version(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT version FROM video_counts_version").fetchone()[0]
+
+    def _store_count(
+        self, conn: sqlite3.Connection, key: str, total: int, version: int
+    ) -> None:
+        """Cache a count if no write happened since it was taken.
+
+        Best effort: the write lock is not waited for, so a read never
+        queues behind saves; a busy database just leaves the count uncached.
+        """
+        conn.execute("PRAGMA busy_timeout = 0")
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if self._counts_version(conn) == version:
+                conn.execute(
+                    "INSERT OR REPLACE INTO video_counts (filter_key, count) VALUES (?, ?)",
+                    (key, total),
+                )
+                conn.execute(
+                    """
+                    DELETE FROM video_counts WHERE rowid NOT IN (
+                        SELECT rowid FROM video_counts ORDER BY rowid DESC LIMIT ?
+                    )
+                    """,
+                    (self.COUNT_CACHE_SIZE,),
+                )
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            if conn.in_transaction:
+                conn.rollback()
+            logger.debug(f"Count for {key} not cached: {e}")
+        finally:
+            conn.execute(f"PRAGMA busy_timeout = {int(self.BUSY_TIMEOUT_SECONDS * 1000)}")
+
+    def _adjust_counts(
+        self, conn: sqlite3.Connection, videos: Sequence[dict], delta: int
+    ) -> None:
+        """Add ``delta`` per matching video to every cached count.
+
+        ``videos`` are the filtered fields of the written rows, as built by
+        _count_fields(); they are matched against the cached filters here
+        rather than with a query per filter. Runs inside the caller's write
+        transaction.
+        """
+        conn.execute("UPDATE video_counts_version SET version = version + 1")
+        updates = []
+        stale = []
+        for row in conn.execute("SELECT filter_key FROM video_counts").fetchall():
+            filters = json.loads(row["filter_key"])
+            if any(v for k, v in filters.items() if k not in _COUNTED_FILTERS):
+                # Written before LIKE filters stopped being cached
+                stale.append((row["filter_key"],))
+                continue
+            matched = sum(1 for video in videos if self._count_matches(filters, video))
+            if matched:
+                updates.append((delta * matched, row["filter_key"]))
+        conn.executemany(
+            "UPDATE video_counts SET count = count + ? WHERE filter_key = ?", updates
+        )
+        conn.executemany("DELETE FROM video_counts WHERE filter_key = ?", stale)
+
+    @staticmethod
+    def _count_fields(metadata: VideoMetadata) -> dict:
+        """Fields of a video the cached count filters test."""
+        return {
+            "interest": metadata.interest,
+            "grade": metadata.grade,
+            "style": metadata.style.value,
+            "quality": metadata.quality.value,
+            "success": metadata.success,
+            "concept_ids": set(metadata.concept_ids),
+        }
 
-        videos = [self._row_to_metadata(row) for row in rows]
-        return videos, total
+    @staticmethod
+    def _stored_count_fields(conn: sqlite3.Connection, video_id: str) -> Optional[dict]:
+        """_count_fields() of a stored video, or None if it does not exist."""
+        row = conn.execute(
+            "SELECT interest, grade, style, quality, success FROM videos WHERE id = ?",
+            (video_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        concept_ids = {
+            r["concept_id"] for r in conn.execute(
+                "SELECT concept_id FROM video_concepts WHERE video_id = ?", (video_id,)
+            )
+        }
+        return {
+            "interest": row["interest"],
+            "grade": row["grade"],
+            "style": row["style"],
+            "quality": row["quality"],
+            "success": bool(row["success"]),
+            "concept_ids": concept_ids,
+        }
+
+    @staticmethod
+    def _count_matches(filters: dict, video: dict) -> bool:
+        """Whether a video passes cached filters, like _filter_conditions()."""
+        concept_id = filters.get("concept_id")
+        if concept_id and concept_id not in video["concept_ids"]:
+            return False
+        for name in ("interest", "grade", "style", "quality"):
+            if filters.get(name) and filters[name] != video[name]:
+                return False
+        return not (filters.get("success_only") and not video["success"])
+
+    def best_videos_for_concepts(
+        self,
+        concept_ids: Sequence[str],
+        interest: Optional[str] = None,
+        success_only: bool = True,
+    ) -> Dict[str, VideoMetadata]:
+        """
+        Pick the best video for each of several concepts in one query.
+
+        Videos matching ``interest`` are preferred, then higher quality,
+        then the most recent.
+
+        Args:
+            concept_ids: Concepts to resolve, e.g. every concept of a lesson
+            interest: Preferred interest theme
+            success_only: Only consider successfully rendered videos
+
+        Returns:
+            Best video per concept; concepts without videos are omitted
+        """
+        concept_ids = list(dict.fromkeys(concept_ids))
+        if not concept_ids:
+            return {}
+
+        placeholders = ", ".join("?" for _ in concept_ids)
+        success = "AND videos.success = 1" if success_only else ""
+        with self._get_connection() as conn:
+            rows = conn.execute(f"""
+                WITH ranked AS (
+                    SELECT
+                        video_concepts.concept_id AS best_for,
+                        {_LIST_SELECT},
+                        ROW_NUMBER() OVER (
+                            PARTITION BY video_concepts.concept_id
+                            ORDER BY
+                                COALESCE(videos.interest = ?, 0) DESC,
+                                {_QUALITY_RANK} DESC,
+                                videos.created_at DESC,
+                                videos.id DESC
+                        ) AS position
+                    FROM video_concepts JOIN videos ON videos.id = video_concepts.video_id
+                    WHERE video_concepts.concept_id IN ({placeholders}) {success}
+                )
+                SELECT * FROM ranked WHERE position = 1
+            """, [interest] + concept_ids).fetchall()
+
+        best = {row["best_for"]: self._row_to_metadata(row) for row in rows}
+        return {c: best[c] for c in concept_ids if c in best}
 
     def delete(self, video_id: str) -> bool:
         """
@@ -310,10 +1245,19 @@ class VideoStorage:
             True if deleted, False if not found
         """
         with self._get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT code_id FROM videos WHERE id = ?", (video_id,)
+            ).fetchone()
+            if row is not None:
+                # Count the row out while it is still visible
+                self._adjust_counts(conn, [self._stored_count_fields(conn, video_id)], -1)
             cursor = conn.execute(
                 "DELETE FROM videos WHERE id = ?",
                 (video_id,)
             )
+            if row is not None:
+                self._release_code(conn, row["code_id"])
             conn.commit()
             deleted = cursor.rowcount > 0
 
@@ -338,29 +1282,74 @@ class VideoStorage:
         # Add updated_at timestamp
         updates["updated_at"] = datetime.utcnow().isoformat()
 
-        # Build SET clause
-        set_clause = ", ".join(f"{k} = ?" for k in updates.keys())
-        values = list(updates.values()) + [video_id]
-
         with self._get_connection() as conn:
-            conn.execute(
+            conn.execute("BEGIN IMMEDIATE")
+            old_code_id = None
+            if "code" in updates:
+                row = conn.execute(
+                    "SELECT code_id FROM videos WHERE id = ?", (video_id,)
+                ).fetchone()
+                old_code_id = row["code_id"] if row is not None else None
+                updates["code_id"] = self._store_code(conn, updates.pop("code"))
+                updates["code"] = ""
+            concept_ids = None
+            if "concept_ids" in updates:
+                concept_ids = list(updates["concept_ids"] or [])
+                updates["concept_ids"] = json.dumps(concept_ids)
+            # Only changes to filtered fields move the row between counts
+            old_fields = None
+            if _COUNTED_COLUMNS.intersection(updates):
+                old_fields = self._stored_count_fields(conn, video_id)
+
+            # Build SET clause
+            set_clause = ", ".join(f"{k} = ?" for k in updates.keys())
+            values = list(updates.values()) + [video_id]
+
+            cursor = conn.execute(
                 f"UPDATE videos SET {set_clause} WHERE id = ?",
                 values
             )
+            if concept_ids is not None and cursor.rowcount:
+                conn.execute("DELETE FROM video_concepts WHERE video_id = ?", (video_id,))
+                conn.executemany(
+                    "INSERT INTO video_concepts (concept_id, video_id) VALUES (?, ?)",
+                    [(concept_id, video_id) for concept_id in dict.fromkeys(concept_ids)],
+                )
+            if not cursor.rowcount:
+                # No such video: drop a code blob stored for it above
+                self._release_code(conn, updates.get("code_id"))
+            elif old_code_id != updates.get("code_id", old_code_id):
+                self._release_code(conn, old_code_id)
+            if old_fields is not None:
+                new_fields = self._stored_count_fields(conn, video_id)
+                if new_fields != old_fields:
+                    self._adjust_counts(conn, [old_fields], -1)
+                    self._adjust_counts(conn, [new_fields], 1)
             conn.commit()
 
         return self.get_by_id(video_id)
 
+    @staticmethod
+    def _row_code(row: sqlite3.Row) -> str:
+        """Code of a row that selected code_data (and the legacy code column)."""
+        if row["code_data"] is not None:
+            return decompress_code(row["code_data"])
+        return row["code"] or ""
+
     def _row_to_metadata(self, row: sqlite3.Row) -> VideoMetadata:
-        """Convert a database row to VideoMetadata."""
+        """Convert a database row to VideoMetadata.
+
+        Rows selected without code (list results) get an empty ``code``.
+        """
         from .models import AnimationStyle, VideoQuality
 
+        code = self._row_code(row) if "code_data" in row.keys() else ""
         return VideoMetadata(
             id=row["id"],
             topic=row["topic"],
             scene_name=row["scene_name"],
             video_path=row["video_path"],
-            code=row["code"],
+            code=code,
             concept_ids=json.loads(row["concept_ids"] or "[]"),
             grade=row["grade"],
             requirements=row["requirements"],
@@ -379,35 +1368,70 @@ class VideoStorage:
             render_time_ms=row["render_time_ms"],
             file_size_bytes=row["file_size_bytes"],
             duration_seconds=row["duration_seconds"],
+            content_sha256=row["content_sha256"],
             success=bool(row["success"]),
             error_message=row["error_message"],
             created_at=datetime.fromisoformat(row["created_at"]),
             updated_at=datetime.fromisoformat(row["updated_at"]),
         )
 
+    def referenced_content_hashes(self) -> Set[str]:
+        """Blob store hashes of every stored video, for BlobStore.gc()."""
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT content_sha256 FROM videos WHERE content_sha256 IS NOT NULL"
+            ).fetchall()
+        return {row[0] for row in rows}
+
     def get_stats(self) -> dict:
-        """Get storage statistics."""
+        """
+        Get storage statistics.
+
+        Reads the video_stats rollup, so the cost does not grow with the
+        number of videos.
+        """
         with self._get_connection() as conn:
-            total = conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
-            successful = conn.execute(
-                "SELECT COUNT(*) FROM videos WHERE success = 1"
-            ).fetchone()[0]
-            by_interest = conn.execute("""
-                SELECT interest, COUNT(*) as count
-                FROM videos
-                WHERE interest IS NOT NULL
-                GROUP BY interest
-            """).fetchall()
-            by_style = conn.execute("""
-                SELECT style, COUNT(*) as count
-                FROM videos
-                GROUP BY style
-            """).fetchall()
+            rows = conn.execute(
+                "SELECT * FROM video_stats WHERE videos > 0"
+            ).fetchall()
+
+        groups: dict = {dimension: {} for dimension in STATS_DIMENSIONS}
+        for row in rows:
+            groups[row["dimension"]][row["value"]] = row
+        overall = groups["all"].get("")
+
+        def average(row: Optional[sqlite3.Row], stage: str) -> Optional[float]:
+            """Mean of <stage>_time_ms over the videos that recorded it."""
+            if row is None or not row[f"{stage}_timed"]:
+                return None
+            return row[f"{stage}_time_ms"] / row[f"{stage}_timed"]
+
+        def counts(dimension: str) -> dict:
+            return {value: row["videos"] for value, row in groups[dimension].items()}
 
+        total = overall["videos"] if overall else 0
+        successful = overall["successful"] if overall else 0
         return {
             "total_videos": total,
             "successful_videos": successful,
             "failed_videos": total - successful,
-            "by_interest": {row["interest"]: row["count"] for row in by_interest},
-            "by_style": {row["style"]: row["count"] for row in by_style},
+            "by_interest": counts("interest"),
+            "by_style": counts("style"),
+            "by_grade": counts("grade"),
+            "by_provider": counts("provider"),
+            "by_model": {
+                model: {
+                    "videos": row["videos"],
+                    "successful": row["successful"],
+                    "avg_generation_time_ms": average(row, "generation"),
+                    "avg_render_time_ms": average(row, "render"),
+                    "input_tokens": row["input_tokens"],
+                    "output_tokens": row["output_tokens"],
+                }
+                for model, row in groups["model"].items()
+            },
+            "avg_generation_time_ms": average(overall, "generation"),
+            "avg_render_time_ms": average(overall, "render"),
+            "total_input_tokens": overall["input_tokens"] if overall else 0,
+            "total_output_tokens": overall["output_tokens"] if overall else 0,
         }
@@ -101,6 +101,68 @@ class Config:
         int(os.getenv("MATH_ENGINE_MAX_TOKENS", "4096"))
     )
 
+    # Stream LLM output and stop at the closing code fence
+    llm_streaming: bool = field(default_factory=lambda:
+        os.getenv("MATH_ENGINE_LLM_STREAMING", "false").lower() == "true"
+    )
+
+    # Provider-side prompt caching of the static system prompt
+    prompt_cache_enabled: bool = field(default_factory=lambda:
+        os.getenv("MATH_ENGINE_PROMPT_CACHE", "false").lower() == "true"
+    )
+
+    # Run a dry-run, lowest-quality smoke test before each full render so
+    # scene errors reach the fix loop in seconds
+    draft_render: bool = field(default_factory=lambda:
+        os.getenv("MATH_ENGINE_DRAFT_RENDER", "false").lower() == "true"
+    )
+
+    # Speculative generation: render this many candidates (sampled at
+    # increasing temperatures) in parallel and keep the first that renders.
+    # 1 disables speculation.
+    speculative_candidates: int = field(default_factory=lambda:
+        int(os.getenv("MATH_ENGINE_SPECULATIVE_CANDIDATES", "1"))
+    )
+
+    # Deterministic fixes for known render errors, tried before asking the
+    # LLM. With fix memory, LLM fixes that rendered are recorded per error
+    # fingerprint and replayed when the same error recurs.
+    auto_fix_enabled: bool = field(default_factory=lambda:
+        os.getenv("MATH_ENGINE_AUTO_FIX", "true").lower() == "true"
+    )
+    fix_memory_enabled: bool = field(default_factory=lambda:
+        os.getenv("MATH_ENGINE_FIX_MEMORY", "false").lower() == "true"
+    )
+    fix_memory_path: Path = field(default_factory=lambda:
+        Path(os.getenv("MATH_ENGINE_FIX_MEMORY_PATH", "./.llm_cache/fixes.db"))
+    )
+
+    # Shared per provider/model rate limits (0 = unlimited). Overload
+    # responses (429/529) halve the concurrency cap until calls succeed again.
+    llm_rpm: int = field(default_factory=lambda:
+        int(os.getenv("MATH_ENGINE_LLM_RPM", "0"))
+    )
+    llm_tpm: int = field(default_factory=lambda:
+        int(os.getenv("MATH_ENGINE_LLM_TPM", "0"))
+    )
+    llm_max_concurrency: int = field(default_factory=lambda:
+        int(os.getenv("MATH_ENGINE_LLM_MAX_CONCURRENCY", "16"))
+    )
+
+    # LLM Response Cache Settings
+    llm_cache_enabled: bool = field(default_factory=lambda:
+        os.getenv("MATH_ENGINE_LLM_CACHE", "false").lower() == "true"
+    )
+    llm_cache_path: Path = field(default_factory=lambda:
+        Path(os.getenv("MATH_ENGINE_LLM_CACHE_PATH", "./.llm_cache/responses.db"))
+    )
+    llm_cache_max_mb: int = field(default_factory=lambda:
+        int(os.getenv("MATH_ENGINE_LLM_CACHE_MAX_MB", "256"))
+    )
+    llm_cache_max_age_days: float = field(default_factory=lambda:
+        float(os.getenv("MATH_ENGINE_LLM_CACHE_MAX_AGE_DAYS", "30"))
+    )
+
     # Rendering Settings
     video_quality: VideoQuality = field(default_factory=lambda: VideoQuality(
         os.getenv("MATH_ENGINE_VIDEO_QUALITY", "m")
@@ -116,6 +178,67 @@ class Config:
     manim_cache_dir: Path = field(default_factory=lambda:
         Path(os.getenv("MATH_ENGINE_MANIM_CACHE", "./.manim_cache"))
     )
+    # Symbol table of the installed Manim API, used by the static analyzer
+    manim_symbols_cache_dir: Path = field(default_factory=lambda:
+        Path(os.getenv("MATH_ENGINE_SYMBOLS_CACHE_DIR", "./.manim_symbols"))
+    )
+
+    # Render Cache Settings
+    render_cache_enabled: bool = field(default_factory=lambda:
+        os.getenv("MATH_ENGINE_RENDER_CACHE", "false").lower() == "true"
+    )
+    render_cache_dir: Path = field(default_factory=lambda:
+        Path(os.getenv("MATH_ENGINE_RENDER_CACHE_DIR", "./.render_cache"))
+    )
+    render_cache_max_mb: int = field(default_factory=lambda:
+        int(os.getenv("MATH_ENGINE_RENDER_CACHE_MAX_MB", "2048"))
+    )
+
+    # Media Cache Settings: byte budgets (MB, 0 = unlimited) for Manim's
+    # partial movie and TeX/text caches, swept in the background. Final
+    # videos in output_dir are only evicted with a non-zero output budget.
+    media_cache_enabled: bool = field(default_factory=lambda:
+        os.getenv("MATH_ENGINE_MEDIA_CACHE", "false").lower() == "true"
+    )
+    media_cache_partial_mb: int = field(default_factory=lambda:
+        int(os.getenv("MATH_ENGINE_MEDIA_CACHE_PARTIAL_MB", "2048"))
+    )
+    media_cache_tex_mb: int = field(default_factory=lambda:
+        int(os.getenv("MATH_ENGINE_MEDIA_CACHE_TEX_MB", "512"))
+    )
+    media_cache_output_mb: int = field(default_factory=lambda:
+        int(os.getenv("MATH_ENGINE_MEDIA_CACHE_OUTPUT_MB", "0"))
+    )
+    media_cache_max_age_days: float = field(default_factory=lambda:
+        float(os.getenv("MATH_ENGINE_MEDIA_CACHE_MAX_AGE_DAYS", "30"))
+    )
+    media_cache_sweep_seconds: float = field(default_factory=lambda:
+        float(os.getenv("MATH_ENGINE_MEDIA_CACHE_SWEEP_SECONDS", "300"))
+    )
+
+    # Blob Store Settings: rendered videos stored once per content hash,
+    # with outputs hardlinked to them (copied across filesystems)
+    blob_store_enabled: bool = field(default_factory=lambda:
+        os.getenv("MATH_ENGINE_BLOB_STORE", "false").lower() == "true"
+    )
+    blob_store_dir: Path = field(default_factory=lambda:
+        Path(os.getenv("MATH_ENGINE_BLOB_STORE_DIR", "./.blob_store"))
+    )
+
+    # Render Backend Settings ("subprocess" spawns manim per render,
+    # "pool" reuses warm worker processes)
+    render_backend: str = field(default_factory=lambda:
+        os.getenv("MATH_ENGINE_RENDER_BACKEND", "subprocess")
+    )
+    render_workers: int = field(default_factory=lambda:
+        int(os.getenv("MATH_ENGINE_RENDER_WORKERS", str(os.cpu_count() or 1)))
+    )
+    render_worker_max_jobs: int = field(default_factory=lambda:
+        int(os.getenv("MATH_ENGINE_RENDER_WORKER_MAX_JOBS", "50"))
+    )
+    render_worker_max_rss_mb: int = field(default_factory=lambda:
+        int(os.getenv("MATH_ENGINE_RENDER_WORKER_MAX_RSS_MB", "2048"))
+    )
 
     # Animation Style
     animation_style: AnimationStyle = field(default_factory=lambda: AnimationStyle(
@@ -198,6 +321,12 @@ class Config:
         # On Cloud Run it uses the service account automatically.
         # Locally it uses `gcloud auth application-default login`.
 
+        # Validate render backend
+        if self.render_backend not in ("subprocess", "pool"):
+            raise ValueError(
+                f"MATH_ENGINE_RENDER_BACKEND must be 'subprocess' or 'pool', got {self.render_backend!r}"
+            )
+
         # Validate TTS API key for ElevenLabs
         if self.tts_provider == TTSProvider.ELEVENLABS and not self.elevenlabs_api_key:
             raise ValueError(
@@ -2,18 +2,31 @@
 Main Math Content Engine - orchestrates LLM generation and Manim rendering.
 """
 
+import asyncio
 import logging
+import os
+import threading
 import time
 import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from contextlib import nullcontext
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, TYPE_CHECKING
+from typing import Any, Dict, Generator, Iterable, Iterator, List, Optional, Tuple, TYPE_CHECKING
 
 from .config import Config, AnimationStyle
+from .generator.auto_fixer import AutoFix, create_auto_fixer
 from .generator.code_generator import ManimCodeGenerator, GenerationResult
 from .generator.prompts import AnimationStyle as PromptAnimationStyle
+from .llm.base import BaseLLMClient
+from .llm.cache import CachedLLMClient, create_llm_cache
 from .llm.factory import create_llm_client
 from .renderer.manim_renderer import ManimRenderer, RenderResult
+from .renderer.blob_store import BlobStore, create_blob_store
+from .renderer.media_cache import MediaCache, create_media_cache
+from .renderer.render_cache import RenderCache, create_render_cache
+from .renderer.worker_pool import create_worker_pool
+from .utils.manim_analyzer import set_symbols_cache_dir
 from .personalization import ContentPersonalizer, StudentProfile, list_available_interests
 
 if TYPE_CHECKING:
@@ -38,6 +51,21 @@ class AnimationResult:
     video_id: Optional[str] = None  # ID assigned when stored in local database
     tutor_video_id: Optional[str] = None  # UUID from agentic_math_tutor PostgreSQL
     engine_video_id: Optional[str] = None  # Independent UUID for cross-store linking
+    # Speculative generation (config.speculative_candidates > 1)
+    winning_candidate: Optional[int] = None  # Index of the candidate whose render was kept
+    candidates_tried: int = 1  # Candidates generated for this animation
+    wasted_render_time: float = 0.0  # Seconds spent rendering discarded candidates
+    content_hash: Optional[str] = None  # SHA-256 of the video file, with a blob store
+
+
+@dataclass
+class _Candidate:
+    """One speculative candidate: its generated code and render outcome."""
+    index: int
+    temperature: float
+    generation: GenerationResult
+    generation_time_ms: int
+    render: Optional[RenderResult] = None
 
 
 class MathContentEngine:
@@ -59,12 +87,16 @@ class MathContentEngine:
         ...     print(f"Video saved to: {result.video_path}")
     """
 
+    # Arguments of generate() consumed by the code generation stage
+    _GENERATION_ARGS = ("topic", "requirements", "audience_level", "interest", "student_profile")
+
     def __init__(
         self,
         config: Optional[Config] = None,
         interest: Optional[str] = None,
         storage: Optional["VideoStorage"] = None,
         tutor_writer: Optional["TutorDataServiceWriter"] = None,
+        llm_client: Optional[BaseLLMClient] = None,
     ):
         """
         Initialize the Math Content Engine.
@@ -74,6 +106,8 @@ class MathContentEngine:
             interest: Student interest for content personalization (e.g., "basketball", "gaming")
             storage: Optional VideoStorage instance for persisting video metadata
             tutor_writer: Optional TutorDataServiceWriter for persisting to agentic_math_tutor PostgreSQL
+            llm_client: Optional LLM client to use instead of creating one, e.g. a
+                shared client from get_llm_client() in long-running servers
         """
         self.config = config or Config.from_env()
         self.interest = interest
@@ -81,7 +115,16 @@ class MathContentEngine:
         self.tutor_writer = tutor_writer
 
         # Initialize components
-        self.llm_client = create_llm_client(self.config)
+        self.llm_client = llm_client or create_llm_client(self.config)
+        llm_cache = create_llm_cache(self.config)
+        if llm_cache is not None:
+            self.llm_client = CachedLLMClient(
+                self.llm_client,
+                llm_cache,
+                provider=self.config.llm_provider.value,
+            )
+
+        set_symbols_cache_dir(self.config.manim_symbols_cache_dir)
 
         # Map config AnimationStyle to prompt AnimationStyle
         prompt_style = PromptAnimationStyle(self.config.animation_style.value)
@@ -91,12 +134,18 @@ class MathContentEngine:
             max_retries=self.config.max_retries,
             animation_style=prompt_style,
             interest=interest,
+            streaming=self.config.llm_streaming,
         )
+        self.auto_fixer = create_auto_fixer(self.config)
         self.renderer = ManimRenderer(
             output_dir=self.config.output_dir,
             cache_dir=self.config.manim_cache_dir,
             quality=self.config.video_quality,
             output_format=self.config.output_format,
+            render_cache=create_render_cache(self.config),
+            worker_pool=create_worker_pool(self.config),
+            media_cache=create_media_cache(self.config),
+            blob_store=create_blob_store(self.config),
         )
 
         interest_info = ""
@@ -156,21 +205,195 @@ class MathContentEngine:
         Returns:
             AnimationResult with success status, video path, and metadata
         """
-        start_time = time.time()
         interest_info = f" (personalized for {interest})" if interest else ""
         if student_profile and student_profile.name:
             interest_info += f", student={student_profile.name}"
         logger.info(f"Generating animation for topic: {topic}{interest_info}")
 
-        total_attempts = 0
-        render_attempts = 0
-        last_generation: Optional[GenerationResult] = None
-        last_render: Optional[RenderResult] = None
+        if self.config.speculative_candidates > 1:
+            return self._generate_speculative(
+                topic=topic,
+                requirements=requirements,
+                audience_level=audience_level,
+                output_filename=output_filename,
+                interest=interest,
+                student_profile=student_profile,
+                save_to_storage=save_to_storage,
+                concept_ids=concept_ids,
+                grade=grade,
+            )
+
+        generation_result, generation_time_ms = self._generate_code(
+            topic=topic,
+            requirements=requirements,
+            audience_level=audience_level,
+            interest=interest,
+            student_profile=student_profile,
+        )
+        return self._render_with_fixes(
+            generation_result,
+            generation_time_ms,
+            topic=topic,
+            requirements=requirements,
+            audience_level=audience_level,
+            output_filename=output_filename,
+            interest=interest,
+            save_to_storage=save_to_storage,
+            concept_ids=concept_ids,
+            grade=grade,
+        )
+
+    def generate_many(
+        self,
+        specs: Iterable[dict],
+        llm_concurrency: int = 4,
+        render_concurrency: Optional[int] = None,
+    ) -> Iterator[Tuple[int, AnimationResult]]:
+        """
+        Generate many animations, overlapping LLM calls with rendering.
+
+        Code generation runs on a pool of ``llm_concurrency`` threads; each
+        generated script is handed to a render pool as soon as it is ready,
+        so rendering of early items overlaps generation of later ones.
+        Renders run out of process (a ``manim`` subprocess or a warm worker),
+        so render threads scale across cores.
+
+        Args:
+            specs: Keyword arguments for generate(), one dict per animation
+                (e.g. ``{"topic": ..., "output_filename": ...}``)
+            llm_concurrency: Maximum concurrent code generation requests
+            render_concurrency: Maximum concurrent renders (defaults to CPU count)
+
+        Yields:
+            (index, AnimationResult) tuples in completion order, where index
+            is the position of the spec in ``specs``
+        """
+        specs = list(specs)
+        render_concurrency = render_concurrency or os.cpu_count() or 1
+        logger.info(
+            f"Generating {len(specs)} animations "
+            f"(llm_concurrency={llm_concurrency}, render_concurrency={render_concurrency})"
+        )
+
+        llm_pool = ThreadPoolExecutor(llm_concurrency, thread_name_prefix="engine-llm")
+        render_pool = ThreadPoolExecutor(render_concurrency, thread_name_prefix="engine-render")
+        pending = {}
+        try:
+            for index, spec in enumerate(specs):
+                generation_args = {k: v for k, v in spec.items() if k in self._GENERATION_ARGS}
+                future = llm_pool.submit(self._generate_code, **generation_args)
+                pending[future] = (index, spec, "generate")
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, spec, stage = pending.pop(future)
+                    try:
+                        value = future.result()
+                    except Exception as e:
+                        logger.exception(f"Animation {index} failed during {stage}")
+                        yield index, AnimationResult(
+                            success=False,
+                            video_path=None,
+                            code="",
+                            scene_name="",
+                            generation_attempts=0,
+                            render_attempts=0,
+                            total_attempts=0,
+                            error_message=f"Unexpected error during {stage}: {e}",
+                        )
+                        continue
+
+                    if stage == "generate":
+                        generation_result, generation_time_ms = value
+                        future = render_pool.submit(
+                            self._render_with_fixes,
+                            generation_result,
+                            generation_time_ms,
+                            **spec,
+                        )
+                        pending[future] = (index, spec, "render")
+                    else:
+                        yield index, value
+        finally:
+            # Stop queued work if the caller stops iterating early
+            for future in pending:
+                future.cancel()
+            llm_pool.shutdown(wait=True)
+            render_pool.shutdown(wait=True)
+
+    async def agenerate(
+        self,
+        topic: str,
+        requirements: str = "",
+        audience_level: str = "high school",
+        output_filename: Optional[str] = None,
+        interest: Optional[str] = None,
+        student_profile: Optional[StudentProfile] = None,
+        save_to_storage: bool = True,
+        concept_ids: Optional[list] = None,
+        grade: Optional[str] = None,
+    ) -> AnimationResult:
+        """
+        Asynchronous generate() for use from an event loop.
+
+        Code generation and LLM fixes await the LLM client's async API, so no
+        thread is held while waiting on the provider; each render runs in a
+        worker thread. Arguments match generate().
+
+        Returns:
+            AnimationResult with success status, video path, and metadata
+        """
+        logger.info(f"Generating animation for topic: {topic}")
+
+        if self.config.speculative_candidates > 1:
+            # Candidates race on threads; the renders dominate anyway
+            return await asyncio.to_thread(
+                self._generate_speculative,
+                topic=topic,
+                requirements=requirements,
+                audience_level=audience_level,
+                output_filename=output_filename,
+                interest=interest,
+                student_profile=student_profile,
+                save_to_storage=save_to_storage,
+                concept_ids=concept_ids,
+                grade=grade,
+            )
 
-        # Track generation timing
         gen_start = time.time()
+        generation_result = await self.code_generator.agenerate(
+            topic=topic,
+            requirements=requirements,
+            audience_level=audience_level,
+            interest=interest,
+            student_profile=student_profile,
+        )
+        generation_time_ms = int((time.time() - gen_start) * 1000)
 
-        # Generate initial code
+        return await self._arender_with_fixes(
+            generation_result,
+            generation_time_ms,
+            topic=topic,
+            requirements=requirements,
+            audience_level=audience_level,
+            output_filename=output_filename,
+            interest=interest,
+            save_to_storage=save_to_storage,
+            concept_ids=concept_ids,
+            grade=grade,
+        )
+
+    def _generate_code(
+        self,
+        topic: str,
+        requirements: str = "",
+        audience_level: str = "high school",
+        interest: Optional[str] = None,
+        student_profile: Optional[StudentProfile] = None,
+    ) -> Tuple[GenerationResult, int]:
+        """Generate code for a topic; returns the result and elapsed milliseconds."""
+        gen_start = time.time()
         generation_result = self.code_generator.generate(
             topic=topic,
             requirements=requirements,
@@ -178,9 +401,337 @@ class MathContentEngine:
             interest=interest,
             student_profile=student_profile,
         )
+        return generation_result, int((time.time() - gen_start) * 1000)
+
+    def _generate_speculative(
+        self,
+        topic: str,
+        requirements: str = "",
+        audience_level: str = "high school",
+        output_filename: Optional[str] = None,
+        interest: Optional[str] = None,
+        student_profile: Optional[StudentProfile] = None,
+        save_to_storage: bool = True,
+        concept_ids: Optional[list] = None,
+        grade: Optional[str] = None,
+    ) -> AnimationResult:
+        """Race several candidate scenes; the first to render successfully wins.
+
+        ``config.speculative_candidates`` candidates are generated concurrently
+        at increasing temperatures, bypassing the LLM response cache, and each
+        valid one is rendered under a candidate name as soon as it is ready.
+        When one renders, the other renders are killed, unstarted work is
+        cancelled and the winner is moved to the requested output name. If
+        none renders, the first valid candidate is fixed and continues
+        through the usual render-fix loop.
+        """
+        count = self.config.speculative_candidates
+        generation_args = {
+            "topic": topic,
+            "requirements": requirements,
+            "audience_level": audience_level,
+            "interest": interest,
+            "student_profile": student_profile,
+        }
+        logger.info(f"Speculatively generating {count} candidates for: {topic}")
+
+        cancel_event = threading.Event()
+        # Render start times, so renders killed for the winner count as wasted
+        render_started: Dict[int, float] = {}
+        executor = ThreadPoolExecutor(count, thread_name_prefix="engine-candidate")
+        futures = [
+            executor.submit(
+                self._run_candidate,
+                index,
+                self._candidate_temperature(index),
+                cancel_event,
+                generation_args,
+                self._candidate_filename(output_filename, index),
+                render_started,
+            )
+            for index in range(count)
+        ]
+        finished: List[_Candidate] = []
+        winner: Optional[_Candidate] = None
+        try:
+            for future in as_completed(futures):
+                try:
+                    candidate = future.result()
+                except Exception:
+                    logger.exception("Speculative candidate failed")
+                    continue
+                finished.append(candidate)
+                if candidate.render is not None and candidate.render.success:
+                    winner = candidate
+                    break
+        finally:
+            # Kill the losing renders and drop work that has not started;
+            # LLM calls already in flight finish in the background
+            cancel_event.set()
+            for future in futures:
+                future.cancel()
+                future.add_done_callback(
+                    lambda f: self._discard_candidate_output(f, winner)
+                )
+            executor.shutdown(wait=False)
+            killed_at = time.time()
+
+        wasted = sum(
+            c.render.render_time for c in finished
+            if c is not winner and c.render is not None
+        )
+        finished_indexes = {c.index for c in finished}
+        wasted += sum(
+            killed_at - started for index, started in list(render_started.items())
+            if index not in finished_indexes
+        )
+
+        if winner is not None:
+            logger.info(
+                f"Speculative candidate {winner.index} won "
+                f"(temperature={winner.temperature}, wasted render time {wasted:.1f}s)"
+            )
+            video_path = winner.render.output_path
+            if output_filename and video_path is not None:
+                video_path = self.renderer.rename_output(video_path, output_filename)
+            result = AnimationResult(
+                success=True,
+                video_path=video_path,
+                code=winner.generation.code,
+                scene_name=winner.generation.scene_name,
+                generation_attempts=winner.generation.attempts,
+                render_attempts=1,
+                total_attempts=winner.generation.attempts + 1,
+                render_time=winner.render.render_time,
+                winning_candidate=winner.index,
+                candidates_tried=count,
+                wasted_render_time=wasted,
+                content_hash=winner.render.content_hash,
+            )
+            if save_to_storage and (self.storage or self.tutor_writer):
+                result = self._save_to_storage(
+                    result, topic, requirements, audience_level, interest,
+                    winner.generation_time_ms, int(winner.render.render_time * 1000),
+                    concept_ids=concept_ids, grade=grade,
+                )
+            return result
+
+        # No candidate rendered: fall back to the render-fix loop
+        logger.warning(f"No speculative candidate rendered for: {topic}; falling back to fixes")
+        finished.sort(key=lambda c: c.index)
+        fallback = next((c for c in finished if c.generation.validation.is_valid), None)
+        if fallback is None and finished:
+            fallback = finished[0]
+        if fallback is None:
+            generation, generation_time_ms = self._generate_code(**generation_args)
+        else:
+            generation, generation_time_ms = fallback.generation, fallback.generation_time_ms
+            if fallback.render is not None:
+                fixed = self.code_generator.fix_code(
+                    code=generation.code,
+                    error_message=fallback.render.error_message,
+                )
+                if fixed.validation.is_valid:
+                    generation = fixed
+
+        result = self._render_with_fixes(
+            generation,
+            generation_time_ms,
+            topic=topic,
+            requirements=requirements,
+            audience_level=audience_level,
+            output_filename=output_filename,
+            interest=interest,
+            save_to_storage=save_to_storage,
+            concept_ids=concept_ids,
+            grade=grade,
+        )
+        result.candidates_tried = count
+        result.wasted_render_time = wasted
+        return result
+
+    def _candidate_temperature(self, index: int) -> float:
+        """Sampling temperature for the speculative candidate at ``index``.
+
+        Candidates are spread evenly from the configured temperature to 1.0.
+        """
+        base = self.config.temperature
+        count = self.config.speculative_candidates
+        if count < 2 or base >= 1.0:
+            return base
+        return base + (1.0 - base) * index / (count - 1)
+
+    @staticmethod
+    def _candidate_filename(output_filename: Optional[str], index: int) -> Optional[str]:
+        """Output name a candidate renders under until it wins."""
+        if not output_filename:
+            return None
+        return f"{Path(output_filename).stem}.candidate{index}"
+
+    def _run_candidate(
+        self,
+        index: int,
+        temperature: float,
+        cancel_event: threading.Event,
+        generation_args: dict,
+        output_filename: Optional[str],
+        render_started: Dict[int, float],
+    ) -> _Candidate:
+        """Generate and, if valid, render one speculative candidate."""
+        gen_start = time.time()
+        # Candidates exist to sample different scenes; a cached one would
+        # make every run replay the same race
+        with self._uncached_llm():
+            generation = self.code_generator.generate(**generation_args, temperature=temperature)
+        candidate = _Candidate(
+            index=index,
+            temperature=temperature,
+            generation=generation,
+            generation_time_ms=int((time.time() - gen_start) * 1000),
+        )
+        if generation.validation.is_valid and not cancel_event.is_set():
+            render_started[index] = time.time()
+            candidate.render = self._render_checked(
+                generation.code,
+                generation.scene_name,
+                output_filename,
+                cancel_event=cancel_event,
+            )
+        return candidate
+
+    def _uncached_llm(self):
+        """Context manager bypassing the LLM response cache on this thread."""
+        if isinstance(self.llm_client, CachedLLMClient):
+            return self.llm_client.bypass()
+        return nullcontext()
+
+    def _render_checked(
+        self,
+        code: str,
+        scene_name: str,
+        output_filename: Optional[str] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> RenderResult:
+        """Render code, gated on a fast dry-run smoke test when draft_render is on.
+
+        A failed smoke test is returned in place of the render, so its error
+        goes straight to fix_code without paying for a full-quality render.
+        """
+        kwargs = {"cancel_event": cancel_event} if cancel_event is not None else {}
+        if self.config.draft_render and not self.renderer.is_cached(code, scene_name):
+            smoke_result = self.renderer.smoke_test(code, scene_name, **kwargs)
+            if not smoke_result.success:
+                logger.warning(
+                    f"Smoke test failed in {smoke_result.render_time:.1f}s; skipping full render"
+                )
+                return smoke_result
+        return self.renderer.render(
+            code=code,
+            scene_name=scene_name,
+            output_filename=output_filename,
+            **kwargs,
+        )
+
+    @staticmethod
+    def _discard_candidate_output(future: Future, winner: Optional[_Candidate]) -> None:
+        """Delete the video of a losing candidate that finished rendering anyway."""
+        if future.cancelled() or future.exception() is not None:
+            return
+        candidate = future.result()
+        if candidate is winner or candidate.render is None or not candidate.render.success:
+            return
+        if candidate.render.output_path is not None:
+            candidate.render.output_path.unlink(missing_ok=True)
+
+    def _render_with_fixes(
+        self,
+        generation_result: GenerationResult,
+        generation_time_ms: int,
+        topic: str,
+        requirements: str = "",
+        audience_level: str = "high school",
+        output_filename: Optional[str] = None,
+        interest: Optional[str] = None,
+        student_profile: Optional[StudentProfile] = None,
+        save_to_storage: bool = True,
+        concept_ids: Optional[list] = None,
+        grade: Optional[str] = None,
+    ) -> AnimationResult:
+        """Render generated code, asking the LLM to fix it after each failure.
+
+        Accepts every generate() argument so a full spec can be passed
+        through; generation-only arguments such as student_profile are unused.
+        """
+        steps = self._render_fix_steps(generation_result, output_filename)
+        try:
+            step = next(steps)
+            while True:
+                if step[0] == "render":
+                    step = steps.send(self._render_checked(*step[1:]))
+                else:
+                    step = steps.send(self.code_generator.fix_code(*step[1:]))
+        except StopIteration as done:
+            result, render_time_ms = done.value
+
+        if save_to_storage and (self.storage or self.tutor_writer):
+            result = self._save_to_storage(
+                result, topic, requirements, audience_level, interest,
+                generation_time_ms, render_time_ms,
+                concept_ids=concept_ids, grade=grade,
+            )
+        return result
+
+    async def _arender_with_fixes(
+        self,
+        generation_result: GenerationResult,
+        generation_time_ms: int,
+        topic: str,
+        requirements: str = "",
+        audience_level: str = "high school",
+        output_filename: Optional[str] = None,
+        interest: Optional[str] = None,
+        student_profile: Optional[StudentProfile] = None,
+        save_to_storage: bool = True,
+        concept_ids: Optional[list] = None,
+        grade: Optional[str] = None,
+    ) -> AnimationResult:
+        """Async _render_with_fixes(): renders run in a worker thread, fixes await the LLM."""
+        steps = self._render_fix_steps(generation_result, output_filename)
+        try:
+            step = next(steps)
+            while True:
+                if step[0] == "render":
+                    step = steps.send(await asyncio.to_thread(self._render_checked, *step[1:]))
+                else:
+                    step = steps.send(await self.code_generator.afix_code(*step[1:]))
+        except StopIteration as done:
+            result, render_time_ms = done.value
+
+        if save_to_storage and (self.storage or self.tutor_writer):
+            result = await asyncio.to_thread(
+                self._save_to_storage,
+                result, topic, requirements, audience_level, interest,
+                generation_time_ms, render_time_ms,
+                concept_ids=concept_ids, grade=grade,
+            )
+        return result
+
+    def _render_fix_steps(
+        self,
+        generation_result: GenerationResult,
+        output_filename: Optional[str],
+    ) -> Generator[tuple, Any, Tuple[AnimationResult, Optional[int]]]:
+        """Render-fix loop shared by _render_with_fixes() and _arender_with_fixes().
+
+        Yields ``("render", code, scene_name, output_filename)`` to request a
+        RenderResult and ``("fix", code, error_message)`` to request an LLM
+        fix as a GenerationResult. Returns the unsaved AnimationResult and the
+        render time in milliseconds (None when nothing was rendered).
+        """
         total_attempts = generation_result.attempts
+        render_attempts = 0
         last_generation = generation_result
-        generation_time_ms = int((time.time() - gen_start) * 1000)
+        last_render: Optional[RenderResult] = None
 
         if not generation_result.validation.is_valid:
             result = AnimationResult(
@@ -193,19 +744,19 @@ class MathContentEngine:
                 total_attempts=total_attempts,
                 error_message=f"Code generation failed: {generation_result.validation.errors}",
             )
-            # Save failed generation to storage if configured
-            if save_to_storage and (self.storage or self.tutor_writer):
-                result = self._save_to_storage(
-                    result, topic, requirements, audience_level, interest,
-                    generation_time_ms, None,
-                    concept_ids=concept_ids, grade=grade,
-                )
-            return result
+            return result, None
 
         # Try to render with error feedback loop
         code = generation_result.code
         scene_name = generation_result.scene_name
         render_start = time.time()
+        # Deterministic fix awaiting its render, and the error and code an
+        # LLM fix started from, so its outcome can be reported or learned
+        pending_fix: Optional[AutoFix] = None
+        llm_fixed_from: Optional[Tuple[str, str]] = None
+        auto_fixed = set()
+        # Code that came from the LLM, dropped from its cache if nothing renders
+        llm_codes = [code]
 
         while render_attempts < self.config.max_retries:
             render_attempts += 1
@@ -213,13 +764,17 @@ class MathContentEngine:
 
             logger.info(f"Render attempt {render_attempts}/{self.config.max_retries}")
 
-            render_result = self.renderer.render(
-                code=code,
-                scene_name=scene_name,
-                output_filename=output_filename,
-            )
+            render_result = yield ("render", code, scene_name, output_filename)
             last_render = render_result
 
+            if self.auto_fixer is not None:
+                if pending_fix is not None:
+                    self.auto_fixer.report(pending_fix, render_result.success)
+                elif llm_fixed_from is not None and render_result.success:
+                    self.auto_fixer.learn(llm_fixed_from[0], llm_fixed_from[1], code)
+            pending_fix = None
+            llm_fixed_from = None
+
             if render_result.success:
                 render_time_ms = int((time.time() - render_start) * 1000)
                 logger.info(f"Animation rendered successfully: {render_result.output_path}")
@@ -232,15 +787,9 @@ class MathContentEngine:
                     render_attempts=render_attempts,
                     total_attempts=total_attempts,
                     render_time=render_result.render_time,
+                    content_hash=render_result.content_hash,
                 )
-                # Save successful generation to storage if configured
-                if save_to_storage and (self.storage or self.tutor_writer):
-                    result = self._save_to_storage(
-                        result, topic, requirements, audience_level, interest,
-                        generation_time_ms, render_time_ms,
-                        concept_ids=concept_ids, grade=grade,
-                    )
-                return result
+                return result, render_time_ms
 
             # Render failed - try to fix the code
             logger.warning(f"Render failed: {render_result.error_message}")
@@ -248,21 +797,32 @@ class MathContentEngine:
             if render_attempts >= self.config.max_retries:
                 break
 
+            # Try a deterministic fix first, once per error fingerprint
+            if self.auto_fixer is not None:
+                auto_fix = self.auto_fixer.fix(code, render_result.error_message)
+                if auto_fix is not None and auto_fix.fingerprint not in auto_fixed:
+                    auto_fixed.add(auto_fix.fingerprint)
+                    pending_fix = auto_fix
+                    code = auto_fix.code
+                    logger.info(f"Code fixed by {auto_fix.source}, retrying render...")
+                    continue
+
             # Use LLM to fix the code
-            fix_result = self.code_generator.fix_code(
-                code=code,
-                error_message=render_result.error_message,
-            )
+            fix_result = yield ("fix", code, render_result.error_message)
 
             if fix_result.validation.is_valid:
+                llm_fixed_from = (render_result.error_message, code)
                 code = fix_result.code
                 scene_name = fix_result.scene_name
+                llm_codes.append(code)
                 logger.info("Code fixed by LLM, retrying render...")
             else:
                 logger.warning("LLM code fix did not produce valid code")
 
         # All attempts failed
         render_time_ms = int((time.time() - render_start) * 1000)
+        for llm_code in llm_codes:
+            self.llm_client.discard_response(llm_code)
         error_msg = last_render.error_message if last_render else "Unknown error"
         result = AnimationResult(
             success=False,
@@ -274,14 +834,7 @@ class MathContentEngine:
             total_attempts=total_attempts,
             error_message=f"Rendering failed after {render_attempts} attempts: {error_msg}",
         )
-        # Save failed generation to storage if configured
-        if save_to_storage and (self.storage or self.tutor_writer):
-            result = self._save_to_storage(
-                result, topic, requirements, audience_level, interest,
-                generation_time_ms, render_time_ms,
-                concept_ids=concept_ids, grade=grade,
-            )
-        return result
+        return result, render_time_ms
 
     def _save_to_storage(
         self,
@@ -329,6 +882,7 @@ class MathContentEngine:
                     generation_time_ms=generation_time_ms,
                     render_time_ms=render_time_ms,
                     file_size_bytes=file_size_bytes,
+                    content_sha256=result.content_hash,
                     success=result.success,
                     error_message=result.error_message,
                 )
@@ -422,6 +976,7 @@ class MathContentEngine:
             total_attempts=1,
             error_message=render_result.error_message,
             render_time=render_result.render_time,
+            content_hash=render_result.content_hash,
         )
 
     def preview_code(
@@ -453,6 +1008,26 @@ class MathContentEngine:
             student_profile=student_profile,
         )
 
+    def get_cache_stats(self) -> dict:
+        """
+        Get hit/miss counters for the engine's caches.
+
+        Returns:
+            Dict keyed by cache name; empty when no cache is enabled
+        """
+        stats = {}
+        if isinstance(self.llm_client, CachedLLMClient):
+            stats["llm"] = self.llm_client.cache.stats()
+        if isinstance(getattr(self.renderer, "render_cache", None), RenderCache):
+            stats["render"] = self.renderer.render_cache.stats()
+        if isinstance(getattr(self.renderer, "media_cache", None), MediaCache):
+            stats["media"] = self.renderer.media_cache.stats()
+        if isinstance(getattr(self.renderer, "blob_store", None), BlobStore):
+            stats["blobs"] = self.renderer.blob_store.stats()
+        if self.auto_fixer is not None:
+            stats["auto_fix"] = self.auto_fixer.stats()
+        return stats
+
     def cleanup(self):
         """Clean up temporary files and cache."""
         self.renderer.cleanup_cache()
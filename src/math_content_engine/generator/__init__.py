@@ -1,5 +1,6 @@
 """Code generator module."""
 
+from .auto_fixer import AutoFixer, create_auto_fixer
 from .code_generator import ManimCodeGenerator
 
-__all__ = ["ManimCodeGenerator"]
+__all__ = ["ManimCodeGenerator", "AutoFixer", "create_auto_fixer"]
@@ -0,0 +1,563 @@
+"""
+Deterministic fixes for recurring render failures.
+
+Render errors are reduced to a fingerprint (exception type, message template
+with values masked, and the offending API). Known fingerprints are fixed by
+AST-level rewrite rules, and fixes the LLM made for a fingerprint can be
+recorded and replayed later, so repeated failures skip the LLM fix call.
+"""
+
+import ast
+import difflib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..renderer.manim_renderer import NO_OUTPUT_ERROR
+from ..utils.manim_analyzer import DEPRECATED_APIS, latex_available
+
+if TYPE_CHECKING:
+    from ..config import Config
+
+logger = logging.getLogger(__name__)
+
+_EXCEPTION_LINE = re.compile(
+    r"^\s*(?:[\w.]+\.)?(\w+(?:Error|Exception)|KeyboardInterrupt|StopIteration)\s*:\s*(.*)$"
+)
+_QUOTED = re.compile(r"""'([^']*)'|"([^"]*)\"""")
+_PATH = re.compile(r"(?:[A-Za-z]:)?(?:/[\w.\-]+){2,}/?")
+_HEX = re.compile(r"0x[0-9a-fA-F]+")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IDENTIFIER = re.compile(r"^[A-Za-z_][\w.]*$")
+
+# Renamed APIs that can be fixed by substituting the name alone
+NAME_RENAMES = {old: new for old, new in DEPRECATED_APIS.items() if new.isidentifier()}
+
+# Methods removed from Manim classes and their drop-in replacements
+METHOD_RENAMES = {
+    "get_graph": "plot",
+}
+
+# Learned fixes larger than this are rewrites, not replayable patches
+_MAX_LEARNED_HUNKS = 4
+_MAX_HUNK_LINES = 8
+
+
+@dataclass(frozen=True)
+class ErrorFingerprint:
+    """Normalized identity of a render error."""
+    exc_type: str
+    template: str
+    api: str = ""
+
+    @property
+    def key(self) -> str:
+        return f"{self.exc_type}: {self.template} [{self.api}]"
+
+
+def fingerprint_error(error_message: str) -> Optional[ErrorFingerprint]:
+    """
+    Reduce a render error message to a fingerprint.
+
+    The last exception line of the traceback is used. Quoted values, paths,
+    addresses and numbers are masked in the template; the identifiers
+    found in quotes (e.g. the undefined name) become the ``api``.
+
+    Args:
+        error_message: Error text from a RenderResult
+
+    Returns:
+        The fingerprint, or None for an empty message
+    """
+    if not error_message or not error_message.strip():
+        return None
+
+    exc_type, message = "RenderError", ""
+    for line in reversed(error_message.strip().splitlines()):
+        match = _EXCEPTION_LINE.match(line)
+        if match:
+            exc_type, message = match.group(1), match.group(2)
+            break
+    else:
+        message = error_message.strip().splitlines()[-1]
+
+    identifiers = []
+    for match in _QUOTED.finditer(message):
+        value = match.group(1) if match.group(1) is not None else match.group(2)
+        if _IDENTIFIER.match(value):
+            identifiers.append(value)
+
+    template = _QUOTED.sub("'<*>'", message)
+    template = _PATH.sub("<path>", template)
+    template = _HEX.sub("<addr>", template)
+    template = _NUMBER.sub("<n>", template)
+    return ErrorFingerprint(exc_type, template.strip(), ".".join(identifiers[:2]))
+
+
+# ----------------------------------------------------------------------
+# Source rewriting helpers
+# ----------------------------------------------------------------------
+
+def _line_offsets(code: bytes) -> List[int]:
+    offsets = [0]
+    for line in code.splitlines(keepends=True):
+        offsets.append(offsets[-1] + len(line))
+    return offsets
+
+
+def _replace_spans(code: str, spans: Iterable[Tuple[int, int, int, int, str]]) -> str:
+    """Replace (lineno, col, end_lineno, end_col, text) spans; cols are UTF-8 offsets."""
+    data = code.encode("utf-8")
+    offsets = _line_offsets(data)
+    edits = sorted(
+        ((offsets[l1 - 1] + c1, offsets[l2 - 1] + c2, text) for l1, c1, l2, c2, text in spans),
+        reverse=True,
+    )
+    for start, end, text in edits:
+        data = data[:start] + text.encode("utf-8") + data[end:]
+    return data.decode("utf-8")
+
+
+def _span(node: ast.AST, text: str) -> Tuple[int, int, int, int, str]:
+    return (node.lineno, node.col_offset, node.end_lineno, node.end_col_offset, text)
+
+
+def _parses(code: str) -> bool:
+    try:
+        ast.parse(code)
+    except SyntaxError:
+        return False
+    return True
+
+
+# ----------------------------------------------------------------------
+# Rules
+# ----------------------------------------------------------------------
+
+@dataclass
+class FixRule:
+    """A deterministic rewrite for errors matching a fingerprint."""
+    name: str
+    matches: Callable[[ErrorFingerprint], bool]
+    rewrite: Callable[[str, ast.AST, ErrorFingerprint], Optional[str]]
+
+
+def _rename_deprecated(code: str, tree: ast.AST, fp: ErrorFingerprint) -> Optional[str]:
+    old = fp.api.split(".")[0]
+    new = NAME_RENAMES.get(old)
+    if new is None:
+        return None
+    spans = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id == old:
+            spans.append(_span(node, new))
+        elif isinstance(node, ast.ImportFrom):
+            for alias in node.names:
+                if alias.name == old and alias.asname is None:
+                    spans.append(_span(alias, new))
+    return _replace_spans(code, spans) if spans else None
+
+
+def _rename_method(code: str, tree: ast.AST, fp: ErrorFingerprint) -> Optional[str]:
+    method = fp.api.split(".")[-1]
+    new = METHOD_RENAMES.get(method)
+    if new is None:
+        return None
+    spans = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Attribute) and node.attr == method:
+            # Replace just the attribute name at the end of the expression
+            end = node.end_col_offset
+            spans.append((node.end_lineno, end - len(method.encode()), node.end_lineno, end, new))
+    return _replace_spans(code, spans) if spans else None
+
+
+def _latex_missing(fp: ErrorFingerprint) -> bool:
+    """True if the render failed because LaTeX is not installed.
+
+    A compile error in the LaTeX source reports the same "latex error" as a
+    missing compiler, so that case is told apart by looking for latex on PATH.
+    """
+    if fp.exc_type == "FileNotFoundError" and fp.api.lower() in ("latex", "dvisvgm"):
+        return True
+    return "latex" in fp.template.lower() and not latex_available()
+
+
+def _plain_text(value: str) -> bool:
+    """True if a LaTeX string reads the same as plain text."""
+    return not any(c in value for c in "\\{}^_")
+
+
+def _text_call(value: str, extra: List[str]) -> str:
+    return "Text(" + ", ".join([repr(value)] + extra) + ")"
+
+
+def _latex_to_text(code: str, tree: ast.AST, fp: ErrorFingerprint) -> Optional[str]:
+    """Replace LaTeX-only mobjects with Text where the content is plain.
+
+    Strings with LaTeX markup, including sub- and superscripts, are left
+    alone: as Text they would show the markup instead of the formula.
+    """
+    spans = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+
+        # axes.get_axis_labels(...) builds MathTex labels from strings
+        if isinstance(node.func, ast.Attribute) and node.func.attr == "get_axis_labels":
+            func = ast.get_source_segment(code, node.func)
+            labels = dict(zip(("x_label", "y_label"), node.args))
+            labels.update({kw.arg: kw.value for kw in node.keywords if kw.arg in ("x_label", "y_label")})
+            args = []
+            for name, default in (("x_label", "x"), ("y_label", "y")):
+                value = labels.get(name)
+                if value is None:
+                    args.append(f"{name}={_text_call(default, [])}")
+                elif (
+                    isinstance(value, ast.Constant)
+                    and isinstance(value.value, str)
+                    and _plain_text(value.value)
+                ):
+                    args.append(f"{name}={_text_call(value.value.strip('$'), [])}")
+                else:
+                    args.append(f"{name}={ast.get_source_segment(code, value)}")
+            args += [
+                ast.get_source_segment(code, kw) for kw in node.keywords
+                if kw.arg not in ("x_label", "y_label")
+            ]
+            spans.append(_span(node, f"{func}({', '.join(args)})"))
+
+        # MathTex("x = 2") / Tex("Area") with plain-text content
+        elif isinstance(node.func, ast.Name) and node.func.id in ("MathTex", "Tex"):
+            if not node.args or not all(
+                isinstance(a, ast.Constant) and isinstance(a.value, str) for a in node.args
+            ):
+                continue
+            text = " ".join(a.value for a in node.args).replace("$", "")
+            if not _plain_text(text):
+                continue
+            extra = [ast.get_source_segment(code, kw) for kw in node.keywords]
+            spans.append(_span(node, _text_call(text, extra)))
+
+    return _replace_spans(code, spans) if spans else None
+
+
+def _append_wait(code: str, tree: ast.AST, fp: ErrorFingerprint) -> Optional[str]:
+    """Append self.wait() to construct() so the scene produces a video."""
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef) and node.name == "construct" and node.body:
+            last = node.body[-1]
+            indent = " " * node.body[0].col_offset
+            lines = code.splitlines(keepends=True)
+            if lines and not lines[-1].endswith("\n"):
+                lines[-1] += "\n"
+            lines.insert(last.end_lineno, f"{indent}self.wait()\n")
+            return "".join(lines)
+    return None
+
+
+DEFAULT_RULES: Tuple[FixRule, ...] = (
+    FixRule(
+        "rename-deprecated",
+        lambda fp: fp.exc_type in ("NameError", "ImportError") and fp.api.split(".")[0] in NAME_RENAMES,
+        _rename_deprecated,
+    ),
+    FixRule(
+        "rename-method",
+        lambda fp: fp.exc_type == "AttributeError" and fp.api.split(".")[-1] in METHOD_RENAMES,
+        _rename_method,
+    ),
+    FixRule("latex-to-text", _latex_missing, _latex_to_text),
+    FixRule("append-wait", lambda fp: fp.template == NO_OUTPUT_ERROR, _append_wait),
+)
+
+
+# ----------------------------------------------------------------------
+# Learned fixes
+# ----------------------------------------------------------------------
+
+def _indent_of(line: str) -> str:
+    return line[: len(line) - len(line.lstrip())]
+
+
+def diff_hunks(before: str, after: str) -> Optional[List[Tuple[List[str], List[str]]]]:
+    """
+    Turn a small code change into replayable (old lines, new lines) hunks.
+
+    Old lines are stored stripped; new lines keep their indentation
+    relative to the first old line. Pure insertions are anchored on the
+    preceding line.
+
+    Returns:
+        The hunks, or None if the change is too large to be a patch
+    """
+    old_lines = before.splitlines()
+    new_lines = after.splitlines()
+    matcher = difflib.SequenceMatcher(a=old_lines, b=new_lines, autojunk=False)
+    hunks = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        if i1 == i2:
+            if i1 == 0:
+                return None
+            i1 -= 1
+            j1 -= 1
+        if i2 - i1 > _MAX_HUNK_LINES or j2 - j1 > 2 * _MAX_HUNK_LINES:
+            return None
+        base = _indent_of(old_lines[i1])
+        new = [
+            line[len(base):] if line.startswith(base) else line.lstrip()
+            for line in new_lines[j1:j2]
+        ]
+        hunks.append(([line.strip() for line in old_lines[i1:i2]], new))
+    if not hunks or len(hunks) > _MAX_LEARNED_HUNKS:
+        return None
+    return hunks
+
+
+def apply_hunk(code: str, old: List[str], new: List[str]) -> Optional[str]:
+    """Apply one learned hunk where its old lines appear; None if they don't."""
+    lines = code.splitlines()
+    stripped = [line.strip() for line in lines]
+    size = len(old)
+    for start in range(len(lines) - size + 1):
+        if stripped[start:start + size] == old:
+            base = _indent_of(lines[start])
+            replacement = [base + line if line else line for line in new]
+            result = lines[:start] + replacement + lines[start + size:]
+            return "\n".join(result) + ("\n" if code.endswith("\n") else "")
+    return None
+
+
+class FixMemory:
+    """SQLite store of LLM fixes that resolved each error fingerprint."""
+
+    def __init__(self, db_path: Path):
+        """
+        Initialize the store.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS learned_fixes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                fingerprint TEXT NOT NULL,
+                old_lines TEXT NOT NULL,
+                new_lines TEXT NOT NULL,
+                successes INTEGER NOT NULL DEFAULT 0,
+                failures INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                UNIQUE (fingerprint, old_lines, new_lines)
+            )
+        """)
+        self._conn.commit()
+
+    def record(self, fingerprint: str, before: str, after: str) -> int:
+        """
+        Record the change from ``before`` to ``after`` as a fix for a fingerprint.
+
+        Returns:
+            Number of hunks recorded (0 if the change was too large)
+        """
+        hunks = diff_hunks(before, after)
+        if not hunks:
+            return 0
+        with self._lock:
+            for old, new in hunks:
+                self._conn.execute(
+                    """
+                    INSERT INTO learned_fixes
+                        (fingerprint, old_lines, new_lines, successes, created_at)
+                    VALUES (?, ?, ?, 1, ?)
+                    ON CONFLICT (fingerprint, old_lines, new_lines)
+                    DO UPDATE SET successes = successes + 1
+                    """,
+                    (fingerprint, json.dumps(old), json.dumps(new), time.time()),
+                )
+            self._conn.commit()
+        return len(hunks)
+
+    def replay(self, fingerprint: str, code: str) -> Optional[Tuple[str, List[int]]]:
+        """
+        Apply every learned hunk for a fingerprint that matches the code.
+
+        Returns:
+            (fixed code, ids of the applied fixes), or None if nothing applied
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT id, old_lines, new_lines FROM learned_fixes
+                WHERE fingerprint = ? AND successes > failures
+                ORDER BY successes - failures DESC
+                """,
+                (fingerprint,),
+            ).fetchall()
+
+        applied = []
+        for fix_id, old, new in rows:
+            result = apply_hunk(code, json.loads(old), json.loads(new))
+            if result is not None and result != code:
+                code = result
+                applied.append(fix_id)
+        return (code, applied) if applied else None
+
+    def report(self, fix_ids: List[int], success: bool) -> None:
+        """Count a replayed fix's outcome, so unreliable fixes stop replaying."""
+        column = "successes" if success else "failures"
+        with self._lock:
+            self._conn.executemany(
+                f"UPDATE learned_fixes SET {column} = {column} + 1 WHERE id = ?",
+                [(fix_id,) for fix_id in fix_ids],
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM learned_fixes").fetchone()[0]
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+# ----------------------------------------------------------------------
+# Fixer
+# ----------------------------------------------------------------------
+
+@dataclass
+class AutoFix:
+    """A deterministic fix proposed for a render error."""
+    code: str
+    fingerprint: ErrorFingerprint
+    source: str  # "rule:<name>" or "memory"
+    memory_ids: List[int] = field(default_factory=list)
+
+
+class AutoFixer:
+    """Applies rewrite rules and learned fixes to failing scene code."""
+
+    def __init__(
+        self,
+        memory: Optional[FixMemory] = None,
+        rules: Tuple[FixRule, ...] = DEFAULT_RULES,
+    ):
+        """
+        Initialize the fixer.
+
+        Args:
+            memory: Optional store of learned LLM fixes to replay and extend
+            rules: Rewrite rules, tried in order
+        """
+        self.memory = memory
+        self.rules = rules
+        self.rule_fixes = 0
+        self.memory_fixes = 0
+        self.misses = 0
+        self.learned = 0
+
+    def fix(self, code: str, error_message: str) -> Optional[AutoFix]:
+        """
+        Propose a fix for code that failed with ``error_message``.
+
+        Returns:
+            An AutoFix with parseable, changed code, or None if no rule or
+            learned fix applies
+        """
+        fp = fingerprint_error(error_message)
+        if fp is None:
+            return None
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            return None
+
+        for rule in self.rules:
+            if not rule.matches(fp):
+                continue
+            fixed = rule.rewrite(code, tree, fp)
+            if fixed and fixed != code and _parses(fixed):
+                self.rule_fixes += 1
+                logger.info(f"Auto-fix rule {rule.name} matched {fp.key}")
+                return AutoFix(fixed, fp, f"rule:{rule.name}")
+
+        if self.memory is not None:
+            replayed = self.memory.replay(fp.key, code)
+            if replayed is not None and _parses(replayed[0]):
+                self.memory_fixes += 1
+                logger.info(f"Replaying {len(replayed[1])} learned fix(es) for {fp.key}")
+                return AutoFix(replayed[0], fp, "memory", replayed[1])
+
+        self.misses += 1
+        return None
+
+    def report(self, fix: AutoFix, success: bool) -> None:
+        """Record whether a proposed fix rendered successfully."""
+        if self.memory is not None and fix.memory_ids:
+            self.memory.report(fix.memory_ids, success)
+
+    def learn(self, error_message: str, before: str, after: str) -> None:
+        """Remember an LLM fix of ``before`` into ``after`` that rendered successfully."""
+        if self.memory is None:
+            return
+        fp = fingerprint_error(error_message)
+        if fp is not None and self.memory.record(fp.key, before, after):
+            self.learned += 1
+
+    def stats(self) -> dict:
+        """Return fix counters."""
+        stats = {
+            "rule_fixes": self.rule_fixes,
+            "memory_fixes": self.memory_fixes,
+            "misses": self.misses,
+            "learned": self.learned,
+        }
+        if self.memory is not None:
+            stats["learned_fixes"] = len(self.memory)
+        return stats
+
+
+_shared_memories: Dict[Path, FixMemory] = {}
+_shared_memories_lock = threading.Lock()
+
+
+def _shared_fix_memory(db_path: Path) -> FixMemory:
+    """Return the process-wide FixMemory for a database path."""
+    key = Path(db_path).resolve()
+    with _shared_memories_lock:
+        memory = _shared_memories.get(key)
+        if memory is None:
+            memory = FixMemory(db_path)
+            _shared_memories[key] = memory
+        return memory
+
+
+def create_auto_fixer(config: "Config") -> Optional[AutoFixer]:
+    """
+    Create an AutoFixer from configuration.
+
+    Engines that share a fix memory path share one FixMemory connection.
+
+    Args:
+        config: Configuration object with auto-fix settings
+
+    Returns:
+        AutoFixer instance, or None when auto-fixing is disabled
+    """
+    if not config.auto_fix_enabled:
+        return None
+    memory = _shared_fix_memory(config.fix_memory_path) if config.fix_memory_enabled else None
+    return AutoFixer(memory)
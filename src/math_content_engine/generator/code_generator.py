@@ -2,12 +2,13 @@
 Manim code generator using LLM.
 """
 
+import asyncio
 import logging
 from dataclasses import dataclass
-from typing import Optional
+from typing import Generator, Optional
 
-from ..llm.base import BaseLLMClient
-from ..utils.code_extractor import extract_python_code
+from ..llm.base import BaseLLMClient, build_retry_prompt
+from ..utils.code_extractor import StreamingCodeExtractor, extract_python_code
 from ..utils.validators import validate_manim_code, ValidationResult
 from .prompts import AnimationStyle, get_system_prompt, build_generation_prompt
 from ..personalization import ContentPersonalizer, StudentProfile, get_interest_profile
@@ -50,7 +51,8 @@ class ManimCodeGenerator:
         llm_client: BaseLLMClient,
         max_retries: int = 5,
         animation_style: Optional[AnimationStyle] = None,
-        interest: Optional[str] = None
+        interest: Optional[str] = None,
+        streaming: bool = False,
     ):
         """
         Initialize the code generator.
@@ -60,9 +62,12 @@ class ManimCodeGenerator:
             max_retries: Maximum retry attempts for failed generations
             animation_style: Visual style preset for animations
             interest: Student interest for content personalization (e.g., "basketball", "gaming")
+            streaming: Stream LLM output, stopping at the closing code fence and
+                aborting responses that are clearly not Manim code
         """
         self.llm_client = llm_client
         self.max_retries = max_retries
+        self.streaming = streaming
         self.animation_style = animation_style or AnimationStyle.DARK
         self.system_prompt = get_system_prompt(self.animation_style)
 
@@ -99,6 +104,7 @@ class ManimCodeGenerator:
         audience_level: str = "high school",
         interest: Optional[str] = None,
         student_profile: Optional[StudentProfile] = None,
+        temperature: Optional[float] = None,
     ) -> GenerationResult:
         """
         Generate Manim code for a given topic.
@@ -109,10 +115,191 @@ class ManimCodeGenerator:
             audience_level: Target audience level
             interest: Optional interest override for personalization
             student_profile: Optional student profile for individual personalization
+            temperature: Optional sampling temperature override, e.g. to
+                diversify speculative candidates
 
         Returns:
             GenerationResult with generated code and metadata
         """
+        prompt = self._build_generation_prompt(
+            topic, requirements, audience_level, interest, student_profile
+        )
+
+        steps = self._generation_steps()
+        try:
+            error_context = next(steps)
+            while True:
+                error_context = steps.send(self._request(prompt, error_context, temperature))
+        except StopIteration as done:
+            return done.value
+
+    def fix_code(self, code: str, error_message: str) -> GenerationResult:
+        """
+        Fix existing code that failed during rendering.
+
+        Uses a structured diagnosis approach so the LLM identifies the root
+        cause before attempting a minimal fix (rather than rewriting the
+        whole scene from scratch).
+
+        Args:
+            code: The code that failed
+            error_message: Error message from Manim
+
+        Returns:
+            GenerationResult with fixed code
+        """
+        fix_prompt = self._build_fix_prompt(code, error_message)
+        return self._fix_result(self._request(fix_prompt))
+
+    def _request(
+        self,
+        prompt: str,
+        error_context: Optional[str] = None,
+        temperature: Optional[float] = None,
+    ) -> str:
+        """Send a prompt to the LLM and return the raw response text."""
+        if self.streaming:
+            return self._stream_request(build_retry_prompt(prompt, error_context), temperature)
+        if temperature is not None:
+            return self.llm_client.generate(
+                build_retry_prompt(prompt, error_context),
+                self.system_prompt,
+                temperature=temperature,
+            ).content
+        if error_context:
+            return self.llm_client.generate_with_retry(
+                prompt, self.system_prompt, error_context
+            ).content
+        return self.llm_client.generate(prompt, self.system_prompt).content
+
+    def _stream_request(self, prompt: str, temperature: Optional[float] = None) -> str:
+        """Stream a response, stopping at the closing code fence or on early abort."""
+        extractor = StreamingCodeExtractor()
+        if temperature is not None:
+            stream = self.llm_client.stream(prompt, self.system_prompt, temperature=temperature)
+        else:
+            stream = self.llm_client.stream(prompt, self.system_prompt)
+        try:
+            for chunk in stream:
+                if extractor.feed(chunk):
+                    break
+            if extractor.done and not extractor.aborted and hasattr(stream, "finish"):
+                # Let a caching stream store the response up to the fence
+                stream.finish(extractor.text)
+        finally:
+            # Closing the stream cancels the rest of the provider response
+            if hasattr(stream, "close"):
+                stream.close()
+
+        if extractor.aborted:
+            logger.warning(f"Aborted LLM stream early: {extractor.abort_reason}")
+        return extractor.text
+
+    async def agenerate(
+        self,
+        topic: str,
+        requirements: str = "",
+        audience_level: str = "high school",
+        interest: Optional[str] = None,
+        student_profile: Optional[StudentProfile] = None,
+        temperature: Optional[float] = None,
+    ) -> GenerationResult:
+        """
+        Asynchronously generate Manim code for a given topic.
+
+        Same as generate(), but awaits the LLM client's async API so many
+        generations can share one event loop.
+        """
+        prompt = self._build_generation_prompt(
+            topic, requirements, audience_level, interest, student_profile
+        )
+
+        steps = self._generation_steps()
+        try:
+            error_context = next(steps)
+            while True:
+                error_context = steps.send(
+                    await self._arequest(prompt, error_context, temperature)
+                )
+        except StopIteration as done:
+            return done.value
+
+    async def afix_code(self, code: str, error_message: str) -> GenerationResult:
+        """Asynchronously fix code that failed during rendering (see fix_code)."""
+        fix_prompt = self._build_fix_prompt(code, error_message)
+        return self._fix_result(await self._arequest(fix_prompt))
+
+    def _generation_steps(self) -> Generator[Optional[str], str, GenerationResult]:
+        """Validation retry loop shared by generate() and agenerate().
+
+        Yields the error context for each LLM request (None for the first),
+        receives the raw response, and returns the final GenerationResult.
+        """
+        raw_response = yield None
+        code = extract_python_code(raw_response)
+        validation = validate_manim_code(code)
+        attempt = 1
+
+        # Retry loop for invalid code
+        while not validation.is_valid and attempt < self.max_retries:
+            attempt += 1
+            logger.warning(
+                f"Validation failed (attempt {attempt-1}/{self.max_retries}): {validation.errors}"
+            )
+            # Keep the invalid response from being replayed by a response cache
+            self.llm_client.discard_response(code)
+
+            raw_response = yield self._build_error_context(code, validation)
+            code = extract_python_code(raw_response)
+            validation = validate_manim_code(code)
+
+        if not validation.is_valid:
+            logger.error(f"Failed to generate valid code after {self.max_retries} attempts")
+            self.llm_client.discard_response(code)
+
+        return GenerationResult(
+            code=code,
+            scene_name=self._extract_scene_name(code),
+            validation=validation,
+            attempts=attempt,
+            raw_response=raw_response,
+        )
+
+    async def _arequest(
+        self,
+        prompt: str,
+        error_context: Optional[str] = None,
+        temperature: Optional[float] = None,
+    ) -> str:
+        """Async variant of _request()."""
+        if self.streaming:
+            # Provider streams are synchronous iterators; consume one off the loop
+            return await asyncio.to_thread(
+                self._stream_request, build_retry_prompt(prompt, error_context), temperature
+            )
+        if temperature is not None:
+            response = await self.llm_client.agenerate(
+                build_retry_prompt(prompt, error_context),
+                self.system_prompt,
+                temperature=temperature,
+            )
+        elif error_context:
+            response = await self.llm_client.agenerate_with_retry(
+                prompt, self.system_prompt, error_context
+            )
+        else:
+            response = await self.llm_client.agenerate(prompt, self.system_prompt)
+        return response.content
+
+    def _build_generation_prompt(
+        self,
+        topic: str,
+        requirements: str,
+        audience_level: str,
+        interest: Optional[str],
+        student_profile: Optional[StudentProfile],
+    ) -> str:
+        """Build the personalized generation prompt for a topic."""
         # Build animation personalization context with engagement data
         personalization_context = ""
         if interest:
@@ -143,55 +330,11 @@ class ManimCodeGenerator:
             interest_info = ", personalized"
         logger.info(f"Generating Manim code for topic: {topic} (style: {self.animation_style.value}{interest_info})")
 
-        # Initial generation
-        response = self.llm_client.generate(prompt, self.system_prompt)
-        code = extract_python_code(response.content)
-        validation = validate_manim_code(code)
-        attempt = 1
-
-        # Retry loop for invalid code
-        while not validation.is_valid and attempt < self.max_retries:
-            attempt += 1
-            logger.warning(
-                f"Validation failed (attempt {attempt-1}/{self.max_retries}): {validation.errors}"
-            )
+        return prompt
 
-            error_context = self._build_error_context(code, validation)
-            response = self.llm_client.generate_with_retry(
-                prompt, self.system_prompt, error_context
-            )
-            code = extract_python_code(response.content)
-            validation = validate_manim_code(code)
-
-        if not validation.is_valid:
-            logger.error(f"Failed to generate valid code after {self.max_retries} attempts")
-
-        scene_name = self._extract_scene_name(code)
-
-        return GenerationResult(
-            code=code,
-            scene_name=scene_name,
-            validation=validation,
-            attempts=attempt,
-            raw_response=response.content,
-        )
-
-    def fix_code(self, code: str, error_message: str) -> GenerationResult:
-        """
-        Fix existing code that failed during rendering.
-
-        Uses a structured diagnosis approach so the LLM identifies the root
-        cause before attempting a minimal fix (rather than rewriting the
-        whole scene from scratch).
-
-        Args:
-            code: The code that failed
-            error_message: Error message from Manim
-
-        Returns:
-            GenerationResult with fixed code
-        """
-        fix_prompt = f"""The following Manim code failed with an error. Fix it using a MINIMAL change.
+    def _build_fix_prompt(self, code: str, error_message: str) -> str:
+        """Build the minimal-fix prompt for code that failed to render."""
+        return f"""The following Manim code failed with an error. Fix it using a MINIMAL change.
 
 ## FAILED CODE
 ```python
@@ -211,9 +354,11 @@ class ManimCodeGenerator:
 
 Return ONLY the corrected Python code. Keep everything that was already working."""
 
-        response = self.llm_client.generate(fix_prompt, self.system_prompt)
-        fixed_code = extract_python_code(response.content)
+    def _fix_result(self, raw_response: str) -> GenerationResult:
+        fixed_code = extract_python_code(raw_response)
         validation = validate_manim_code(fixed_code)
+        if not validation.is_valid:
+            self.llm_client.discard_response(fixed_code)
         scene_name = self._extract_scene_name(fixed_code)
 
         return GenerationResult(
@@ -221,7 +366,7 @@ Return ONLY the corrected Python code. Keep everything that was already working.
             scene_name=scene_name,
             validation=validation,
             attempts=1,
-            raw_response=response.content,
+            raw_response=raw_response,
         )
 
     def _extract_scene_name(self, code: str) -> str:
@@ -26,7 +26,6 @@ class SessionManager:
         # Will be set when engine is available
         self._engine = None
         self._code_generator = None
-        self._renderer = None
 
     def _get_engine(self):
         """Lazy load the math content engine."""
@@ -48,15 +47,27 @@ class SessionManager:
             self._code_generator = ManimCodeGenerator(config)
         return self._code_generator
 
-    def _get_renderer(self):
-        """Lazy load the renderer."""
-        if self._renderer is None:
-            from ...renderer.manim_renderer import ManimRenderer
-            from ...config import Config
+    def _get_renderer(self, output_dir: Path, quality):
+        """Create a renderer writing to *output_dir* at *quality*.
 
-            config = Config.from_env()
-            self._renderer = ManimRenderer(config)
-        return self._renderer
+        The render cache and warm worker pool are shared process-wide, so
+        building a renderer per call is cheap.
+        """
+        from ...renderer.manim_renderer import ManimRenderer
+        from ...renderer.blob_store import create_blob_store
+        from ...renderer.render_cache import create_render_cache
+        from ...renderer.worker_pool import create_worker_pool
+        from ...config import Config
+
+        config = Config.from_env()
+        return ManimRenderer(
+            output_dir=output_dir,
+            cache_dir=config.manim_cache_dir,
+            quality=quality,
+            render_cache=create_render_cache(config),
+            worker_pool=create_worker_pool(config),
+            blob_store=create_blob_store(config),
+        )
 
     def create_session(self, topic: str, requirements: Optional[list[str]] = None) -> PromptSession:
         """Create a new prompt engineering session."""
@@ -186,8 +197,6 @@ class SessionManager:
         start_time = time.time()
 
         try:
-            renderer = self._get_renderer()
-
             # Map quality string to VideoQuality enum
             from ...config import VideoQuality
             quality_map = {
@@ -199,11 +208,10 @@ class SessionManager:
             }
             video_quality = quality_map.get(quality, VideoQuality.LOW)
 
+            renderer = self._get_renderer(output_dir, video_quality)
             render_result = renderer.render(
                 code=code,
                 scene_name=scene_name,
-                output_dir=output_dir,
-                quality=video_quality,
             )
 
             render_time_ms = int((time.time() - start_time) * 1000)
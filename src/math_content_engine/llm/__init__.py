@@ -5,7 +5,10 @@ from .claude import ClaudeClient
 from .openai import OpenAIClient
 from .gemini import GeminiClient
 from .deepseek import DeepSeekClient
-from .factory import create_llm_client
+from .factory import close_llm_clients, create_llm_client, get_llm_client
+from .cache import CachedLLMClient, LLMResponseCache, create_llm_cache
+from .connections import aclose_async_clients
+from .rate_limit import RateLimiter, get_rate_limiter
 
 __all__ = [
     "BaseLLMClient",
@@ -14,4 +17,12 @@ __all__ = [
     "GeminiClient",
     "DeepSeekClient",
     "create_llm_client",
+    "get_llm_client",
+    "close_llm_clients",
+    "CachedLLMClient",
+    "LLMResponseCache",
+    "create_llm_cache",
+    "aclose_async_clients",
+    "RateLimiter",
+    "get_rate_limiter",
 ]
@@ -2,24 +2,64 @@
 Base class for LLM clients.
 """
 
+import asyncio
+import hashlib
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterator, Optional
+
+from .rate_limit import is_overload_error, retry_after_seconds, used_tokens
+
+# Retries the Anthropic and OpenAI SDKs make by default
+SDK_DEFAULT_RETRIES = 2
+
+if TYPE_CHECKING:
+    from .rate_limit import RateLimiter
 
 
 @dataclass
 class LLMResponse:
-    """Response from an LLM API call."""
+    """Response from an LLM API call.
+
+    Where the provider reports it, ``usage`` includes ``cached_input_tokens``
+    (served from the provider's prompt cache) and ``uncached_input_tokens``.
+    """
     content: str
     model: str
     usage: dict
     finish_reason: Optional[str] = None
 
 
+def token_count(obj: Any, name: str) -> Optional[int]:
+    """Read an integer token counter from an SDK usage object, if present."""
+    value = getattr(obj, name, None) if obj is not None else None
+    return value if isinstance(value, int) else None
+
+
+def prompt_cache_key(system_prompt: str) -> str:
+    """Stable key identifying a system prompt for provider-side caching."""
+    return hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()[:32]
+
+
+def build_retry_prompt(prompt: str, error_context: Optional[str] = None) -> str:
+    """Append the previous attempt's error to a prompt for a retry."""
+    if not error_context:
+        return prompt
+    return f"""{prompt}
+
+---
+PREVIOUS ATTEMPT FAILED WITH ERROR:
+{error_context}
+
+Please fix the code to resolve this error. Return ONLY the corrected Python code."""
+
+
 class BaseLLMClient(ABC):
     """Abstract base class for LLM clients."""
 
-    def __init__(self, api_key: str, model: str, temperature: float = 0.7, max_tokens: int = 4096):
+    def __init__(self, api_key: str, model: str, temperature: float = 0.7, max_tokens: int = 4096,
+                 prompt_cache: bool = False, rate_limiter: Optional["RateLimiter"] = None):
         """
         Initialize the LLM client.
 
@@ -28,11 +68,18 @@ class BaseLLMClient(ABC):
             model: Model identifier to use
             temperature: Sampling temperature (0.0-1.0)
             max_tokens: Maximum tokens in response
+            prompt_cache: Ask the provider to cache the system prompt prefix
+                where it needs an explicit opt-in
+            rate_limiter: Shared per provider/model limiter; when given, it
+                owns retries and the SDK's own retries are disabled
         """
         self.api_key = api_key
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
+        self.prompt_cache = prompt_cache
+        # Shared per provider/model limiter, passed in by create_llm_client()
+        self.rate_limiter = rate_limiter
 
     @abstractmethod
     def generate(self, prompt: str, system_prompt: Optional[str] = None, *, json_mode: bool = False) -> LLMResponse:
@@ -71,3 +118,158 @@ class BaseLLMClient(ABC):
             LLMResponse with corrected content
         """
         pass
+
+    def close(self) -> None:
+        """Release the client's HTTP connections. The default is a no-op."""
+
+    def discard_response(self, text: str) -> int:
+        """
+        Forget a cached response containing ``text`` so it is not replayed.
+
+        Called when a response turned out to be unusable. Clients without a
+        response cache have nothing to forget; the default is a no-op.
+
+        Returns:
+            Number of cached responses removed
+        """
+        return 0
+
+    def _sdk_options(self) -> dict:
+        """Extra SDK client options.
+
+        With a rate limiter attached, the limiter retries overloads and
+        transient errors itself, so SDK retries are turned off rather than
+        multiplying the attempts.
+        """
+        return {"max_retries": 0} if self.rate_limiter is not None else {}
+
+    def _stream_client(self, client: Any) -> Any:
+        """SDK client to open streams with.
+
+        The limiter cannot retry a stream, so streams keep the SDK's own
+        retries, which only cover opening the request.
+        """
+        if self.rate_limiter is None:
+            return client
+        return client.with_options(max_retries=SDK_DEFAULT_RETRIES)
+
+    def _estimate_tokens(self, prompt: str, system_prompt: Optional[str],
+                         max_tokens: Optional[int]) -> int:
+        """Conservative token estimate for a request: ~4 chars/token plus max output."""
+        chars = len(prompt) + len(system_prompt or "")
+        return chars // 4 + (max_tokens if max_tokens is not None else self.max_tokens)
+
+    def _limited(self, request: Callable[[], LLMResponse], estimated_tokens: int) -> LLMResponse:
+        """Run a provider call through the rate limiter, if one is attached."""
+        if self.rate_limiter is None:
+            return request()
+        return self.rate_limiter.call(request, estimated_tokens, used_tokens)
+
+    async def _alimited(self, request: Callable[[], Awaitable[LLMResponse]],
+                        estimated_tokens: int) -> LLMResponse:
+        """Async variant of _limited()."""
+        if self.rate_limiter is None:
+            return await request()
+        return await self.rate_limiter.acall(request, estimated_tokens, used_tokens)
+
+    @contextmanager
+    def _stream_slot(self, estimated_tokens: int):
+        """Hold a rate limiter slot for the duration of a streaming request.
+
+        Streams are not retried, since chunks may already have been consumed,
+        but overload errors still back the limiter off.
+        """
+        if self.rate_limiter is None:
+            yield
+            return
+        with self.rate_limiter.slot(estimated_tokens):
+            try:
+                yield
+            except Exception as exc:
+                if is_overload_error(exc):
+                    self.rate_limiter.record_overload(retry_after_seconds(exc))
+                raise
+        self.rate_limiter.record_success()
+
+    def stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> Iterator[str]:
+        """
+        Stream a response from the LLM as text chunks.
+
+        Closing the iterator early cancels the request where the provider
+        supports streaming. The default yields the full generate() response
+        as a single chunk.
+
+        Args:
+            prompt: User prompt to send
+            system_prompt: Optional system prompt for context
+            max_tokens: Override the default max_tokens if provided
+            temperature: Override the default temperature if provided
+
+        Yields:
+            Successive pieces of the response text
+        """
+        kwargs = {}
+        if max_tokens is not None:
+            kwargs["max_tokens"] = max_tokens
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+        yield self.generate(prompt, system_prompt, **kwargs).content
+
+    async def agenerate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        *,
+        json_mode: bool = False,
+    ) -> LLMResponse:
+        """
+        Asynchronously generate a response from the LLM.
+
+        Providers with an async SDK override this; the default runs
+        generate() in a worker thread.
+
+        Args:
+            prompt: User prompt to send
+            system_prompt: Optional system prompt for context
+            max_tokens: Override the default max_tokens if provided
+            temperature: Override the default temperature if provided
+            json_mode: Request structured JSON output where supported
+
+        Returns:
+            LLMResponse with generated content
+        """
+        kwargs = {}
+        if max_tokens is not None:
+            kwargs["max_tokens"] = max_tokens
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+        if json_mode:
+            kwargs["json_mode"] = True
+        return await asyncio.to_thread(self.generate, prompt, system_prompt, **kwargs)
+
+    async def agenerate_with_retry(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        error_context: Optional[str] = None
+    ) -> LLMResponse:
+        """
+        Asynchronously generate a response with error context for retries.
+
+        Args:
+            prompt: Original user prompt
+            system_prompt: Optional system prompt
+            error_context: Error message from previous attempt
+
+        Returns:
+            LLMResponse with corrected content
+        """
+        return await self.agenerate(build_retry_prompt(prompt, error_context), system_prompt)
@@ -0,0 +1,471 @@
+"""
+Content-addressed cache for LLM responses.
+
+Entries are keyed on a SHA-256 of everything that determines a completion
+(provider, model, temperature, max tokens, system prompt and user prompt)
+and persisted in a small SQLite database, so regeneration runs over the
+same textbook examples skip the LLM round-trip entirely.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, Optional
+
+from .base import BaseLLMClient, LLMResponse
+
+if TYPE_CHECKING:
+    from ..config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """SQLite-backed LLM response cache with size and age eviction."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        max_bytes: Optional[int] = 256 * 1024 * 1024,
+        max_age_seconds: Optional[float] = 30 * 24 * 3600,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            db_path: Path to the SQLite database file
+            max_bytes: Evict least-recently-used entries above this total size
+                (None disables size eviction)
+            max_age_seconds: Evict entries older than this (None disables
+                age eviction)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_llm_responses_last_accessed
+            ON llm_responses(last_accessed)
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """Build a stable content hash from the parts that determine a completion."""
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[LLMResponse]:
+        """Return the cached response for *key*, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+
+            if row is not None and self.max_age_seconds is not None:
+                if now - row[1] > self.max_age_seconds:
+                    self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                    row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE llm_responses SET last_accessed = ? WHERE key = ?",
+                (now, key),
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        return LLMResponse(**json.loads(row[0]))
+
+    def put(self, key: str, response: LLMResponse) -> None:
+        """Store *response* under *key* and evict if over budget."""
+        payload = json.dumps(asdict(response))
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO llm_responses
+                    (key, response, size_bytes, created_at, last_accessed)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                (key, payload, len(payload.encode("utf-8")), now, now),
+            )
+            self._conn.commit()
+        self.evict()
+
+    def delete(self, key: str) -> bool:
+        """Remove the entry for *key*; returns True if one was stored."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def evict(self) -> int:
+        """Drop expired entries, then least-recently-used ones above max_bytes.
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        with self._lock:
+            if self.max_age_seconds is not None:
+                cursor = self._conn.execute(
+                    "DELETE FROM llm_responses WHERE created_at < ?",
+                    (time.time() - self.max_age_seconds,),
+                )
+                removed += cursor.rowcount
+
+            if self.max_bytes is not None:
+                total = self._conn.execute(
+                    "SELECT COALESCE(SUM(size_bytes), 0) FROM llm_responses"
+                ).fetchone()[0]
+                if total > self.max_bytes:
+                    rows = self._conn.execute(
+                        "SELECT key, size_bytes FROM llm_responses ORDER BY last_accessed ASC"
+                    ).fetchall()
+                    for key, size in rows:
+                        if total <= self.max_bytes:
+                            break
+                        self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                        total -= size
+                        removed += 1
+
+            self._conn.commit()
+
+        if removed:
+            logger.debug(f"Evicted {removed} LLM cache entries")
+        return removed
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current cache usage."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM llm_responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "size_bytes": size,
+        }
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+class CachedLLMClient(BaseLLMClient):
+    """
+    LLM client wrapper that serves repeated requests from an LLMResponseCache.
+
+    Any attribute not defined here is delegated to the wrapped client, so the
+    wrapper can stand in wherever a provider client is expected.
+
+    Responses are cached as soon as they arrive; callers that find a
+    response unusable (invalid code, or code that never rendered) drop it
+    again with discard_response() so it is not replayed on the next run.
+    """
+
+    # Recently served responses remembered for discard_response()
+    _MAX_SERVED = 256
+
+    def __init__(self, client: BaseLLMClient, cache: LLMResponseCache, provider: Optional[str] = None):
+        """
+        Initialize the caching wrapper.
+
+        Args:
+            client: The provider client to delegate cache misses to
+            cache: Response cache shared by this wrapper
+            provider: Provider name used in the cache key (defaults to the
+                wrapped client's class name)
+        """
+        super().__init__(client.api_key, client.model, client.temperature, client.max_tokens)
+        self.client = client
+        self.cache = cache
+        self.provider = provider or type(client).__name__
+        self._served: "OrderedDict[str, str]" = OrderedDict()
+        self._served_lock = threading.Lock()
+        self._local = threading.local()
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "client":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    def _key(self, kind: str, prompt: str, system_prompt: Optional[str], **extra: Any) -> str:
+        return self.cache.make_key(
+            kind=kind,
+            provider=self.provider,
+            model=self.client.model,
+            system_prompt=system_prompt,
+            prompt=prompt,
+            **extra,
+        )
+
+    def _generate_key(self, prompt: str, system_prompt: Optional[str],
+                      max_tokens: Optional[int], temperature: Optional[float],
+                      json_mode: bool) -> str:
+        return self._key(
+            "generate", prompt, system_prompt,
+            temperature=temperature if temperature is not None else self.client.temperature,
+            max_tokens=max_tokens if max_tokens is not None else self.client.max_tokens,
+            json_mode=json_mode,
+        )
+
+    def _retry_key(self, prompt: str, system_prompt: Optional[str],
+                   error_context: Optional[str]) -> str:
+        return self._key(
+            "generate_with_retry", prompt, system_prompt,
+            error_context=error_context,
+            temperature=self.client.temperature,
+            max_tokens=self.client.max_tokens,
+        )
+
+    @contextmanager
+    def bypass(self) -> Iterator[None]:
+        """Send requests made on this thread straight to the provider, uncached."""
+        previous = getattr(self._local, "bypass", False)
+        self._local.bypass = True
+        try:
+            yield
+        finally:
+            self._local.bypass = previous
+
+    def _bypassed(self) -> bool:
+        return getattr(self._local, "bypass", False)
+
+    def _lookup(self, key: str) -> Optional[LLMResponse]:
+        if self._bypassed():
+            return None
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.debug(f"LLM cache hit ({key[:12]})")
+            self._remember(key, cached.content)
+        return cached
+
+    def _store(self, key: str, response: LLMResponse) -> LLMResponse:
+        if response.content and not self._bypassed():
+            self.cache.put(key, response)
+            self._remember(key, response.content)
+        return response
+
+    def _remember(self, key: str, content: str) -> None:
+        with self._served_lock:
+            self._served[key] = content
+            self._served.move_to_end(key)
+            while len(self._served) > self._MAX_SERVED:
+                self._served.popitem(last=False)
+
+    def discard_response(self, text: str) -> int:
+        """
+        Drop cached responses that contain ``text``.
+
+        Only responses recently served by this wrapper are considered, so
+        this is cheap and never touches entries another process relies on.
+
+        Args:
+            text: Part of the response to forget, e.g. the extracted code
+                that failed validation or rendering
+
+        Returns:
+            Number of cache entries removed
+        """
+        text = text.strip()
+        if not text:
+            return 0
+        with self._served_lock:
+            keys = [key for key, content in self._served.items() if text in content]
+            for key in keys:
+                del self._served[key]
+        removed = sum(self.cache.delete(key) for key in keys)
+        if removed:
+            logger.debug(f"Discarded {removed} unusable LLM cache entries")
+        return removed
+
+    @staticmethod
+    def _overrides(max_tokens: Optional[int], temperature: Optional[float], json_mode: bool) -> dict:
+        kwargs = {}
+        if max_tokens is not None:
+            kwargs["max_tokens"] = max_tokens
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+        if json_mode:
+            kwargs["json_mode"] = True
+        return kwargs
+
+    def generate(self, prompt: str, system_prompt: Optional[str] = None,
+                 max_tokens: Optional[int] = None, temperature: Optional[float] = None,
+                 *, json_mode: bool = False) -> LLMResponse:
+        """Generate a response, serving it from the cache when possible."""
+        key = self._generate_key(prompt, system_prompt, max_tokens, temperature, json_mode)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        kwargs = self._overrides(max_tokens, temperature, json_mode)
+        return self._store(key, self.client.generate(prompt, system_prompt, **kwargs))
+
+    def stream(self, prompt: str, system_prompt: Optional[str] = None,
+               max_tokens: Optional[int] = None,
+               temperature: Optional[float] = None) -> Iterator[str]:
+        """Stream a response, serving it from the cache when possible.
+
+        Shares cache entries with generate(). A stream consumed to the end is
+        stored; a consumer that stops early because it has everything it
+        needs calls ``finish(text)`` on the returned iterator to store
+        ``text`` instead. Streams closed without finish() are not stored.
+        """
+        key = self._generate_key(prompt, system_prompt, max_tokens, temperature, False)
+        cached = self._lookup(key)
+        if cached is not None:
+            return iter([cached.content])
+
+        kwargs = self._overrides(max_tokens, temperature, False)
+        return _CachingStream(
+            self.client.stream(prompt, system_prompt, **kwargs),
+            lambda text: self._store(key, LLMResponse(content=text, model=self.client.model, usage={})),
+        )
+
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None,
+                        max_tokens: Optional[int] = None, temperature: Optional[float] = None,
+                        *, json_mode: bool = False) -> LLMResponse:
+        """Asynchronously generate a response, serving it from the cache when possible."""
+        key = self._generate_key(prompt, system_prompt, max_tokens, temperature, json_mode)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        kwargs = self._overrides(max_tokens, temperature, json_mode)
+        return self._store(key, await self.client.agenerate(prompt, system_prompt, **kwargs))
+
+    def generate_with_retry(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        error_context: Optional[str] = None
+    ) -> LLMResponse:
+        """Generate a retry response, serving it from the cache when possible."""
+        key = self._retry_key(prompt, system_prompt, error_context)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        return self._store(key, self.client.generate_with_retry(prompt, system_prompt, error_context))
+
+    async def agenerate_with_retry(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        error_context: Optional[str] = None
+    ) -> LLMResponse:
+        """Asynchronously generate a retry response, serving it from the cache when possible."""
+        key = self._retry_key(prompt, system_prompt, error_context)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+
+        response = await self.client.agenerate_with_retry(prompt, system_prompt, error_context)
+        return self._store(key, response)
+
+
+class _CachingStream:
+    """Iterator over a provider stream that stores the response once."""
+
+    def __init__(self, stream: Iterator[str], store: Callable[[str], Any]):
+        self._stream = stream
+        self._store = store
+        self._chunks: list = []
+        self._stored = False
+
+    def __iter__(self) -> "_CachingStream":
+        return self
+
+    def __next__(self) -> str:
+        try:
+            chunk = next(self._stream)
+        except StopIteration:
+            self.finish("".join(self._chunks))
+            raise
+        self._chunks.append(chunk)
+        return chunk
+
+    def finish(self, text: str) -> None:
+        """Store ``text`` as the complete response, e.g. up to a closing code fence."""
+        if not self._stored:
+            self._stored = True
+            self._store(text)
+
+    def close(self) -> None:
+        """Close the provider stream, cancelling the rest of the request."""
+        if hasattr(self._stream, "close"):
+            self._stream.close()
+
+
+_shared_caches: Dict[Path, LLMResponseCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def create_llm_cache(config: "Config") -> Optional[LLMResponseCache]:
+    """
+    Return the process-wide LLMResponseCache for the configured database.
+
+    Engines that share a cache path share one connection; the settings of
+    the first call win.
+
+    Args:
+        config: Configuration object with LLM cache settings
+
+    Returns:
+        LLMResponseCache instance, or None when the LLM cache is disabled
+    """
+    if not config.llm_cache_enabled:
+        return None
+
+    key = Path(config.llm_cache_path).resolve()
+    with _shared_caches_lock:
+        cache = _shared_caches.get(key)
+        if cache is None:
+            cache = LLMResponseCache(
+                config.llm_cache_path,
+                max_bytes=config.llm_cache_max_mb * 1024 * 1024,
+                max_age_seconds=config.llm_cache_max_age_days * 24 * 3600,
+            )
+            _shared_caches[key] = cache
+        return cache
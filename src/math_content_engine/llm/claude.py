@@ -2,20 +2,25 @@
 Claude (Anthropic) LLM client implementation.
 """
 
-from typing import Optional
+from typing import TYPE_CHECKING, Iterator, Optional
 
 import anthropic
 
-from .base import BaseLLMClient, LLMResponse
+from .base import BaseLLMClient, LLMResponse, build_retry_prompt, token_count
+from .connections import get_async_client, http_limits
+
+if TYPE_CHECKING:
+    from .rate_limit import RateLimiter
 
 
 class ClaudeClient(BaseLLMClient):
     """LLM client for Anthropic's Claude models."""
 
     def __init__(self, api_key: str, model: str = "claude-sonnet-4-20250514",
-                 temperature: float = 0.7, max_tokens: int = 4096):
-        super().__init__(api_key, model, temperature, max_tokens)
-        self.client = anthropic.Anthropic(api_key=api_key)
+                 temperature: float = 0.7, max_tokens: int = 4096, prompt_cache: bool = False,
+                 rate_limiter: Optional["RateLimiter"] = None):
+        super().__init__(api_key, model, temperature, max_tokens, prompt_cache, rate_limiter)
+        self.client = anthropic.Anthropic(api_key=api_key, **self._sdk_options())
 
     def generate(self, prompt: str, system_prompt: Optional[str] = None,
                  max_tokens: Optional[int] = None, temperature: Optional[float] = None,
@@ -33,6 +38,52 @@ class ClaudeClient(BaseLLMClient):
         """
         # json_mode accepted for API compatibility; Claude does not support
         # response_format. Prompt instructions + repair fallback handle JSON.
+        kwargs = self._build_request(prompt, system_prompt, max_tokens, temperature)
+        return self._limited(
+            lambda: self._to_response(self.client.messages.create(**kwargs)),
+            self._estimate_tokens(prompt, system_prompt, max_tokens),
+        )
+
+    def stream(self, prompt: str, system_prompt: Optional[str] = None,
+               max_tokens: Optional[int] = None,
+               temperature: Optional[float] = None) -> Iterator[str]:
+        """Stream a response from Claude; closing the iterator ends the request."""
+        kwargs = self._build_request(prompt, system_prompt, max_tokens, temperature)
+        with self._stream_slot(self._estimate_tokens(prompt, system_prompt, max_tokens)):
+            with self._stream_client(self.client).messages.stream(**kwargs) as stream:
+                yield from stream.text_stream
+
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None,
+                        max_tokens: Optional[int] = None, temperature: Optional[float] = None,
+                        *, json_mode: bool = False) -> LLMResponse:
+        """Generate a response using the shared async Anthropic client."""
+        kwargs = self._build_request(prompt, system_prompt, max_tokens, temperature)
+        client = self.async_client
+
+        async def request() -> LLMResponse:
+            return self._to_response(await client.messages.create(**kwargs))
+
+        return await self._alimited(
+            request, self._estimate_tokens(prompt, system_prompt, max_tokens)
+        )
+
+    @property
+    def async_client(self) -> "anthropic.AsyncAnthropic":
+        """The process-wide async client for this API key."""
+        options = self._sdk_options()
+        return get_async_client(
+            "claude",
+            self.api_key,
+            lambda: anthropic.AsyncAnthropic(
+                api_key=self.api_key,
+                http_client=anthropic.DefaultAsyncHttpxClient(limits=http_limits()),
+                **options,
+            ),
+            max_retries=options.get("max_retries"),
+        )
+
+    def _build_request(self, prompt: str, system_prompt: Optional[str],
+                       max_tokens: Optional[int], temperature: Optional[float]) -> dict:
         messages = [{"role": "user", "content": prompt}]
 
         kwargs = {
@@ -43,20 +94,45 @@ class ClaudeClient(BaseLLMClient):
         }
 
         if system_prompt:
-            kwargs["system"] = system_prompt
-
-        response = self.client.messages.create(**kwargs)
+            if self.prompt_cache:
+                # Cache breakpoint after the static system prompt, so every
+                # call sharing it reuses the cached prefix
+                kwargs["system"] = [{
+                    "type": "text",
+                    "text": system_prompt,
+                    "cache_control": {"type": "ephemeral"},
+                }]
+            else:
+                kwargs["system"] = system_prompt
+
+        return kwargs
+
+    def _to_response(self, response) -> LLMResponse:
+        usage = {
+            "input_tokens": response.usage.input_tokens,
+            "output_tokens": response.usage.output_tokens,
+        }
+        # input_tokens excludes cache reads and writes; report them separately
+        cache_read = token_count(response.usage, "cache_read_input_tokens")
+        cache_write = token_count(response.usage, "cache_creation_input_tokens")
+        if cache_read is not None or cache_write is not None:
+            usage["cache_creation_input_tokens"] = cache_write or 0
+            usage["cached_input_tokens"] = cache_read or 0
+            usage["uncached_input_tokens"] = (
+                (token_count(response.usage, "input_tokens") or 0) + (cache_write or 0)
+            )
 
         return LLMResponse(
             content=response.content[0].text,
             model=response.model,
-            usage={
-                "input_tokens": response.usage.input_tokens,
-                "output_tokens": response.usage.output_tokens,
-            },
+            usage=usage,
             finish_reason=response.stop_reason,
         )
 
+    def close(self) -> None:
+        """Close the synchronous SDK client's connection pool."""
+        self.client.close()
+
     def generate_with_retry(
         self,
         prompt: str,
@@ -64,15 +140,4 @@ class ClaudeClient(BaseLLMClient):
         error_context: Optional[str] = None
     ) -> LLMResponse:
         """Generate a response with error context for code correction."""
-        if error_context:
-            retry_prompt = f"""{prompt}
-
----
-PREVIOUS ATTEMPT FAILED WITH ERROR:
-{error_context}
-
-Please fix the code to resolve this error. Return ONLY the corrected Python code."""
-        else:
-            retry_prompt = prompt
-
-        return self.generate(retry_prompt, system_prompt)
+        return self.generate(build_retry_prompt(prompt, error_context), system_prompt)
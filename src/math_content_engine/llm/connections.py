@@ -0,0 +1,92 @@
+"""
+Process-wide registry of async LLM SDK clients.
+
+Async SDK clients own an HTTP connection pool, so creating one per request
+throws away keep-alive connections and TLS sessions. Clients are shared per
+(provider, api key, base URL, SDK retry setting) instead. httpx async pools are bound to the
+event loop that first used them, so the registry is kept per event loop;
+a server running a single loop therefore holds exactly one client per key.
+"""
+
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Connection pool limits for each shared async client. Generation requests
+# are long-lived, so allow many concurrent connections per client.
+MAX_CONNECTIONS = 200
+MAX_KEEPALIVE_CONNECTIONS = 50
+
+_ClientKey = Tuple[str, str, Optional[str], Optional[int]]
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[_ClientKey, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+_lock = threading.Lock()
+
+
+def get_async_client(
+    provider: str,
+    api_key: str,
+    factory: Callable[[], Any],
+    base_url: Optional[str] = None,
+    max_retries: Optional[int] = None,
+) -> Any:
+    """
+    Return the shared async SDK client for a provider and API key.
+
+    Must be called from a coroutine; the client is created with *factory*
+    on first use in the running event loop.
+
+    Args:
+        provider: Provider name (e.g. "claude", "openai")
+        api_key: API key the client authenticates with
+        factory: Zero-argument callable building a new client
+        base_url: Optional API base URL, for OpenAI-compatible providers
+        max_retries: SDK retry setting the client is built with, when not the
+            SDK default; clients with different settings are kept apart
+
+    Returns:
+        The shared client instance
+    """
+    loop = asyncio.get_running_loop()
+    key = (provider, api_key, base_url, max_retries)
+    with _lock:
+        clients = _clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            client = factory()
+            clients[key] = client
+            logger.debug(f"Created shared async client for provider={provider}")
+    return client
+
+
+def http_limits():
+    """Return the httpx connection limits used by shared async clients."""
+    import httpx
+
+    return httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+    )
+
+
+async def aclose_async_clients() -> None:
+    """Close every shared async client created in the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _clients.pop(loop, {})
+    for client in clients.values():
+        close = getattr(client, "close", None)
+        if close is None:
+            continue
+        try:
+            result = close()
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception as e:
+            logger.warning(f"Failed to close async LLM client: {e}")
@@ -7,11 +7,15 @@ in a separate `reasoning_content` field before the final answer.
 """
 
 import logging
-from typing import Optional
+from typing import TYPE_CHECKING, Iterator, Optional
 
 import openai
 
-from .base import BaseLLMClient, LLMResponse
+from .base import BaseLLMClient, LLMResponse, build_retry_prompt, token_count
+from .connections import get_async_client, http_limits
+
+if TYPE_CHECKING:
+    from .rate_limit import RateLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -27,9 +31,16 @@ class DeepSeekClient(BaseLLMClient):
         model: str = "deepseek-reasoner",
         temperature: float = 0.7,
         max_tokens: int = 4096,
+        prompt_cache: bool = False,
+        rate_limiter: Optional["RateLimiter"] = None,
     ):
-        super().__init__(api_key=api_key, model=model, temperature=temperature, max_tokens=max_tokens)
-        self.client = openai.OpenAI(api_key=api_key, base_url=DEEPSEEK_BASE_URL)
+        super().__init__(
+            api_key=api_key, model=model, temperature=temperature, max_tokens=max_tokens,
+            prompt_cache=prompt_cache, rate_limiter=rate_limiter,
+        )
+        self.client = openai.OpenAI(
+            api_key=api_key, base_url=DEEPSEEK_BASE_URL, **self._sdk_options()
+        )
 
     def generate(
         self,
@@ -56,6 +67,76 @@ class DeepSeekClient(BaseLLMClient):
             and ignores system prompts. For the reasoner model, system
             instructions are prepended to the user prompt instead.
         """
+        kwargs = self._build_request(prompt, system_prompt, max_tokens, temperature, json_mode)
+        return self._limited(
+            lambda: self._to_response(self.client.chat.completions.create(**kwargs)),
+            self._estimate_tokens(prompt, system_prompt, max_tokens),
+        )
+
+    def stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> Iterator[str]:
+        """Stream a response from DeepSeek; closing the iterator ends the request."""
+        kwargs = self._build_request(prompt, system_prompt, max_tokens, temperature, False)
+        with self._stream_slot(self._estimate_tokens(prompt, system_prompt, max_tokens)):
+            client = self._stream_client(self.client)
+            stream = client.chat.completions.create(stream=True, **kwargs)
+            try:
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                stream.close()
+
+    async def agenerate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        *,
+        json_mode: bool = False,
+    ) -> LLMResponse:
+        """Generate a response using the shared async DeepSeek client."""
+        kwargs = self._build_request(prompt, system_prompt, max_tokens, temperature, json_mode)
+        client = self.async_client
+
+        async def request() -> LLMResponse:
+            return self._to_response(await client.chat.completions.create(**kwargs))
+
+        return await self._alimited(
+            request, self._estimate_tokens(prompt, system_prompt, max_tokens)
+        )
+
+    @property
+    def async_client(self) -> "openai.AsyncOpenAI":
+        """The process-wide async client for this API key."""
+        options = self._sdk_options()
+        return get_async_client(
+            "deepseek",
+            self.api_key,
+            lambda: openai.AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=DEEPSEEK_BASE_URL,
+                http_client=openai.DefaultAsyncHttpxClient(limits=http_limits()),
+                **options,
+            ),
+            base_url=DEEPSEEK_BASE_URL,
+            max_retries=options.get("max_retries"),
+        )
+
+    def _build_request(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        max_tokens: Optional[int],
+        temperature: Optional[float],
+        json_mode: bool,
+    ) -> dict:
         messages = []
         is_reasoner = "reasoner" in self.model
 
@@ -82,8 +163,9 @@ class DeepSeekClient(BaseLLMClient):
         if json_mode and not is_reasoner:
             kwargs["response_format"] = {"type": "json_object"}
 
-        response = self.client.chat.completions.create(**kwargs)
+        return kwargs
 
+    def _to_response(self, response) -> LLMResponse:
         choice = response.choices[0]
 
         # deepseek-reasoner returns reasoning_content alongside the answer
@@ -91,17 +173,29 @@ class DeepSeekClient(BaseLLMClient):
         if reasoning:
             logger.debug("DeepSeek reasoning (%d chars): %.200s...", len(reasoning), reasoning)
 
+        usage = {
+            "prompt_tokens": response.usage.prompt_tokens,
+            "completion_tokens": response.usage.completion_tokens,
+            "total_tokens": response.usage.total_tokens,
+        }
+        # DeepSeek caches prompt prefixes automatically and reports hits/misses
+        cache_hit = token_count(response.usage, "prompt_cache_hit_tokens")
+        cache_miss = token_count(response.usage, "prompt_cache_miss_tokens")
+        if cache_hit is not None and cache_miss is not None:
+            usage["cached_input_tokens"] = cache_hit
+            usage["uncached_input_tokens"] = cache_miss
+
         return LLMResponse(
             content=choice.message.content,
             model=response.model,
-            usage={
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.total_tokens,
-            },
+            usage=usage,
             finish_reason=choice.finish_reason,
         )
 
+    def close(self) -> None:
+        """Close the synchronous SDK client's connection pool."""
+        self.client.close()
+
     def generate_with_retry(
         self,
         prompt: str,
@@ -109,15 +203,4 @@ class DeepSeekClient(BaseLLMClient):
         error_context: Optional[str] = None,
     ) -> LLMResponse:
         """Generate a response with error context for code correction."""
-        if error_context:
-            retry_prompt = f"""{prompt}
-
----
-PREVIOUS ATTEMPT FAILED WITH ERROR:
-{error_context}
-
-Please fix the code to resolve this error. Return ONLY the corrected Python code."""
-        else:
-            retry_prompt = prompt
-
-        return self.generate(retry_prompt, system_prompt)
+        return self.generate(build_retry_prompt(prompt, error_context), system_prompt)
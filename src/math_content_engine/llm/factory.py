@@ -1,17 +1,32 @@
 """
-Factory function for creating LLM clients.
+Factory functions for creating and sharing LLM clients.
 """
 
+import atexit
+import logging
+import threading
+from typing import Dict
+
 from ..config import Config, LLMProvider
 from .base import BaseLLMClient
 from .claude import ClaudeClient
 from .openai import OpenAIClient
+from .rate_limit import RateLimiter, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+_clients: Dict[tuple, BaseLLMClient] = {}
+_clients_lock = threading.Lock()
 
 
 def create_llm_client(config: Config) -> BaseLLMClient:
     """
     Create an LLM client based on configuration.
 
+    Every client for the same provider and model shares one rate limiter,
+    so budgets and overload backoff apply across the whole process. The
+    limiter owns retries, so the SDK clients are built without their own.
+
     Args:
         config: Configuration object with LLM settings
 
@@ -21,12 +36,29 @@ def create_llm_client(config: Config) -> BaseLLMClient:
     Raises:
         ValueError: If provider is not supported
     """
+    if not isinstance(config.llm_provider, LLMProvider):
+        raise ValueError(f"Unsupported LLM provider: {config.llm_provider}")
+
+    rate_limiter = get_rate_limiter(
+        config.llm_provider.value,
+        config.get_model(),
+        requests_per_minute=config.llm_rpm or None,
+        tokens_per_minute=config.llm_tpm or None,
+        max_concurrency=config.llm_max_concurrency or None,
+    )
+    return _build_client(config, rate_limiter)
+
+
+def _build_client(config: Config, rate_limiter: RateLimiter) -> BaseLLMClient:
+    """Instantiate the provider client for the configuration."""
     if config.llm_provider == LLMProvider.CLAUDE:
         return ClaudeClient(
             api_key=config.anthropic_api_key,
             model=config.claude_model,
             temperature=config.temperature,
             max_tokens=config.max_tokens,
+            prompt_cache=config.prompt_cache_enabled,
+            rate_limiter=rate_limiter,
         )
     elif config.llm_provider == LLMProvider.OPENAI:
         return OpenAIClient(
@@ -34,6 +66,8 @@ def create_llm_client(config: Config) -> BaseLLMClient:
             model=config.openai_model,
             temperature=config.temperature,
             max_tokens=config.max_tokens,
+            prompt_cache=config.prompt_cache_enabled,
+            rate_limiter=rate_limiter,
         )
     elif config.llm_provider == LLMProvider.GEMINI:
         from .gemini import GeminiClient
@@ -42,8 +76,10 @@ def create_llm_client(config: Config) -> BaseLLMClient:
             model=config.gemini_model,
             temperature=config.temperature,
             max_tokens=config.max_tokens,
+            prompt_cache=config.prompt_cache_enabled,
             project_id=config.gcp_project_id,
             location=config.gcp_location,
+            rate_limiter=rate_limiter,
         )
     elif config.llm_provider == LLMProvider.DEEPSEEK:
         from .deepseek import DeepSeekClient
@@ -53,6 +89,65 @@ def create_llm_client(config: Config) -> BaseLLMClient:
             model=config.deepseek_model,
             temperature=config.temperature,
             max_tokens=config.max_tokens,
+            prompt_cache=config.prompt_cache_enabled,
+            rate_limiter=rate_limiter,
         )
     else:
         raise ValueError(f"Unsupported LLM provider: {config.llm_provider}")
+
+
+def _client_key(config: Config) -> tuple:
+    """Identify the settings that determine a client's behaviour."""
+    return (
+        config.llm_provider,
+        config.get_model(),
+        config.get_api_key(),
+        config.temperature,
+        config.max_tokens,
+        config.prompt_cache_enabled,
+        config.gcp_project_id,
+        config.gcp_location,
+    )
+
+
+def get_llm_client(config: Config) -> BaseLLMClient:
+    """
+    Return a shared LLM client for the configuration.
+
+    Clients are kept in a process-wide registry keyed on provider, model,
+    API key and sampling settings, so their HTTP connection pools stay warm
+    across requests. The SDK clients are thread-safe; use
+    create_llm_client() when a private client is needed.
+
+    Args:
+        config: Configuration object with LLM settings
+
+    Returns:
+        Shared LLM client instance
+
+    Raises:
+        ValueError: If provider is not supported
+    """
+    key = _client_key(config)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = create_llm_client(config)
+            _clients[key] = client
+            logger.debug(f"Registered shared LLM client for {config.llm_provider.value}")
+    return client
+
+
+def close_llm_clients() -> None:
+    """Close and forget every shared LLM client."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            logger.warning(f"Failed to close LLM client: {e}")
+
+
+atexit.register(close_llm_clients)
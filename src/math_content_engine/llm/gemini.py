@@ -7,9 +7,12 @@ Locally: uses `gcloud auth application-default login`.
 """
 
 import logging
-from typing import Optional
+from typing import TYPE_CHECKING, Iterator, Optional
 
-from .base import BaseLLMClient, LLMResponse
+from .base import BaseLLMClient, LLMResponse, build_retry_prompt, token_count
+
+if TYPE_CHECKING:
+    from .rate_limit import RateLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -25,8 +28,13 @@ class GeminiClient(BaseLLMClient):
         project_id: Optional[str] = None,
         location: str = "us-central1",
         api_key: str = "",  # Not used — ADC handles auth
+        prompt_cache: bool = False,
+        rate_limiter: Optional["RateLimiter"] = None,
     ):
-        super().__init__(api_key=api_key, model=model, temperature=temperature, max_tokens=max_tokens)
+        super().__init__(
+            api_key=api_key, model=model, temperature=temperature, max_tokens=max_tokens,
+            prompt_cache=prompt_cache, rate_limiter=rate_limiter,
+        )
         self.project_id = project_id
         self.location = location
         self._model_client = None
@@ -83,23 +91,68 @@ class GeminiClient(BaseLLMClient):
             json_mode: Accepted for API compatibility; Gemini support via
                 GenerationConfig.response_mime_type can be added later.
         """
-        from vertexai.generative_models import GenerationConfig
-
         # json_mode accepted for API compatibility; Gemini support via
         # GenerationConfig.response_mime_type can be added later.
 
         model = self._get_model(system_instruction=system_prompt)
+        return self._limited(
+            lambda: self._to_response(model.generate_content(
+                prompt,
+                generation_config=self._generation_config(max_tokens, temperature),
+            )),
+            self._estimate_tokens(prompt, system_prompt, max_tokens),
+        )
 
-        gen_config = GenerationConfig(
-            max_output_tokens=max_tokens if max_tokens is not None else self.max_tokens,
-            temperature=temperature if temperature is not None else self.temperature,
+    def stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> Iterator[str]:
+        """Stream a response from Gemini via Vertex AI."""
+        model = self._get_model(system_instruction=system_prompt)
+        with self._stream_slot(self._estimate_tokens(prompt, system_prompt, max_tokens)):
+            responses = model.generate_content(
+                prompt,
+                generation_config=self._generation_config(max_tokens, temperature),
+                stream=True,
+            )
+            for response in responses:
+                if response.candidates and response.candidates[0].content.parts:
+                    yield response.text
+
+    async def agenerate(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        *,
+        json_mode: bool = False,
+    ) -> LLMResponse:
+        """Generate a response using the Vertex AI async API."""
+        model = self._get_model(system_instruction=system_prompt)
+
+        async def request() -> LLMResponse:
+            return self._to_response(await model.generate_content_async(
+                prompt,
+                generation_config=self._generation_config(max_tokens, temperature),
+            ))
+
+        return await self._alimited(
+            request, self._estimate_tokens(prompt, system_prompt, max_tokens)
         )
 
-        response = model.generate_content(
-            prompt,
-            generation_config=gen_config,
+    def _generation_config(self, max_tokens: Optional[int], temperature: Optional[float]):
+        from vertexai.generative_models import GenerationConfig
+
+        return GenerationConfig(
+            max_output_tokens=max_tokens if max_tokens is not None else self.max_tokens,
+            temperature=temperature if temperature is not None else self.temperature,
         )
 
+    def _to_response(self, response) -> LLMResponse:
         # Extract usage metadata
         usage = {}
         if hasattr(response, "usage_metadata") and response.usage_metadata:
@@ -109,6 +162,12 @@ class GeminiClient(BaseLLMClient):
                 "output_tokens": getattr(um, "candidates_token_count", 0),
                 "total_tokens": getattr(um, "total_token_count", 0),
             }
+            # Gemini 2.5 caches repeated prefixes implicitly
+            cached = token_count(um, "cached_content_token_count")
+            prompt_tokens = token_count(um, "prompt_token_count")
+            if cached is not None and prompt_tokens is not None:
+                usage["cached_input_tokens"] = cached
+                usage["uncached_input_tokens"] = prompt_tokens - cached
 
         # Extract finish reason
         finish_reason = None
@@ -131,15 +190,4 @@ class GeminiClient(BaseLLMClient):
         error_context: Optional[str] = None,
     ) -> LLMResponse:
         """Generate a response with error context for code correction."""
-        if error_context:
-            retry_prompt = f"""{prompt}
-
----
-PREVIOUS ATTEMPT FAILED WITH ERROR:
-{error_context}
-
-Please fix the code to resolve this error. Return ONLY the corrected Python code."""
-        else:
-            retry_prompt = prompt
-
-        return self.generate(retry_prompt, system_prompt)
+        return self.generate(build_retry_prompt(prompt, error_context), system_prompt)
@@ -2,20 +2,25 @@
 OpenAI LLM client implementation.
 """
 
-from typing import Optional
+from typing import TYPE_CHECKING, Iterator, Optional
 
 import openai
 
-from .base import BaseLLMClient, LLMResponse
+from .base import BaseLLMClient, LLMResponse, build_retry_prompt, prompt_cache_key, token_count
+from .connections import get_async_client, http_limits
+
+if TYPE_CHECKING:
+    from .rate_limit import RateLimiter
 
 
 class OpenAIClient(BaseLLMClient):
     """LLM client for OpenAI models."""
 
     def __init__(self, api_key: str, model: str = "gpt-4o",
-                 temperature: float = 0.7, max_tokens: int = 4096):
-        super().__init__(api_key, model, temperature, max_tokens)
-        self.client = openai.OpenAI(api_key=api_key)
+                 temperature: float = 0.7, max_tokens: int = 4096, prompt_cache: bool = False,
+                 rate_limiter: Optional["RateLimiter"] = None):
+        super().__init__(api_key, model, temperature, max_tokens, prompt_cache, rate_limiter)
+        self.client = openai.OpenAI(api_key=api_key, **self._sdk_options())
 
     def generate(self, prompt: str, system_prompt: Optional[str] = None,
                  max_tokens: Optional[int] = None, temperature: Optional[float] = None,
@@ -29,6 +34,61 @@ class OpenAIClient(BaseLLMClient):
             temperature: Override the default temperature if provided
             json_mode: Request structured JSON output via response_format
         """
+        kwargs = self._build_request(prompt, system_prompt, max_tokens, temperature, json_mode)
+        return self._limited(
+            lambda: self._to_response(self.client.chat.completions.create(**kwargs)),
+            self._estimate_tokens(prompt, system_prompt, max_tokens),
+        )
+
+    def stream(self, prompt: str, system_prompt: Optional[str] = None,
+               max_tokens: Optional[int] = None,
+               temperature: Optional[float] = None) -> Iterator[str]:
+        """Stream a response from OpenAI; closing the iterator ends the request."""
+        kwargs = self._build_request(prompt, system_prompt, max_tokens, temperature, False)
+        with self._stream_slot(self._estimate_tokens(prompt, system_prompt, max_tokens)):
+            client = self._stream_client(self.client)
+            stream = client.chat.completions.create(stream=True, **kwargs)
+            try:
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                stream.close()
+
+    async def agenerate(self, prompt: str, system_prompt: Optional[str] = None,
+                        max_tokens: Optional[int] = None, temperature: Optional[float] = None,
+                        *, json_mode: bool = False) -> LLMResponse:
+        """Generate a response using the shared async OpenAI client."""
+        kwargs = self._build_request(prompt, system_prompt, max_tokens, temperature, json_mode)
+        client = self.async_client
+
+        async def request() -> LLMResponse:
+            return self._to_response(await client.chat.completions.create(**kwargs))
+
+        return await self._alimited(
+            request, self._estimate_tokens(prompt, system_prompt, max_tokens)
+        )
+
+    @property
+    def async_client(self) -> "openai.AsyncOpenAI":
+        """The process-wide async client for this API key."""
+        options = self._sdk_options()
+        return get_async_client(
+            "openai",
+            self.api_key,
+            lambda: openai.AsyncOpenAI(
+                api_key=self.api_key,
+                http_client=openai.DefaultAsyncHttpxClient(limits=http_limits()),
+                **options,
+            ),
+            max_retries=options.get("max_retries"),
+        )
+
+    def _build_request(self, prompt: str, system_prompt: Optional[str],
+                       max_tokens: Optional[int], temperature: Optional[float],
+                       json_mode: bool) -> dict:
+        # The static system prompt always comes first so OpenAI's automatic
+        # prefix caching can match it across calls
         messages = []
 
         if system_prompt:
@@ -46,20 +106,37 @@ class OpenAIClient(BaseLLMClient):
         if json_mode:
             kwargs["response_format"] = {"type": "json_object"}
 
-        response = self.client.chat.completions.create(**kwargs)
+        if self.prompt_cache and system_prompt:
+            # Route requests sharing a system prompt to the same cache shard
+            kwargs["extra_body"] = {"prompt_cache_key": prompt_cache_key(system_prompt)}
 
+        return kwargs
+
+    def _to_response(self, response) -> LLMResponse:
         choice = response.choices[0]
+        usage = {
+            "prompt_tokens": response.usage.prompt_tokens,
+            "completion_tokens": response.usage.completion_tokens,
+            "total_tokens": response.usage.total_tokens,
+        }
+        details = getattr(response.usage, "prompt_tokens_details", None)
+        cached = token_count(details, "cached_tokens")
+        prompt_tokens = token_count(response.usage, "prompt_tokens")
+        if cached is not None and prompt_tokens is not None:
+            usage["cached_input_tokens"] = cached
+            usage["uncached_input_tokens"] = prompt_tokens - cached
+
         return LLMResponse(
             content=choice.message.content,
             model=response.model,
-            usage={
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.total_tokens,
-            },
+            usage=usage,
             finish_reason=choice.finish_reason,
         )
 
+    def close(self) -> None:
+        """Close the synchronous SDK client's connection pool."""
+        self.client.close()
+
     def generate_with_retry(
         self,
         prompt: str,
@@ -67,15 +144,4 @@ class OpenAIClient(BaseLLMClient):
         error_context: Optional[str] = None
     ) -> LLMResponse:
         """Generate a response with error context for code correction."""
-        if error_context:
-            retry_prompt = f"""{prompt}
-
----
-PREVIOUS ATTEMPT FAILED WITH ERROR:
-{error_context}
-
-Please fix the code to resolve this error. Return ONLY the corrected Python code."""
-        else:
-            retry_prompt = prompt
-
-        return self.generate(retry_prompt, system_prompt)
+        return self.generate(build_retry_prompt(prompt, error_context), system_prompt)
@@ -0,0 +1,439 @@
+"""
+Adaptive rate limiting for LLM providers.
+
+One RateLimiter is shared by every client talking to the same provider and
+model. It enforces request and token budgets with token buckets, caps the
+number of in-flight requests, and adapts that cap with AIMD: each success
+adds to the concurrency limit, and each 429/529 overload response halves it
+and pauses new requests for the provider's Retry-After (or an exponential
+backoff when none is given). Transient failures the provider SDKs would
+retry themselves (5xx, 408, 409, connection errors and timeouts) are
+retried with backoff too, without touching the concurrency cap.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# HTTP statuses that mean "slow down": rate limited / overloaded
+OVERLOAD_STATUS_CODES = (429, 529)
+
+# Other HTTP statuses worth retrying: timeouts, conflicts and server errors
+TRANSIENT_STATUS_CODES = (408, 409)
+
+# SDK/httpx exception classes for failed connections and timeouts; matched
+# by name so neither SDK has to be installed
+_TRANSIENT_ERROR_NAMES = frozenset({
+    "APIConnectionError", "APITimeoutError", "TransportError", "TimeoutException",
+})
+
+# Longest single sleep while waiting for a free slot, so limit changes
+# (e.g. additive increase after a success) are picked up promptly
+_MAX_POLL_SECONDS = 0.05
+
+
+def is_overload_error(exc: BaseException) -> bool:
+    """Return True for provider rate-limit / overload errors."""
+    # Anthropic/OpenAI SDK errors carry status_code; google.api_core errors
+    # (Vertex AI) carry an HTTPStatus in .code
+    for status in (
+        getattr(exc, "status_code", None),
+        getattr(getattr(exc, "response", None), "status_code", None),
+        getattr(exc, "code", None),
+    ):
+        if isinstance(status, int) and status in OVERLOAD_STATUS_CODES:
+            return True
+    return False
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """Return True for server errors, timeouts and dropped connections."""
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    if any(cls.__name__ in _TRANSIENT_ERROR_NAMES for cls in type(exc).__mro__):
+        return True
+    for status in (
+        getattr(exc, "status_code", None),
+        getattr(getattr(exc, "response", None), "status_code", None),
+        getattr(exc, "code", None),
+    ):
+        if isinstance(status, int) and (
+            status in TRANSIENT_STATUS_CODES
+            or (status >= 500 and status not in OVERLOAD_STATUS_CODES)
+        ):
+            return True
+    return False
+
+
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Read the Retry-After header (in seconds) from a provider error, if any."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return float(value) / 1000.0
+        except (TypeError, ValueError):
+            pass
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Token bucket refilled continuously up to ``capacity`` per minute."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` tokens are available (0 if available now)."""
+        self._refill(now)
+        # Requests larger than the bucket are admitted once it is full
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+    def give(self, amount: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """
+    Request/token budgets plus an adaptive concurrency cap for one provider model.
+
+    Use ``call``/``acall`` to run a request with limits and overload retries,
+    or ``slot``/``aslot`` to hold a slot for a streaming request.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        min_concurrency: int = 1,
+        max_retries: int = 5,
+        max_backoff: float = 60.0,
+        name: str = "llm",
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            requests_per_minute: Request budget (None or 0 for unlimited)
+            tokens_per_minute: Token budget, counting prompt estimate plus
+                max_tokens up front and refunding the unused part afterwards
+                (None or 0 for unlimited)
+            max_concurrency: Upper bound for in-flight requests (None for unbounded)
+            min_concurrency: Lower bound the AIMD decrease never goes below
+            max_retries: Retries after overload or transient errors before
+                giving up
+            max_backoff: Longest pause after an overload response, in seconds
+            name: Label used in log messages
+        """
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_retries = max_retries
+        self.max_backoff = max_backoff
+        self.name = name
+
+        # Start at the ceiling; overloads back off from there
+        self.concurrency_limit = float(max_concurrency) if max_concurrency else None
+        self.in_flight = 0
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+        self.overloads = 0
+        self.transient_errors = 0
+        self.completed = 0
+
+    # ------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------
+
+    def _try_acquire(self, estimated_tokens: int) -> float:
+        """Take a slot if possible; otherwise return how long to wait."""
+        with self._lock:
+            now = time.monotonic()
+            waits = [self._blocked_until - now]
+            if self.concurrency_limit is not None and self.in_flight >= int(self.concurrency_limit):
+                waits.append(_MAX_POLL_SECONDS)
+            if self.requests is not None:
+                waits.append(self.requests.wait_time(1, now))
+            if self.tokens is not None and estimated_tokens:
+                waits.append(self.tokens.wait_time(estimated_tokens, now))
+
+            wait = max(waits)
+            if wait > 0:
+                return wait
+
+            self.in_flight += 1
+            if self.requests is not None:
+                self.requests.take(1)
+            if self.tokens is not None and estimated_tokens:
+                self.tokens.take(estimated_tokens)
+            return 0.0
+
+    def _release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    @contextmanager
+    def slot(self, estimated_tokens: int = 0):
+        """Block until a request may start, and hold its slot until exit."""
+        while True:
+            wait = self._try_acquire(estimated_tokens)
+            if wait <= 0:
+                break
+            time.sleep(min(wait, 1.0))
+        try:
+            yield
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def aslot(self, estimated_tokens: int = 0):
+        """Async variant of slot(); waits without blocking the event loop."""
+        while True:
+            wait = self._try_acquire(estimated_tokens)
+            if wait <= 0:
+                break
+            await asyncio.sleep(min(wait, 1.0))
+        try:
+            yield
+        finally:
+            self._release()
+
+    # ------------------------------------------------------------------
+    # Feedback
+    # ------------------------------------------------------------------
+
+    def record_success(self, estimated_tokens: int = 0, used_tokens: Optional[int] = None) -> None:
+        """Additively raise the concurrency cap and refund unused token budget."""
+        with self._lock:
+            self.completed += 1
+            if self.concurrency_limit is not None:
+                # +1 per "window" of successes, i.e. 1/limit per success
+                self.concurrency_limit = min(
+                    float(self.max_concurrency),
+                    self.concurrency_limit + 1.0 / max(self.concurrency_limit, 1.0),
+                )
+            if self.tokens is not None and used_tokens is not None and estimated_tokens > used_tokens:
+                self.tokens.give(estimated_tokens - used_tokens)
+
+    def record_overload(self, retry_after: Optional[float] = None, attempt: int = 0) -> float:
+        """
+        Halve the concurrency cap and pause new requests after an overload.
+
+        Args:
+            retry_after: Provider-requested delay in seconds, if any
+            attempt: Zero-based retry attempt, for exponential backoff
+
+        Returns:
+            The pause applied, in seconds
+        """
+        if retry_after is None:
+            delay = min(self.max_backoff, (2 ** attempt) * (1.0 + random.random()))
+        else:
+            delay = min(self.max_backoff, retry_after)
+
+        with self._lock:
+            self.overloads += 1
+            if self.concurrency_limit is not None:
+                self.concurrency_limit = max(float(self.min_concurrency), self.concurrency_limit / 2)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            limit = self.concurrency_limit
+
+        logger.warning(
+            f"{self.name}: provider overloaded; pausing {delay:.1f}s"
+            + (f", concurrency limit now {int(limit)}" if limit is not None else "")
+        )
+        return delay
+
+    def record_transient_error(
+        self, retry_after: Optional[float] = None, attempt: int = 0
+    ) -> float:
+        """
+        Count a transient failure and pick the backoff before its retry.
+
+        Unlike an overload this says nothing about capacity, so the
+        concurrency cap and other requests are left alone.
+
+        Args:
+            retry_after: Provider-requested delay in seconds, if any
+            attempt: Zero-based retry attempt, for exponential backoff
+
+        Returns:
+            Seconds the failed request should wait before retrying
+        """
+        if retry_after is None:
+            delay = min(self.max_backoff, 0.5 * (2 ** attempt) * (1.0 + random.random()))
+        else:
+            delay = min(self.max_backoff, retry_after)
+        with self._lock:
+            self.transient_errors += 1
+        logger.warning(f"{self.name}: transient provider error; retrying in {delay:.1f}s")
+        return delay
+
+    def _record_failure(self, exc: BaseException, attempt: int) -> float:
+        """Record a retryable failure; returns the request's own wait."""
+        if is_overload_error(exc):
+            # Admission waits out the pause for every request, this one too
+            self.record_overload(retry_after_seconds(exc), attempt)
+            return 0.0
+        return self.record_transient_error(retry_after_seconds(exc), attempt)
+
+    @staticmethod
+    def _is_retryable(exc: BaseException) -> bool:
+        return is_overload_error(exc) or is_transient_error(exc)
+
+    # ------------------------------------------------------------------
+    # Request wrappers
+    # ------------------------------------------------------------------
+
+    def call(
+        self,
+        request: Callable[[], T],
+        estimated_tokens: int = 0,
+        count_tokens: Optional[Callable[[T], Optional[int]]] = None,
+    ) -> T:
+        """
+        Run ``request`` within the limits, retrying overloads and transient errors.
+
+        Args:
+            request: Zero-argument callable performing the provider call
+            estimated_tokens: Tokens to reserve against the token budget
+            count_tokens: Optional callable returning the tokens actually used
+
+        Returns:
+            The request's result
+        """
+        attempt = 0
+        while True:
+            pause = None
+            with self.slot(estimated_tokens):
+                try:
+                    result = request()
+                except Exception as exc:
+                    if attempt >= self.max_retries or not self._is_retryable(exc):
+                        raise
+                    pause = self._record_failure(exc, attempt)
+                    attempt += 1
+            if pause is None:
+                self.record_success(
+                    estimated_tokens, count_tokens(result) if count_tokens else None
+                )
+                return result
+            # Back off outside the slot so other requests can use it
+            time.sleep(pause)
+
+    async def acall(
+        self,
+        request: Callable[[], Awaitable[T]],
+        estimated_tokens: int = 0,
+        count_tokens: Optional[Callable[[T], Optional[int]]] = None,
+    ) -> T:
+        """Async variant of call(); ``request`` returns an awaitable."""
+        attempt = 0
+        while True:
+            pause = None
+            async with self.aslot(estimated_tokens):
+                try:
+                    result = await request()
+                except Exception as exc:
+                    if attempt >= self.max_retries or not self._is_retryable(exc):
+                        raise
+                    pause = self._record_failure(exc, attempt)
+                    attempt += 1
+            if pause is None:
+                self.record_success(
+                    estimated_tokens, count_tokens(result) if count_tokens else None
+                )
+                return result
+            await asyncio.sleep(pause)
+
+    def stats(self) -> dict:
+        """Return current limits and counters."""
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "concurrency_limit": (
+                    int(self.concurrency_limit) if self.concurrency_limit is not None else None
+                ),
+                "completed": self.completed,
+                "overloads": self.overloads,
+                "transient_errors": self.transient_errors,
+            }
+
+
+_limiters: Dict[Tuple[str, str], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(
+    provider: str,
+    model: str,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+    max_concurrency: Optional[int] = None,
+) -> RateLimiter:
+    """
+    Return the process-wide limiter for a provider and model.
+
+    The settings of the first call win; later calls share the same limiter.
+    """
+    key = (provider, model)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter(
+                requests_per_minute=requests_per_minute,
+                tokens_per_minute=tokens_per_minute,
+                max_concurrency=max_concurrency,
+                name=f"{provider}/{model}",
+            )
+            _limiters[key] = limiter
+    return limiter
+
+
+def reset_rate_limiters() -> None:
+    """Forget all shared limiters (mainly for tests)."""
+    with _limiters_lock:
+        _limiters.clear()
+
+
+def used_tokens(response: Any) -> Optional[int]:
+    """Total tokens reported in an LLMResponse's usage, if known."""
+    usage = getattr(response, "usage", None) or {}
+    if isinstance(usage.get("total_tokens"), int):
+        return usage["total_tokens"]
+    parts = [
+        usage.get(name) for name in
+        ("input_tokens", "output_tokens", "prompt_tokens", "completion_tokens")
+    ]
+    counts = [p for p in parts if isinstance(p, int)]
+    return sum(counts) if counts else None
@@ -1,5 +1,20 @@
 """Manim renderer module."""
 
+from .blob_store import BlobStore, create_blob_store
 from .manim_renderer import ManimRenderer
+from .media_cache import MediaCache, create_media_cache
+from .render_cache import RenderCache, create_render_cache
+from .worker_pool import ManimWorkerPool, create_worker_pool, shutdown_worker_pool
 
-__all__ = ["ManimRenderer"]
+__all__ = [
+    "ManimRenderer",
+    "RenderCache",
+    "create_render_cache",
+    "MediaCache",
+    "create_media_cache",
+    "BlobStore",
+    "create_blob_store",
+    "ManimWorkerPool",
+    "create_worker_pool",
+    "shutdown_worker_pool",
+]
@@ -0,0 +1,198 @@
+"""
+Content-addressed store for rendered videos.
+
+Every finished video is stored once under the SHA-256 of its bytes; named
+outputs in the engine, playground and lab output directories are hardlinks
+into the store (copies across filesystems). Identical renders of the same
+code at the same quality therefore take the disk space of one file, and
+whether a render is already stored is a single stat of its hash path.
+
+Blobs no longer linked from any output and not referenced by the video
+database are removed by gc().
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..config import Config
+
+logger = logging.getLogger(__name__)
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def hash_file(path: Path) -> str:
+    """Return the hex SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BlobStore:
+    """Videos stored once per content hash, linked into output directories."""
+
+    def __init__(self, root: Path):
+        """
+        Initialize the blob store.
+
+        Args:
+            root: Directory holding the blobs, sharded by the first two hex
+                digits of their hash. Keep it on the same filesystem as the
+                output directories so outputs can be hardlinks.
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        self.stored = 0
+        self.deduplicated = 0
+        self._lock = threading.Lock()
+
+    def blob_path(self, digest: str, suffix: str = "") -> Path:
+        """Path a blob with this hash and file suffix (".mp4") is stored at."""
+        return self.root / digest[:2] / f"{digest}{suffix}"
+
+    def contains(self, digest: str, suffix: str = "") -> bool:
+        """Return True if a blob is stored."""
+        return self.blob_path(digest, suffix).exists()
+
+    def put(self, source: Path, move: bool = False) -> Tuple[str, Path]:
+        """
+        Store a file, or reuse the stored copy of identical content.
+
+        Args:
+            source: File to store
+            move: Move ``source`` into the store instead of linking it; the
+                source is removed either way once its content is stored
+
+        Returns:
+            The content hash and the blob path
+        """
+        source = Path(source)
+        digest = hash_file(source)
+        path = self.blob_path(digest, source.suffix)
+
+        if path.exists():
+            os.utime(path)
+            with self._lock:
+                self.deduplicated += 1
+            if move:
+                source.unlink(missing_ok=True)
+            return digest, path
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        if move:
+            shutil.move(str(source), str(tmp))
+        else:
+            try:
+                os.link(source, tmp)
+            except OSError:
+                shutil.copy2(source, tmp)
+        # A concurrent put of the same content replaces it with equal bytes
+        os.replace(tmp, path)
+        with self._lock:
+            self.stored += 1
+        return digest, path
+
+    @staticmethod
+    def link(blob: Path, dest: Path) -> None:
+        """
+        Point ``dest`` at a blob, replacing whatever ``dest`` was.
+
+        Uses a hardlink, or a copy when the blob is on another filesystem.
+        Never a symlink: gc() only sees outputs through the blob's link
+        count, and playground and lab outputs are not in the database, so
+        a symlinked output would dangle once its blob is collected.
+        """
+        tmp = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            os.link(blob, tmp)
+        except OSError:
+            shutil.copy2(blob, tmp)
+        os.replace(tmp, dest)
+
+    @staticmethod
+    def is_linked(dest: Path, blob: Path) -> bool:
+        """Return True if ``dest`` already holds ``blob``, as a link or a copy."""
+        try:
+            if os.path.samefile(dest, blob):
+                return True
+            if os.path.getsize(dest) != os.path.getsize(blob):
+                return False
+            return hash_file(dest) == blob.name.split(".")[0]
+        except OSError:
+            return False
+
+    def gc(
+        self,
+        referenced: Iterable[str] = (),
+        grace_seconds: float = 3600.0,
+    ) -> int:
+        """
+        Remove blobs nothing refers to any more.
+
+        A blob is kept while another hardlink to it exists (a named output),
+        while its hash is in ``referenced`` (e.g. from
+        VideoStorage.referenced_content_hashes()), or while it was used
+        within ``grace_seconds``. Outputs copied across filesystems do not
+        depend on their blob.
+
+        Returns:
+            Number of blobs removed
+        """
+        keep = set(referenced)
+        now = time.time()
+        removed = 0
+        for path in self.root.glob("??/*"):
+            if path.name.startswith("."):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if stat.st_nlink > 1 or path.name.split(".")[0] in keep:
+                continue
+            if now - stat.st_mtime < grace_seconds:
+                continue
+            path.unlink(missing_ok=True)
+            removed += 1
+        if removed:
+            logger.info(f"Blob store removed {removed} unreferenced blobs")
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        """Return blob counts, stored bytes and deduplicated puts."""
+        blobs = [p for p in self.root.glob("??/*") if not p.name.startswith(".")]
+        with self._lock:
+            stored, deduplicated = self.stored, self.deduplicated
+        return {
+            "blobs": len(blobs),
+            "size_bytes": sum(p.stat().st_size for p in blobs if p.exists()),
+            "stored": stored,
+            "deduplicated": deduplicated,
+        }
+
+
+def create_blob_store(config: "Config") -> Optional[BlobStore]:
+    """
+    Create a blob store from configuration.
+
+    Args:
+        config: Configuration object with blob store settings
+
+    Returns:
+        BlobStore instance, or None when the blob store is disabled
+    """
+    if not config.blob_store_enabled:
+        return None
+    return BlobStore(config.blob_store_dir)
@@ -7,14 +7,27 @@ import os
 import shutil
 import subprocess
 import tempfile
+import threading
+import time
+import uuid
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
 
 from ..config import VideoQuality
+from .render_cache import RenderCache, link_or_copy
+
+if TYPE_CHECKING:
+    from .blob_store import BlobStore
+    from .media_cache import MediaCache
+    from .worker_pool import ManimWorkerPool
 
 logger = logging.getLogger(__name__)
 
+# Error for a render that exits cleanly without writing a video, which
+# Manim does for scenes that never play or wait
+NO_OUTPUT_ERROR = "Render produced no video file; the scene may not play any animation"
+
 
 @dataclass
 class RenderResult:
@@ -25,6 +38,15 @@ class RenderResult:
     stdout: str = ""
     stderr: str = ""
     render_time: float = 0.0
+    cached: bool = False
+    cancelled: bool = False
+    content_hash: Optional[str] = None  # SHA-256 of the video, with a blob store
+    tex_hits: int = 0  # LaTeX/text SVGs reused from the cache (worker pool only)
+    tex_misses: int = 0  # LaTeX/text SVGs created by the render (worker pool only)
+
+
+class RenderCancelled(Exception):
+    """Raised internally when a render is cancelled via its cancel event."""
 
 
 class ManimRenderer:
@@ -40,12 +62,39 @@ class ManimRenderer:
         VideoQuality.FOURK: "-qk",
     }
 
+    # Resolution subfolder Manim writes each quality preset to
+    QUALITY_DIRS = {
+        VideoQuality.LOW: "480p15",
+        VideoQuality.MEDIUM: "720p30",
+        VideoQuality.HIGH: "1080p60",
+        VideoQuality.PRODUCTION: "1440p60",
+        VideoQuality.FOURK: "2160p60",
+    }
+
+    # Name of the scene script inside each job directory
+    SCRIPT_NAME = "scene"
+
+    # Seconds before a manim subprocess is abandoned
+    RENDER_TIMEOUT = 300
+
+    # How often a cancellable render checks its cancel event
+    CANCEL_POLL_SECONDS = 0.2
+
+    # Partial movie files Manim may keep per scene and quality. Each play()
+    # call is cached under a hash of the animation and scene state, so a
+    # re-render after a small fix only recomputes the animations it changed.
+    MAX_PARTIAL_MOVIE_FILES = 1000
+
     def __init__(
         self,
         output_dir: Path,
         cache_dir: Path,
         quality: VideoQuality = VideoQuality.MEDIUM,
         output_format: str = "mp4",
+        render_cache: Optional[RenderCache] = None,
+        worker_pool: Optional["ManimWorkerPool"] = None,
+        media_cache: Optional["MediaCache"] = None,
+        blob_store: Optional["BlobStore"] = None,
     ):
         """
         Initialize the renderer.
@@ -55,11 +104,26 @@ class ManimRenderer:
             cache_dir: Directory for Manim cache
             quality: Video quality preset
             output_format: Output format (mp4 or gif)
+            render_cache: Optional cache of finished renders keyed on code,
+                scene name, quality and format
+            worker_pool: Optional pool of warm render workers; when omitted
+                each render spawns a ``manim`` subprocess
+            media_cache: Optional size- and age-bounded manager of the
+                partial movie, TeX and output caches
+            blob_store: Optional content-addressed store; outputs become
+                links to one stored copy per distinct video
         """
         self.output_dir = Path(output_dir)
         self.cache_dir = Path(cache_dir)
         self.quality = quality
         self.output_format = output_format
+        self.render_cache = render_cache
+        self.worker_pool = worker_pool
+        self.media_cache = media_cache
+        self.blob_store = blob_store
+
+        self._partial_locks: Dict[Path, threading.Lock] = {}
+        self._partial_locks_guard = threading.Lock()
 
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
@@ -69,6 +133,7 @@ class ManimRenderer:
         code: str,
         scene_name: str,
         output_filename: Optional[str] = None,
+        cancel_event: Optional[threading.Event] = None,
     ) -> RenderResult:
         """
         Render Manim code to a video file.
@@ -77,43 +142,235 @@ class ManimRenderer:
             code: Python code containing the Manim scene
             scene_name: Name of the Scene class to render
             output_filename: Optional custom output filename
+            cancel_event: Optional event; setting it kills the render, which
+                then returns a failed result with ``cancelled=True``
 
         Returns:
             RenderResult with success status and output path
         """
-        import time
         start_time = time.time()
 
-        # Create temporary file for the code
-        with tempfile.NamedTemporaryFile(
-            mode='w',
-            suffix='.py',
-            delete=False,
-            dir=self.cache_dir,
-        ) as f:
-            f.write(code)
-            temp_file = Path(f.name)
+        cache_key = None
+        if self.render_cache is not None:
+            cache_key = self.render_cache.make_key(
+                code, scene_name, self.quality.value, self.output_format
+            )
+            cached_path = self.render_cache.get(cache_key, self.output_format)
+            if cached_path is not None:
+                try:
+                    final_path, content_hash = self._publish_output(
+                        cached_path, output_filename, keep_source=True
+                    )
+                except FileNotFoundError:
+                    # Evicted by another render between get() and the link
+                    logger.info(f"Cached render for {scene_name} was evicted; rendering")
+                else:
+                    logger.info(f"Render cache hit for {scene_name}: {final_path}")
+                    return RenderResult(
+                        success=True,
+                        output_path=final_path,
+                        render_time=time.time() - start_time,
+                        cached=True,
+                        content_hash=content_hash,
+                    )
+
+        # Each render gets its own media directory so concurrent renders of
+        # identically named scenes never see each other's output
+        job_dir = self._create_job_dir()
+        script_path = job_dir / f"{self.SCRIPT_NAME}.py"
+        script_path.write_text(code)
+        partial_dir = self._claim_partial_movie_dir(scene_name)
+        if partial_dir is not None and self.media_cache is not None:
+            self.media_cache.hold(partial_dir)
 
         try:
-            result = self._run_manim(temp_file, scene_name)
+            if self.worker_pool is not None:
+                result = self.worker_pool.render(
+                    script_path,
+                    scene_name,
+                    media_dir=job_dir,
+                    quality=self.quality,
+                    output_format=self.output_format,
+                    extra_config=self._shared_cache_config(partial_dir),
+                    cancel_event=cancel_event,
+                )
+            elif partial_dir is not None:
+                result = self._run_manim(
+                    script_path, scene_name, cancel_event, partial_movie_dir=partial_dir
+                )
+            else:
+                result = self._run_manim(script_path, scene_name, cancel_event)
             render_time = time.time() - start_time
             result.render_time = render_time
+            if self.media_cache is not None:
+                self.media_cache.record_render(
+                    f"{result.stdout}\n{result.stderr}",
+                    partial_dir,
+                    tex_hits=result.tex_hits,
+                    tex_misses=result.tex_misses,
+                )
+
+            if result.success and result.output_path is None:
+                result.success = False
+                result.error_message = NO_OUTPUT_ERROR
 
             # Move output to final location
             if result.success and result.output_path:
-                final_path = self._move_to_output(result.output_path, output_filename)
-                result.output_path = final_path
+                if cache_key is not None:
+                    self.render_cache.put(cache_key, result.output_path, self.output_format)
+                result.output_path, result.content_hash = self._publish_output(
+                    result.output_path, output_filename
+                )
 
             return result
 
         finally:
-            # Cleanup temp file
-            if temp_file.exists():
-                temp_file.unlink()
+            if partial_dir is not None:
+                if self.media_cache is not None:
+                    self.media_cache.release(partial_dir)
+                self._partial_locks[partial_dir].release()
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+    def smoke_test(
+        self,
+        code: str,
+        scene_name: str,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> RenderResult:
+        """
+        Quickly check that a scene runs, without rendering video.
+
+        Executes ``construct()`` with Manim's dry-run mode at the lowest
+        quality, so exceptions surface in seconds rather than partway
+        through a full-quality render.
+
+        Args:
+            code: Python code containing the Manim scene
+            scene_name: Name of the Scene class to check
+            cancel_event: Optional event; setting it kills the check
+
+        Returns:
+            RenderResult with success status; output_path is always None
+        """
+        start_time = time.time()
+        job_dir = self._create_job_dir()
+        script_path = job_dir / f"{self.SCRIPT_NAME}.py"
+        script_path.write_text(code)
+
+        try:
+            if self.worker_pool is not None:
+                result = self.worker_pool.render(
+                    script_path,
+                    scene_name,
+                    media_dir=job_dir,
+                    quality=VideoQuality.LOW,
+                    output_format=self.output_format,
+                    extra_config={**self._shared_cache_config(), "dry_run": True},
+                    cancel_event=cancel_event,
+                )
+            else:
+                result = self._run_manim(script_path, scene_name, cancel_event, dry_run=True)
+            result.output_path = None
+            result.render_time = time.time() - start_time
+            return result
+        finally:
+            shutil.rmtree(job_dir, ignore_errors=True)
 
-    def _run_manim(self, script_path: Path, scene_name: str) -> RenderResult:
-        """Run manim command on the script."""
-        quality_flag = self.QUALITY_FLAGS.get(self.quality, "-qm")
+    def is_cached(self, code: str, scene_name: str) -> bool:
+        """Return True if the render cache already holds this render."""
+        if self.render_cache is None:
+            return False
+        key = self.render_cache.make_key(code, scene_name, self.quality.value, self.output_format)
+        return self.render_cache.contains(key, self.output_format)
+
+    def rename_output(self, output_path: Path, output_filename: str) -> Path:
+        """
+        Move a finished output to a new name in the output directory.
+
+        Used to publish a render made under a provisional name, such as a
+        speculative candidate's.
+
+        Args:
+            output_path: Output file returned by render()
+            output_filename: Requested filename, with or without extension
+
+        Returns:
+            The new output path
+        """
+        dest_path = self._output_name(output_path, output_filename)
+        if dest_path == output_path:
+            return output_path
+        dest_path = self._claim_output(dest_path)
+        os.replace(output_path, dest_path)
+        return dest_path
+
+    def _create_job_dir(self) -> Path:
+        """Create an isolated Manim media directory for one render."""
+        jobs_dir = self.cache_dir / "jobs"
+        jobs_dir.mkdir(parents=True, exist_ok=True)
+        return Path(tempfile.mkdtemp(prefix="job_", dir=jobs_dir))
+
+    def _claim_partial_movie_dir(self, scene_name: str) -> Optional[Path]:
+        """Lock the persistent partial movie directory of a scene.
+
+        Re-renders of a scene reuse the partial movie files of earlier
+        renders. Returns None if another render of the same scene holds the
+        directory; that render then keeps its partial movies in its own job
+        directory instead of waiting.
+        """
+        partial_dir = (
+            self.cache_dir / "partial_movie_files" / self.QUALITY_DIRS[self.quality] / scene_name
+        ).resolve()
+        with self._partial_locks_guard:
+            lock = self._partial_locks.setdefault(partial_dir, threading.Lock())
+        if not lock.acquire(blocking=False):
+            return None
+        partial_dir.mkdir(parents=True, exist_ok=True)
+        # Mark the scene as recently used for media cache eviction
+        os.utime(partial_dir)
+        return partial_dir
+
+    def _shared_cache_config(self, partial_movie_dir: Optional[Path] = None) -> dict:
+        """Manim config keeping LaTeX, text and partial movie caches shared across jobs."""
+        config = {
+            "tex_dir": str((self.cache_dir / "Tex").resolve()),
+            "text_dir": str((self.cache_dir / "texts").resolve()),
+        }
+        if partial_movie_dir is not None:
+            config["partial_movie_dir"] = str(partial_movie_dir)
+            config["max_files_cached"] = self.MAX_PARTIAL_MOVIE_FILES
+        return config
+
+    def _write_job_config(self, job_dir: Path, partial_movie_dir: Optional[Path] = None) -> Path:
+        """Write a manim.cfg for a job pointing at the shared caches."""
+        config_path = job_dir / "manim.cfg"
+        lines = ["[CLI]"]
+        lines += [
+            f"{key} = {value}"
+            for key, value in self._shared_cache_config(partial_movie_dir).items()
+        ]
+        config_path.write_text("\n".join(lines) + "\n")
+        return config_path
+
+    def _run_manim(
+        self,
+        script_path: Path,
+        scene_name: str,
+        cancel_event: Optional[threading.Event] = None,
+        dry_run: bool = False,
+        partial_movie_dir: Optional[Path] = None,
+    ) -> RenderResult:
+        """Run manim command on the script.
+
+        The script's directory is used as the job's media directory. With
+        ``dry_run`` the scene runs at the lowest quality without writing
+        any video. ``partial_movie_dir`` keeps per-animation movie files
+        outside the job so later renders of the scene can reuse them.
+        """
+        quality = VideoQuality.LOW if dry_run else self.quality
+        quality_flag = self.QUALITY_FLAGS.get(quality, "-qm")
+        media_dir = script_path.parent
+        config_path = self._write_job_config(media_dir, partial_movie_dir)
 
         # Build command
         cmd = [
@@ -121,25 +378,25 @@ class ManimRenderer:
             quality_flag,
             str(script_path),
             scene_name,
-            "--media_dir", str(self.cache_dir),
+            "--media_dir", str(media_dir),
+            "--config_file", str(config_path),
         ]
 
+        if dry_run:
+            cmd.append("--dry_run")
         # Add format flag for GIF
-        if self.output_format == "gif":
+        elif self.output_format == "gif":
             cmd.append("--format=gif")
 
         logger.info(f"Running: {' '.join(cmd)}")
 
         try:
-            process = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300,  # 5 minute timeout
-            )
+            process = self._execute(cmd, cancel_event)
 
             if process.returncode == 0:
-                output_path = self._find_output_file(scene_name)
+                output_path = None
+                if not dry_run:
+                    output_path = self._find_output_file(media_dir, script_path, scene_name)
                 return RenderResult(
                     success=True,
                     output_path=output_path,
@@ -162,6 +419,13 @@ class ManimRenderer:
                 output_path=None,
                 error_message="Rendering timed out after 5 minutes",
             )
+        except RenderCancelled:
+            return RenderResult(
+                success=False,
+                output_path=None,
+                error_message="Render cancelled",
+                cancelled=True,
+            )
         except FileNotFoundError:
             return RenderResult(
                 success=False,
@@ -175,47 +439,156 @@ class ManimRenderer:
                 error_message=f"Unexpected error: {str(e)}",
             )
 
-    def _find_output_file(self, scene_name: str) -> Optional[Path]:
-        """Find the output file in the media directory."""
-        media_dir = self.cache_dir / "videos"
+    def _execute(
+        self,
+        cmd: list,
+        cancel_event: Optional[threading.Event],
+    ) -> subprocess.CompletedProcess:
+        """Run a manim command, killing it if ``cancel_event`` is set.
+
+        Raises:
+            subprocess.TimeoutExpired: If the render exceeds RENDER_TIMEOUT
+            RenderCancelled: If the cancel event was set
+        """
+        if cancel_event is None:
+            return subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                timeout=self.RENDER_TIMEOUT,
+            )
 
-        if not media_dir.exists():
-            return None
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        deadline = time.monotonic() + self.RENDER_TIMEOUT
+        while True:
+            try:
+                stdout, stderr = process.communicate(timeout=self.CANCEL_POLL_SECONDS)
+                return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+            except subprocess.TimeoutExpired:
+                if cancel_event.is_set():
+                    process.kill()
+                    process.communicate()
+                    raise RenderCancelled()
+                if time.monotonic() > deadline:
+                    process.kill()
+                    process.communicate()
+                    raise
+
+    def _find_output_file(
+        self,
+        media_dir: Path,
+        script_path: Path,
+        scene_name: str,
+    ) -> Optional[Path]:
+        """Find the output file in a job's media directory.
 
-        # Search for the output file
+        Manim writes to ``videos/<script stem>/<resolution>/<scene>.<ext>``,
+        so the path is resolved directly; the glob fallback only ever scans
+        this job's directory.
+        """
         extension = "gif" if self.output_format == "gif" else "mp4"
-        pattern = f"**/{scene_name}.{extension}"
+        videos_dir = media_dir / "videos"
+
+        expected = (
+            videos_dir
+            / script_path.stem
+            / self.QUALITY_DIRS.get(self.quality, "720p30")
+            / f"{scene_name}.{extension}"
+        )
+        if expected.exists():
+            return expected
+
+        if not videos_dir.exists():
+            return None
 
-        matches = list(media_dir.glob(pattern))
+        matches = list(videos_dir.glob(f"**/{scene_name}.{extension}"))
         if matches:
-            # Return the most recent
-            return max(matches, key=lambda p: p.stat().st_mtime)
+            return matches[0]
 
         return None
 
-    def _move_to_output(
+    def _publish_output(
         self,
         source_path: Path,
-        output_filename: Optional[str]
-    ) -> Path:
-        """Move rendered file to output directory."""
+        output_filename: Optional[str],
+        keep_source: bool = False,
+    ) -> Tuple[Path, Optional[str]]:
+        """Place a rendered file in the output directory.
+
+        Without a blob store this is _move_to_output(). With one, the file
+        is stored by content hash and the output is a link to the blob; an
+        output name already linked to identical content is reused instead
+        of claiming a suffixed name.
+
+        Returns:
+            The output path and the content hash (None without a blob store)
+        """
+        if self.blob_store is None:
+            return self._move_to_output(source_path, output_filename, keep_source), None
+
+        digest, blob = self.blob_store.put(source_path, move=not keep_source)
+        dest_path = self._output_name(source_path, output_filename)
+        if self.blob_store.is_linked(dest_path, blob):
+            return dest_path, digest
+        dest_path = self._claim_output(dest_path)
+        self.blob_store.link(blob, dest_path)
+        return dest_path, digest
+
+    def _output_name(self, source_path: Path, output_filename: Optional[str]) -> Path:
+        """Preferred output path for a render, before collision handling."""
         if output_filename:
             # Add extension if not present
             if not output_filename.endswith(f".{self.output_format}"):
                 output_filename = f"{output_filename}.{self.output_format}"
-            dest_path = self.output_dir / output_filename
-        else:
-            dest_path = self.output_dir / source_path.name
+            return self.output_dir / output_filename
+        return self.output_dir / source_path.name
+
+    def _claim_output(self, dest_path: Path) -> Path:
+        """Create an empty placeholder at the first free variant of dest_path.
 
-        # Handle existing files
-        if dest_path.exists():
-            counter = 1
-            stem = dest_path.stem
-            while dest_path.exists():
+        The name is claimed with O_EXCL so that concurrent renders never
+        pick the same destination.
+        """
+        counter = 1
+        stem = dest_path.stem
+        while True:
+            try:
+                os.close(os.open(dest_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return dest_path
+            except FileExistsError:
                 dest_path = self.output_dir / f"{stem}_{counter}.{self.output_format}"
                 counter += 1
 
-        shutil.move(str(source_path), str(dest_path))
+    def _move_to_output(
+        self,
+        source_path: Path,
+        output_filename: Optional[str],
+        keep_source: bool = False,
+    ) -> Path:
+        """Move rendered file to output directory.
+
+        With ``keep_source`` the file is hardlinked (or copied) instead of
+        moved, so cached renders stay in the cache.
+        """
+        # Handle existing files by claiming a suffixed name
+        dest_path = self._claim_output(self._output_name(source_path, output_filename))
+
+        if keep_source:
+            tmp_path = dest_path.with_name(f".{dest_path.name}.{uuid.uuid4().hex}.tmp")
+            try:
+                link_or_copy(source_path, tmp_path)
+            except FileNotFoundError:
+                # Release the claimed name if the source vanished
+                dest_path.unlink(missing_ok=True)
+                raise
+            os.replace(tmp_path, dest_path)
+        else:
+            shutil.move(str(source_path), str(dest_path))
         return dest_path
 
     def _extract_error(self, stderr: str) -> str:
@@ -239,8 +612,24 @@ class ManimRenderer:
 
         return stderr[-500:] if len(stderr) > 500 else stderr
 
-    def cleanup_cache(self):
-        """Remove all cached files."""
-        if self.cache_dir.exists():
+    def cleanup_cache(self, keep_tex: bool = True):
+        """
+        Remove cached files.
+
+        Args:
+            keep_tex: Keep the LaTeX and text SVG caches, which any later
+                scene rendering the same strings reuses
+        """
+        if not self.cache_dir.exists():
+            return
+        if not keep_tex:
             shutil.rmtree(self.cache_dir)
             self.cache_dir.mkdir(parents=True, exist_ok=True)
+            return
+        for path in self.cache_dir.iterdir():
+            if path.name in ("Tex", "texts"):
+                continue
+            if path.is_dir():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                path.unlink(missing_ok=True)
@@ -0,0 +1,341 @@
+"""
+Size- and age-bounded management of Manim's media caches.
+
+Manim leaves three kinds of reusable files behind: partial movie files (one
+per play() call, reused when a scene is re-rendered), LaTeX and text SVG
+caches (reused by every scene that renders the same string), and the final
+videos in the output directory. Each is a tier with its own byte budget;
+a background thread evicts the least recently used entries of each tier
+above its budget and entries older than the maximum age.
+"""
+
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..config import Config
+
+logger = logging.getLogger(__name__)
+
+# Manim log lines for a reused and a freshly rendered partial movie file
+_CACHE_HIT = re.compile(r"Using cached data\s*\(hash\s*:\s*([\w]+)\)")
+_CACHE_MISS = re.compile(r"Partial movie file written")
+
+# Tier names
+PARTIAL_MOVIES = "partial_movies"
+TEX = "tex"
+OUTPUTS = "outputs"
+
+
+@dataclass
+class TierBudget:
+    """Eviction limits for one cache tier."""
+    max_bytes: Optional[int] = None  # None = no size limit
+    max_age_seconds: Optional[float] = None  # None = no age limit
+
+
+@dataclass
+class _Entry:
+    path: Path
+    size: int
+    last_used: float
+
+
+def _tree_size(path: Path) -> Tuple[int, float]:
+    """Total size and newest mtime/atime of the files under a directory."""
+    size = 0
+    newest = 0.0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                stat = os.stat(os.path.join(root, name))
+            except FileNotFoundError:
+                continue
+            size += stat.st_size
+            newest = max(newest, stat.st_mtime, stat.st_atime)
+    return size, newest
+
+
+class MediaCache:
+    """Tiered LRU eviction over a Manim cache directory and output directory."""
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        output_dir: Optional[Path] = None,
+        budgets: Optional[Dict[str, TierBudget]] = None,
+        sweep_interval: float = 300.0,
+        grace_seconds: float = 600.0,
+    ):
+        """
+        Initialize the media cache.
+
+        Args:
+            cache_dir: Manim cache directory (Config.manim_cache_dir)
+            output_dir: Directory of final videos; the outputs tier is only
+                managed when given
+            budgets: Limits per tier name (partial_movies, tex, outputs);
+                tiers without a budget are never evicted
+            sweep_interval: Seconds between background sweeps
+            grace_seconds: Entries used more recently than this are never
+                evicted, so files a running render depends on stay in place
+        """
+        self.cache_dir = Path(cache_dir).resolve()
+        self.output_dir = Path(output_dir).resolve() if output_dir is not None else None
+        self.budgets = budgets or {}
+        self.sweep_interval = sweep_interval
+        self.grace_seconds = grace_seconds
+
+        # Paths renders are using right now, with their holder counts
+        self._held: Dict[Path, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.tex_hits = 0
+        self.tex_misses = 0
+        self.evicted: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _tier_entries(self, tier: str) -> List[_Entry]:
+        """Evictable entries of a tier: scene directories or single files."""
+        if tier == PARTIAL_MOVIES:
+            # <cache>/partial_movie_files/<quality>/<scene>/, evicted per scene
+            root = self.cache_dir / "partial_movie_files"
+            dirs = [d for q in root.glob("*") if q.is_dir() for d in q.iterdir() if d.is_dir()]
+            entries = []
+            for directory in dirs:
+                size, newest = _tree_size(directory)
+                try:
+                    newest = max(newest, directory.stat().st_mtime)
+                except FileNotFoundError:
+                    continue
+                entries.append(_Entry(directory, size, newest))
+            return entries
+
+        if tier == TEX:
+            roots = [self.cache_dir / "Tex", self.cache_dir / "texts"]
+        elif tier == OUTPUTS and self.output_dir is not None:
+            roots = [self.output_dir]
+        else:
+            return []
+
+        entries = []
+        for root in roots:
+            if not root.is_dir():
+                continue
+            for path in root.rglob("*"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                if path.is_file():
+                    entries.append(_Entry(path, stat.st_size, max(stat.st_mtime, stat.st_atime)))
+        return entries
+
+    def sweep(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Evict expired entries and LRU entries above each tier's budget.
+
+        Returns:
+            Number of entries removed per tier
+        """
+        now = time.time() if now is None else now
+        removed = {}
+        for tier, budget in self.budgets.items():
+            entries = sorted(self._tier_entries(tier), key=lambda e: e.last_used)
+            total = sum(e.size for e in entries)
+            count = 0
+            for entry in entries:
+                expired = (
+                    budget.max_age_seconds is not None
+                    and now - entry.last_used > budget.max_age_seconds
+                )
+                over = budget.max_bytes is not None and total > budget.max_bytes
+                if not (expired or over):
+                    # Entries are oldest first: nothing after this one is expired
+                    break
+                if now - entry.last_used < self.grace_seconds:
+                    break
+                with self._lock:
+                    if entry.path in self._held:
+                        continue
+                if entry.path.is_dir():
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                else:
+                    entry.path.unlink(missing_ok=True)
+                total -= entry.size
+                count += 1
+            removed[tier] = count
+
+        with self._lock:
+            for tier, count in removed.items():
+                self.evicted[tier] = self.evicted.get(tier, 0) + count
+        if any(removed.values()):
+            logger.debug(f"Media cache evicted {removed}")
+        return removed
+
+    def hold(self, path: Path) -> None:
+        """Protect a path from eviction until release() is called."""
+        with self._lock:
+            self._held[Path(path)] = self._held.get(Path(path), 0) + 1
+
+    def release(self, path: Path) -> None:
+        """Undo one hold() of a path."""
+        with self._lock:
+            count = self._held.pop(Path(path), 0) - 1
+            if count > 0:
+                self._held[Path(path)] = count
+
+    def record_render(
+        self,
+        log: str,
+        partial_movie_dir: Optional[Path] = None,
+        tex_hits: int = 0,
+        tex_misses: int = 0,
+    ) -> None:
+        """
+        Count partial movie reuse from a Manim render log.
+
+        Reused partial movie files are touched so LRU eviction sees them
+        as recently used.
+
+        Args:
+            log: Combined stdout/stderr of the manim run
+            partial_movie_dir: Partial movie directory the render used
+            tex_hits: LaTeX/text SVGs the render found in the cache
+            tex_misses: LaTeX/text SVGs the render had to create
+        """
+        with self._lock:
+            self.tex_hits += tex_hits
+            self.tex_misses += tex_misses
+        if not log:
+            return
+        # Rich wraps long log lines; rejoin them before matching
+        text = " ".join(log.split())
+        hashes = _CACHE_HIT.findall(text)
+        misses = len(_CACHE_MISS.findall(text))
+        with self._lock:
+            self.hits += len(hashes)
+            self.misses += misses
+
+        if partial_movie_dir is not None:
+            for digest in hashes:
+                for path in partial_movie_dir.glob(f"{digest}.*"):
+                    try:
+                        os.utime(path)
+                    except FileNotFoundError:
+                        pass
+
+    def start(self) -> None:
+        """Start the background sweeper thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="manim-media-cache", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background sweeper thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.warning(f"Media cache sweep failed: {e}")
+
+    def stats(self) -> dict:
+        """
+        Return usage per tier, with hit rates for partial movies and TeX.
+
+        TeX/text lookups are only counted for renders on the worker pool;
+        the manim CLI does not report them.
+        """
+        with self._lock:
+            hits, misses = self.hits, self.misses
+            tex_hits, tex_misses = self.tex_hits, self.tex_misses
+            evicted = dict(self.evicted)
+        lookups = hits + misses
+        tex_lookups = tex_hits + tex_misses
+        tiers = {}
+        for tier in (PARTIAL_MOVIES, TEX, OUTPUTS):
+            entries = self._tier_entries(tier)
+            budget = self.budgets.get(tier)
+            tiers[tier] = {
+                "entries": len(entries),
+                "size_bytes": sum(e.size for e in entries),
+                "max_bytes": budget.max_bytes if budget else None,
+                "evicted": evicted.get(tier, 0),
+            }
+        tiers[PARTIAL_MOVIES].update({
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        })
+        tiers[TEX].update({
+            "hits": tex_hits,
+            "misses": tex_misses,
+            "hit_rate": tex_hits / tex_lookups if tex_lookups else 0.0,
+        })
+        return tiers
+
+
+_shared_caches: Dict[Path, MediaCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def create_media_cache(config: "Config") -> Optional[MediaCache]:
+    """
+    Return the process-wide MediaCache for the configured Manim cache directory.
+
+    The sweeper is started on first use; the settings of the first call win.
+
+    Args:
+        config: Configuration object with media cache settings
+
+    Returns:
+        MediaCache instance, or None when the media cache is disabled
+    """
+    if not config.media_cache_enabled:
+        return None
+
+    max_age = config.media_cache_max_age_days * 24 * 3600 or None
+
+    def megabytes(mb: int) -> Optional[int]:
+        return mb * 1024 * 1024 if mb > 0 else None
+
+    key = Path(config.manim_cache_dir).resolve()
+    with _shared_caches_lock:
+        cache = _shared_caches.get(key)
+        if cache is None:
+            budgets = {
+                PARTIAL_MOVIES: TierBudget(megabytes(config.media_cache_partial_mb), max_age),
+                TEX: TierBudget(megabytes(config.media_cache_tex_mb), max_age),
+            }
+            if config.media_cache_output_mb > 0:
+                # Final videos are only evicted for an explicit budget
+                budgets[OUTPUTS] = TierBudget(megabytes(config.media_cache_output_mb))
+            cache = MediaCache(
+                config.manim_cache_dir,
+                output_dir=config.output_dir,
+                budgets=budgets,
+                sweep_interval=config.media_cache_sweep_seconds,
+            )
+            _shared_caches[key] = cache
+        cache.start()
+        return cache
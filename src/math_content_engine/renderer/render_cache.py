@@ -0,0 +1,196 @@
+"""
+Render-result cache for ManimRenderer.
+
+Finished videos are stored under a SHA-256 of everything that determines the
+output (code, scene name, quality, output format and the installed Manim
+version). A cache hit materialises the stored file at the requested output
+name with a hardlink (or a copy across filesystems) instead of re-running
+Manim.
+"""
+
+import hashlib
+import logging
+import os
+import shutil
+import threading
+import uuid
+from functools import lru_cache
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..config import Config
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def get_manim_version() -> str:
+    """Return the installed Manim version, or "unknown" if it is not installed."""
+    try:
+        return version("manim")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def link_or_copy(source: Path, dest: Path) -> None:
+    """Hardlink *source* to *dest*, falling back to a copy across filesystems."""
+    try:
+        os.link(source, dest)
+    except OSError:
+        shutil.copy2(source, dest)
+
+
+class RenderCache:
+    """Filesystem cache of rendered videos with LRU eviction by total bytes."""
+
+    def __init__(self, cache_dir: Path, max_bytes: Optional[int] = 2 * 1024 * 1024 * 1024):
+        """
+        Initialize the render cache.
+
+        Args:
+            cache_dir: Directory holding cached renders
+            max_bytes: Evict least-recently-used renders above this total size
+                (None disables eviction)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(code: str, scene_name: str, quality: str, output_format: str) -> str:
+        """Build the content hash identifying a render."""
+        digest = hashlib.sha256()
+        for part in (code, scene_name, quality, output_format, get_manim_version()):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str, output_format: str) -> Path:
+        return self.cache_dir / f"{key}.{output_format}"
+
+    def get(self, key: str, output_format: str) -> Optional[Path]:
+        """
+        Look up a cached render.
+
+        Args:
+            key: Key from make_key()
+            output_format: File extension of the render (mp4 or gif)
+
+        Returns:
+            Path to the cached file, or None on a miss
+        """
+        path = self._entry_path(key, output_format)
+        try:
+            # Touch the entry so LRU eviction sees it as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return path
+
+    def contains(self, key: str, output_format: str) -> bool:
+        """Return True if a render is cached, without counting a hit or miss."""
+        return self._entry_path(key, output_format).exists()
+
+    def put(self, key: str, source: Path, output_format: str) -> Path:
+        """
+        Store a finished render in the cache.
+
+        Args:
+            key: Key from make_key()
+            source: Rendered file to store (left in place)
+            output_format: File extension of the render
+
+        Returns:
+            Path to the cached entry
+        """
+        path = self._entry_path(key, output_format)
+        tmp = self.cache_dir / f".{key}.{uuid.uuid4().hex}.tmp"
+        link_or_copy(source, tmp)
+        os.replace(tmp, path)
+        self.evict()
+        return path
+
+    def _entries(self) -> list:
+        entries = []
+        for path in self.cache_dir.iterdir():
+            if path.name.startswith("."):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self) -> int:
+        """
+        Remove least-recently-used renders until under max_bytes.
+
+        Returns:
+            Number of renders removed
+        """
+        if self.max_bytes is None:
+            return 0
+
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+
+        if removed:
+            logger.debug(f"Evicted {removed} cached renders")
+        return removed
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current cache usage."""
+        with self._lock:
+            entries = self._entries()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(entries),
+            "size_bytes": sum(size for _, size, _ in entries),
+        }
+
+    def clear(self) -> None:
+        """Remove all cached renders."""
+        with self._lock:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+
+def create_render_cache(config: "Config") -> Optional[RenderCache]:
+    """
+    Create a RenderCache from configuration.
+
+    Args:
+        config: Configuration object with render cache settings
+
+    Returns:
+        RenderCache instance, or None when the render cache is disabled
+    """
+    if not config.render_cache_enabled:
+        return None
+    return RenderCache(
+        config.render_cache_dir,
+        max_bytes=config.render_cache_max_mb * 1024 * 1024,
+    )
@@ -0,0 +1,500 @@
+"""
+Pool of long-lived Manim render workers.
+
+Each worker process imports manim (and with it numpy, cairo and pango) once,
+then renders jobs received over a pipe in-process, executing every scene in a
+fresh module namespace. This avoids paying interpreter start-up and the
+manim import on every render, which dominates short renders and the
+render -> fix -> render retry loop.
+
+Workers are recycled after a fixed number of jobs or when their peak RSS
+crosses a high-water mark, so leaks in long sessions stay bounded.
+"""
+
+import atexit
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from typing import Optional, Set, Tuple, TYPE_CHECKING
+
+from ..config import VideoQuality
+
+if TYPE_CHECKING:
+    from ..config import Config
+    from .manim_renderer import RenderResult
+
+logger = logging.getLogger(__name__)
+
+# Manim config names for each quality preset
+_MANIM_QUALITY_NAMES = {
+    VideoQuality.LOW: "low_quality",
+    VideoQuality.MEDIUM: "medium_quality",
+    VideoQuality.HIGH: "high_quality",
+    VideoQuality.PRODUCTION: "production_quality",
+    VideoQuality.FOURK: "fourk_quality",
+}
+
+_MANIM_NOT_INSTALLED = "Manim is not installed. Run: pip install manim"
+
+
+def _peak_rss_mb() -> float:
+    """Return this process's peak resident set size in MB."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    # ru_maxrss is reported in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+# SVG files under the TeX and text caches opened by the running job; None
+# while no job is recording
+_tex_reads: Optional[Set[str]] = None
+_tex_roots: Tuple[str, ...] = ()
+
+
+def _audit_tex_reads(event: str, args: tuple) -> None:
+    """Audit hook recording the TeX/text cache SVGs a job opens."""
+    if event != "open" or _tex_reads is None:
+        return
+    path = args[0]
+    if isinstance(path, os.PathLike):
+        path = os.fspath(path)
+    if isinstance(path, str) and path.endswith(".svg") and path.startswith(_tex_roots):
+        _tex_reads.add(path)
+
+
+def _count_tex_reads(paths: Set[str], started: float) -> Tuple[int, int]:
+    """Split the SVGs a job read into cache hits and files it created."""
+    hits = misses = 0
+    for path in paths:
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            continue
+        if mtime < started:
+            hits += 1
+        else:
+            misses += 1
+    return hits, misses
+
+
+class _LogCapture(logging.Handler):
+    """Collects the messages of the manim logger during one job."""
+
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.lines = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.lines.append(record.getMessage())
+        except Exception:
+            self.handleError(record)
+
+
+def _render_job(job: dict) -> dict:
+    """
+    Render one job inside a worker process.
+
+    Besides the outcome, the result carries the manim INFO log (which
+    reports partial movie reuse) and the TeX/text SVG cache hits and misses.
+    """
+    global _tex_reads, _tex_roots
+    import types
+
+    from manim import config as manim_config
+    from manim import logger as manim_logger
+    from manim import tempconfig
+
+    script_path = job["script_path"]
+    code = Path(script_path).read_text()
+    module = types.ModuleType(f"manim_job_{Path(script_path).stem}")
+    module.__file__ = script_path
+
+    overrides = {
+        "media_dir": job["media_dir"],
+        "input_file": script_path,
+        "quality": job["quality"],
+        "format": job["output_format"],
+        "progress_bar": "none",
+        # INFO carries the partial movie cache lines; the console handlers
+        # stay at WARNING and only the capture handler sees INFO
+        "verbosity": "INFO",
+    }
+    overrides.update(job.get("extra_config", {}))
+
+    capture = _LogCapture()
+    console_levels = [(handler, handler.level) for handler in manim_logger.handlers]
+    for handler, level in console_levels:
+        handler.setLevel(max(level, logging.WARNING))
+    manim_logger.addHandler(capture)
+    started = time.time()
+    _tex_reads = set()
+
+    try:
+        with tempconfig(overrides):
+            _tex_roots = tuple(
+                os.path.join(str(manim_config.get_dir(key)), "")
+                for key in ("tex_dir", "text_dir")
+            )
+            exec(compile(code, script_path, "exec"), module.__dict__)
+            scene_cls = module.__dict__.get(job["scene_name"])
+            if scene_cls is None:
+                result = {
+                    "success": False,
+                    "error_message": f"Scene class not found: {job['scene_name']}",
+                }
+            else:
+                scene = scene_cls()
+                scene.render()
+
+                file_writer = scene.renderer.file_writer
+                if manim_config.format == "gif":
+                    output_path = getattr(file_writer, "gif_file_path", None)
+                else:
+                    output_path = getattr(file_writer, "movie_file_path", None)
+                result = {
+                    "success": True,
+                    "output_path": str(output_path) if output_path else None,
+                }
+    except Exception:
+        lines = traceback.format_exc().strip().split("\n")
+        result = {"success": False, "error_message": "\n".join(lines[-10:])}
+    finally:
+        tex_reads, _tex_reads, _tex_roots = _tex_reads, None, ()
+        manim_logger.removeHandler(capture)
+        for handler, level in console_levels:
+            handler.setLevel(level)
+
+    result["tex_hits"], result["tex_misses"] = _count_tex_reads(tex_reads, started)
+    result["log"] = "\n".join(capture.lines)
+    return result
+
+
+def _worker_main(conn) -> None:
+    """Entry point of a render worker process."""
+    try:
+        import manim  # noqa: F401 - warm the import once per worker
+        manim_available = True
+    except ImportError:
+        manim_available = False
+    else:
+        sys.addaudithook(_audit_tex_reads)
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+
+        if manim_available:
+            result = _render_job(job)
+        else:
+            result = {"success": False, "error_message": _MANIM_NOT_INSTALLED}
+        result["peak_rss_mb"] = _peak_rss_mb()
+        conn.send(result)
+
+    conn.close()
+
+
+class _Worker:
+    """Handle on a single worker process."""
+
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def stop(self, timeout: float = 5.0) -> None:
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class ManimWorkerPool:
+    """
+    Pool of warm render workers with the same result contract as ManimRenderer.
+
+    Workers are started lazily, up to ``size``. Calls to ``render`` block
+    until a worker is free, so the pool also bounds render concurrency.
+    """
+
+    # How often a cancellable render checks its cancel event
+    CANCEL_POLL_SECONDS = 0.2
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        max_jobs_per_worker: int = 50,
+        max_rss_mb: Optional[float] = 2048,
+        job_timeout: float = 300,
+    ):
+        """
+        Initialize the worker pool.
+
+        Args:
+            size: Maximum number of worker processes (defaults to CPU count)
+            max_jobs_per_worker: Recycle a worker after this many jobs
+            max_rss_mb: Recycle a worker once its peak RSS exceeds this
+                (None disables the memory check)
+            job_timeout: Seconds before a render is abandoned and its
+                worker killed
+        """
+        self.size = size or os.cpu_count() or 1
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_rss_mb = max_rss_mb
+        self.job_timeout = job_timeout
+
+        # spawn avoids inheriting locks held by other threads at fork time
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle: "queue.LifoQueue[_Worker]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._workers: set = set()
+        self._closed = False
+
+        self.jobs_completed = 0
+        self.workers_recycled = 0
+
+    def _acquire(self) -> _Worker:
+        self._slots.acquire()
+        try:
+            worker = self._idle.get_nowait()
+            if worker.process.is_alive():
+                return worker
+            self._discard(worker)
+        except queue.Empty:
+            pass
+
+        try:
+            worker = _Worker(self._ctx)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._workers.add(worker)
+        logger.debug(f"Started render worker pid={worker.process.pid}")
+        return worker
+
+    def _release(self, worker: Optional[_Worker]) -> None:
+        if worker is not None:
+            self._idle.put(worker)
+        self._slots.release()
+
+    def _discard(self, worker: _Worker, recycle: bool = False) -> None:
+        with self._lock:
+            self._workers.discard(worker)
+            if recycle:
+                self.workers_recycled += 1
+
+    def render(
+        self,
+        script_path: Path,
+        scene_name: str,
+        media_dir: Path,
+        quality: VideoQuality,
+        output_format: str = "mp4",
+        extra_config: Optional[dict] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> "RenderResult":
+        """
+        Render a scene on a warm worker.
+
+        Args:
+            script_path: File containing the scene code
+            scene_name: Name of the Scene class to render
+            media_dir: Manim media directory for this job
+            quality: Video quality preset
+            output_format: Output format (mp4 or gif)
+            extra_config: Additional Manim config overrides for the job
+            cancel_event: Optional event; setting it kills the worker running
+                the job, which is replaced on the next render
+
+        Returns:
+            RenderResult with output_path pointing into media_dir
+        """
+        from .manim_renderer import RenderResult
+
+        if self._closed:
+            raise RuntimeError("ManimWorkerPool has been shut down")
+
+        job = {
+            "script_path": str(script_path),
+            "scene_name": scene_name,
+            "media_dir": str(media_dir),
+            "quality": _MANIM_QUALITY_NAMES.get(quality, "medium_quality"),
+            "output_format": output_format,
+            "extra_config": extra_config or {},
+        }
+
+        worker = self._acquire()
+        reply = None
+        error = None
+        cancelled = False
+        try:
+            worker.conn.send(job)
+            if self._wait_for_reply(worker, cancel_event):
+                reply = worker.conn.recv()
+            elif cancel_event is not None and cancel_event.is_set():
+                logger.info(f"Render cancelled; killing worker pid={worker.process.pid}")
+                cancelled = True
+                error = "Render cancelled"
+            else:
+                logger.warning(f"Render worker pid={worker.process.pid} timed out; killing it")
+                error = f"Rendering timed out after {self.job_timeout:.0f} seconds"
+        except (EOFError, BrokenPipeError, OSError) as e:
+            logger.warning(f"Render worker pid={worker.process.pid} died: {e}")
+            error = f"Render worker crashed: {e}"
+        except BaseException:
+            worker.kill()
+            self._discard(worker)
+            self._release(None)
+            raise
+
+        if reply is None:
+            worker.kill()
+            self._discard(worker)
+            self._release(None)
+            return RenderResult(
+                success=False, output_path=None, error_message=error, cancelled=cancelled
+            )
+
+        worker.jobs += 1
+        with self._lock:
+            self.jobs_completed += 1
+        if self._should_recycle(worker, reply):
+            worker.stop()
+            self._discard(worker, recycle=True)
+            worker = None
+        self._release(worker)
+
+        output_path = reply.get("output_path")
+        return RenderResult(
+            success=reply["success"],
+            output_path=Path(output_path) if output_path else None,
+            error_message=reply.get("error_message"),
+            stdout=reply.get("log", ""),
+            tex_hits=reply.get("tex_hits", 0),
+            tex_misses=reply.get("tex_misses", 0),
+        )
+
+    def _wait_for_reply(self, worker: _Worker, cancel_event: Optional[threading.Event]) -> bool:
+        """Wait for a job reply; False on timeout or cancellation."""
+        if cancel_event is None:
+            return worker.conn.poll(self.job_timeout)
+        deadline = time.monotonic() + self.job_timeout
+        while not cancel_event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if worker.conn.poll(min(self.CANCEL_POLL_SECONDS, remaining)):
+                return True
+        return False
+
+    def _should_recycle(self, worker: _Worker, reply: dict) -> bool:
+        if self._closed:
+            return True
+        if worker.jobs >= self.max_jobs_per_worker:
+            return True
+        if self.max_rss_mb is not None and reply.get("peak_rss_mb", 0) > self.max_rss_mb:
+            return True
+        return False
+
+    def stats(self) -> dict:
+        """Return worker and job counters."""
+        with self._lock:
+            return {
+                "size": self.size,
+                "workers": len(self._workers),
+                "jobs_completed": self.jobs_completed,
+                "workers_recycled": self.workers_recycled,
+            }
+
+    def shutdown(self) -> None:
+        """Stop all idle workers; busy workers stop after their current job."""
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.stop()
+            self._discard(worker)
+
+
+_shared_pool: Optional[ManimWorkerPool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_worker_pool(
+    size: Optional[int] = None,
+    max_jobs_per_worker: int = 50,
+    max_rss_mb: Optional[float] = 2048,
+) -> ManimWorkerPool:
+    """
+    Return the process-wide worker pool, creating it on first use.
+
+    The settings of the first call win; later calls share the same pool.
+    """
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None or _shared_pool._closed:
+            _shared_pool = ManimWorkerPool(
+                size=size,
+                max_jobs_per_worker=max_jobs_per_worker,
+                max_rss_mb=max_rss_mb,
+            )
+        return _shared_pool
+
+
+def shutdown_worker_pool() -> None:
+    """Shut down the process-wide worker pool, if one was started."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is not None:
+            _shared_pool.shutdown()
+            _shared_pool = None
+
+
+atexit.register(shutdown_worker_pool)
+
+
+def create_worker_pool(config: "Config") -> Optional[ManimWorkerPool]:
+    """
+    Return the shared worker pool when the "pool" render backend is configured.
+
+    Args:
+        config: Configuration object with render backend settings
+
+    Returns:
+        The process-wide ManimWorkerPool, or None for the subprocess backend
+    """
+    if config.render_backend != "pool":
+        return None
+    return get_worker_pool(
+        size=config.render_workers,
+        max_jobs_per_worker=config.render_worker_max_jobs,
+        max_rss_mb=config.render_worker_max_rss_mb,
+    )
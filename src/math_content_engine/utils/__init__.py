@@ -2,6 +2,7 @@
 
 from .code_extractor import extract_python_code
 from .json_repair import parse_json_with_repair, repair_json
+from .manim_analyzer import Finding, analyze_manim_code
 from .validators import validate_manim_code
 
 __all__ = [
@@ -9,4 +10,6 @@ __all__ = [
     "parse_json_with_repair",
     "repair_json",
     "validate_manim_code",
+    "analyze_manim_code",
+    "Finding",
 ]
@@ -73,3 +73,81 @@ def extract_imports(code: str) -> list[str]:
     """
     import_pattern = r'^(?:from|import)\s+.+$'
     return re.findall(import_pattern, code, re.MULTILINE)
+
+
+class StreamingCodeExtractor:
+    """
+    Incrementally extract a fenced Python code block from streamed text.
+
+    Feed chunks as they arrive; ``feed`` returns True as soon as the
+    closing fence has been seen, so the caller can stop consuming the
+    stream instead of waiting for trailing prose. Output that is clearly
+    not a Manim scene (no ``from manim import`` within the first lines of
+    code) marks the extractor as aborted so the request can be cancelled
+    early.
+    """
+
+    _OPEN_FENCE = re.compile(r'```[ \t]*(?:python|py)?[ \t]*\n')
+    _MANIM_IMPORT = re.compile(r'^\s*(?:from\s+manim\b|import\s+manim\b)', re.MULTILINE)
+
+    def __init__(self, max_lines_without_import: int = 15, max_preamble_lines: int = 40):
+        """
+        Initialize the extractor.
+
+        Args:
+            max_lines_without_import: Abort when this many lines of code have
+                arrived without a manim import
+            max_preamble_lines: Abort when this many lines of text have
+                arrived without a code fence or a manim import
+        """
+        self.max_lines_without_import = max_lines_without_import
+        self.max_preamble_lines = max_preamble_lines
+        self.text = ""
+        self.done = False
+        self.aborted = False
+        self.abort_reason: Optional[str] = None
+        self._code_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Consume the next chunk of streamed text.
+
+        Returns:
+            True once no more input is needed (closing fence seen or aborted)
+        """
+        if self.done:
+            return True
+        self.text += chunk
+
+        if self._code_start is None:
+            match = self._OPEN_FENCE.search(self.text)
+            if match:
+                self._code_start = match.end()
+
+        if self._code_start is not None:
+            closing = self.text.find("```", self._code_start)
+            if closing != -1:
+                self.text = self.text[:closing + 3]
+                self.done = True
+                return True
+            self._check(self.text[self._code_start:], self.max_lines_without_import, "code")
+        else:
+            self._check(self.text, self.max_preamble_lines, "response")
+
+        return self.done
+
+    def _check(self, region: str, max_lines: int, label: str) -> None:
+        # Only complete lines count, so a partial import line is not judged
+        complete_lines = region.count("\n")
+        if complete_lines < max_lines:
+            return
+        if self._MANIM_IMPORT.search(region):
+            return
+        self.aborted = True
+        self.done = True
+        self.abort_reason = f"No 'from manim import' in the first {max_lines} lines of {label}"
+
+    @property
+    def code(self) -> str:
+        """Python code extracted from the text consumed so far."""
+        return extract_python_code(self.text)
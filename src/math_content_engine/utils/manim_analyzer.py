@@ -0,0 +1,523 @@
+"""
+Static analysis of generated Manim code.
+
+Walks the AST of a scene to catch common render failures before paying for
+a render: deprecated or removed Manim APIs, undefined names, methods that
+do not exist in the installed Manim version, LaTeX mobjects without a LaTeX
+install, and one mobject animated twice in the same ``self.play()`` call.
+
+Checks against the Manim API use a symbol table built from the installed
+``manim`` package. Building it imports manim, so the table is cached on
+disk per Manim version, in the directory set with set_symbols_cache_dir()
+(Config.manim_symbols_cache_dir for the engine). When manim is not
+installed those checks are skipped.
+
+Removed APIs, undefined names and unknown methods are errors. LaTeX
+without an install and mobjects animated twice in one play() call are
+warnings: Manim can still render many such scenes, and the render-fix
+loop handles the ones it cannot.
+"""
+
+import ast
+import builtins
+import inspect
+import json
+import logging
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from functools import lru_cache
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Directory of the on-disk symbol table cache; None keeps it in memory
+_symbols_cache_dir: Optional[Path] = None
+
+# Bump when the cached symbol table format changes
+_SYMBOLS_FORMAT = 1
+
+# Removed or renamed Manim APIs and their replacements
+DEPRECATED_APIS = {
+    "ShowCreation": "Create",
+    "ShowCreationThenDestruction": "ShowPassingFlash",
+    "ShowCreationThenFadeOut": "ShowPassingFlash",
+    "TextMobject": "Text",
+    "TexMobject": "MathTex",
+    "FadeInFrom": "FadeIn(mobject, shift=...)",
+    "FadeInFromDown": "FadeIn(mobject, shift=UP)",
+    "FadeOutAndShift": "FadeOut(mobject, shift=...)",
+    "FadeOutAndShiftDown": "FadeOut(mobject, shift=DOWN)",
+}
+
+# Mobjects that compile LaTeX when created
+LATEX_MOBJECTS = frozenset({
+    "Tex",
+    "MathTex",
+    "SingleStringMathTex",
+    "BulletedList",
+    "Title",
+    "Matrix",
+    "IntegerMatrix",
+    "DecimalMatrix",
+    "MobjectMatrix",
+})
+
+# Animations that read a mobject without changing it, so sharing it with
+# another animation in the same play() call is fine
+_NON_MUTATING_ANIMATIONS = frozenset({"Flash", "Circumscribe", "FocusOn"})
+
+_BUILTIN_NAMES = frozenset(dir(builtins)) | {"__file__", "__name__"}
+
+
+@dataclass
+class Finding:
+    """One problem found by the analyzer."""
+    rule: str
+    message: str
+    line: Optional[int] = None
+    severity: str = "error"  # "error" or "warning"
+
+    def __str__(self) -> str:
+        return f"Line {self.line}: {self.message}" if self.line else self.message
+
+
+@dataclass
+class ManimSymbols:
+    """Public API of an installed Manim version."""
+    version: str
+    names: FrozenSet[str]
+    # Attributes of each exported Mobject and Scene class
+    class_attributes: Dict[str, FrozenSet[str]] = field(default_factory=dict)
+    # Classes resolving unknown get_*/set_* accessors via __getattr__
+    dynamic_classes: FrozenSet[str] = frozenset()
+    scene_classes: FrozenSet[str] = frozenset()
+
+    def to_dict(self) -> dict:
+        return {
+            "format": _SYMBOLS_FORMAT,
+            "version": self.version,
+            "names": sorted(self.names),
+            "class_attributes": {k: sorted(v) for k, v in self.class_attributes.items()},
+            "dynamic_classes": sorted(self.dynamic_classes),
+            "scene_classes": sorted(self.scene_classes),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ManimSymbols":
+        return cls(
+            version=data["version"],
+            names=frozenset(data["names"]),
+            class_attributes={k: frozenset(v) for k, v in data["class_attributes"].items()},
+            dynamic_classes=frozenset(data["dynamic_classes"]),
+            scene_classes=frozenset(data["scene_classes"]),
+        )
+
+
+def _build_symbols(manim_version: str) -> ManimSymbols:
+    """Introspect the installed manim package."""
+    import manim
+
+    names = frozenset(n for n in dir(manim) if not n.startswith("_"))
+    class_attributes = {}
+    dynamic = set()
+    scenes = set()
+    for name in names:
+        obj = getattr(manim, name, None)
+        if not inspect.isclass(obj):
+            continue
+        if not (issubclass(obj, manim.Mobject) or issubclass(obj, manim.Scene)):
+            continue
+        class_attributes[name] = frozenset(a for a in dir(obj) if not a.startswith("__"))
+        if hasattr(obj, "__getattr__"):
+            dynamic.add(name)
+        if issubclass(obj, manim.Scene):
+            scenes.add(name)
+
+    return ManimSymbols(
+        version=manim_version,
+        names=names,
+        class_attributes=class_attributes,
+        dynamic_classes=frozenset(dynamic),
+        scene_classes=frozenset(scenes),
+    )
+
+
+def set_symbols_cache_dir(cache_dir: Optional[Path]) -> None:
+    """Set the directory analyze_manim_code() caches the symbol table in."""
+    global _symbols_cache_dir
+    _symbols_cache_dir = Path(cache_dir) if cache_dir is not None else None
+
+
+@lru_cache(maxsize=None)
+def load_manim_symbols(cache_dir: Optional[Path] = None) -> Optional[ManimSymbols]:
+    """
+    Return the symbol table of the installed Manim version.
+
+    Args:
+        cache_dir: Directory of the on-disk cache; without one the table is
+            only kept in memory for the life of the process
+
+    Returns:
+        ManimSymbols, or None if manim is not installed
+    """
+    try:
+        manim_version = version("manim")
+    except PackageNotFoundError:
+        return None
+
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = Path(cache_dir) / f"manim_symbols-{manim_version}.json"
+        try:
+            data = json.loads(cache_path.read_text())
+            if data.get("format") == _SYMBOLS_FORMAT:
+                return ManimSymbols.from_dict(data)
+        except (OSError, ValueError, KeyError):
+            pass
+
+    try:
+        symbols = _build_symbols(manim_version)
+    except Exception as e:
+        logger.warning(f"Could not introspect manim {manim_version}: {e}")
+        return None
+
+    if cache_path is None:
+        return symbols
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(symbols.to_dict(), f)
+        os.replace(tmp, cache_path)
+    except OSError as e:
+        logger.debug(f"Could not cache manim symbols at {cache_path}: {e}")
+    return symbols
+
+
+def latex_available() -> bool:
+    """Return True if a LaTeX compiler Manim can use is on PATH."""
+    return shutil.which("latex") is not None
+
+
+def _call_name(node: ast.AST) -> Optional[str]:
+    """Name of a called class or function, for ``Name(...)`` calls."""
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+        return node.func.id
+    return None
+
+
+def _bound_names(tree: ast.AST) -> Set[str]:
+    """Every name bound anywhere in the module (flow-insensitive)."""
+    bound: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            bound.add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            bound.add(node.name)
+        elif isinstance(node, ast.arg):
+            bound.add(node.arg)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                if alias.name != "*":
+                    bound.add(alias.asname or alias.name.split(".")[0])
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            bound.add(node.name)
+        elif isinstance(node, (ast.Global, ast.Nonlocal)):
+            bound.update(node.names)
+        elif isinstance(node, (ast.MatchAs, ast.MatchStar)) and node.name:
+            bound.add(node.name)
+    return bound
+
+
+def _star_imports(tree: ast.AST) -> Set[str]:
+    return {
+        node.module or ""
+        for node in ast.walk(tree)
+        if isinstance(node, ast.ImportFrom) and any(a.name == "*" for a in node.names)
+    }
+
+
+def _check_deprecated(tree: ast.AST) -> List[Finding]:
+    findings = []
+    for node in ast.walk(tree):
+        name = None
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            name = node.id
+        elif isinstance(node, ast.ImportFrom) and node.module == "manim":
+            for alias in node.names:
+                if alias.name in DEPRECATED_APIS:
+                    findings.append(Finding(
+                        "deprecated-api",
+                        f"`{alias.name}` was removed from Manim; use `{DEPRECATED_APIS[alias.name]}`",
+                        node.lineno,
+                    ))
+            continue
+        if name in DEPRECATED_APIS:
+            findings.append(Finding(
+                "deprecated-api",
+                f"`{name}` was removed from Manim; use `{DEPRECATED_APIS[name]}`",
+                node.lineno,
+            ))
+    return findings
+
+
+def _check_undefined_names(tree: ast.AST, symbols: Optional[ManimSymbols]) -> List[Finding]:
+    star_modules = _star_imports(tree)
+    if star_modules - {"manim"}:
+        # Names from other star imports cannot be resolved statically
+        return []
+    known = _bound_names(tree) | _BUILTIN_NAMES
+    if "manim" in star_modules:
+        if symbols is None:
+            return []
+        known |= symbols.names
+
+    findings = []
+    reported = set()
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, ast.Name)
+            and isinstance(node.ctx, ast.Load)
+            and node.id not in known
+            and node.id not in DEPRECATED_APIS
+            and node.id not in reported
+        ):
+            reported.add(node.id)
+            findings.append(Finding("undefined-name", f"Name `{node.id}` is not defined", node.lineno))
+    return findings
+
+
+def _check_manim_imports(tree: ast.AST, symbols: ManimSymbols) -> List[Finding]:
+    findings = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module == "manim":
+            for alias in node.names:
+                if alias.name != "*" and alias.name not in symbols.names \
+                        and alias.name not in DEPRECATED_APIS:
+                    findings.append(Finding(
+                        "unknown-api",
+                        f"Manim {symbols.version} has no `{alias.name}`",
+                        node.lineno,
+                    ))
+    return findings
+
+
+def _dynamic_accessor(method: str, call: ast.Call) -> bool:
+    """True if Mobject.__getattr__ can serve the call as a property accessor.
+
+    Mobject maps ``get_x()`` to ``self.x`` and ``set_x(value)`` to an
+    assignment, so those only work with no arguments or one argument.
+    """
+    arg_count = len(call.args) + len(call.keywords)
+    if method.startswith("get_"):
+        return arg_count == 0
+    if method.startswith("set_"):
+        return arg_count == 1
+    return False
+
+
+def _check_method_calls(tree: ast.AST, symbols: ManimSymbols) -> List[Finding]:
+    """Flag calls to methods missing from the called object's Manim class."""
+    # Variables bound to exactly one Manim class constructor and nothing else
+    bindings: Dict[str, Set[Optional[str]]] = {}
+    constructor_targets = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign):
+            value_class = _call_name(node.value)
+            if value_class in symbols.class_attributes:
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        bindings.setdefault(target.id, set()).add(value_class)
+                        constructor_targets.add(id(target))
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store) \
+                and id(node) not in constructor_targets:
+            bindings.setdefault(node.id, set()).add(None)
+        elif isinstance(node, ast.arg):
+            bindings.setdefault(node.arg, set()).add(None)
+
+    findings = []
+    for node in ast.walk(tree):
+        if not (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and isinstance(node.func.value, ast.Name)
+        ):
+            continue
+        classes = bindings.get(node.func.value.id)
+        if not classes or len(classes) != 1 or None in classes:
+            continue
+        class_name = next(iter(classes))
+        method = node.func.attr
+        if method in symbols.class_attributes[class_name]:
+            continue
+        if class_name in symbols.dynamic_classes and _dynamic_accessor(method, node):
+            continue
+        findings.append(Finding(
+            "unknown-api",
+            f"`{class_name}` has no method `{method}` in Manim {symbols.version}",
+            node.lineno,
+        ))
+    return findings
+
+
+def _check_scene_calls(tree: ast.AST, symbols: ManimSymbols) -> List[Finding]:
+    """Flag ``self.method(...)`` calls that neither the scene nor Manim define."""
+    findings = []
+    for cls in ast.walk(tree):
+        if not isinstance(cls, ast.ClassDef):
+            continue
+        bases = [b.id for b in cls.bases if isinstance(b, ast.Name)]
+        if len(bases) != len(cls.bases) or not bases:
+            continue
+        if not all(b in symbols.scene_classes for b in bases):
+            continue
+
+        available = set()
+        for base in bases:
+            available |= symbols.class_attributes.get(base, frozenset())
+        for node in ast.walk(cls):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                available.add(node.name)
+            elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+                available.add(node.id)
+            elif (
+                isinstance(node, ast.Attribute)
+                and isinstance(node.ctx, ast.Store)
+                and isinstance(node.value, ast.Name)
+                and node.value.id == "self"
+            ):
+                available.add(node.attr)
+
+        for node in ast.walk(cls):
+            if (
+                isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Attribute)
+                and isinstance(node.func.value, ast.Name)
+                and node.func.value.id == "self"
+                and node.func.attr not in available
+            ):
+                findings.append(Finding(
+                    "unknown-api",
+                    f"`{'/'.join(bases)}` has no method `{node.func.attr}` "
+                    f"in Manim {symbols.version}",
+                    node.lineno,
+                ))
+    return findings
+
+
+def _check_latex(tree: ast.AST) -> List[Finding]:
+    findings = []
+    for node in ast.walk(tree):
+        name = _call_name(node)
+        if name in LATEX_MOBJECTS:
+            findings.append(Finding(
+                "latex-unavailable",
+                f"`{name}` needs LaTeX, which is not installed; use `Text` instead",
+                node.lineno,
+                severity="warning",
+            ))
+    return findings
+
+
+def _animation_target(node: ast.AST) -> Optional[str]:
+    """Name of the mobject an animation argument of play() acts on."""
+    # mobject.animate.shift(...).scale(...)
+    current = node
+    while isinstance(current, (ast.Call, ast.Attribute)):
+        if isinstance(current, ast.Call):
+            current = current.func
+            continue
+        if (
+            current.attr == "animate"
+            and isinstance(current.value, ast.Name)
+        ):
+            return current.value.id
+        current = current.value
+
+    # Animation(mobject, ...)
+    name = _call_name(node)
+    if name and name not in _NON_MUTATING_ANIMATIONS and node.args:
+        first = node.args[0]
+        if isinstance(first, ast.Name):
+            return first.id
+    return None
+
+
+def _check_parallel_reuse(tree: ast.AST) -> List[Finding]:
+    findings = []
+    for node in ast.walk(tree):
+        if not (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and node.func.attr == "play"
+            and isinstance(node.func.value, ast.Name)
+            and node.func.value.id == "self"
+        ):
+            continue
+        seen = set()
+        for arg in node.args:
+            target = _animation_target(arg)
+            if target is None:
+                continue
+            if target in seen:
+                findings.append(Finding(
+                    "mobject-reused",
+                    f"`{target}` is animated more than once in the same self.play() call; "
+                    f"combine the animations or play them one after another",
+                    node.lineno,
+                    severity="warning",
+                ))
+                break
+            seen.add(target)
+    return findings
+
+
+def analyze_manim_code(
+    code: str,
+    tree: Optional[ast.AST] = None,
+    symbols: Optional[ManimSymbols] = None,
+    check_latex: Optional[bool] = None,
+) -> List[Finding]:
+    """
+    Statically analyze Manim scene code.
+
+    Args:
+        code: Python source of the scene
+        tree: Already parsed AST of ``code``, if available
+        symbols: Manim symbol table (defaults to the installed Manim version,
+            cached under set_symbols_cache_dir(); API checks are skipped when
+            manim is not installed)
+        check_latex: Flag LaTeX mobjects when no LaTeX is installed. Defaults
+            to checking only when manim is installed, since without it
+            nothing can be rendered either way.
+
+    Returns:
+        List of findings, in source order
+
+    Raises:
+        SyntaxError: If ``code`` does not parse and no tree is given
+    """
+    if tree is None:
+        tree = ast.parse(code)
+    if symbols is None:
+        symbols = load_manim_symbols(_symbols_cache_dir)
+    if check_latex is None:
+        check_latex = symbols is not None and not latex_available()
+
+    findings = _check_deprecated(tree)
+    findings += _check_undefined_names(tree, symbols)
+    if symbols is not None:
+        findings += _check_manim_imports(tree, symbols)
+        findings += _check_method_calls(tree, symbols)
+        findings += _check_scene_calls(tree, symbols)
+    if check_latex:
+        findings += _check_latex(tree)
+    findings += _check_parallel_reuse(tree)
+
+    findings.sort(key=lambda f: f.line or 0)
+    return findings
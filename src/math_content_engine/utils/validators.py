@@ -6,6 +6,8 @@ import ast
 import re
 from dataclasses import dataclass, field
 
+from .manim_analyzer import Finding, analyze_manim_code
+
 
 @dataclass
 class ValidationResult:
@@ -13,6 +15,8 @@ class ValidationResult:
     is_valid: bool
     errors: list[str] = field(default_factory=list)
     warnings: list[str] = field(default_factory=list)
+    # Structured static-analysis findings; also rendered into errors/warnings
+    findings: list[Finding] = field(default_factory=list)
 
 
 def validate_manim_code(code: str) -> ValidationResult:
@@ -25,6 +29,9 @@ def validate_manim_code(code: str) -> ValidationResult:
     - Has a Scene class
     - Has construct method
     - Uses self.play() calls
+    - Static analysis of the AST (see analyze_manim_code): removed APIs,
+      undefined names, APIs missing from the installed Manim, LaTeX
+      without a LaTeX install, one mobject animated twice in a play()
 
     Args:
         code: Python code string
@@ -44,7 +51,7 @@ def validate_manim_code(code: str) -> ValidationResult:
 
     # Check Python syntax
     try:
-        ast.parse(code)
+        tree = ast.parse(code)
     except SyntaxError as e:
         return ValidationResult(
             is_valid=False,
@@ -79,10 +86,15 @@ def validate_manim_code(code: str) -> ValidationResult:
     if 'plt.show()' in code:
         warnings.append("Code contains plt.show() which may interfere with rendering")
 
+    findings = analyze_manim_code(code, tree=tree)
+    for finding in findings:
+        (errors if finding.severity == "error" else warnings).append(str(finding))
+
     return ValidationResult(
         is_valid=len(errors) == 0,
         errors=errors,
         warnings=warnings,
+        findings=findings,
     )
 
 
@@ -64,23 +64,11 @@ async def mark_request_status(
             logger.exception("Failed to update request %s to %s", request_id, status)
 
 
-def generate_video_sync(
-    concept_id: str,
-    topic: str,
-    theme: str,
-    grade: str,
-    mastery_context: dict | None = None,
-) -> dict:
-    """
-    Generate a video using the local MathContentEngine.
-
-    This is a SYNC function (CPU-bound Manim rendering). Must be called
-    via ``asyncio.to_thread()`` to avoid blocking the event loop.
-
-    Returns dict with keys: success, video_id, video_path, scene_name, code, error_message.
-    """
+def _build_engine(theme: str):
+    """Create a MathContentEngine for *theme*; returns (engine, interest)."""
     from math_content_engine.config import Config
     from math_content_engine.engine import MathContentEngine
+    from math_content_engine.llm import get_llm_client
     from math_content_engine.api.storage import VideoStorage
     from math_content_engine.personalization.theme_mapper import theme_to_interest
     from pathlib import Path
@@ -102,7 +90,38 @@ def generate_video_sync(
         interest=interest if interest != "neutral" else None,
         storage=storage,
         tutor_writer=tutor_writer,
+        llm_client=get_llm_client(config),
     )
+    return engine, interest
+
+
+def _result_dict(result) -> dict:
+    return {
+        "success": result.success,
+        "video_id": result.video_id,
+        "video_path": str(result.video_path) if result.video_path else None,
+        "scene_name": result.scene_name,
+        "code": result.code,
+        "error_message": result.error_message,
+    }
+
+
+def generate_video_sync(
+    concept_id: str,
+    topic: str,
+    theme: str,
+    grade: str,
+    mastery_context: dict | None = None,
+) -> dict:
+    """
+    Generate a video using the local MathContentEngine.
+
+    This is a SYNC function (CPU-bound Manim rendering). From async code
+    use ``generate_video()`` instead.
+
+    Returns dict with keys: success, video_id, video_path, scene_name, code, error_message.
+    """
+    engine, interest = _build_engine(theme)
 
     # Adapt topic from concept_id if not provided
     if not topic:
@@ -115,15 +134,35 @@ def generate_video_sync(
         concept_ids=[concept_id],
         grade=grade,
     )
+    return _result_dict(result)
 
-    return {
-        "success": result.success,
-        "video_id": result.video_id,
-        "video_path": str(result.video_path) if result.video_path else None,
-        "scene_name": result.scene_name,
-        "code": result.code,
-        "error_message": result.error_message,
-    }
+
+async def generate_video(
+    concept_id: str,
+    topic: str,
+    theme: str,
+    grade: str,
+    mastery_context: dict | None = None,
+) -> dict:
+    """
+    Async variant of ``generate_video_sync()``.
+
+    LLM calls are awaited on the event loop; only engine setup and Manim
+    rendering run in worker threads.
+    """
+    engine, interest = await asyncio.to_thread(_build_engine, theme)
+
+    if not topic:
+        topic = concept_id.replace("-", " ").replace("_", " ")
+
+    result = await engine.agenerate(
+        topic=topic,
+        requirements="",
+        interest=interest if interest != "neutral" else None,
+        concept_ids=[concept_id],
+        grade=grade,
+    )
+    return _result_dict(result)
 
 
 async def publish_result(
@@ -187,10 +226,7 @@ async def process_one(tutor_api_url: str, request: dict) -> None:
     await mark_request_status(tutor_api_url, request_id, "in_progress")
 
     try:
-        # Run CPU-bound Manim generation in a thread to avoid blocking event loop
-        result = await asyncio.to_thread(
-            generate_video_sync, concept_id, concept_id, theme, grade, mastery_context
-        )
+        result = await generate_video(concept_id, concept_id, theme, grade, mastery_context)
 
         if result["success"]:
             # Publish to Redis stream
@@ -146,3 +146,20 @@ def sample_content_event_data(sample_video_dto_data):
         "timestamp": "2024-01-01T00:00:00Z",
         "payload": sample_video_dto_data,
     }
+
+
+@pytest.fixture
+def fake_manim():
+    """Factory for _run_manim replacements that write a fake video."""
+    from math_content_engine.renderer.manim_renderer import RenderResult
+
+    def make(renderer, payload=b"video-bytes"):
+        def run(script_path, scene_name, cancel_event=None, partial_movie_dir=None):
+            output = renderer.cache_dir / "videos" / f"{scene_name}.mp4"
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_bytes(payload)
+            return RenderResult(success=True, output_path=output)
+
+        return run
+
+    return make
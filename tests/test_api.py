@@ -3,8 +3,10 @@ Tests for the Video Retrieval API.
 """
 
 import pytest
+import sqlite3
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
 
 from math_content_engine.api.models import (
     VideoCreate,
@@ -164,6 +166,382 @@ class TestVideoStorage:
         assert stats["failed_videos"] == 1
         assert stats["by_interest"].get("basketball") == 2
 
+    def test_stats_rollup_follows_writes(self, storage, sample_video):
+        """The rollup matches a full recount after saves, updates and deletes."""
+        videos = storage.save_many([
+            sample_video.model_copy(update={
+                "grade": "grade_7" if i % 2 else "grade_8",
+                "llm_model": "model-a" if i < 3 else "model-b",
+                "input_tokens": 100,
+                "output_tokens": 10,
+                "generation_time_ms": 1000 * (i + 1),
+                "render_time_ms": None if i == 0 else 500,
+            })
+            for i in range(5)
+        ])
+        storage.update(videos[0].id, success=0, interest="music", llm_model="model-b")
+        storage.delete(videos[1].id)
+
+        stats = storage.get_stats()
+        assert stats["total_videos"] == 4
+        assert stats["failed_videos"] == 1
+        assert stats["by_interest"] == {"basketball": 3, "music": 1}
+        assert stats["by_grade"] == {"grade_7": 1, "grade_8": 3}
+        assert stats["by_provider"] == {"claude": 4}
+        assert stats["avg_generation_time_ms"] == (1000 + 3000 + 4000 + 5000) / 4
+        assert stats["avg_render_time_ms"] == 500
+        assert stats["total_input_tokens"] == 400
+        model_b = stats["by_model"]["model-b"]
+        assert (model_b["videos"], model_b["successful"]) == (3, 2)
+        assert model_b["output_tokens"] == 30
+        assert stats["by_model"]["model-a"]["avg_generation_time_ms"] == 3000
+
+    def test_stats_rollup_backfilled(self, temp_db, sample_video):
+        """Databases created before the rollup get it built on open."""
+        import sqlite3
+
+        storage = VideoStorage(temp_db)
+        storage.save_many([sample_video] * 3)
+        storage.close()
+        conn = sqlite3.connect(temp_db)
+        conn.execute("DROP TABLE video_stats")
+        conn.commit()
+        conn.close()
+
+        stats = VideoStorage(temp_db).get_stats()
+        assert stats["total_videos"] == 3
+        assert stats["by_interest"] == {"basketball": 3}
+        assert stats["avg_generation_time_ms"] == 1500
+
+    def test_wal_mode_and_connection_reuse(self, storage):
+        """The database runs in WAL mode and each thread reuses one connection."""
+        conn = storage._get_connection()
+        assert conn is storage._get_connection()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+    def test_concurrent_writes_and_reads(self, storage, sample_video):
+        """Threads write and read concurrently without "database is locked"."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        def work(i):
+            saved = storage.save(sample_video.model_copy(update={"topic": f"Topic {i}"}))
+            return storage.get_by_id(saved.id).topic
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            topics = list(pool.map(work, range(40)))
+
+        assert topics == [f"Topic {i}" for i in range(40)]
+        assert storage.list_videos()[1] == 40
+        storage.close()
+        assert storage.get_stats()["total_videos"] == 40
+
+    def test_keyset_pagination_visits_every_row_once(self, storage, sample_video):
+        """Following next_cursor returns every video once, newest first."""
+        saved = [storage.save(sample_video) for _ in range(7)]
+
+        seen = []
+        params = VideoSearchParams(page_size=3, include_total=False)
+        while True:
+            page = storage.list_videos_page(params)
+            assert page.total is None
+            seen += [v.id for v in page.videos]
+            if not page.has_more:
+                break
+            params = params.model_copy(update={"cursor": page.next_cursor})
+
+        assert sorted(seen) == sorted(v.id for v in saved)
+        assert len(seen) == 7
+
+    def test_invalid_cursor(self, storage):
+        with pytest.raises(ValueError):
+            storage.list_videos_page(VideoSearchParams(cursor="not-a-cursor"))
+
+    def test_cached_counts_follow_writes(self, storage, sample_video):
+        """Totals stay correct after saves and deletes without recounting."""
+        basketball = VideoSearchParams(interest="basketball")
+        music = VideoSearchParams(interest="music")
+        assert storage.list_videos(basketball)[1] == 0
+        assert storage.list_videos(music)[1] == 0
+
+        first = storage.save(sample_video)
+        storage.save(sample_video)
+        storage.save(sample_video.model_copy(update={"interest": "music"}))
+        assert storage.list_videos(basketball)[1] == 2
+        assert storage.list_videos(music)[1] == 1
+
+        storage.delete(first.id)
+        assert storage.list_videos(basketball)[1] == 1
+        assert storage.list_videos(music)[1] == 1
+
+        storage.update(first.id)  # no-op update leaves counts alone
+        storage.update(storage.list_videos(music)[0][0].id, interest="basketball")
+        assert storage.list_videos(basketball)[1] == 2
+        assert storage.list_videos(music)[1] == 0
+
+    def test_cached_counts_match_equality_filters_in_python(self, storage, sample_video):
+        """Concept, grade and success filters follow writes; LIKE filters are not cached."""
+        by_concept = VideoSearchParams(concept_id="c1", grade="8")
+        failed_too = VideoSearchParams(concept_id="c1", success_only=False)
+        by_topic = VideoSearchParams(topic="Pythag")
+        for params in (by_concept, failed_too, by_topic):
+            assert storage.list_videos(params)[1] == 0
+
+        video = storage.save(sample_video.model_copy(update={"concept_ids": ["c1"], "grade": "8"}))
+        storage.save(sample_video.model_copy(update={"concept_ids": ["c1"], "success": False}))
+        storage.save(sample_video.model_copy(update={"concept_ids": ["c2"], "grade": "8"}))
+        assert storage.list_videos(by_concept)[1] == 1
+        assert storage.list_videos(failed_too)[1] == 2
+        assert storage.list_videos(by_topic)[1] == 2
+
+        storage.delete(video.id)
+        assert storage.list_videos(by_concept)[1] == 0
+        assert storage.list_videos(failed_too)[1] == 1
+
+        with storage._get_connection() as conn:
+            keys = [r["filter_key"] for r in conn.execute("SELECT filter_key FROM video_counts")]
+        assert len(keys) == 2
+        assert not any("topic" in key for key in keys)
+
+    def test_update_adjusts_counts_instead_of_dropping_them(self, storage, sample_video):
+        """Updates move a row between cached counts; other keys stay cached."""
+        basketball = VideoSearchParams(interest="basketball")
+        music = VideoSearchParams(interest="music")
+        video = storage.save(sample_video)
+        assert storage.list_videos(basketball)[1] == 1
+        assert storage.list_videos(music)[1] == 0
+
+        storage.update(video.id, topic="Renamed")
+        storage.update(video.id, interest="music")
+
+        with patch.object(VideoStorage, "_count", side_effect=AssertionError("recounted")):
+            assert storage.list_videos(basketball)[1] == 0
+            assert storage.list_videos(music)[1] == 1
+
+    def test_count_miss_does_not_wait_for_the_write_lock(self, storage, sample_video):
+        """A read that misses the cache counts without the lock and skips caching."""
+        storage.save(sample_video)
+        writer = sqlite3.connect(str(storage.db_path))
+        writer.execute("BEGIN IMMEDIATE")
+        try:
+            assert storage.list_videos(VideoSearchParams(interest="basketball"))[1] == 1
+        finally:
+            writer.rollback()
+            writer.close()
+
+        with storage._get_connection() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM video_counts").fetchone()[0] == 0
+
+    def test_count_is_not_cached_across_a_write(self, storage, sample_video):
+        """A count taken before a save finished is not stored."""
+        params = VideoSearchParams(interest="basketball")
+        count = VideoStorage._count
+
+        def count_then_save(conn, conditions, values):
+            total = count(conn, conditions, values)
+            VideoStorage(storage.db_path).save(sample_video)
+            return total
+
+        with patch.object(VideoStorage, "_count", side_effect=count_then_save):
+            assert storage.list_videos(params)[1] == 0
+        assert storage.list_videos(params)[1] == 1
+
+    def test_full_text_search_ranks_topic_matches_first(self, storage, sample_video):
+        """q matches words anywhere in the text fields, best match first."""
+        in_requirements = storage.save(sample_video.model_copy(update={
+            "topic": "Triangles", "requirements": "mention the Pythagorean theorem",
+        }))
+        in_topic = storage.save(sample_video)
+        storage.save(sample_video.model_copy(update={"topic": "Fractions", "requirements": None}))
+
+        videos, total = storage.list_videos(VideoSearchParams(q="pythag theorem"))
+        assert [v.id for v in videos] == [in_topic.id, in_requirements.id]
+        assert total == 2
+
+    def test_full_text_search_code_is_opt_in(self, storage, sample_video):
+        storage.save(sample_video)
+        assert storage.list_videos(VideoSearchParams(q="manim"))[1] == 0
+        assert storage.list_videos(VideoSearchParams(q="manim", search_code=True))[1] == 1
+
+    def test_search_index_follows_updates_and_deletes(self, storage, sample_video):
+        video = storage.save(sample_video)
+        storage.update(video.id, topic="Circle area")
+        assert storage.list_videos(VideoSearchParams(q="circle"))[1] == 1
+        assert storage.list_videos(VideoSearchParams(q="theorem"))[1] == 0
+
+        storage.delete(video.id)
+        assert storage.list_videos(VideoSearchParams(q="circle"))[1] == 0
+
+    def test_search_syntax_is_sanitized(self, storage, sample_video):
+        """FTS operators and quotes in user input do not raise."""
+        storage.save(sample_video)
+        videos, _ = storage.list_videos(VideoSearchParams(q='"Pythagorean (theorem" -*'))
+        assert len(videos) == 1
+        assert storage.list_videos(VideoSearchParams(q="***"))[1] == 1
+
+
+    def test_identical_code_is_stored_once(self, storage, sample_video):
+        first = storage.save(sample_video)
+        second = storage.save(sample_video)
+        conn = storage._get_connection()
+        assert conn.execute("SELECT COUNT(*) FROM code_blobs").fetchone()[0] == 1
+
+        storage.delete(first.id)
+        assert storage.get_code(second.id) == sample_video.code
+        storage.delete(second.id)
+        assert conn.execute("SELECT COUNT(*) FROM code_blobs").fetchone()[0] == 0
+        assert storage.list_videos(VideoSearchParams(q="manim", search_code=True))[1] == 0
+
+    def test_code_is_loaded_only_on_request(self, storage, sample_video):
+        """List results and include_code=False skip the code blob."""
+        video = storage.save(sample_video)
+        assert storage.list_videos()[0][0].code == ""
+        assert storage.get_by_id(video.id, include_code=False).code == ""
+        assert storage.get_by_id(video.id).code == sample_video.code
+
+        storage.update(video.id, code="class Other(Scene):\n    pass")
+        assert storage.get_code(video.id) == "class Other(Scene):\n    pass"
+        assert storage.list_videos(VideoSearchParams(q="manim", search_code=True))[1] == 0
+        assert storage.list_videos(VideoSearchParams(q="other", search_code=True))[1] == 1
+
+    def test_inline_code_is_migrated(self, temp_db, sample_video):
+        """Databases with code stored in the videos row are moved to code_blobs."""
+        import sqlite3
+
+        VideoStorage(temp_db).close()
+        conn = sqlite3.connect(temp_db)
+        # A database written before the migration existed
+        conn.execute("PRAGMA user_version = 0")
+        conn.execute(
+            "INSERT INTO videos (id, topic, scene_name, video_path, code, quality, "
+            "created_at, updated_at) VALUES ('legacy', 'Old topic', 'OldScene', '/old.mp4', "
+            "'class OldScene: pass', 'm', '2024-01-01T00:00:00', '2024-01-01T00:00:00')"
+        )
+        conn.commit()
+        conn.close()
+
+        storage = VideoStorage(temp_db)
+        assert storage.get_by_id("legacy").code == "class OldScene: pass"
+        row = storage._get_connection().execute(
+            "SELECT code, code_id FROM videos WHERE id = 'legacy'"
+        ).fetchone()
+        assert row["code"] == "" and row["code_id"] is not None
+        assert storage.list_videos(VideoSearchParams(q="oldscene", search_code=True))[1] == 1
+
+    def test_inline_code_migration_runs_once(self, temp_db):
+        """Once migrated, opening the database skips the inline code scan."""
+        VideoStorage(temp_db).close()
+        with patch.object(VideoStorage, "_store_code") as store_code:
+            conn = sqlite3.connect(temp_db)
+            conn.execute(
+                "INSERT INTO videos (id, topic, scene_name, video_path, code, quality, "
+                "created_at, updated_at) VALUES ('late', 'Topic', 'Scene', '/v.mp4', "
+                "'class Scene: pass', 'm', '2024-01-01T00:00:00', '2024-01-01T00:00:00')"
+            )
+            conn.commit()
+            conn.close()
+            VideoStorage(temp_db).close()
+        store_code.assert_not_called()
+
+
+    def test_save_many(self, storage, sample_video):
+        """Bulk saves span several chunks and keep cached counts exact."""
+        basketball = VideoSearchParams(interest="basketball")
+        assert storage.list_videos(basketball)[1] == 0
+
+        videos = [
+            sample_video.model_copy(update={"topic": f"Topic {i}", "interest": interest})
+            for i, interest in enumerate(["basketball", "music"] * 6)
+        ]
+        saved = storage.save_many(videos, chunk_size=5)
+
+        assert [v.topic for v in saved] == [v.topic for v in videos]
+        assert storage.list_videos(basketball)[1] == 6
+        assert storage.list_videos()[1] == 12
+        assert storage.get_by_id(saved[-1].id).code == sample_video.code
+        conn = storage._get_connection()
+        assert conn.execute("SELECT COUNT(*) FROM code_blobs").fetchone()[0] == 1
+
+
+    def test_concept_filter_follows_writes(self, storage, sample_video):
+        two_step = "algebra.pre_algebra.two_step_equations"
+        params = VideoSearchParams(concept_id=two_step)
+        video = storage.save(sample_video.model_copy(update={"concept_ids": [two_step]}))
+        storage.save(sample_video.model_copy(update={"concept_ids": ["geometry.angles"]}))
+        assert [v.id for v in storage.list_videos(params)[0]] == [video.id]
+
+        storage.update(video.id, concept_ids=["geometry.angles"])
+        assert storage.list_videos(params)[1] == 0
+        assert storage.get_by_id(video.id).concept_ids == ["geometry.angles"]
+
+        storage.update(video.id, concept_ids=[two_step])
+        storage.delete(video.id)
+        assert storage.list_videos(params)[1] == 0
+        conn = storage._get_connection()
+        assert conn.execute("SELECT COUNT(*) FROM video_concepts").fetchone()[0] == 1
+
+    def test_best_videos_for_concepts(self, storage, sample_video):
+        """One lookup picks a video per concept, preferring the interest."""
+        def save(concept, **update):
+            return storage.save(sample_video.model_copy(update={"concept_ids": [concept], **update}))
+
+        save("a", quality=VideoQuality.LOW)
+        best_a = save("a", quality=VideoQuality.HIGH)
+        music_a = save("a", quality=VideoQuality.LOW, interest="music")
+        best_b = save("b")
+        save("c", success=False)
+
+        best = storage.best_videos_for_concepts(["b", "a", "c", "missing"])
+        assert list(best) == ["b", "a"]
+        assert (best["a"].id, best["b"].id) == (best_a.id, best_b.id)
+        assert storage.best_videos_for_concepts(["a"], interest="music")["a"].id == music_a.id
+
+
+class TestAsyncVideoStorage:
+    """Tests for the async storage facade."""
+
+    def test_calls_run_off_the_event_loop(self, storage, sample_video):
+        """Storage calls run on the pool while the loop keeps serving tasks."""
+        import asyncio
+        import threading
+        import time
+
+        from math_content_engine.api.async_storage import AsyncVideoStorage
+
+        async_storage = AsyncVideoStorage(storage, max_workers=2)
+        loop_thread = threading.get_ident()
+        threads = []
+        original = storage.get_by_id
+
+        def slow_get(*args, **kwargs):
+            threads.append(threading.get_ident())
+            time.sleep(0.2)
+            return original(*args, **kwargs)
+
+        storage.get_by_id = slow_get
+
+        async def main():
+            saved = await async_storage.save(sample_video)
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            task = asyncio.create_task(ticker())
+            videos = await asyncio.gather(*(async_storage.get_by_id(saved.id) for _ in range(4)))
+            task.cancel()
+            return saved, videos, ticks
+
+        saved, videos, ticks = asyncio.run(main())
+        async_storage.close()
+
+        assert [v.id for v in videos] == [saved.id] * 4
+        assert loop_thread not in threads and len(set(threads)) == 2
+        assert ticks > 10
+
 
 class TestVideoModels:
     """Tests for Pydantic models."""
@@ -238,6 +616,61 @@ class TestAPIEndpoints:
         assert response.status_code == 200
         assert response.json()["topic"] == sample_video.topic
 
+    def test_create_videos_bulk(self, client, sample_video):
+        payload = [
+            sample_video.model_copy(update={"topic": f"Topic {i}"}).model_dump()
+            for i in range(3)
+        ]
+        response = client.post("/api/v1/videos/bulk", json=payload)
+        assert response.status_code == 201
+        created = response.json()
+        assert [v["topic"] for v in created] == ["Topic 0", "Topic 1", "Topic 2"]
+
+        response = client.get(f"/api/v1/videos/{created[1]['id']}")
+        assert response.json()["topic"] == "Topic 1"
+
+    def test_create_videos_bulk_is_all_or_nothing(self, client, sample_video):
+        """A failed bulk request saves no records, so it can be retried."""
+        payload = [sample_video.model_dump()] * 3
+        with patch.object(
+            VideoStorage, "_index_concepts", side_effect=sqlite3.OperationalError("disk I/O")
+        ):
+            with pytest.raises(sqlite3.OperationalError):
+                client.post("/api/v1/videos/bulk", json=payload)
+        assert client.get("/api/v1/videos").json()["total"] == 0
+
+    def test_create_videos_bulk_limits_size(self, client, sample_video):
+        from math_content_engine.api.routes import MAX_BULK_VIDEOS
+
+        payload = [sample_video.model_dump()] * (MAX_BULK_VIDEOS + 1)
+        response = client.post("/api/v1/videos/bulk", json=payload)
+        assert response.status_code == 413
+        assert client.get("/api/v1/videos").json()["total"] == 0
+
+    def test_cursor_with_search_is_rejected(self, client, sample_video):
+        """A cursor from a plain listing cannot be reused once q is added."""
+        for i in range(3):
+            client.post("/api/v1/videos", json=sample_video.model_copy(
+                update={"topic": f"Pythagorean {i}"}).model_dump())
+        cursor = client.get("/api/v1/videos?page_size=1").json()["next_cursor"]
+        assert cursor
+
+        response = client.get(f"/api/v1/videos?q=pythagorean&cursor={cursor}")
+        assert response.status_code == 400
+        assert "cursor" in response.json()["detail"]
+
+    def test_videos_by_concepts(self, client, sample_video):
+        for concept in ("a", "b"):
+            client.post("/api/v1/videos", json=sample_video.model_copy(
+                update={"concept_ids": [concept]}).model_dump())
+
+        response = client.get("/api/v1/videos/by-concepts?concept_id=a&concept_id=b&concept_id=c")
+        assert response.status_code == 200
+        assert sorted(response.json()) == ["a", "b"]
+
+        response = client.get("/api/v1/videos?concept_id=a")
+        assert len(response.json()["videos"]) == 1
+
     def test_get_video_not_found(self, client):
         """Test getting a nonexistent video."""
         response = client.get("/api/v1/videos/nonexistent-id")
@@ -256,6 +689,28 @@ class TestAPIEndpoints:
         assert data["total"] == 3
         assert len(data["videos"]) == 3
 
+    def test_list_videos_with_cursor(self, client, sample_video):
+        """The list endpoint pages by cursor and can skip the total."""
+        for _ in range(3):
+            client.post("/api/v1/videos", json=sample_video.model_dump())
+
+        data = client.get("/api/v1/videos?page_size=2&include_total=false").json()
+        assert data["total"] is None
+        assert data["has_more"] is True
+
+        data = client.get(f"/api/v1/videos?page_size=2&cursor={data['next_cursor']}").json()
+        assert len(data["videos"]) == 1
+        assert data["has_more"] is False
+        assert data["next_cursor"] is None
+
+        assert client.get("/api/v1/videos?cursor=bogus").status_code == 400
+
+    def test_list_videos_search(self, client, sample_video):
+        client.post("/api/v1/videos", json=sample_video.model_dump())
+        data = client.get("/api/v1/videos?q=pythagorean").json()
+        assert data["total"] == 1
+        assert client.get("/api/v1/videos?q=calculus").json()["total"] == 0
+
     def test_delete_video(self, client, sample_video):
         """Test deleting a video."""
         # Create
@@ -0,0 +1,190 @@
+"""Tests for deterministic render-error fixes."""
+
+import ast
+from unittest.mock import patch
+
+from math_content_engine.config import Config
+from math_content_engine.generator import auto_fixer
+from math_content_engine.generator.auto_fixer import (
+    AutoFixer,
+    FixMemory,
+    create_auto_fixer,
+    fingerprint_error,
+)
+from math_content_engine.renderer.manim_renderer import NO_OUTPUT_ERROR
+
+LATEX_ERROR = "RuntimeError: latex error converting to dvi. See log output above"
+
+TRACEBACK = '''Traceback (most recent call last):
+  File "/tmp/jobs/job_abc/scene.py", line 12, in construct
+    self.play(ShowCreation(circle))
+NameError: name 'ShowCreation' is not defined'''
+
+
+class TestFingerprint:
+    """Tests for fingerprint_error."""
+
+    def test_masks_values_and_extracts_api(self):
+        """Only the exception line counts; values are masked."""
+        fp = fingerprint_error(TRACEBACK)
+        assert fp.exc_type == "NameError"
+        assert fp.template == "name '<*>' is not defined"
+        assert fp.api == "ShowCreation"
+
+    def test_same_error_in_other_scene_has_same_key(self):
+        """Line numbers and paths do not change the fingerprint."""
+        other = TRACEBACK.replace("line 12", "line 40").replace("job_abc", "job_xyz")
+        assert fingerprint_error(other).key == fingerprint_error(TRACEBACK).key
+
+    def test_attribute_error_api_includes_class(self):
+        fp = fingerprint_error("AttributeError: 'Axes' object has no attribute 'get_graph'")
+        assert fp.api == "Axes.get_graph"
+
+    def test_empty_message(self):
+        assert fingerprint_error("") is None
+
+
+class TestRules:
+    """Tests for the built-in rewrite rules."""
+
+    def test_renames_deprecated_animation(self):
+        code = (
+            "from manim import *\n\n"
+            "class Demo(Scene):\n"
+            "    def construct(self):\n"
+            "        circle = Circle()\n"
+            "        self.play(ShowCreation(circle))\n"
+        )
+        fix = AutoFixer().fix(code, TRACEBACK)
+        assert fix.source == "rule:rename-deprecated"
+        assert "self.play(Create(circle))" in fix.code
+        assert "ShowCreation" not in fix.code
+
+    def test_renames_removed_method(self):
+        code = "axes = Axes()\ngraph = axes.get_graph(lambda x: x ** 2, color=BLUE)\n"
+        fix = AutoFixer().fix(code, "AttributeError: 'Axes' object has no attribute 'get_graph'")
+        assert fix.code == "axes = Axes()\ngraph = axes.plot(lambda x: x ** 2, color=BLUE)\n"
+
+    def test_latex_failure_replaces_axis_labels_and_plain_tex(self):
+        """Missing LaTeX moves plain-text labels to Text; real formulas are kept."""
+        code = (
+            "labels = axes.get_axis_labels(x_label='x', y_label='f(x)')\n"
+            "title = Tex('Area', font_size=40)\n"
+            "formula = MathTex(r'\\frac{1}{2}')\n"
+            "terms = MathTex('x^2 - y_1')\n"
+        )
+        with patch.object(auto_fixer, "latex_available", return_value=False):
+            fix = AutoFixer().fix(code, LATEX_ERROR)
+        assert fix.source == "rule:latex-to-text"
+        assert "axes.get_axis_labels(x_label=Text('x'), y_label=Text('f(x)'))" in fix.code
+        assert "title = Text('Area', font_size=40)" in fix.code
+        assert "MathTex(r'\\frac{1}{2}')" in fix.code
+        assert "MathTex('x^2 - y_1')" in fix.code
+
+    def test_latex_compile_error_is_not_rewritten(self):
+        """With LaTeX installed, a malformed expression is left to the LLM fix."""
+        code = (
+            "bad = MathTex(r'\\fracc{1}{2}')\n"
+            "good = MathTex('x^2 - y_1')\n"
+            "title = Tex('Area')\n"
+        )
+        with patch.object(auto_fixer, "latex_available", return_value=True):
+            assert AutoFixer().fix(code, LATEX_ERROR) is None
+
+    def test_latex_failure_adds_default_axis_labels(self):
+        fix = AutoFixer().fix(
+            "labels = axes.get_axis_labels()\n",
+            "FileNotFoundError: [Errno 2] No such file or directory: 'latex'",
+        )
+        assert "get_axis_labels(x_label=Text('x'), y_label=Text('y'))" in fix.code
+
+    def test_no_output_appends_wait(self):
+        code = (
+            "class Demo(Scene):\n"
+            "    def construct(self):\n"
+            "        self.add(Circle())\n"
+            "\n"
+            "    def helper(self):\n"
+            "        pass\n"
+        )
+        fix = AutoFixer().fix(code, NO_OUTPUT_ERROR)
+        assert "        self.add(Circle())\n        self.wait()\n" in fix.code
+        ast.parse(fix.code)
+
+    def test_unknown_error_is_not_fixed(self):
+        fixer = AutoFixer()
+        assert fixer.fix("x = 1\n", "ValueError: bad value 3") is None
+        assert fixer.stats()["misses"] == 1
+
+
+class TestFixMemory:
+    """Tests for learned LLM fixes."""
+
+    BEFORE = (
+        "class Demo(Scene):\n"
+        "    def construct(self):\n"
+        "        dot = Dot()\n"
+        "        self.play(dot.move_along(path))\n"
+    )
+    AFTER = (
+        "class Demo(Scene):\n"
+        "    def construct(self):\n"
+        "        dot = Dot()\n"
+        "        self.play(MoveAlongPath(dot, path))\n"
+    )
+    ERROR = "AttributeError: 'Dot' object has no attribute 'move_along'"
+
+    def test_learned_fix_is_replayed_on_other_code(self, tmp_path):
+        """A learned fix applies wherever its lines recur, at any indentation."""
+        fixer = AutoFixer(FixMemory(tmp_path / "fixes.db"))
+        fixer.learn(self.ERROR, self.BEFORE, self.AFTER)
+
+        other = (
+            "class Other(Scene):\n"
+            "    def construct(self):\n"
+            "        for path in paths:\n"
+            "            self.play(dot.move_along(path))\n"
+        )
+        fix = fixer.fix(other, self.ERROR)
+        assert fix.source == "memory"
+        assert "            self.play(MoveAlongPath(dot, path))\n" in fix.code
+
+    def test_failing_fix_stops_replaying(self, tmp_path):
+        fixer = AutoFixer(FixMemory(tmp_path / "fixes.db"))
+        fixer.learn(self.ERROR, self.BEFORE, self.AFTER)
+        fix = fixer.fix(self.BEFORE, self.ERROR)
+        fixer.report(fix, success=False)
+        assert fixer.fix(self.BEFORE, self.ERROR) is None
+
+    def test_large_rewrites_are_not_learned(self, tmp_path):
+        memory = FixMemory(tmp_path / "fixes.db")
+        after = "\n".join(f"line_{i} = {i}" for i in range(40)) + "\n"
+        assert memory.record("key", self.BEFORE, after) == 0
+        assert len(memory) == 0
+
+
+class TestCreateAutoFixer:
+    """Tests for create_auto_fixer."""
+
+    def test_disabled(self, monkeypatch):
+        monkeypatch.setenv("MATH_ENGINE_AUTO_FIX", "false")
+        assert create_auto_fixer(Config()) is None
+
+    def test_memory_enabled(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("MATH_ENGINE_FIX_MEMORY", "true")
+        monkeypatch.setenv("MATH_ENGINE_FIX_MEMORY_PATH", str(tmp_path / "fixes.db"))
+        fixer = create_auto_fixer(Config())
+        assert fixer.memory is not None
+        assert (tmp_path / "fixes.db").exists()
+
+    def test_memory_is_shared_per_path(self, monkeypatch, tmp_path):
+        """Engines built per request reuse one FixMemory connection per path."""
+        monkeypatch.setenv("MATH_ENGINE_FIX_MEMORY", "true")
+        monkeypatch.setenv("MATH_ENGINE_FIX_MEMORY_PATH", str(tmp_path / "fixes.db"))
+        first = create_auto_fixer(Config())
+        second = create_auto_fixer(Config())
+        assert first is not second
+        assert first.memory is second.memory
+
+        monkeypatch.setenv("MATH_ENGINE_FIX_MEMORY_PATH", str(tmp_path / "other.db"))
+        assert create_auto_fixer(Config()).memory is not first.memory
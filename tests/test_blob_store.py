@@ -0,0 +1,136 @@
+"""Tests for the content-addressed video blob store."""
+
+import hashlib
+import os
+import time
+from unittest.mock import patch
+
+from math_content_engine.api.models import VideoCreate
+from math_content_engine.api.storage import VideoStorage
+from math_content_engine.config import Config, VideoQuality
+from math_content_engine.renderer.blob_store import BlobStore, create_blob_store
+from math_content_engine.renderer.manim_renderer import ManimRenderer
+
+CODE = """from manim import *
+
+class BlobScene(Scene):
+    def construct(self):
+        self.play(Create(Square()))
+"""
+
+HOUR = 3600
+
+
+def _age(path, seconds):
+    stamp = time.time() - seconds
+    os.utime(path, (stamp, stamp))
+
+
+class TestBlobStore:
+    """Tests for BlobStore."""
+
+    def test_identical_content_is_stored_once(self, tmp_path):
+        store = BlobStore(tmp_path / "blobs")
+        first = tmp_path / "a.mp4"
+        second = tmp_path / "b.mp4"
+        first.write_bytes(b"same")
+        second.write_bytes(b"same")
+
+        digest, blob = store.put(first)
+        assert store.put(second, move=True) == (digest, blob)
+
+        assert digest == hashlib.sha256(b"same").hexdigest()
+        assert store.contains(digest, ".mp4")
+        assert first.exists() and not second.exists()
+        assert store.stats()["blobs"] == 1
+        assert store.stats()["deduplicated"] == 1
+
+    def test_gc_keeps_linked_and_referenced_blobs(self, tmp_path):
+        """Only blobs with no output link and no database reference go."""
+        store = BlobStore(tmp_path / "blobs")
+        blobs = {}
+        for name in ("linked", "referenced", "orphan", "recent"):
+            source = tmp_path / f"{name}.mp4"
+            source.write_bytes(name.encode())
+            blobs[name] = store.put(source, move=True)
+        store.link(blobs["linked"][1], tmp_path / "output.mp4")
+        for name in ("linked", "referenced", "orphan"):
+            _age(blobs[name][1], 2 * HOUR)
+
+        assert store.gc(referenced=[blobs["referenced"][0]]) == 1
+        assert not blobs["orphan"][1].exists()
+        assert all(blobs[n][1].exists() for n in ("linked", "referenced", "recent"))
+
+        (tmp_path / "output.mp4").unlink()
+        assert store.gc(grace_seconds=0) == 3
+
+    def test_cross_filesystem_outputs_are_copies_that_survive_gc(self, tmp_path):
+        """Without hardlinks an output is a copy, never a symlink gc() could break."""
+        store = BlobStore(tmp_path / "blobs")
+        source = tmp_path / "video.mp4"
+        source.write_bytes(b"video")
+        _, blob = store.put(source, move=True)
+        output = tmp_path / "output.mp4"
+
+        with patch("os.link", side_effect=OSError("cross-device link")):
+            store.link(blob, output)
+
+        assert not output.is_symlink()
+        assert store.is_linked(output, blob)
+        _age(blob, 2 * HOUR)
+        assert store.gc() == 1
+        assert output.read_bytes() == b"video"
+
+    def test_create_blob_store(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("MATH_ENGINE_BLOB_STORE_DIR", str(tmp_path / "blobs"))
+        assert create_blob_store(Config()) is None
+
+        monkeypatch.setenv("MATH_ENGINE_BLOB_STORE", "true")
+        assert create_blob_store(Config()).root == tmp_path / "blobs"
+
+
+class TestRendererIntegration:
+    """Tests for ManimRenderer outputs linked into the blob store."""
+
+    def test_outputs_are_links_to_one_blob(self, tmp_path, fake_manim):
+        store = BlobStore(tmp_path / "blobs")
+        renderer = ManimRenderer(
+            output_dir=tmp_path / "output",
+            cache_dir=tmp_path / "cache",
+            quality=VideoQuality.LOW,
+            blob_store=store,
+        )
+
+        with patch.object(renderer, "_run_manim", side_effect=fake_manim(renderer)):
+            first = renderer.render(CODE, "BlobScene", output_filename="lesson")
+            again = renderer.render(CODE, "BlobScene", output_filename="lesson")
+            variant = renderer.render(CODE, "BlobScene", output_filename="variant")
+
+        # Re-rendering identical content reuses the existing output name
+        assert again.output_path == first.output_path
+        assert variant.output_path.name == "variant.mp4"
+        assert first.content_hash == variant.content_hash
+        assert os.path.samefile(first.output_path, variant.output_path)
+        assert store.stats()["blobs"] == 1
+
+        with patch.object(
+            renderer, "_run_manim", side_effect=fake_manim(renderer, b"changed")
+        ):
+            changed = renderer.render(CODE, "BlobScene", output_filename="lesson")
+        assert changed.output_path.name == "lesson_1.mp4"
+        assert changed.content_hash != first.content_hash
+
+    def test_content_hash_is_stored_with_the_video(self, tmp_path):
+        storage = VideoStorage(tmp_path / "videos.db")
+        digest = hashlib.sha256(b"video").hexdigest()
+        video = storage.save(VideoCreate(
+            topic="Squares",
+            scene_name="BlobScene",
+            video_path="/output/lesson.mp4",
+            code=CODE,
+            file_size_bytes=5,
+            content_sha256=digest,
+        ))
+
+        assert storage.get_by_id(video.id).content_sha256 == digest
+        assert storage.referenced_content_hashes() == {digest}
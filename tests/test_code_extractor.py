@@ -5,6 +5,7 @@ from math_content_engine.utils.code_extractor import (
     extract_python_code,
     extract_class_name,
     extract_imports,
+    StreamingCodeExtractor,
 )
 
 
@@ -179,3 +180,57 @@ class TestScene(Scene):
 '''
         imports = extract_imports(code)
         assert len(imports) == 0
+
+
+class TestStreamingCodeExtractor:
+    """Tests for StreamingCodeExtractor."""
+
+    @staticmethod
+    def _feed_all(extractor, text, size=7):
+        """Feed text in small chunks; return how many characters were consumed."""
+        for start in range(0, len(text), size):
+            if extractor.feed(text[start:start + size]):
+                return start + size
+        return len(text)
+
+    def test_stops_at_closing_fence(self):
+        """Trailing prose after the closing fence is never consumed."""
+        code = "from manim import *\n\nclass Demo(Scene):\n    def construct(self):\n        self.wait()"
+        text = f"Here you go:\n```python\n{code}\n```\n" + "Explanation. " * 200
+
+        extractor = StreamingCodeExtractor()
+        consumed = self._feed_all(extractor, text)
+
+        assert extractor.done and not extractor.aborted
+        assert consumed < len(text) // 2
+        assert extractor.code == code
+
+    def test_aborts_when_code_lacks_manim_import(self):
+        """Code without a manim import is abandoned after N lines."""
+        text = "```python\n" + "x = 1\n" * 50 + "```"
+
+        extractor = StreamingCodeExtractor(max_lines_without_import=10)
+        consumed = self._feed_all(extractor, text)
+
+        assert extractor.aborted
+        assert "from manim import" in extractor.abort_reason
+        assert consumed < len(text)
+
+    def test_aborts_on_long_prose_without_code(self):
+        """A response that never opens a code block is abandoned."""
+        text = "I cannot help with that.\n" * 100
+
+        extractor = StreamingCodeExtractor(max_preamble_lines=20)
+        self._feed_all(extractor, text)
+
+        assert extractor.aborted
+
+    def test_unfenced_code_is_read_to_the_end(self):
+        """Raw code without fences is accepted once the stream ends."""
+        code = "from manim import *\n\nclass Demo(Scene):\n    pass\n"
+
+        extractor = StreamingCodeExtractor()
+        self._feed_all(extractor, code)
+
+        assert not extractor.aborted
+        assert extractor.code == code.strip()
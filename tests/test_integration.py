@@ -89,6 +89,71 @@ class PythagoreanTheorem(Scene):
         assert result.scene_name == "PythagoreanTheorem"
 
 
+class TestStreamingGeneration:
+    """Tests for ManimCodeGenerator streaming mode."""
+
+    def test_streaming_stops_reading_after_code_block(self):
+        """The generator stops consuming the stream at the closing fence."""
+        consumed = []
+
+        def stream(prompt, system_prompt=None):
+            for chunk in ["```python\n", VALID_MANIM_CODE, "\n```\n", "Trailing prose", " more"]:
+                consumed.append(chunk)
+                yield chunk
+
+        mock_client = Mock()
+        mock_client.stream.side_effect = stream
+
+        generator = ManimCodeGenerator(mock_client, streaming=True)
+        result = generator.generate("Test topic")
+
+        assert result.validation.is_valid
+        assert result.scene_name == "TestScene"
+        assert "Trailing prose" not in consumed
+        mock_client.generate.assert_not_called()
+
+    def test_streaming_retries_after_early_abort(self):
+        """An aborted stream counts as invalid output and is retried."""
+        responses = iter([
+            ["Sorry, here is some unrelated text.\n" * 60],
+            ["```python\n", VALID_MANIM_CODE, "\n```"],
+        ])
+        prompts = []
+
+        def stream(prompt, system_prompt=None):
+            prompts.append(prompt)
+            yield from next(responses)
+
+        mock_client = Mock()
+        mock_client.stream.side_effect = stream
+
+        generator = ManimCodeGenerator(mock_client, streaming=True)
+        result = generator.generate("Test topic")
+
+        assert result.validation.is_valid
+        assert result.attempts == 2
+        assert "PREVIOUS ATTEMPT FAILED WITH ERROR" in prompts[1]
+
+    @pytest.mark.asyncio
+    async def test_agenerate_streams_with_temperature_override(self):
+        """agenerate honours streaming and the temperature override like generate."""
+        temperatures = []
+
+        def stream(prompt, system_prompt=None, temperature=None):
+            temperatures.append(temperature)
+            yield from ["```python\n", VALID_MANIM_CODE, "\n```"]
+
+        mock_client = Mock()
+        mock_client.stream.side_effect = stream
+
+        generator = ManimCodeGenerator(mock_client, streaming=True)
+        result = await generator.agenerate("Test topic", temperature=0.9)
+
+        assert result.validation.is_valid
+        assert temperatures == [0.9]
+        mock_client.agenerate.assert_not_called()
+
+
 class TestManimRenderer:
     """Tests for Manim rendering."""
 
@@ -114,6 +179,18 @@ class TestManimRenderer:
         assert output_dir.exists()
         assert cache_dir.exists()
 
+    def test_rename_output_claims_requested_name(self, renderer):
+        """rename_output moves a render to the requested name without overwriting."""
+        provisional = renderer.output_dir / "lesson.candidate1.mp4"
+        provisional.write_bytes(b"winner")
+        (renderer.output_dir / "lesson.mp4").write_bytes(b"earlier")
+
+        final = renderer.rename_output(provisional, "lesson")
+
+        assert final == renderer.output_dir / "lesson_1.mp4"
+        assert final.read_bytes() == b"winner"
+        assert not provisional.exists()
+
     @patch("subprocess.run")
     def test_render_success(self, mock_run, renderer, tmp_path):
         """Test successful rendering."""
@@ -148,6 +225,97 @@ class TestManimRenderer:
         assert not result.success
         assert result.error_message is not None
 
+    @staticmethod
+    def _fake_manim_run(cmd, **kwargs):
+        """Write a video where manim would, tagged with the script contents."""
+        script_path = Path(cmd[2])
+        media_dir = Path(cmd[cmd.index("--media_dir") + 1])
+        output = media_dir / "videos" / script_path.stem / "480p15" / f"{cmd[3]}.mp4"
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(script_path.read_text())
+        return Mock(returncode=0, stdout="", stderr="")
+
+    def test_concurrent_renders_of_same_scene_are_isolated(self, renderer):
+        """Parallel renders of one scene name each get their own output."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        codes = [VALID_MANIM_CODE + f"# variant {i}\n" for i in range(8)]
+        with patch("subprocess.run", side_effect=self._fake_manim_run):
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(lambda c: renderer.render(c, "TestScene"), codes))
+
+        assert all(r.success for r in results)
+        assert len({r.output_path for r in results}) == len(codes)
+        for code, result in zip(codes, results):
+            assert result.output_path.read_text() == code
+
+    def test_job_directory_is_removed_after_render(self, renderer):
+        """Per-job media directories do not accumulate in the cache."""
+        with patch("subprocess.run", side_effect=self._fake_manim_run) as mock_run:
+            result = renderer.render(VALID_MANIM_CODE, "TestScene")
+
+        assert result.success
+        cmd = mock_run.call_args[0][0]
+        assert "--config_file" in cmd
+        assert not Path(cmd[cmd.index("--media_dir") + 1]).exists()
+        assert list((renderer.cache_dir / "jobs").iterdir()) == []
+
+    def test_partial_movies_are_kept_across_renders(self, renderer):
+        """Re-renders of a scene share one partial movie directory outside the job."""
+        partial_dirs = []
+
+        def run(cmd, **kwargs):
+            config = Path(cmd[cmd.index("--config_file") + 1]).read_text()
+            partial_dirs.extend(
+                line.split(" = ", 1)[1] for line in config.splitlines()
+                if line.startswith("partial_movie_dir")
+            )
+            return self._fake_manim_run(cmd, **kwargs)
+
+        with patch("subprocess.run", side_effect=run):
+            renderer.render(VALID_MANIM_CODE, "TestScene")
+            renderer.render(VALID_MANIM_CODE + "# fixed\n", "TestScene")
+
+        assert len(partial_dirs) == 2
+        assert partial_dirs[0] == partial_dirs[1]
+        assert Path(partial_dirs[0]).is_dir()
+
+        # A concurrent render of the same scene falls back to its job directory
+        claimed = renderer._claim_partial_movie_dir("Busy")
+        assert renderer._claim_partial_movie_dir("Busy") is None
+        renderer._partial_locks[claimed].release()
+
+    def test_smoke_test_runs_dry_run_at_low_quality(self, tmp_path):
+        """The smoke test runs a dry run at -ql and produces no video."""
+        renderer = ManimRenderer(
+            output_dir=tmp_path / "output",
+            cache_dir=tmp_path / "cache",
+            quality=VideoQuality.HIGH,
+        )
+        with patch("subprocess.run", return_value=Mock(returncode=0, stdout="", stderr="")) as run:
+            result = renderer.smoke_test(VALID_MANIM_CODE, "TestScene")
+
+        assert result.success
+        assert result.output_path is None
+        cmd = run.call_args[0][0]
+        assert "--dry_run" in cmd
+        assert "-ql" in cmd
+        assert list((renderer.cache_dir / "jobs").iterdir()) == []
+
+    def test_cancel_event_kills_running_process(self, renderer):
+        """Setting the cancel event kills the render process promptly."""
+        import threading
+        import time
+
+        from math_content_engine.renderer.manim_renderer import RenderCancelled
+
+        cancel = threading.Event()
+        threading.Timer(0.2, cancel.set).start()
+        start = time.monotonic()
+        with pytest.raises(RenderCancelled):
+            renderer._execute(["sleep", "30"], cancel)
+        assert time.monotonic() - start < 5
+
 
 class TestMathContentEngine:
     """Integration tests for the main engine."""
@@ -207,6 +375,313 @@ class TestMathContentEngine:
         assert result.success
         mock_renderer.render.assert_called_once()
 
+    @patch('math_content_engine.engine.create_llm_client')
+    def test_generate_many_yields_every_spec(self, mock_create_client, mock_config, tmp_path):
+        """generate_many returns one indexed result per spec."""
+        mock_client = Mock()
+        mock_client.generate.return_value = LLMResponse(
+            content=f"```python\n{VALID_MANIM_CODE}\n```",
+            model="test",
+            usage={},
+        )
+        mock_create_client.return_value = mock_client
+
+        def render(code, scene_name, output_filename=None):
+            return RenderResult(success=True, output_path=tmp_path / f"{output_filename}.mp4")
+
+        with patch('math_content_engine.engine.ManimRenderer') as mock_renderer_class:
+            mock_renderer_class.return_value.render.side_effect = render
+            engine = MathContentEngine(mock_config)
+            specs = [{"topic": f"Topic {i}", "output_filename": f"video_{i}"} for i in range(5)]
+            results = dict(engine.generate_many(specs, llm_concurrency=2, render_concurrency=3))
+
+        assert sorted(results) == list(range(5))
+        for index, result in results.items():
+            assert result.success
+            assert result.video_path == tmp_path / f"video_{index}.mp4"
+
+    @patch('math_content_engine.engine.create_llm_client')
+    def test_generate_many_overlaps_generation_and_rendering(
+        self, mock_create_client, mock_config, tmp_path
+    ):
+        """Rendering starts before every LLM call has finished."""
+        import threading
+
+        first_render_started = threading.Event()
+        calls = []
+
+        def generate(*args, **kwargs):
+            calls.append(first_render_started.is_set())
+            if len(calls) > 1:
+                first_render_started.wait(timeout=5)
+            return LLMResponse(
+                content=f"```python\n{VALID_MANIM_CODE}\n```", model="test", usage={}
+            )
+
+        def render(code, scene_name, output_filename=None):
+            first_render_started.set()
+            return RenderResult(success=True, output_path=tmp_path / "out.mp4")
+
+        mock_client = Mock()
+        mock_client.generate.side_effect = generate
+        mock_create_client.return_value = mock_client
+
+        with patch('math_content_engine.engine.ManimRenderer') as mock_renderer_class:
+            mock_renderer_class.return_value.render.side_effect = render
+            engine = MathContentEngine(mock_config)
+            specs = [{"topic": f"Topic {i}"} for i in range(3)]
+            results = list(engine.generate_many(specs, llm_concurrency=1))
+
+        assert len(results) == 3
+        assert first_render_started.is_set()
+        # The last generation ran after the first render had begun
+        assert calls[-1] is True
+
+    @patch('math_content_engine.engine.create_llm_client')
+    def test_generate_many_reports_exceptions_per_item(self, mock_create_client, mock_config):
+        """An exception in one item becomes a failed result, not a crash."""
+        mock_client = Mock()
+        mock_client.generate.side_effect = RuntimeError("provider down")
+        mock_create_client.return_value = mock_client
+
+        with patch('math_content_engine.engine.ManimRenderer'):
+            engine = MathContentEngine(mock_config)
+            results = list(engine.generate_many([{"topic": "A"}, {"topic": "B"}]))
+
+        assert len(results) == 2
+        assert all(not result.success for _, result in results)
+        assert "provider down" in results[0][1].error_message
+
+    @pytest.mark.asyncio
+    @patch('math_content_engine.engine.create_llm_client')
+    async def test_agenerate_awaits_async_llm(self, mock_create_client, mock_config, tmp_path):
+        """agenerate uses the client's async API instead of generate()."""
+        from unittest.mock import AsyncMock
+
+        mock_client = Mock()
+        mock_client.agenerate = AsyncMock(return_value=LLMResponse(
+            content=f"```python\n{VALID_MANIM_CODE}\n```", model="test", usage={},
+        ))
+        mock_create_client.return_value = mock_client
+
+        with patch('math_content_engine.engine.ManimRenderer') as mock_renderer_class:
+            mock_renderer_class.return_value.render.return_value = RenderResult(
+                success=True, output_path=tmp_path / "out.mp4",
+            )
+            engine = MathContentEngine(mock_config)
+            result = await engine.agenerate("Test topic")
+
+        assert result.success
+        mock_client.agenerate.assert_awaited_once()
+        mock_client.generate.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch('math_content_engine.engine.create_llm_client')
+    async def test_agenerate_fixes_render_errors_asynchronously(
+        self, mock_create_client, mock_config, tmp_path
+    ):
+        """Render failures in agenerate are fixed through the async API."""
+        from unittest.mock import AsyncMock
+
+        mock_client = Mock()
+        mock_client.agenerate = AsyncMock(return_value=LLMResponse(
+            content=f"```python\n{VALID_MANIM_CODE}\n```", model="test", usage={},
+        ))
+        mock_create_client.return_value = mock_client
+
+        with patch('math_content_engine.engine.ManimRenderer') as mock_renderer_class:
+            mock_renderer_class.return_value.render.side_effect = [
+                RenderResult(success=False, output_path=None, error_message="boom"),
+                RenderResult(success=True, output_path=tmp_path / "out.mp4"),
+            ]
+            engine = MathContentEngine(mock_config)
+            engine.auto_fixer = None
+            result = await engine.agenerate("Test topic", save_to_storage=False)
+
+        assert result.success
+        assert result.render_attempts == 2
+        assert mock_client.agenerate.await_count == 2
+        assert "boom" in mock_client.agenerate.await_args_list[1].args[0]
+        mock_client.generate.assert_not_called()
+
+    @patch('math_content_engine.engine.create_llm_client')
+    def test_draft_render_failure_skips_full_render(
+        self, mock_create_client, mock_config, tmp_path
+    ):
+        """A failing smoke test goes to fix_code without a full render."""
+        mock_config.draft_render = True
+        mock_client = Mock()
+        mock_client.generate.return_value = LLMResponse(
+            content=f"```python\n{VALID_MANIM_CODE}\n```", model="test", usage={},
+        )
+        mock_create_client.return_value = mock_client
+
+        with patch('math_content_engine.engine.ManimRenderer') as mock_renderer_class:
+            renderer = mock_renderer_class.return_value
+            renderer.is_cached.return_value = False
+            renderer.smoke_test.side_effect = [
+                RenderResult(success=False, output_path=None, error_message="NameError: x"),
+                RenderResult(success=True, output_path=None),
+            ]
+            renderer.render.return_value = RenderResult(
+                success=True, output_path=tmp_path / "out.mp4",
+            )
+            engine = MathContentEngine(mock_config)
+            result = engine.generate("Test topic")
+
+        assert result.success
+        assert result.render_attempts == 2
+        assert renderer.smoke_test.call_count == 2
+        renderer.render.assert_called_once()
+        # Initial generation plus one fix request carrying the smoke-test error
+        assert mock_client.generate.call_count == 2
+        assert "NameError: x" in mock_client.generate.call_args[0][0]
+
+    @patch('math_content_engine.engine.create_llm_client')
+    def test_speculative_first_successful_render_wins(
+        self, mock_create_client, mock_config, tmp_path
+    ):
+        """The first candidate to render wins; the other renders are cancelled."""
+        mock_config.speculative_candidates = 3
+
+        def generate(prompt, system_prompt=None, temperature=None):
+            code = VALID_MANIM_CODE + f"# temperature {temperature}\n"
+            return LLMResponse(content=f"```python\n{code}\n```", model="test", usage={})
+
+        def render(code, scene_name, output_filename=None, cancel_event=None):
+            if "temperature 0.5" in code:
+                return RenderResult(success=True, output_path=tmp_path / "win.mp4", render_time=1.0)
+            cancel_event.wait(timeout=5)
+            return RenderResult(
+                success=False, output_path=None, error_message="Render cancelled",
+                render_time=0.5, cancelled=True,
+            )
+
+        mock_client = Mock()
+        mock_client.generate.side_effect = generate
+        mock_create_client.return_value = mock_client
+
+        with patch('math_content_engine.engine.ManimRenderer') as mock_renderer_class:
+            mock_renderer_class.return_value.render.side_effect = render
+            engine = MathContentEngine(mock_config)
+            result = engine.generate("Test topic")
+
+        assert result.success
+        assert result.video_path == tmp_path / "win.mp4"
+        assert result.winning_candidate == 1
+        assert result.candidates_tried == 3
+        assert [engine._candidate_temperature(i) for i in range(3)] == pytest.approx(
+            [0.0, 0.5, 1.0]
+        )
+
+    @patch('math_content_engine.engine.create_llm_client')
+    def test_speculative_winner_takes_requested_name_and_counts_killed_renders(
+        self, mock_create_client, mock_config, tmp_path
+    ):
+        """The winner is renamed to output_filename; killed renders count as wasted."""
+        import threading
+        import time
+
+        mock_config.speculative_candidates = 2
+        loser_rendering = threading.Event()
+        output_names = []
+
+        def generate(prompt, system_prompt=None, temperature=None):
+            code = VALID_MANIM_CODE + f"# temperature {temperature}\n"
+            return LLMResponse(content=f"```python\n{code}\n```", model="test", usage={})
+
+        def render(code, scene_name, output_filename=None, cancel_event=None):
+            output_names.append(output_filename)
+            if "temperature 1.0" in code:
+                loser_rendering.wait(timeout=5)
+                time.sleep(0.05)
+                return RenderResult(success=True, output_path=tmp_path / "c1.mp4", render_time=1.0)
+            loser_rendering.set()
+            cancel_event.wait(timeout=5)
+            return RenderResult(success=False, output_path=None, cancelled=True, render_time=9.0)
+
+        mock_client = Mock()
+        mock_client.generate.side_effect = generate
+        mock_create_client.return_value = mock_client
+
+        with patch('math_content_engine.engine.ManimRenderer') as mock_renderer_class:
+            renderer = mock_renderer_class.return_value
+            renderer.render.side_effect = render
+            renderer.rename_output.return_value = tmp_path / "lesson.mp4"
+            engine = MathContentEngine(mock_config)
+            result = engine.generate("Test topic", output_filename="lesson", save_to_storage=False)
+
+        assert result.winning_candidate == 1
+        assert sorted(output_names) == ["lesson.candidate0", "lesson.candidate1"]
+        renderer.rename_output.assert_called_once_with(tmp_path / "c1.mp4", "lesson")
+        assert result.video_path == tmp_path / "lesson.mp4"
+        assert 0.05 <= result.wasted_render_time < 9.0
+
+    @patch('math_content_engine.engine.create_llm_client')
+    def test_speculative_falls_back_to_fix_loop(self, mock_create_client, mock_config, tmp_path):
+        """When no candidate renders, the first one is fixed and re-rendered."""
+        mock_config.speculative_candidates = 2
+        fixed_code = VALID_MANIM_CODE + "# fixed\n"
+
+        mock_client = Mock()
+        mock_client.generate.side_effect = lambda prompt, system_prompt=None, temperature=None: (
+            LLMResponse(
+                content=f"```python\n{fixed_code if '## FAILED CODE' in prompt else VALID_MANIM_CODE}\n```",
+                model="test",
+                usage={},
+            )
+        )
+        mock_create_client.return_value = mock_client
+
+        def render(code, scene_name, output_filename=None, cancel_event=None):
+            if code.strip().endswith("# fixed"):
+                return RenderResult(success=True, output_path=tmp_path / "fixed.mp4")
+            return RenderResult(
+                success=False, output_path=None, error_message="NameError", render_time=2.0
+            )
+
+        with patch('math_content_engine.engine.ManimRenderer') as mock_renderer_class:
+            mock_renderer_class.return_value.render.side_effect = render
+            engine = MathContentEngine(mock_config)
+            result = engine.generate("Test topic")
+
+        assert result.success
+        assert result.video_path == tmp_path / "fixed.mp4"
+        assert result.winning_candidate is None
+        assert result.candidates_tried == 2
+        assert result.wasted_render_time == 4.0
+
+    @patch('math_content_engine.engine.create_llm_client')
+    def test_auto_fix_skips_llm_fix_call(self, mock_create_client, mock_config, tmp_path):
+        """A known render error is fixed by rule without asking the LLM."""
+        old_api_code = VALID_MANIM_CODE.replace(
+            "self.wait()", "graph = Axes().get_graph(lambda x: x)\n        self.wait()"
+        )
+        mock_client = Mock()
+        mock_client.generate.return_value = LLMResponse(
+            content=f"```python\n{old_api_code}\n```", model="test", usage={},
+        )
+        mock_create_client.return_value = mock_client
+
+        def render(code, scene_name, output_filename=None):
+            if "get_graph" in code:
+                return RenderResult(
+                    success=False, output_path=None,
+                    error_message="AttributeError: 'Axes' object has no attribute 'get_graph'",
+                )
+            return RenderResult(success=True, output_path=tmp_path / "out.mp4")
+
+        with patch('math_content_engine.engine.ManimRenderer') as mock_renderer_class:
+            mock_renderer_class.return_value.render.side_effect = render
+            engine = MathContentEngine(mock_config)
+            result = engine.generate("Test topic")
+
+        assert result.success
+        assert "Axes().plot(lambda x: x)" in result.code
+        assert result.render_attempts == 2
+        mock_client.generate.assert_called_once()
+        assert engine.get_cache_stats()["auto_fix"]["rule_fixes"] == 1
+
 
 class TestEndToEnd:
     """
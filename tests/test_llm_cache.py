@@ -0,0 +1,298 @@
+"""Tests for the content-addressed LLM response cache."""
+
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from math_content_engine.llm.base import LLMResponse
+from math_content_engine.llm.cache import CachedLLMClient, LLMResponseCache
+
+
+def _response(content: str = "```python\nfrom manim import *\n```") -> LLMResponse:
+    return LLMResponse(
+        content=content,
+        model="claude-sonnet-4-20250514",
+        usage={"input_tokens": 10, "output_tokens": 20},
+        finish_reason="end_turn",
+    )
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Create a cache backed by a temporary database."""
+    cache = LLMResponseCache(tmp_path / "responses.db")
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def inner_client():
+    """Create a mock provider client."""
+    client = Mock()
+    client.api_key = "test-key"
+    client.model = "claude-sonnet-4-20250514"
+    client.temperature = 0.0
+    client.max_tokens = 4096
+    client.generate.return_value = _response()
+    client.generate_with_retry.return_value = _response("fixed")
+    return client
+
+
+class TestLLMResponseCache:
+    """Tests for LLMResponseCache."""
+
+    def test_key_is_stable_and_content_addressed(self):
+        """Same parts give the same key; any change gives a different key."""
+        a = LLMResponseCache.make_key(provider="claude", prompt="x", temperature=0.0)
+        b = LLMResponseCache.make_key(temperature=0.0, prompt="x", provider="claude")
+        c = LLMResponseCache.make_key(provider="claude", prompt="y", temperature=0.0)
+        assert a == b
+        assert a != c
+
+    def test_put_and_get_round_trip(self, cache):
+        """Stored responses come back intact."""
+        cache.put("k", _response())
+        cached = cache.get("k")
+        assert cached == _response()
+        assert cache.stats()["hits"] == 1
+
+    def test_miss_is_counted(self, cache):
+        """Unknown keys return None and count as misses."""
+        assert cache.get("missing") is None
+        stats = cache.stats()
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.0
+
+    def test_expired_entries_are_dropped(self, tmp_path):
+        """Entries older than max_age_seconds are treated as misses."""
+        cache = LLMResponseCache(tmp_path / "r.db", max_age_seconds=0.01)
+        cache.put("k", _response())
+        time.sleep(0.05)
+        assert cache.get("k") is None
+        cache.close()
+
+    def test_size_eviction_removes_least_recently_used(self, tmp_path):
+        """Exceeding max_bytes evicts the least recently accessed entries."""
+        size = len('{"content": "aaaa", "model": "m", "usage": {}, "finish_reason": null}')
+        cache = LLMResponseCache(tmp_path / "r.db", max_bytes=size * 2)
+        cache.put("a", LLMResponse(content="aaaa", model="m", usage={}))
+        time.sleep(0.01)
+        cache.put("b", LLMResponse(content="bbbb", model="m", usage={}))
+        time.sleep(0.01)
+        cache.get("a")  # touch "a" so "b" becomes least recently used
+        time.sleep(0.01)
+        cache.put("c", LLMResponse(content="cccc", model="m", usage={}))
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+        cache.close()
+
+
+class TestCachedLLMClient:
+    """Tests for CachedLLMClient."""
+
+    def test_second_identical_call_is_served_from_cache(self, cache, inner_client):
+        """Repeated prompts only reach the provider once."""
+        client = CachedLLMClient(inner_client, cache, provider="claude")
+
+        first = client.generate("Animate 2x + 3 = 7", "system")
+        second = client.generate("Animate 2x + 3 = 7", "system")
+
+        assert first == second
+        inner_client.generate.assert_called_once()
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_different_system_prompt_misses(self, cache, inner_client):
+        """The system prompt is part of the cache key."""
+        client = CachedLLMClient(inner_client, cache, provider="claude")
+
+        client.generate("prompt", "dark style")
+        client.generate("prompt", "light style")
+
+        assert inner_client.generate.call_count == 2
+
+    def test_temperature_override_is_part_of_key(self, cache, inner_client):
+        """Per-call temperature overrides produce separate entries."""
+        client = CachedLLMClient(inner_client, cache, provider="claude")
+
+        client.generate("prompt", temperature=0.0)
+        client.generate("prompt", temperature=0.9)
+
+        assert inner_client.generate.call_count == 2
+        assert inner_client.generate.call_args.kwargs == {"temperature": 0.9}
+
+    def test_retry_calls_are_cached_by_error_context(self, cache, inner_client):
+        """generate_with_retry is cached separately per error context."""
+        client = CachedLLMClient(inner_client, cache, provider="claude")
+
+        client.generate_with_retry("prompt", "system", "NameError: x")
+        client.generate_with_retry("prompt", "system", "NameError: x")
+        client.generate_with_retry("prompt", "system", "TypeError: y")
+
+        assert inner_client.generate_with_retry.call_count == 2
+
+    def test_empty_responses_are_not_cached(self, cache, inner_client):
+        """Empty completions are never persisted."""
+        inner_client.generate.return_value = _response("")
+        client = CachedLLMClient(inner_client, cache, provider="claude")
+
+        client.generate("prompt")
+        client.generate("prompt")
+
+        assert inner_client.generate.call_count == 2
+
+    def test_discarded_response_is_requested_again(self, cache, inner_client):
+        """A response dropped as unusable is not replayed."""
+        client = CachedLLMClient(inner_client, cache, provider="claude")
+
+        client.generate("prompt", "system")
+        assert client.discard_response("from manim import *") == 1
+        client.generate("prompt", "system")
+
+        assert inner_client.generate.call_count == 2
+
+    def test_discard_ignores_unrelated_and_empty_text(self, cache, inner_client):
+        """Only responses containing the text are dropped."""
+        client = CachedLLMClient(inner_client, cache, provider="claude")
+        client.generate("prompt", "system")
+
+        assert client.discard_response("class Other(Scene)") == 0
+        assert client.discard_response("  ") == 0
+        assert cache.stats()["entries"] == 1
+
+    def test_invalid_generated_code_is_discarded(self, cache, inner_client):
+        """Code that fails validation is dropped from the cache."""
+        from math_content_engine.generator.code_generator import ManimCodeGenerator
+
+        inner_client.generate.return_value = _response("```python\nprint('not manim')\n```")
+        client = CachedLLMClient(inner_client, cache, provider="claude")
+        generator = ManimCodeGenerator(client, max_retries=1)
+
+        result = generator.generate("Pythagorean theorem")
+
+        assert not result.validation.is_valid
+        assert cache.stats()["entries"] == 0
+
+    def test_bypass_neither_reads_nor_writes_the_cache(self, cache, inner_client):
+        """Requests inside bypass() always reach the provider and are not stored."""
+        client = CachedLLMClient(inner_client, cache, provider="claude")
+        client.generate("prompt")
+
+        with client.bypass():
+            client.generate("prompt")
+            client.generate("other prompt")
+
+        assert inner_client.generate.call_count == 3
+        assert cache.stats()["entries"] == 1
+
+    def test_unknown_attributes_delegate_to_wrapped_client(self, cache, inner_client):
+        """Provider-specific attributes remain reachable through the wrapper."""
+        inner_client.project_id = "my-project"
+        client = CachedLLMClient(inner_client, cache)
+        assert client.project_id == "my-project"
+
+
+class TestCachedStreaming:
+    """Tests for streaming through CachedLLMClient."""
+
+    def test_complete_stream_is_cached(self, cache, inner_client):
+        """A fully consumed stream is stored and replayed from the cache."""
+        inner_client.stream.side_effect = lambda *a, **k: iter(["```python\n", "from manim import *\n```"])
+        client = CachedLLMClient(inner_client, cache)
+
+        first = "".join(client.stream("prompt", "system"))
+        second = "".join(client.stream("prompt", "system"))
+
+        assert first == second == "```python\nfrom manim import *\n```"
+        assert inner_client.stream.call_count == 1
+        # Streams share entries with generate()
+        assert client.generate("prompt", "system").content == first
+        inner_client.generate.assert_not_called()
+
+    def test_stream_closed_early_is_not_cached(self, cache, inner_client):
+        """Partial streams are never stored."""
+        inner_client.stream.side_effect = lambda *a, **k: iter(["a", "b", "c"])
+        client = CachedLLMClient(inner_client, cache)
+
+        stream = client.stream("prompt", "system")
+        next(stream)
+        stream.close()
+
+        assert cache.stats()["entries"] == 0
+
+    def test_stream_stopped_at_code_fence_is_cached(self, cache, inner_client):
+        """The generator stores the extracted response when it stops at the fence."""
+        from math_content_engine.generator.code_generator import ManimCodeGenerator
+
+        code = "from manim import *\n\nclass S(Scene):\n    def construct(self):\n        self.wait()\n"
+        inner_client.stream.side_effect = lambda *a, **k: iter(
+            ["```python\n", code, "```", "\nTrailing prose"]
+        )
+        generator = ManimCodeGenerator(CachedLLMClient(inner_client, cache), streaming=True)
+
+        first = generator.generate("Topic")
+        second = generator.generate("Topic")
+
+        assert first.validation.is_valid
+        assert second.code == first.code
+        assert inner_client.stream.call_count == 1
+        assert cache.stats()["entries"] == 1
+
+    def test_aborted_stream_is_not_cached(self, cache, inner_client):
+        """Streams the extractor aborts early are never stored."""
+        from math_content_engine.generator.code_generator import ManimCodeGenerator
+
+        inner_client.stream.side_effect = lambda *a, **k: iter(["Unrelated text.\n" * 60])
+        generator = ManimCodeGenerator(
+            CachedLLMClient(inner_client, cache), max_retries=1, streaming=True
+        )
+
+        generator.generate("Topic")
+
+        assert cache.stats()["entries"] == 0
+
+
+class TestEngineCacheWiring:
+    """Tests for enabling the cache through Config."""
+
+    def test_engine_wraps_client_when_enabled(self, monkeypatch, tmp_path, inner_client):
+        """MATH_ENGINE_LLM_CACHE=true wraps the provider client."""
+        from unittest.mock import patch
+
+        from math_content_engine.config import Config
+        from math_content_engine.engine import MathContentEngine
+
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+        monkeypatch.setenv("MATH_ENGINE_OUTPUT_DIR", str(tmp_path / "output"))
+        monkeypatch.setenv("MATH_ENGINE_MANIM_CACHE", str(tmp_path / "cache"))
+        monkeypatch.setenv("MATH_ENGINE_LLM_CACHE", "true")
+        monkeypatch.setenv("MATH_ENGINE_LLM_CACHE_PATH", str(tmp_path / "llm.db"))
+
+        with patch("math_content_engine.engine.create_llm_client", return_value=inner_client):
+            engine = MathContentEngine(Config())
+
+        assert isinstance(engine.llm_client, CachedLLMClient)
+        assert engine.code_generator.llm_client is engine.llm_client
+        assert engine.get_cache_stats()["llm"]["entries"] == 0
+
+    def test_engines_share_one_cache_per_path(self, monkeypatch, tmp_path, inner_client):
+        """Engines configured with the same cache path share a connection."""
+        from unittest.mock import patch
+
+        from math_content_engine.config import Config
+        from math_content_engine.engine import MathContentEngine
+
+        monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+        monkeypatch.setenv("MATH_ENGINE_OUTPUT_DIR", str(tmp_path / "output"))
+        monkeypatch.setenv("MATH_ENGINE_MANIM_CACHE", str(tmp_path / "cache"))
+        monkeypatch.setenv("MATH_ENGINE_LLM_CACHE", "true")
+        monkeypatch.setenv("MATH_ENGINE_LLM_CACHE_PATH", str(tmp_path / "llm.db"))
+
+        with patch("math_content_engine.engine.create_llm_client", return_value=inner_client):
+            first = MathContentEngine(Config())
+            second = MathContentEngine(Config())
+
+        assert first.llm_client.cache is second.llm_client.cache
@@ -5,7 +5,8 @@ from unittest.mock import Mock, patch
 from math_content_engine.llm.base import BaseLLMClient, LLMResponse
 from math_content_engine.llm.claude import ClaudeClient
 from math_content_engine.llm.openai import OpenAIClient
-from math_content_engine.llm.factory import create_llm_client
+from math_content_engine.llm.factory import close_llm_clients, create_llm_client, get_llm_client
+from math_content_engine.llm.rate_limit import RateLimiter, get_rate_limiter
 from math_content_engine.constants import LLMProvider
 
 
@@ -244,6 +245,11 @@ class TestLLMFactory:
         mock_config.claude_model = "claude-sonnet-4-20250514"
         mock_config.temperature = 0.7
         mock_config.max_tokens = 4096
+        mock_config.prompt_cache_enabled = False
+        mock_config.get_model.return_value = "claude-sonnet-4-20250514"
+        mock_config.llm_rpm = 0
+        mock_config.llm_tpm = 0
+        mock_config.llm_max_concurrency = 4
 
         client = create_llm_client(mock_config)
 
@@ -251,7 +257,9 @@ class TestLLMFactory:
             api_key="claude-key",
             model="claude-sonnet-4-20250514",
             temperature=0.7,
-            max_tokens=4096
+            max_tokens=4096,
+            prompt_cache=False,
+            rate_limiter=get_rate_limiter("claude", "claude-sonnet-4-20250514"),
         )
 
     @patch('math_content_engine.llm.factory.OpenAIClient')
@@ -263,6 +271,11 @@ class TestLLMFactory:
         mock_config.openai_model = "gpt-4o"
         mock_config.temperature = 0.8
         mock_config.max_tokens = 2048
+        mock_config.prompt_cache_enabled = False
+        mock_config.get_model.return_value = "gpt-4o"
+        mock_config.llm_rpm = 0
+        mock_config.llm_tpm = 0
+        mock_config.llm_max_concurrency = 4
 
         client = create_llm_client(mock_config)
 
@@ -270,9 +283,21 @@ class TestLLMFactory:
             api_key="openai-key",
             model="gpt-4o",
             temperature=0.8,
-            max_tokens=2048
+            max_tokens=2048,
+            prompt_cache=False,
+            rate_limiter=get_rate_limiter("openai", "gpt-4o"),
         )
 
+    @patch('math_content_engine.llm.claude.anthropic')
+    def test_rate_limited_clients_disable_sdk_retries(self, mock_anthropic):
+        """The SDK client only retries on its own when no limiter is attached."""
+        ClaudeClient(api_key="key")
+        ClaudeClient(api_key="key", rate_limiter=RateLimiter())
+
+        first, second = mock_anthropic.Anthropic.call_args_list
+        assert "max_retries" not in first.kwargs
+        assert second.kwargs["max_retries"] == 0
+
     def test_invalid_provider_raises(self):
         """Test that invalid provider raises ValueError."""
         mock_config = Mock()
@@ -282,6 +307,200 @@ class TestLLMFactory:
             create_llm_client(mock_config)
 
 
+class TestLLMClientRegistry:
+    """Tests for the shared LLM client registry."""
+
+    @pytest.fixture(autouse=True)
+    def empty_registry(self):
+        """Start and finish each test with no shared clients."""
+        close_llm_clients()
+        yield
+        close_llm_clients()
+
+    @staticmethod
+    def _config(api_key="registry-key", temperature=0.7):
+        config = Mock()
+        config.llm_provider = LLMProvider.CLAUDE
+        config.anthropic_api_key = api_key
+        config.claude_model = "claude-sonnet-4-20250514"
+        config.get_model.return_value = "claude-sonnet-4-20250514"
+        config.get_api_key.return_value = api_key
+        config.temperature = temperature
+        config.max_tokens = 4096
+        config.prompt_cache_enabled = False
+        config.gcp_project_id = None
+        config.gcp_location = "us-central1"
+        config.llm_rpm = 0
+        config.llm_tpm = 0
+        config.llm_max_concurrency = 16
+        return config
+
+    @patch('math_content_engine.llm.factory.ClaudeClient')
+    def test_same_settings_share_one_client(self, mock_claude_class):
+        """Repeated lookups with the same settings reuse the client."""
+        mock_claude_class.side_effect = lambda **kwargs: Mock()
+
+        first = get_llm_client(self._config())
+        second = get_llm_client(self._config())
+        other_key = get_llm_client(self._config(api_key="other-key"))
+        other_temp = get_llm_client(self._config(temperature=0.2))
+
+        assert first is second
+        assert first is not other_key
+        assert first is not other_temp
+        assert mock_claude_class.call_count == 3
+
+    @patch('math_content_engine.llm.factory.ClaudeClient')
+    def test_concurrent_lookups_create_one_client(self, mock_claude_class):
+        """The registry is safe to use from many threads at once."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        mock_claude_class.side_effect = lambda **kwargs: Mock()
+        config = self._config()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            clients = list(pool.map(lambda _: get_llm_client(config), range(32)))
+
+        assert len({id(client) for client in clients}) == 1
+        assert mock_claude_class.call_count == 1
+
+    @patch('math_content_engine.llm.factory.ClaudeClient')
+    def test_close_llm_clients_closes_and_forgets(self, mock_claude_class):
+        """close_llm_clients closes every client and empties the registry."""
+        mock_claude_class.side_effect = lambda **kwargs: Mock()
+
+        first = get_llm_client(self._config())
+        close_llm_clients()
+        second = get_llm_client(self._config())
+
+        first.close.assert_called_once()
+        assert first is not second
+
+
+class TestStreaming:
+    """Tests for streaming LLM responses."""
+
+    @patch('anthropic.Anthropic')
+    def test_claude_stream_yields_text_chunks(self, mock_anthropic_class):
+        """Claude streams text from messages.stream()."""
+        stream_cm = mock_anthropic_class.return_value.messages.stream.return_value
+        stream_cm.__enter__ = Mock(return_value=Mock(text_stream=iter(["a", "b"])))
+        stream_cm.__exit__ = Mock(return_value=False)
+
+        client = ClaudeClient(api_key="test-key", model="claude-sonnet-4-20250514")
+        chunks = list(client.stream("Prompt", system_prompt="System"))
+
+        assert chunks == ["a", "b"]
+        call_kwargs = mock_anthropic_class.return_value.messages.stream.call_args[1]
+        assert call_kwargs['system'] == "System"
+
+    @patch('openai.OpenAI')
+    def test_openai_stream_closes_on_early_exit(self, mock_openai_class):
+        """Closing the iterator closes the underlying HTTP stream."""
+        def chunk(text):
+            return Mock(choices=[Mock(delta=Mock(content=text))])
+
+        sdk_stream = Mock()
+        sdk_stream.__iter__ = Mock(return_value=iter([chunk("a"), chunk("b"), chunk("c")]))
+        mock_openai_class.return_value.chat.completions.create.return_value = sdk_stream
+
+        client = OpenAIClient(api_key="test-key", model="gpt-4o")
+        stream = client.stream("Prompt")
+        assert next(stream) == "a"
+        stream.close()
+
+        sdk_stream.close.assert_called_once()
+        assert mock_openai_class.return_value.chat.completions.create.call_args[1]['stream'] is True
+
+
+class TestPromptCaching:
+    """Tests for provider-side prompt caching and cached-token reporting."""
+
+    @patch('anthropic.Anthropic')
+    def test_claude_marks_system_prompt_cacheable(self, mock_anthropic_class):
+        """With prompt_cache the system prompt becomes a cache breakpoint."""
+        mock_message = Mock()
+        mock_message.content = [Mock(text="Code")]
+        mock_message.model = "claude-sonnet-4-20250514"
+        mock_message.usage = Mock(
+            input_tokens=20, output_tokens=200,
+            cache_read_input_tokens=3000, cache_creation_input_tokens=0,
+        )
+        mock_message.stop_reason = "end_turn"
+        mock_anthropic_class.return_value.messages.create.return_value = mock_message
+
+        client = ClaudeClient(api_key="test-key", model="claude-sonnet-4-20250514", prompt_cache=True)
+        result = client.generate("Prompt", system_prompt="Static system prompt")
+
+        system = mock_anthropic_class.return_value.messages.create.call_args[1]['system']
+        assert system == [{
+            "type": "text",
+            "text": "Static system prompt",
+            "cache_control": {"type": "ephemeral"},
+        }]
+        assert result.usage['cached_input_tokens'] == 3000
+        assert result.usage['uncached_input_tokens'] == 20
+
+    @patch('anthropic.Anthropic')
+    def test_claude_system_prompt_unchanged_by_default(self, mock_anthropic_class):
+        """Without prompt_cache the request is sent exactly as before."""
+        mock_message = Mock()
+        mock_message.content = [Mock(text="Code")]
+        mock_message.usage = Mock(input_tokens=100, output_tokens=200)
+        mock_anthropic_class.return_value.messages.create.return_value = mock_message
+
+        client = ClaudeClient(api_key="test-key", model="claude-sonnet-4-20250514")
+        result = client.generate("Prompt", system_prompt="Static system prompt")
+
+        call_kwargs = mock_anthropic_class.return_value.messages.create.call_args[1]
+        assert call_kwargs['system'] == "Static system prompt"
+        assert "cached_input_tokens" not in result.usage
+
+    @patch('openai.OpenAI')
+    def test_openai_reports_cached_prompt_tokens(self, mock_openai_class):
+        """OpenAI cached_tokens are split out of prompt_tokens."""
+        mock_choice = Mock()
+        mock_choice.message.content = "Code"
+        mock_choice.finish_reason = "stop"
+        mock_response = Mock(model="gpt-4o", choices=[mock_choice])
+        mock_response.usage = Mock(
+            prompt_tokens=2500, completion_tokens=100, total_tokens=2600,
+            prompt_tokens_details=Mock(cached_tokens=2048),
+        )
+        mock_openai_class.return_value.chat.completions.create.return_value = mock_response
+
+        client = OpenAIClient(api_key="test-key", model="gpt-4o", prompt_cache=True)
+        result = client.generate("Prompt", system_prompt="Static system prompt")
+
+        call_kwargs = mock_openai_class.return_value.chat.completions.create.call_args[1]
+        assert call_kwargs['messages'][0] == {"role": "system", "content": "Static system prompt"}
+        assert "prompt_cache_key" in call_kwargs['extra_body']
+        assert result.usage['cached_input_tokens'] == 2048
+        assert result.usage['uncached_input_tokens'] == 452
+
+    @patch('openai.OpenAI')
+    def test_deepseek_reports_cache_hits(self, mock_openai_class):
+        """DeepSeek prompt_cache_hit/miss tokens map to cached/uncached."""
+        from math_content_engine.llm.deepseek import DeepSeekClient
+
+        mock_choice = Mock()
+        mock_choice.message.content = "Code"
+        mock_choice.message.reasoning_content = None
+        mock_choice.finish_reason = "stop"
+        mock_response = Mock(model="deepseek-chat", choices=[mock_choice])
+        mock_response.usage = Mock(
+            prompt_tokens=1000, completion_tokens=10, total_tokens=1010,
+            prompt_cache_hit_tokens=896, prompt_cache_miss_tokens=104,
+        )
+        mock_openai_class.return_value.chat.completions.create.return_value = mock_response
+
+        client = DeepSeekClient(api_key="test-key", model="deepseek-chat")
+        result = client.generate("Prompt", system_prompt="System")
+
+        assert result.usage['cached_input_tokens'] == 896
+        assert result.usage['uncached_input_tokens'] == 104
+
+
 class TestRetryBehavior:
     """Tests for retry behavior across LLM clients."""
 
@@ -368,3 +587,101 @@ class TestClientInterface:
         assert callable(claude.generate_with_retry)
         assert hasattr(openai, 'generate_with_retry')
         assert callable(openai.generate_with_retry)
+
+
+class TestAsyncClients:
+    """Tests for the async generation API and shared async SDK clients."""
+
+    @staticmethod
+    def _claude_message(text="Async code"):
+        message = Mock()
+        message.content = [Mock(text=text)]
+        message.model = "claude-sonnet-4-20250514"
+        message.usage = Mock(input_tokens=10, output_tokens=20)
+        message.stop_reason = "end_turn"
+        return message
+
+    @pytest.mark.asyncio
+    @patch('anthropic.AsyncAnthropic')
+    async def test_claude_agenerate_uses_async_sdk(self, mock_async_class):
+        """agenerate awaits the async Anthropic client with the same request."""
+        from unittest.mock import AsyncMock
+
+        mock_async_class.return_value.messages.create = AsyncMock(
+            return_value=self._claude_message()
+        )
+
+        client = ClaudeClient(api_key="async-key-1", model="claude-sonnet-4-20250514")
+        result = await client.agenerate("Prompt", system_prompt="System")
+
+        assert result.content == "Async code"
+        call_kwargs = mock_async_class.return_value.messages.create.call_args[1]
+        assert call_kwargs['system'] == "System"
+        assert call_kwargs['messages'][0]['content'] == "Prompt"
+
+    @pytest.mark.asyncio
+    @patch('anthropic.AsyncAnthropic')
+    async def test_rate_limited_async_client_disables_sdk_retries(self, mock_async_class):
+        """Rate-limited clients get their own async SDK client without retries."""
+        plain = ClaudeClient(api_key="async-key-retries")
+        limited = ClaudeClient(api_key="async-key-retries", rate_limiter=RateLimiter())
+
+        plain.async_client
+        limited.async_client
+
+        first, second = mock_async_class.call_args_list
+        assert "max_retries" not in first.kwargs
+        assert second.kwargs["max_retries"] == 0
+
+    @pytest.mark.asyncio
+    @patch('anthropic.AsyncAnthropic')
+    async def test_async_client_shared_per_api_key(self, mock_async_class):
+        """Clients with the same API key share one pooled async SDK client."""
+        mock_async_class.side_effect = lambda **kwargs: Mock()
+
+        first = ClaudeClient(api_key="async-key-2", model="a")
+        second = ClaudeClient(api_key="async-key-2", model="b")
+        other = ClaudeClient(api_key="async-key-3", model="a")
+
+        assert first.async_client is second.async_client
+        assert first.async_client is not other.async_client
+        assert mock_async_class.call_count == 2
+
+    @pytest.mark.asyncio
+    @patch('openai.AsyncOpenAI')
+    async def test_openai_agenerate_with_retry_formats_prompt(self, mock_async_class):
+        """agenerate_with_retry sends the same retry prompt as the sync API."""
+        from unittest.mock import AsyncMock
+
+        mock_choice = Mock()
+        mock_choice.message.content = "Fixed"
+        mock_choice.finish_reason = "stop"
+        mock_response = Mock(model="gpt-4o", choices=[mock_choice])
+        mock_response.usage = Mock(prompt_tokens=1, completion_tokens=2, total_tokens=3)
+        mock_async_class.return_value.chat.completions.create = AsyncMock(
+            return_value=mock_response
+        )
+
+        client = OpenAIClient(api_key="async-key-4", model="gpt-4o")
+        result = await client.agenerate_with_retry("Original prompt", error_context="Error: Line 3")
+
+        assert result.content == "Fixed"
+        prompt = mock_async_class.return_value.chat.completions.create.call_args[1]['messages'][0]['content']
+        assert "PREVIOUS ATTEMPT FAILED WITH ERROR:" in prompt
+        assert "Error: Line 3" in prompt
+
+    @pytest.mark.asyncio
+    async def test_base_agenerate_falls_back_to_thread(self):
+        """Clients without an async SDK run generate() in a worker thread."""
+
+        class SyncOnlyClient(BaseLLMClient):
+            def generate(self, prompt, system_prompt=None, *, json_mode=False):
+                return LLMResponse(content=f"echo:{prompt}", model=self.model, usage={})
+
+            def generate_with_retry(self, prompt, system_prompt=None, error_context=None):
+                return self.generate(prompt, system_prompt)
+
+        client = SyncOnlyClient(api_key="", model="sync")
+        result = await client.agenerate("hello")
+
+        assert result.content == "echo:hello"
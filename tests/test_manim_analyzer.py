@@ -0,0 +1,242 @@
+"""Tests for the AST-based Manim static analyzer."""
+
+import json
+from unittest.mock import patch
+
+from math_content_engine.utils import manim_analyzer
+from math_content_engine.utils.manim_analyzer import (
+    ManimSymbols,
+    analyze_manim_code,
+    load_manim_symbols,
+)
+from math_content_engine.utils.validators import validate_manim_code
+
+# A tiny stand-in for the installed Manim API
+SYMBOLS = ManimSymbols(
+    version="0.18.0",
+    names=frozenset({
+        "Scene", "Circle", "Square", "Axes", "Text", "MathTex",
+        "Create", "FadeIn", "FadeOut", "Write", "Flash", "UP", "BLUE",
+    }),
+    class_attributes={
+        "Scene": frozenset({"play", "wait", "add", "remove"}),
+        "Circle": frozenset({"shift", "scale", "animate", "set_color"}),
+        "Square": frozenset({"shift", "scale", "animate"}),
+        "Axes": frozenset({"plot", "get_axis_labels", "c2p"}),
+        "Text": frozenset({"shift", "scale"}),
+        "MathTex": frozenset({"shift"}),
+    },
+    dynamic_classes=frozenset({"Circle", "Square", "Axes", "Text", "MathTex"}),
+    scene_classes=frozenset({"Scene"}),
+)
+
+
+def _rules(code, **kwargs):
+    kwargs.setdefault("symbols", SYMBOLS)
+    kwargs.setdefault("check_latex", False)
+    return [f.rule for f in analyze_manim_code(code, **kwargs)]
+
+
+class TestAnalyzeManimCode:
+    """Tests for analyze_manim_code."""
+
+    def test_clean_scene_has_no_findings(self):
+        """Idiomatic code produces no findings."""
+        code = '''
+from manim import *
+
+class Demo(Scene):
+    def construct(self):
+        circle = Circle()
+        axes = Axes()
+        graph = axes.plot(lambda x: x ** 2)
+        self.play(Create(circle), Create(graph))
+        self.play(circle.animate.shift(UP), Flash(circle))
+        self.wait()
+'''
+        assert _rules(code) == []
+
+    def test_deprecated_api(self):
+        """Removed APIs are reported with their replacement."""
+        code = '''
+from manim import *
+
+class Demo(Scene):
+    def construct(self):
+        self.play(ShowCreation(Circle()))
+'''
+        findings = analyze_manim_code(code, symbols=SYMBOLS, check_latex=False)
+        assert [f.rule for f in findings] == ["deprecated-api"]
+        assert "Create" in findings[0].message
+        assert findings[0].line == 6
+
+    def test_deprecated_api_reported_without_manim(self):
+        """Checks that need no symbol table run even without manim."""
+        code = "from manim import *\nx = TextMobject('hi')\n"
+        with patch.object(manim_analyzer, "load_manim_symbols", return_value=None):
+            assert [f.rule for f in analyze_manim_code(code)] == ["deprecated-api"]
+
+    def test_undefined_name(self):
+        """Names bound nowhere and not exported by manim are reported once."""
+        code = '''
+from manim import *
+
+class Demo(Scene):
+    def construct(self):
+        self.play(Create(shape), FadeIn(shape_two))
+        self.play(FadeOut(shape))
+'''
+        assert _rules(code) == ["undefined-name", "undefined-name"]
+
+    def test_unknown_import(self):
+        """Explicit imports of names manim does not export are reported."""
+        code = "from manim import Scene, Arrow3000\n"
+        assert "unknown-api" in _rules(code)
+
+    def test_unknown_method_on_manim_object(self):
+        """Methods missing from the installed class are reported."""
+        code = '''
+from manim import *
+
+class Demo(Scene):
+    def construct(self):
+        axes = Axes()
+        graph = axes.get_graph(lambda x: x)
+        self.play(Create(graph))
+'''
+        findings = analyze_manim_code(code, symbols=SYMBOLS, check_latex=False)
+        assert [f.rule for f in findings] == ["unknown-api"]
+        assert "get_graph" in findings[0].message
+
+    def test_reassigned_variable_is_not_checked(self):
+        """A variable bound to more than one thing has no known class."""
+        code = '''
+from manim import *
+
+class Demo(Scene):
+    def construct(self):
+        shape = Circle()
+        shape = shape.copy()
+        shape.anything()
+'''
+        assert _rules(code) == []
+
+    def test_unknown_scene_method(self):
+        """self.method() calls must exist on the scene or its Manim base."""
+        code = '''
+from manim import *
+
+class Demo(Scene):
+    def construct(self):
+        self.helper()
+        self.play_all()
+
+    def helper(self):
+        self.wait()
+'''
+        findings = analyze_manim_code(code, symbols=SYMBOLS, check_latex=False)
+        assert [f.rule for f in findings] == ["unknown-api"]
+        assert "play_all" in findings[0].message
+
+    def test_latex_without_install(self):
+        """LaTeX mobjects are reported when LaTeX is unavailable."""
+        code = '''
+from manim import *
+
+class Demo(Scene):
+    def construct(self):
+        self.play(Write(MathTex("x^2")))
+'''
+        assert _rules(code, check_latex=True) == ["latex-unavailable"]
+        assert _rules(code, check_latex=False) == []
+
+    def test_mobject_reused_in_one_play(self):
+        """One mobject driven by two animations in the same play() is reported."""
+        code = '''
+from manim import *
+
+class Demo(Scene):
+    def construct(self):
+        circle = Circle()
+        self.play(Create(circle), circle.animate.shift(UP))
+'''
+        assert _rules(code) == ["mobject-reused"]
+
+    def test_render_risks_are_warnings(self):
+        """LaTeX without an install and reused mobjects do not fail validation."""
+        code = '''
+from manim import *
+
+class Demo(Scene):
+    def construct(self):
+        label = MathTex("x^2")
+        self.play(Write(label), label.animate.shift(UP))
+'''
+        findings = analyze_manim_code(code, symbols=SYMBOLS, check_latex=True)
+        assert {f.rule for f in findings} == {"latex-unavailable", "mobject-reused"}
+        assert all(f.severity == "warning" for f in findings)
+
+
+class TestSymbolTable:
+    """Tests for the cached Manim symbol table."""
+
+    def test_missing_manim_returns_none(self, tmp_path):
+        """Without manim installed there is no symbol table."""
+        load_manim_symbols.cache_clear()
+        try:
+            with patch.object(manim_analyzer, "version", side_effect=manim_analyzer.PackageNotFoundError):
+                assert load_manim_symbols(tmp_path) is None
+        finally:
+            load_manim_symbols.cache_clear()
+
+    def test_symbol_table_is_cached_on_disk_per_version(self, tmp_path):
+        """The table is built once per Manim version and then read from disk."""
+        load_manim_symbols.cache_clear()
+        try:
+            with patch.object(manim_analyzer, "version", return_value="0.18.0"), \
+                    patch.object(manim_analyzer, "_build_symbols", return_value=SYMBOLS) as build:
+                first = load_manim_symbols(tmp_path)
+                load_manim_symbols.cache_clear()
+                second = load_manim_symbols(tmp_path)
+
+            build.assert_called_once()
+            assert first.names == second.names
+            assert second.class_attributes["Axes"] == SYMBOLS.class_attributes["Axes"]
+            cached = json.loads((tmp_path / "manim_symbols-0.18.0.json").read_text())
+            assert cached["version"] == "0.18.0"
+        finally:
+            load_manim_symbols.cache_clear()
+
+    def test_analyzer_uses_configured_cache_dir(self, tmp_path):
+        """analyze_manim_code caches the table under set_symbols_cache_dir()."""
+        load_manim_symbols.cache_clear()
+        try:
+            manim_analyzer.set_symbols_cache_dir(tmp_path / "symbols")
+            with patch.object(manim_analyzer, "version", return_value="0.18.0"), \
+                    patch.object(manim_analyzer, "_build_symbols", return_value=SYMBOLS), \
+                    patch.object(manim_analyzer, "latex_available", return_value=True):
+                analyze_manim_code("x = 1\n")
+
+            assert (tmp_path / "symbols" / "manim_symbols-0.18.0.json").exists()
+        finally:
+            manim_analyzer.set_symbols_cache_dir(None)
+            load_manim_symbols.cache_clear()
+
+
+class TestValidatorFindings:
+    """Tests for analyzer findings surfaced through validate_manim_code."""
+
+    def test_findings_become_errors(self):
+        """Error findings make the code invalid and are kept structured."""
+        code = '''
+from manim import *
+
+class Demo(Scene):
+    def construct(self):
+        self.play(ShowCreation(Circle()))
+        self.wait()
+'''
+        result = validate_manim_code(code)
+        assert not result.is_valid
+        assert result.findings[0].rule == "deprecated-api"
+        assert any("ShowCreation" in e for e in result.errors)
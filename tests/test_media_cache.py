@@ -0,0 +1,148 @@
+"""Tests for the managed Manim media cache."""
+
+import os
+import time
+
+from math_content_engine.config import Config, VideoQuality
+from math_content_engine.renderer.manim_renderer import ManimRenderer
+from math_content_engine.renderer.media_cache import (
+    OUTPUTS,
+    PARTIAL_MOVIES,
+    TEX,
+    MediaCache,
+    TierBudget,
+    create_media_cache,
+)
+
+DAY = 24 * 3600
+
+
+def _write(path, size, age=0.0):
+    """Write a file of ``size`` bytes last used ``age`` seconds ago."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+def _partial_scene(cache_dir, scene, size, age):
+    directory = cache_dir / "partial_movie_files" / "480p15" / scene
+    _write(directory / "123_456.mp4", size, age)
+    stamp = time.time() - age
+    os.utime(directory, (stamp, stamp))
+    return directory
+
+
+class TestSweep:
+    """Tests for MediaCache.sweep."""
+
+    def test_evicts_least_recently_used_over_budget(self, tmp_path):
+        """Each tier is trimmed to its own budget, oldest first."""
+        old = _partial_scene(tmp_path, "Old", 600, age=3 * 3600)
+        new = _partial_scene(tmp_path, "New", 600, age=2 * 3600)
+        tex_old = _write(tmp_path / "Tex" / "a.svg", 100, age=3 * 3600)
+        tex_new = _write(tmp_path / "texts" / "b.svg", 100, age=2 * 3600)
+
+        cache = MediaCache(tmp_path, budgets={
+            PARTIAL_MOVIES: TierBudget(max_bytes=1000),
+            TEX: TierBudget(max_bytes=1000),
+        })
+        removed = cache.sweep()
+
+        assert removed == {PARTIAL_MOVIES: 1, TEX: 0}
+        assert not old.exists() and new.exists()
+        assert tex_old.exists() and tex_new.exists()
+
+    def test_evicts_by_age(self, tmp_path):
+        stale = _write(tmp_path / "Tex" / "stale.svg", 10, age=40 * DAY)
+        fresh = _write(tmp_path / "Tex" / "fresh.svg", 10, age=DAY)
+        cache = MediaCache(tmp_path, budgets={TEX: TierBudget(max_age_seconds=30 * DAY)})
+
+        cache.sweep()
+
+        assert not stale.exists() and fresh.exists()
+
+    def test_recent_and_held_entries_survive(self, tmp_path):
+        """Entries in use by a render are never evicted, even over budget."""
+        recent = _partial_scene(tmp_path, "Recent", 600, age=60)
+        held = _partial_scene(tmp_path, "Held", 600, age=3 * 3600)
+        cache = MediaCache(tmp_path, budgets={PARTIAL_MOVIES: TierBudget(max_bytes=100)})
+
+        cache.hold(held)
+        cache.sweep()
+        assert recent.exists() and held.exists()
+
+        cache.release(held)
+        cache.sweep()
+        assert not held.exists()
+
+    def test_outputs_only_managed_with_output_dir(self, tmp_path):
+        video = _write(tmp_path / "output" / "a.mp4", 100, age=DAY)
+        budgets = {OUTPUTS: TierBudget(max_bytes=10)}
+
+        MediaCache(tmp_path / "cache", budgets=budgets).sweep()
+        assert video.exists()
+
+        MediaCache(tmp_path / "cache", output_dir=tmp_path / "output", budgets=budgets).sweep()
+        assert not video.exists()
+
+
+class TestUsageAccounting:
+    """Tests for hit counting from Manim logs."""
+
+    def test_hit_rate_from_render_log(self, tmp_path):
+        """Reused partial movies count as hits and are touched."""
+        partial = _partial_scene(tmp_path, "Demo", 10, age=DAY)
+        log = (
+            "INFO     Animation 0 : Using cached data (hash :\n"
+            "         123_456)\n"
+            "INFO     Animation 1 : Partial movie file written in '/x/789.mp4'\n"
+        )
+        cache = MediaCache(tmp_path)
+        cache.record_render(log, partial)
+
+        stats = cache.stats()[PARTIAL_MOVIES]
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["hit_rate"] == 0.5
+        assert time.time() - (partial / "123_456.mp4").stat().st_mtime < 60
+
+    def test_tex_hit_rate(self, tmp_path):
+        """TeX/text SVG lookups reported by a render are counted per tier."""
+        cache = MediaCache(tmp_path)
+        cache.record_render("", tex_hits=1, tex_misses=3)
+
+        stats = cache.stats()[TEX]
+        assert (stats["hits"], stats["misses"]) == (1, 3)
+        assert stats["hit_rate"] == 0.25
+
+
+class TestRendererIntegration:
+    """Tests for the renderer's use of the media cache."""
+
+    def test_cleanup_cache_keeps_tex(self, tmp_path):
+        renderer = ManimRenderer(
+            output_dir=tmp_path / "output",
+            cache_dir=tmp_path / "cache",
+            quality=VideoQuality.LOW,
+        )
+        tex = _write(tmp_path / "cache" / "Tex" / "a.svg", 10)
+        partial = _partial_scene(tmp_path / "cache", "Demo", 10, age=0)
+
+        renderer.cleanup_cache()
+        assert tex.exists() and not partial.exists()
+
+        renderer.cleanup_cache(keep_tex=False)
+        assert not tex.exists()
+
+    def test_create_media_cache(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("MATH_ENGINE_MANIM_CACHE", str(tmp_path / "cache"))
+        assert create_media_cache(Config()) is None
+
+        monkeypatch.setenv("MATH_ENGINE_MEDIA_CACHE", "true")
+        cache = create_media_cache(Config())
+        try:
+            assert create_media_cache(Config()) is cache
+            assert set(cache.budgets) == {PARTIAL_MOVIES, TEX}
+        finally:
+            cache.stop()
@@ -0,0 +1,46 @@
+
+from manim import *
+
+class SimpleAlgebraScene(Scene):
+    def construct(self):
+        # Title
+        title = Text("Solving for x").scale(0.8)
+        self.play(Write(title))
+        self.play(title.animate.to_edge(UP))
+
+        # Equation (using Text to avoid LaTeX)
+        eq1 = Text("2x + 4 = 10", font_size=48)
+        self.play(Write(eq1))
+        self.wait(0.5)
+
+        # Step 1: Subtract 4
+        step1 = Text("Subtract 4 from both sides", font_size=24)
+        step1.next_to(eq1, DOWN)
+        self.play(Write(step1))
+        self.wait(0.5)
+
+        eq2 = Text("2x = 6", font_size=48)
+        eq2.move_to(eq1.get_center())
+        self.play(
+            FadeOut(step1),
+            Transform(eq1, eq2)
+        )
+        self.wait(0.5)
+
+        # Step 2: Divide by 2
+        step2 = Text("Divide both sides by 2", font_size=24)
+        step2.next_to(eq1, DOWN)
+        self.play(Write(step2))
+        self.wait(0.5)
+
+        eq3 = Text("x = 3", font_size=48, color=GREEN)
+        eq3.move_to(eq1.get_center())
+        self.play(
+            FadeOut(step2),
+            Transform(eq1, eq3)
+        )
+
+        # Highlight answer
+        box = SurroundingRectangle(eq1, color=GREEN)
+        self.play(Create(box))
+        self.wait(1)
@@ -0,0 +1,249 @@
+"""Tests for the shared adaptive LLM rate limiter."""
+
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+
+from math_content_engine.llm.base import LLMResponse
+from math_content_engine.llm.claude import ClaudeClient
+from math_content_engine.llm.rate_limit import (
+    RateLimiter,
+    get_rate_limiter,
+    is_overload_error,
+    is_transient_error,
+    reset_rate_limiters,
+    retry_after_seconds,
+    used_tokens,
+)
+
+
+class OverloadError(Exception):
+    """Stand-in for an SDK 429/529 error."""
+
+    def __init__(self, status_code=429, retry_after="0"):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        headers = {"retry-after": retry_after} if retry_after is not None else {}
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+
+def _response(total=10):
+    return LLMResponse(content="ok", model="m", usage={"input_tokens": total, "output_tokens": 0})
+
+
+class TestErrorClassification:
+    """Tests for overload detection and Retry-After parsing."""
+
+    def test_overload_statuses(self):
+        """429 and 529 are overloads; other errors are not."""
+        assert is_overload_error(OverloadError(429))
+        assert is_overload_error(OverloadError(529))
+        assert not is_overload_error(OverloadError(500))
+        assert not is_overload_error(ValueError("boom"))
+
+    def test_transient_errors(self):
+        """Server errors, 408/409 and dropped connections are transient; overloads are not."""
+        assert is_transient_error(OverloadError(503))
+        assert is_transient_error(OverloadError(500))
+        assert is_transient_error(OverloadError(408))
+        assert is_transient_error(OverloadError(409))
+        assert is_transient_error(ConnectionResetError())
+        assert is_transient_error(type("APITimeoutError", (Exception,), {})())
+        assert not is_transient_error(OverloadError(529))
+        assert not is_transient_error(OverloadError(400))
+        assert not is_transient_error(ValueError("boom"))
+
+    def test_retry_after_header(self):
+        """Retry-After is read in seconds, retry-after-ms in milliseconds."""
+        assert retry_after_seconds(OverloadError(retry_after="7")) == 7.0
+        error = OverloadError()
+        error.response.headers = {"retry-after-ms": "1500"}
+        assert retry_after_seconds(error) == 1.5
+        assert retry_after_seconds(OverloadError(retry_after=None)) is None
+
+
+class TestRateLimiter:
+    """Tests for RateLimiter admission and AIMD behaviour."""
+
+    def test_request_budget_blocks_when_exhausted(self):
+        """Requests beyond the per-minute budget must wait."""
+        limiter = RateLimiter(requests_per_minute=2)
+        assert limiter._try_acquire(0) == 0
+        assert limiter._try_acquire(0) == 0
+        assert limiter._try_acquire(0) > 0
+
+    def test_token_budget_refunds_unused_reservation(self):
+        """Unused reserved tokens are returned after the call."""
+        limiter = RateLimiter(tokens_per_minute=1000)
+        limiter.call(lambda: _response(total=100), estimated_tokens=900, count_tokens=used_tokens)
+        assert limiter.tokens.tokens == pytest.approx(900, abs=1)
+
+    def test_concurrency_cap(self):
+        """No more than max_concurrency requests run at once."""
+        limiter = RateLimiter(max_concurrency=2)
+        with limiter.slot(), limiter.slot():
+            assert limiter._try_acquire(0) > 0
+        assert limiter._try_acquire(0) == 0
+
+    def test_overload_retries_and_halves_concurrency(self):
+        """A 429 is retried after Retry-After and halves the concurrency cap."""
+        limiter = RateLimiter(max_concurrency=8)
+        request = Mock(side_effect=[OverloadError(retry_after="0"), _response()])
+
+        result = limiter.call(request)
+
+        assert result.content == "ok"
+        assert request.call_count == 2
+        stats = limiter.stats()
+        assert stats["overloads"] == 1
+        assert stats["concurrency_limit"] == 4
+
+    def test_retry_after_pauses_new_requests(self):
+        """After an overload, new requests wait for the Retry-After delay."""
+        limiter = RateLimiter()
+        limiter.record_overload(retry_after=30)
+        assert limiter._try_acquire(0) > 29
+
+    def test_successes_restore_concurrency(self):
+        """Additive increase climbs back to max_concurrency."""
+        limiter = RateLimiter(max_concurrency=4)
+        limiter.record_overload(retry_after=0)
+        limiter.record_overload(retry_after=0)
+        assert limiter.stats()["concurrency_limit"] == 1
+
+        for _ in range(20):
+            limiter.record_success()
+        assert limiter.stats()["concurrency_limit"] == 4
+
+    def test_transient_error_is_retried_without_backing_off_concurrency(self):
+        """A 503 followed by success returns the success; the cap is untouched."""
+        limiter = RateLimiter(max_concurrency=8)
+        request = Mock(side_effect=[OverloadError(503, retry_after="0"), _response()])
+
+        result = limiter.call(request)
+
+        assert result.content == "ok"
+        assert request.call_count == 2
+        stats = limiter.stats()
+        assert (stats["transient_errors"], stats["overloads"]) == (1, 0)
+        assert stats["concurrency_limit"] == 8
+
+    def test_other_errors_are_not_retried(self):
+        """Non-overload errors propagate immediately."""
+        limiter = RateLimiter()
+        request = Mock(side_effect=ValueError("bad request"))
+        with pytest.raises(ValueError):
+            limiter.call(request)
+        assert request.call_count == 1
+        assert limiter.stats()["in_flight"] == 0
+
+    def test_gives_up_after_max_retries(self):
+        """Persistent overloads are raised once retries are exhausted."""
+        limiter = RateLimiter(max_retries=2)
+        request = Mock(side_effect=OverloadError(retry_after="0"))
+        with pytest.raises(OverloadError):
+            limiter.call(request)
+        assert request.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_async_call_retries_overload(self):
+        """acall() applies the same retry policy to coroutines."""
+        limiter = RateLimiter(max_concurrency=2)
+        outcomes = [OverloadError(529, retry_after="0"), _response()]
+
+        async def request():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        result = await limiter.acall(request)
+        assert result.content == "ok"
+        assert limiter.stats()["overloads"] == 1
+
+    @pytest.mark.asyncio
+    async def test_async_call_retries_transient_error(self):
+        limiter = RateLimiter()
+        outcomes = [TimeoutError("read timed out"), _response()]
+
+        async def request():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        with patch("math_content_engine.llm.rate_limit.asyncio.sleep") as sleep:
+            sleep.return_value = None
+            result = await limiter.acall(request)
+        assert result.content == "ok"
+        assert limiter.stats()["transient_errors"] == 1
+
+
+class TestSharedLimiter:
+    """Tests for the process-wide limiter registry and client wiring."""
+
+    @pytest.fixture(autouse=True)
+    def empty_registry(self):
+        """Start and finish each test with no shared limiters."""
+        reset_rate_limiters()
+        yield
+        reset_rate_limiters()
+
+    def test_one_limiter_per_provider_model(self):
+        """Lookups share a limiter per provider and model."""
+        first = get_rate_limiter("claude", "model-a", max_concurrency=4)
+        assert get_rate_limiter("claude", "model-a") is first
+        assert get_rate_limiter("claude", "model-b") is not first
+        assert get_rate_limiter("openai", "model-a") is not first
+
+    @patch("math_content_engine.llm.claude.anthropic")
+    def test_client_retries_overload_through_limiter(self, mock_anthropic):
+        """Client calls go through the attached limiter."""
+        usage = SimpleNamespace(input_tokens=5, output_tokens=5)
+        message = SimpleNamespace(
+            content=[SimpleNamespace(text="done")], model="m", usage=usage, stop_reason="end_turn"
+        )
+        mock_anthropic.Anthropic.return_value.messages.create.side_effect = [
+            OverloadError(529, retry_after="0"),
+            message,
+        ]
+        client = ClaudeClient(api_key="key")
+        client.rate_limiter = get_rate_limiter("claude", client.model, max_concurrency=4)
+
+        response = client.generate("prompt")
+
+        assert response.content == "done"
+        assert client.rate_limiter.stats()["overloads"] == 1
+
+    @patch("math_content_engine.llm.claude.anthropic")
+    def test_default_client_survives_a_503(self, mock_anthropic):
+        """SDK retries are off under the default limiter, which retries a 503 itself."""
+        from math_content_engine.config import Config, LLMProvider
+        from math_content_engine.llm.factory import create_llm_client
+
+        usage = SimpleNamespace(input_tokens=5, output_tokens=5)
+        message = SimpleNamespace(
+            content=[SimpleNamespace(text="done")], model="m", usage=usage, stop_reason="end_turn"
+        )
+        mock_anthropic.Anthropic.return_value.messages.create.side_effect = [
+            OverloadError(503, retry_after="0"),
+            message,
+        ]
+        config = Config(llm_provider=LLMProvider.CLAUDE, anthropic_api_key="key")
+
+        response = create_llm_client(config).generate("prompt")
+
+        assert response.content == "done"
+        assert mock_anthropic.Anthropic.call_args.kwargs["max_retries"] == 0
+
+    @patch("math_content_engine.llm.claude.anthropic")
+    def test_streams_keep_sdk_retries(self, mock_anthropic):
+        """The limiter cannot retry a stream, so streams open with SDK retries on."""
+        client = ClaudeClient(api_key="key")
+        client.rate_limiter = get_rate_limiter("claude", client.model)
+        streaming = mock_anthropic.Anthropic.return_value.with_options.return_value
+        streaming.messages.stream.return_value.__enter__.return_value.text_stream = ["a", "b"]
+
+        assert list(client.stream("prompt")) == ["a", "b"]
+        mock_anthropic.Anthropic.return_value.with_options.assert_called_once_with(max_retries=2)
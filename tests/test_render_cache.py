@@ -0,0 +1,137 @@
+"""Tests for the ManimRenderer render-result cache."""
+
+from unittest.mock import patch
+
+import pytest
+
+from math_content_engine.config import VideoQuality
+from math_content_engine.renderer.manim_renderer import ManimRenderer, RenderResult
+from math_content_engine.renderer.render_cache import RenderCache
+
+CODE = """from manim import *
+
+class CachedScene(Scene):
+    def construct(self):
+        self.play(Create(Circle()))
+        self.wait()
+"""
+
+
+@pytest.fixture
+def render_cache(tmp_path):
+    """Create a render cache in a temporary directory."""
+    return RenderCache(tmp_path / "renders")
+
+
+@pytest.fixture
+def renderer(tmp_path, render_cache):
+    """Create a renderer backed by the render cache."""
+    return ManimRenderer(
+        output_dir=tmp_path / "output",
+        cache_dir=tmp_path / "cache",
+        quality=VideoQuality.LOW,
+        render_cache=render_cache,
+    )
+
+
+class TestRenderCache:
+    """Tests for RenderCache."""
+
+    def test_key_depends_on_every_input(self):
+        """Changing any render input changes the key."""
+        base = RenderCache.make_key(CODE, "CachedScene", "l", "mp4")
+        assert base == RenderCache.make_key(CODE, "CachedScene", "l", "mp4")
+        assert base != RenderCache.make_key(CODE + "#", "CachedScene", "l", "mp4")
+        assert base != RenderCache.make_key(CODE, "Other", "l", "mp4")
+        assert base != RenderCache.make_key(CODE, "CachedScene", "h", "mp4")
+        assert base != RenderCache.make_key(CODE, "CachedScene", "l", "gif")
+
+    def test_put_keeps_source_and_get_returns_entry(self, render_cache, tmp_path):
+        """put() stores a copy without consuming the source file."""
+        source = tmp_path / "video.mp4"
+        source.write_bytes(b"abc")
+
+        render_cache.put("k", source, "mp4")
+
+        assert source.exists()
+        assert render_cache.get("k", "mp4").read_bytes() == b"abc"
+        assert render_cache.get("missing", "mp4") is None
+        stats = render_cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_lru_eviction_by_bytes(self, tmp_path):
+        """Least recently used renders are evicted above max_bytes."""
+        import os
+
+        cache = RenderCache(tmp_path / "renders", max_bytes=10)
+        for i, key in enumerate(["old", "new"]):
+            source = tmp_path / f"{key}.mp4"
+            source.write_bytes(b"x" * 6)
+            entry = cache.put(key, source, "mp4")
+            os.utime(entry, (1000 + i, 1000 + i))
+
+        assert cache.get("old", "mp4") is None
+        assert cache.get("new", "mp4") is not None
+
+
+class TestRendererWithCache:
+    """Tests for ManimRenderer cache integration."""
+
+    def test_identical_render_is_served_from_cache(self, renderer, fake_manim):
+        """The second render of identical code skips Manim."""
+        with patch.object(renderer, "_run_manim", side_effect=fake_manim(renderer)) as run:
+            first = renderer.render(CODE, "CachedScene")
+            second = renderer.render(CODE, "CachedScene")
+
+        assert run.call_count == 1
+        assert first.success and not first.cached
+        assert second.success and second.cached
+        assert first.output_path != second.output_path
+        assert second.output_path.read_bytes() == b"video-bytes"
+
+    def test_cache_hit_uses_requested_output_name(self, renderer, fake_manim):
+        """Cache hits are materialised at the requested filename."""
+        with patch.object(renderer, "_run_manim", side_effect=fake_manim(renderer)):
+            renderer.render(CODE, "CachedScene")
+            result = renderer.render(CODE, "CachedScene", output_filename="lesson_1")
+
+        assert result.cached
+        assert result.output_path.name == "lesson_1.mp4"
+
+    def test_entry_evicted_after_lookup_renders_again(self, renderer, fake_manim):
+        """A hit whose file is evicted before it is linked falls back to rendering."""
+        with patch.object(renderer, "_run_manim", side_effect=fake_manim(renderer)) as run:
+            renderer.render(CODE, "CachedScene", output_filename="lesson")
+            real_get = renderer.render_cache.get
+
+            def get_then_evict(key, output_format):
+                path = real_get(key, output_format)
+                path.unlink()
+                return path
+
+            with patch.object(renderer.render_cache, "get", side_effect=get_then_evict):
+                result = renderer.render(CODE, "CachedScene", output_filename="lesson")
+
+        assert run.call_count == 2
+        assert result.success and not result.cached
+        assert result.output_path.name == "lesson_1.mp4"
+        assert result.output_path.read_bytes() == b"video-bytes"
+
+    def test_changed_code_misses(self, renderer, fake_manim):
+        """Different code always re-renders."""
+        with patch.object(renderer, "_run_manim", side_effect=fake_manim(renderer)) as run:
+            renderer.render(CODE, "CachedScene")
+            renderer.render(CODE.replace("Circle", "Square"), "CachedScene")
+
+        assert run.call_count == 2
+
+    def test_failed_renders_are_not_cached(self, renderer):
+        """Failures are never stored."""
+        failure = RenderResult(success=False, output_path=None, error_message="boom")
+        with patch.object(renderer, "_run_manim", return_value=failure) as run:
+            renderer.render(CODE, "CachedScene")
+            renderer.render(CODE, "CachedScene")
+
+        assert run.call_count == 2
+        assert renderer.render_cache.stats()["entries"] == 0
@@ -0,0 +1,166 @@
+"""Tests for the warm Manim render worker pool."""
+
+import importlib.util
+import os
+from unittest.mock import Mock, patch
+
+import pytest
+
+from math_content_engine.config import VideoQuality
+from math_content_engine.renderer.manim_renderer import ManimRenderer, RenderResult
+from math_content_engine.renderer import worker_pool
+from math_content_engine.renderer.media_cache import MediaCache, PARTIAL_MOVIES, TEX
+from math_content_engine.renderer.worker_pool import ManimWorkerPool, create_worker_pool
+
+MANIM_INSTALLED = importlib.util.find_spec("manim") is not None
+
+CODE = """from manim import *
+
+class PoolScene(Scene):
+    def construct(self):
+        self.play(Create(Circle()))
+        self.wait()
+"""
+
+
+@pytest.fixture
+def pool():
+    """Create a single-worker pool and shut it down afterwards."""
+    pool = ManimWorkerPool(size=1, max_jobs_per_worker=2)
+    yield pool
+    pool.shutdown()
+
+
+class TestManimWorkerPool:
+    """Tests for ManimWorkerPool."""
+
+    @pytest.mark.skipif(MANIM_INSTALLED, reason="checks the no-manim error path")
+    def test_reports_missing_manim_like_subprocess_backend(self, pool, tmp_path):
+        """Workers report a missing manim install with the renderer's message."""
+        script = tmp_path / "scene.py"
+        script.write_text(CODE)
+
+        result = pool.render(script, "PoolScene", tmp_path / "media", VideoQuality.LOW)
+
+        assert isinstance(result, RenderResult)
+        assert not result.success
+        assert result.error_message == "Manim is not installed. Run: pip install manim"
+
+    def test_workers_are_reused_then_recycled(self, pool, tmp_path):
+        """A worker serves jobs until max_jobs_per_worker, then is replaced."""
+        script = tmp_path / "scene.py"
+        script.write_text(CODE)
+
+        for _ in range(3):
+            pool.render(script, "Missing", tmp_path / "media", VideoQuality.LOW)
+
+        stats = pool.stats()
+        assert stats["jobs_completed"] == 3
+        assert stats["workers_recycled"] == 1
+        assert stats["workers"] == 1
+
+    def test_reply_carries_cache_log_and_tex_counts(self, pool, tmp_path):
+        """The worker's INFO log and TeX counts reach the RenderResult."""
+        worker = Mock(jobs=0)
+        worker.conn.recv.return_value = {
+            "success": False,
+            "error_message": "boom",
+            "log": "Animation 0 : Using cached data (hash : 1_2)",
+            "tex_hits": 2,
+            "tex_misses": 1,
+            "peak_rss_mb": 0,
+        }
+
+        with patch.object(pool, "_acquire", return_value=worker), \
+                patch.object(pool, "_release"):
+            result = pool.render(tmp_path / "scene.py", "PoolScene", tmp_path, VideoQuality.LOW)
+
+        assert "Using cached data" in result.stdout
+        assert (result.tex_hits, result.tex_misses) == (2, 1)
+
+    def test_tex_reads_split_into_hits_and_misses(self, tmp_path, monkeypatch):
+        """SVGs opened under the TeX cache count as hits if they predate the job."""
+        tex_dir = tmp_path / "Tex"
+        tex_dir.mkdir()
+        cached = tex_dir / "cached.svg"
+        cached.write_text("<svg/>")
+        started = cached.stat().st_mtime + 1
+        created = tex_dir / "created.svg"
+        created.write_text("<svg/>")
+        os.utime(created, (started + 1, started + 1))
+
+        monkeypatch.setattr(worker_pool, "_tex_reads", set())
+        monkeypatch.setattr(worker_pool, "_tex_roots", (os.path.join(str(tex_dir), ""),))
+        for path in (cached, created, tmp_path / "other.svg", tex_dir / "x.tex"):
+            worker_pool._audit_tex_reads("open", (path, "r", 0))
+
+        assert worker_pool._tex_reads == {str(cached), str(created)}
+        assert worker_pool._count_tex_reads(worker_pool._tex_reads, started) == (1, 1)
+
+    def test_render_after_shutdown_raises(self, tmp_path):
+        """A shut-down pool refuses new work."""
+        pool = ManimWorkerPool(size=1)
+        pool.shutdown()
+        with pytest.raises(RuntimeError):
+            pool.render(tmp_path / "scene.py", "PoolScene", tmp_path, VideoQuality.LOW)
+
+
+class TestRendererWithPool:
+    """Tests for routing ManimRenderer through a worker pool."""
+
+    def test_renderer_uses_pool_instead_of_subprocess(self, tmp_path):
+        """With a worker pool configured, no manim subprocess is spawned."""
+        output = tmp_path / "cache" / "PoolScene.mp4"
+        output.parent.mkdir(parents=True)
+        output.write_bytes(b"video")
+
+        pool = Mock()
+        pool.render.return_value = RenderResult(success=True, output_path=output)
+        renderer = ManimRenderer(
+            output_dir=tmp_path / "output",
+            cache_dir=tmp_path / "cache",
+            quality=VideoQuality.LOW,
+            worker_pool=pool,
+        )
+
+        with patch.object(renderer, "_run_manim") as run:
+            result = renderer.render(CODE, "PoolScene")
+
+        run.assert_not_called()
+        pool.render.assert_called_once()
+        assert result.success
+        assert result.output_path == tmp_path / "output" / "PoolScene.mp4"
+        assert result.render_time > 0
+
+    def test_pool_renders_update_media_cache_hit_rates(self, tmp_path):
+        """Partial movie and TeX hits reported by the pool are counted."""
+        pool = Mock()
+        pool.render.return_value = RenderResult(
+            success=False,
+            output_path=None,
+            error_message="boom",
+            stdout="Animation 0 : Using cached data (hash : 1_2)\n"
+            "Animation 1 : Partial movie file written in '/x/3.mp4'",
+            tex_hits=3,
+            tex_misses=1,
+        )
+        media_cache = MediaCache(tmp_path / "cache")
+        renderer = ManimRenderer(
+            output_dir=tmp_path / "output",
+            cache_dir=tmp_path / "cache",
+            quality=VideoQuality.LOW,
+            worker_pool=pool,
+            media_cache=media_cache,
+        )
+
+        renderer.render(CODE, "PoolScene")
+
+        stats = media_cache.stats()
+        assert stats[PARTIAL_MOVIES]["hit_rate"] == 0.5
+        assert (stats[TEX]["hits"], stats[TEX]["misses"]) == (3, 1)
+        assert stats[TEX]["hit_rate"] == 0.75
+
+    def test_create_worker_pool_respects_backend(self):
+        """Only the "pool" backend yields a shared pool."""
+        config = Mock(render_backend="subprocess")
+        assert create_worker_pool(config) is None